@@ -4,11 +4,12 @@ Core Memory Controllers - Handles main memory operations
 This module provides the API routes for core memory operations.
 """
 
+import json
 import logging
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, AsyncIterator, Optional
 
-from fastapi import APIRouter, Body, HTTPException, Query, Depends
+from fastapi import APIRouter, Body, HTTPException, Query, Depends, Request
 from fastapi.responses import JSONResponse
 
 from engram.core.memory import MemoryService
@@ -71,6 +72,108 @@ async def store_memory(
         raise HTTPException(status_code=500, detail=f"Failed to store memory: {str(e)}")
 
 
+def _batch_item(item: Any) -> Optional[Dict[str, Any]]:
+    """Convert a store_batch entry (a string or a MemoryStore-like object) to an add_many item."""
+    if isinstance(item, str):
+        return {"content": item}
+    if not isinstance(item, dict):
+        return None
+    content = item.get("content", item.get("value"))
+    if content is None:
+        return None
+    metadata = item.get("metadata") or ({"key": item["key"]} if "key" in item else None)
+    return {"content": content, "metadata": metadata}
+
+
+async def _ndjson_lines(request: Request) -> AsyncIterator[str]:
+    """Yield the lines of a streamed request body as they arrive."""
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8")
+    if buffer:
+        yield buffer.decode("utf-8")
+
+
+@router.post("/store_batch")
+async def store_memory_batch(
+    request: Request,
+    namespace: str = Query("conversations"),
+    batch_size: int = Query(500, ge=1, le=10000),
+    memory_service: MemoryService = Depends(get_memory_service)
+):
+    """
+    Store many memories in one request.
+    
+    The body is newline-delimited JSON (application/x-ndjson), read as it
+    streams in, or a JSON array. Each entry is a string or an object with
+    "value" (or "content") and optional "key" and "metadata". Entries are
+    stored in batches of batch_size, each encoded and persisted at once.
+    """
+    received = 0
+    stored = 0
+    batches = 0
+    errors = []
+    batch = []
+    
+    async def flush():
+        nonlocal stored, batches
+        if batch:
+            stored += await memory_service.add_many(list(batch), namespace=namespace)
+            batches += 1
+            batch.clear()
+    
+    def collect(entry: Any, position: int):
+        nonlocal received
+        received += 1
+        item = _batch_item(entry)
+        if item is None:
+            errors.append({"entry": position, "error": "missing value"})
+        else:
+            batch.append(item)
+    
+    try:
+        if "ndjson" in request.headers.get("content-type", ""):
+            position = 0
+            async for line in _ndjson_lines(request):
+                if not line.strip():
+                    continue
+                position += 1
+                try:
+                    collect(json.loads(line), position)
+                except ValueError as e:
+                    received += 1
+                    errors.append({"entry": position, "error": f"invalid JSON: {e}"})
+                if len(batch) >= batch_size:
+                    await flush()
+        else:
+            entries = await request.json()
+            if not isinstance(entries, list):
+                raise HTTPException(status_code=400, detail="Expected a JSON array or newline-delimited JSON")
+            for position, entry in enumerate(entries, 1):
+                collect(entry, position)
+                if len(batch) >= batch_size:
+                    await flush()
+        await flush()
+        
+        return {
+            "success": stored == received,
+            "received": received,
+            "stored": stored,
+            "batches": batches,
+            "errors": errors[:100],
+            "namespace": namespace,
+            "timestamp": datetime.now().isoformat()
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error storing memory batch: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to store memory batch: {str(e)}")
+
+
 @router.post("/store_conversation")
 async def store_conversation(
     conversation: List[Dict[str, str]] = Body(...),
@@ -122,9 +122,15 @@ async def search_structured_memory(
     min_importance: int = 1,
     limit: int = 10,
     sort_by: str = "importance",
+    tag_query: str = None,
     structured_memory: StructuredMemory = Depends(get_structured_memory)
 ):
-    """Search for memories."""
+    """
+    Search for memories.
+    
+    tags is a JSON list matched with OR; tag_query is a tag expression such as
+    "python AND (api OR http) AND NOT draft".
+    """
     if structured_memory is None:
         return {"status": "error", "message": "Structured memory service not initialized"}
     
@@ -138,6 +144,7 @@ async def search_structured_memory(
             query=query,
             categories=categories_list,
             tags=tags_list,
+            tag_query=tag_query,
             min_importance=min_importance,
             limit=limit,
             sort_by=sort_by
@@ -149,6 +156,21 @@ async def search_structured_memory(
         return {"status": "error", "message": f"Failed to search structured memories: {str(e)}"}
 
 
+@router.get("/cache")
+async def get_cache_stats(
+    structured_memory: StructuredMemory = Depends(get_structured_memory)
+):
+    """Get hit, miss and eviction metrics of the structured memory cache."""
+    if structured_memory is None:
+        return {"status": "error", "message": "Structured memory service not initialized"}
+    
+    try:
+        return {"success": True, "cache": structured_memory.storage.cache_stats()}
+    except Exception as e:
+        logger.error(f"Error getting structured memory cache stats: {e}")
+        return {"status": "error", "message": f"Failed to get cache stats: {str(e)}"}
+
+
 @router.get("/digest")
 async def get_memory_digest(
     max_memories: int = 10,
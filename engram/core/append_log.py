@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Append-only Log
+
+Provides a JSON lines write-ahead log with batched fsync, plus an atomic
+JSON snapshot writer. Storage backends use the pair to turn full-file
+rewrites into O(1) appends that are periodically compacted into a snapshot.
+"""
+
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+import weakref
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator
+
+logger = logging.getLogger("engram.append_log")
+
+# Logs that still have unsynced records when the interpreter exits
+_open_logs: "weakref.WeakSet[AppendLog]" = weakref.WeakSet()
+
+
+def _sync_open_logs() -> None:
+    """Flush and fsync every open log at interpreter shutdown."""
+    for log in list(_open_logs):
+        try:
+            log.close()
+        except Exception as e:
+            logger.error(f"Error closing log {log.path}: {e}")
+
+
+atexit.register(_sync_open_logs)
+
+
+def atomic_write_json(file_path: Path, data: Any, default=None) -> bool:
+    """
+    Write JSON data atomically (temp file + fsync + rename).
+
+    Args:
+        file_path: Destination path
+        data: JSON-serializable data
+        default: Optional json.dump default hook for non-standard types
+
+    Returns:
+        Boolean indicating success
+    """
+    file_path = Path(file_path)
+    tmp_path = file_path.with_name(file_path.name + ".tmp")
+    try:
+        with open(tmp_path, "w") as f:
+            json.dump(data, f, separators=(",", ":"), default=default)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, file_path)
+        return True
+    except Exception as e:
+        logger.error(f"Error writing snapshot {file_path}: {e}")
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+        return False
+
+
+class AppendLog:
+    """
+    Append-only JSON lines log.
+
+    Every append is written through to the OS immediately, so records survive
+    a process crash. fsync is batched: it runs once every ``fsync_batch``
+    records or ``fsync_interval`` seconds, whichever comes first, which bounds
+    the window of records that could be lost on power failure. A background
+    timer syncs records that no further append follows.
+    """
+
+    def __init__(self, path: Path, fsync_batch: int = 64, fsync_interval: float = 1.0):
+        """
+        Initialize the log.
+
+        Args:
+            path: Path of the log file
+            fsync_batch: Number of records between fsyncs
+            fsync_interval: Maximum seconds between fsyncs
+        """
+        self.path = Path(path)
+        self.fsync_batch = max(1, fsync_batch)
+        self.fsync_interval = fsync_interval
+        self.record_count = 0
+        self._handle = None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._timer = None
+        self._lock = threading.Lock()
+
+    def replay(self) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over the records currently in the log.
+
+        A torn final line (from a crash mid-write) is skipped. Also resets
+        ``record_count`` to the number of valid records found.
+
+        Yields:
+            Log records in append order
+        """
+        self.record_count = 0
+        if not self.path.exists():
+            return
+
+        with open(self.path, "r") as f:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"Skipping corrupt record at {self.path}:{line_number}")
+                    continue
+                self.record_count += 1
+                yield record
+
+    def _open(self):
+        """Open the log for appending if not already open."""
+        if self._handle is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._handle = open(self.path, "a")
+            _open_logs.add(self)
+        return self._handle
+
+    def append(self, record: Dict[str, Any]) -> bool:
+        """
+        Append a single record.
+
+        Args:
+            record: JSON-serializable record
+
+        Returns:
+            Boolean indicating success
+        """
+        return self.append_many([record])
+
+    def append_many(self, records: Iterable[Dict[str, Any]]) -> bool:
+        """
+        Append several records with a single write.
+
+        Args:
+            records: JSON-serializable records
+
+        Returns:
+            Boolean indicating success
+        """
+        lines = [json.dumps(record, separators=(",", ":"), default=list) for record in records]
+        if not lines:
+            return True
+
+        with self._lock:
+            try:
+                handle = self._open()
+                handle.write("\n".join(lines) + "\n")
+                handle.flush()
+                self.record_count += len(lines)
+                self._unsynced += len(lines)
+
+                elapsed = time.monotonic() - self._last_sync
+                if self._unsynced >= self.fsync_batch or elapsed >= self.fsync_interval:
+                    self._fsync()
+                elif self._timer is None:
+                    # Sync within the interval even if nothing else is appended
+                    self._timer = threading.Timer(self.fsync_interval - elapsed, self.sync)
+                    self._timer.daemon = True
+                    self._timer.start()
+                return True
+            except Exception as e:
+                logger.error(f"Error appending to log {self.path}: {e}")
+                return False
+
+    def _cancel_timer(self) -> None:
+        """Cancel a pending background sync (caller holds the lock)."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _fsync(self) -> None:
+        """fsync the open handle (caller holds the lock)."""
+        self._cancel_timer()
+        if self._handle is not None and self._unsynced:
+            os.fsync(self._handle.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def sync(self) -> None:
+        """Force any unsynced records to stable storage."""
+        with self._lock:
+            if self._handle is not None:
+                self._handle.flush()
+                self._fsync()
+
+    def truncate(self) -> None:
+        """Discard all records, typically after compacting into a snapshot."""
+        with self._lock:
+            self._cancel_timer()
+            if self._handle is not None:
+                self._handle.close()
+                self._handle = None
+            with open(self.path, "w") as f:
+                f.flush()
+                os.fsync(f.fileno())
+            self.record_count = 0
+            self._unsynced = 0
+
+    def close(self) -> None:
+        """Sync and close the log file."""
+        with self._lock:
+            if self._handle is not None:
+                self._handle.flush()
+                self._fsync()
+                self._handle.close()
+                self._handle = None
+        _open_logs.discard(self)
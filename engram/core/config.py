@@ -35,10 +35,18 @@ DEFAULT_CONFIG = {
     # Memory settings
     "default_importance": 3,
     "max_memories_per_request": 10,
+    "structured_cache_bytes": 64 * 1024 * 1024,
+    "structured_dedupe": False,  # Return the existing memory when identical content is added
+    "categorization_rules": None,  # Path to a JSON rule file (default: built-in rules)
     
     # Advanced settings
     "memory_expiration_days": 90,
     "vector_search_enabled": True,
+    "vector_index_factory": None,  # FAISS factory string, or {compartment pattern: string} (default: flat)
+    "vector_nprobe": 16,  # Inverted lists visited per IVF search
+    "vector_ef_search": 64,  # Candidate list size of HNSW searches
+    "vector_memory_limit_mb": 1024,  # Loaded FAISS indexes above this unload least recently used compartments
+    "vector_mmap": True,  # Memory-map saved flat and HNSW indexes instead of reading them
 }
 
 class EngramConfig:
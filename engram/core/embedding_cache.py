@@ -0,0 +1,457 @@
+#!/usr/bin/env python3
+"""
+Embedding Cache
+
+Process-wide cache of text embeddings keyed by (model name, content digest),
+so the same text is never encoded twice by the same model. Entries live in an
+in-memory LRU, optionally backed by a memory-mapped on-disk tier that
+survives restarts. Encoders are wrapped with CachedEncoder, which only
+passes cache misses to the underlying model.
+
+Settings are read from the environment:
+    ENGRAM_EMBEDDING_CACHE_SIZE: entries kept in memory (default 10000, 0 disables)
+    ENGRAM_EMBEDDING_CACHE_DIR: directory of the on-disk tier (disabled if unset)
+    ENGRAM_EMBEDDING_CACHE_DISK_SIZE: entries kept on disk per model (default 100000)
+"""
+
+import hashlib
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from engram.core.append_log import AppendLog
+
+logger = logging.getLogger("engram.embedding_cache")
+
+DEFAULT_CACHE_SIZE = 10000
+DEFAULT_DISK_SIZE = 100000
+
+
+def content_digest(text: str) -> str:
+    """
+    Digest identifying a text in the cache.
+
+    Args:
+        text: Text to identify
+
+    Returns:
+        Hex blake2b digest
+    """
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def model_name_of(model: Any) -> str:
+    """
+    Derive a cache namespace for an encoder from its configuration.
+
+    Args:
+        model: Encoder object
+
+    Returns:
+        Name that differs between models producing different embeddings
+    """
+    for attr in ("model_name", "name_or_path"):
+        name = getattr(model, attr, None)
+        if isinstance(name, str) and name:
+            return name
+
+    # SentenceTransformer keeps its source on the first module's config
+    try:
+        name = model[0].auto_model.config.name_or_path
+        if name:
+            return name
+    except Exception:
+        pass
+
+    parts = [type(model).__name__]
+    for attr in ("vector_size", "seed", "num_buckets"):
+        if hasattr(model, attr):
+            parts.append(f"{attr}={getattr(model, attr)}")
+    return "-".join(parts)
+
+
+class DiskTier:
+    """
+    Fixed-capacity memory-mapped store of embeddings for one model.
+
+    Vectors live in a .npy file used as a ring buffer; a JSON lines log
+    records which digest owns each slot. A parallel .npy file tags each slot
+    with its owner, and a slot is only read for the digest it is tagged
+    with, so a crash between overwriting a vector and logging its new owner
+    cannot hand the vector to the old one.
+    """
+
+    def __init__(self, directory: Path, model_name: str, dimension: int, capacity: int):
+        """
+        Open or create the on-disk tier of a model.
+
+        Args:
+            directory: Directory holding the cache files
+            model_name: Model the embeddings belong to
+            dimension: Embedding dimension
+            capacity: Number of embeddings kept before the oldest are overwritten
+        """
+        directory.mkdir(parents=True, exist_ok=True)
+        stem = f"{re.sub(r'[^A-Za-z0-9_.-]+', '_', model_name)}-{dimension}"
+        self.dimension = dimension
+        self.vectors_file = directory / f"{stem}.npy"
+        self.tags_file = directory / f"{stem}.tags.npy"
+        self.log = AppendLog(directory / f"{stem}.log")
+
+        if self.vectors_file.exists():
+            self.vectors = np.load(self.vectors_file, mmap_mode="r+")
+            if self.vectors.shape[1] != dimension:
+                raise ValueError(f"{self.vectors_file} holds {self.vectors.shape[1]}-d vectors, expected {dimension}")
+            self.capacity = self.vectors.shape[0]
+        else:
+            self.capacity = capacity
+            self.vectors = np.lib.format.open_memmap(
+                self.vectors_file, mode="w+", dtype=np.float32, shape=(capacity, dimension)
+            )
+
+        if self.tags_file.exists():
+            self.tags = np.load(self.tags_file, mmap_mode="r+")
+        else:
+            # Slots written before tags existed can't be checked; start over
+            self.log.truncate()
+            self.tags = np.lib.format.open_memmap(
+                self.tags_file, mode="w+", dtype=np.uint8, shape=(self.capacity, 16)
+            )
+
+        self.slots: Dict[str, int] = {}
+        self.owners: Dict[int, str] = {}
+        self.next_slot = 0
+        for record in self.log.replay():
+            self._assign(record["d"], record["s"])
+
+        # Forget slots whose vector was overwritten for an owner the log missed
+        for digest, slot in list(self.slots.items()):
+            if not self._tagged(slot, digest):
+                del self.slots[digest]
+                del self.owners[slot]
+
+    @staticmethod
+    def _tag(digest: str) -> bytes:
+        """Fixed-size tag identifying a digest in the tags file."""
+        return hashlib.blake2b(digest.encode("utf-8"), digest_size=16).digest()
+
+    def _tagged(self, slot: int, digest: str) -> bool:
+        """Check that a slot holds the vector of a digest."""
+        return self.tags[slot].tobytes() == self._tag(digest)
+
+    def _assign(self, digest: str, slot: int) -> None:
+        """Record that a slot now holds a digest's vector."""
+        previous = self.owners.get(slot)
+        if previous is not None:
+            self.slots.pop(previous, None)
+        self.slots[digest] = slot
+        self.owners[slot] = digest
+        self.next_slot = (slot + 1) % self.capacity
+
+    def get(self, digest: str) -> Optional[np.ndarray]:
+        """
+        Look up an embedding.
+
+        Args:
+            digest: Content digest
+
+        Returns:
+            Copy of the stored vector, or None
+        """
+        slot = self.slots.get(digest)
+        if slot is None or not self._tagged(slot, digest):
+            return None
+        return np.array(self.vectors[slot])
+
+    def put(self, digest: str, vector: np.ndarray) -> None:
+        """
+        Store an embedding, overwriting the oldest slot when full.
+
+        Args:
+            digest: Content digest
+            vector: Embedding to store
+        """
+        if digest in self.slots:
+            return
+        slot = self.next_slot
+        # Untag the slot before overwriting its vector, and tag it for the new
+        # owner only once the vector is complete
+        self.tags[slot] = 0
+        self.vectors[slot] = vector
+        self.tags[slot] = np.frombuffer(self._tag(digest), dtype=np.uint8)
+        self._assign(digest, slot)
+        self.log.append({"d": digest, "s": slot})
+
+        # Rewrite the log once it is mostly overwritten entries
+        if self.log.record_count > 2 * self.capacity:
+            self.log.truncate()
+            self.log.append_many({"d": d, "s": s} for d, s in self.slots.items())
+
+    def close(self) -> None:
+        """Flush the vectors and close the log."""
+        self.vectors.flush()
+        self.tags.flush()
+        self.log.close()
+
+
+class EmbeddingCache:
+    """
+    LRU cache of embeddings with an optional memory-mapped disk tier.
+    """
+
+    def __init__(self,
+                 max_entries: int = DEFAULT_CACHE_SIZE,
+                 disk_dir: Optional[Union[str, Path]] = None,
+                 disk_entries: int = DEFAULT_DISK_SIZE):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Embeddings kept in memory (0 disables the memory tier)
+            disk_dir: Directory of the on-disk tier, or None for memory only
+            disk_entries: Embeddings kept on disk per model
+        """
+        self.max_entries = max_entries
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.disk_entries = disk_entries
+        self.entries: "OrderedDict[Tuple[str, str], np.ndarray]" = OrderedDict()
+        self.disk_tiers: Dict[Tuple[str, int], DiskTier] = {}
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _disk_tier(self, model_name: str, dimension: int) -> Optional[DiskTier]:
+        """Get the disk tier of a model, opening it on first use."""
+        if self.disk_dir is None:
+            return None
+        key = (model_name, dimension)
+        tier = self.disk_tiers.get(key)
+        if tier is None:
+            try:
+                tier = DiskTier(self.disk_dir, model_name, dimension, self.disk_entries)
+            except Exception as e:
+                logger.error(f"Error opening embedding disk cache for {model_name}: {e}")
+                return None
+            self.disk_tiers[key] = tier
+        return tier
+
+    def _remember(self, key: Tuple[str, str], vector: np.ndarray) -> None:
+        """Insert into the memory tier, evicting the least recently used entry."""
+        if self.max_entries <= 0:
+            return
+        self.entries[key] = vector
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def get(self, model_name: str, digest: str, dimension: Optional[int] = None) -> Optional[np.ndarray]:
+        """
+        Look up an embedding, counting a hit or miss.
+
+        Args:
+            model_name: Model the embedding belongs to
+            digest: Content digest
+            dimension: Embedding dimension, needed to consult the disk tier
+
+        Returns:
+            The cached vector, or None
+        """
+        key = (model_name, digest)
+        with self._lock:
+            vector = self.entries.get(key)
+            if vector is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return vector
+
+            tier = self._disk_tier(model_name, dimension) if dimension else None
+            if tier is not None:
+                vector = tier.get(digest)
+                if vector is not None:
+                    self._remember(key, vector)
+                    self.disk_hits += 1
+                    return vector
+
+            self.misses += 1
+            return None
+
+    def put(self, model_name: str, digest: str, vector: np.ndarray) -> None:
+        """
+        Store an embedding in every tier.
+
+        Args:
+            model_name: Model the embedding belongs to
+            digest: Content digest
+            vector: 1-D embedding
+        """
+        vector = np.asarray(vector, dtype=np.float32).reshape(-1)
+        vector.flags.writeable = False
+        with self._lock:
+            self._remember((model_name, digest), vector)
+            tier = self._disk_tier(model_name, vector.shape[0])
+            if tier is not None:
+                tier.put(digest, vector)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get hit and miss counters.
+
+        Returns:
+            Dictionary of counters and sizes
+        """
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            "entries": len(self.entries),
+            "max_entries": self.max_entries,
+            "disk_enabled": self.disk_dir is not None,
+        }
+
+    def clear(self) -> None:
+        """Drop the memory tier and reset the counters."""
+        with self._lock:
+            self.entries.clear()
+            self.hits = self.disk_hits = self.misses = 0
+
+    def close(self) -> None:
+        """Flush and close the disk tiers."""
+        with self._lock:
+            for tier in self.disk_tiers.values():
+                tier.close()
+            self.disk_tiers.clear()
+
+
+class CachedEncoder:
+    """
+    Wraps an encoder so repeated texts are served from an EmbeddingCache.
+
+    Any attribute other than encode() is delegated to the wrapped model,
+    so the wrapper can stand in for a SentenceTransformer or SimpleEmbedding.
+    """
+
+    def __init__(self, model: Any, model_name: Optional[str] = None,
+                 cache: Optional[EmbeddingCache] = None):
+        """
+        Wrap an encoder.
+
+        Args:
+            model: Object with an encode(texts) method
+            model_name: Cache namespace for the model (derived if None)
+            cache: Cache to use (the process-wide cache if None)
+        """
+        self.model = model
+        self.model_name = model_name or model_name_of(model)
+        self.cache = cache if cache is not None else get_embedding_cache()
+        self.dimension: Optional[int] = None
+        if hasattr(model, "get_sentence_embedding_dimension"):
+            self.dimension = model.get_sentence_embedding_dimension()
+        elif hasattr(model, "vector_size"):
+            self.dimension = model.vector_size
+        # Whether the model returns a 2-D array for a single string
+        self._single_is_2d: Optional[bool] = None
+
+    def __getattr__(self, name: str) -> Any:
+        if name == "model":
+            raise AttributeError(name)
+        return getattr(self.model, name)
+
+    def encode(self, texts: Union[str, List[str]], **kwargs) -> np.ndarray:
+        """
+        Encode text(s), calling the model only for texts not in the cache.
+
+        Args:
+            texts: Text or list of texts to encode
+            **kwargs: Model options; calls with options bypass the cache
+
+        Returns:
+            Embeddings shaped as the wrapped model returns them
+        """
+        if kwargs:
+            return self.model.encode(texts, **kwargs)
+
+        if isinstance(texts, str):
+            digest = content_digest(texts)
+            vector = self.cache.get(self.model_name, digest, self.dimension)
+            if vector is None or self._single_is_2d is None:
+                output = np.asarray(self.model.encode(texts))
+                self._single_is_2d = output.ndim == 2
+                vector = output.reshape(-1)
+                self.dimension = vector.shape[0]
+                self.cache.put(self.model_name, digest, vector)
+            return vector.reshape(1, -1).copy() if self._single_is_2d else vector.copy()
+
+        digests = [content_digest(text) for text in texts]
+        vectors: List[Optional[np.ndarray]] = [
+            self.cache.get(self.model_name, digest, self.dimension) for digest in digests
+        ]
+
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            # Encode each distinct missing text once
+            unique: Dict[str, int] = {}
+            for i in missing:
+                unique.setdefault(digests[i], i)
+            encoded = np.atleast_2d(np.asarray(self.model.encode([texts[i] for i in unique.values()])))
+            self.dimension = encoded.shape[1]
+            fresh = {}
+            for digest, vector in zip(unique, encoded):
+                self.cache.put(self.model_name, digest, vector)
+                fresh[digest] = vector
+            for i in missing:
+                vectors[i] = fresh[digests[i]]
+
+        if not vectors:
+            return np.zeros((0, self.dimension or 0), dtype=np.float32)
+        return np.vstack(vectors).astype(np.float32, copy=False)
+
+
+_embedding_cache: Optional[EmbeddingCache] = None
+_embedding_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """
+    Get the process-wide embedding cache, creating it from the environment.
+
+    Returns:
+        The shared EmbeddingCache
+    """
+    global _embedding_cache
+    if _embedding_cache is None:
+        with _embedding_cache_lock:
+            if _embedding_cache is None:
+                _embedding_cache = EmbeddingCache(
+                    max_entries=int(os.environ.get("ENGRAM_EMBEDDING_CACHE_SIZE", DEFAULT_CACHE_SIZE)),
+                    disk_dir=os.environ.get("ENGRAM_EMBEDDING_CACHE_DIR") or None,
+                    disk_entries=int(os.environ.get("ENGRAM_EMBEDDING_CACHE_DISK_SIZE", DEFAULT_DISK_SIZE)),
+                )
+    return _embedding_cache
+
+
+def cached_encoder(model: Any, model_name: Optional[str] = None) -> Any:
+    """
+    Wrap an encoder with the process-wide cache (no-op if already wrapped).
+
+    Args:
+        model: Encoder to wrap, or None
+        model_name: Cache namespace for the model (derived if None)
+
+    Returns:
+        CachedEncoder around the model, or the model itself if None or wrapped
+    """
+    if model is None or isinstance(model, CachedEncoder):
+        return model
+    return CachedEncoder(model, model_name)
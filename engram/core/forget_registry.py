@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Forget Registry
+
+Keeps the set of "FORGET/IGNORE" instructions for a client and compiles them
+into a single Aho-Corasick automaton, so filtering a search result costs one
+pass over its text no matter how many items have been forgotten. Uses
+pyahocorasick when it is installed and a pure Python automaton otherwise.
+"""
+
+import logging
+import threading
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger("engram.forget_registry")
+
+# Prefix marking a memory as an instruction to forget its content
+FORGET_PREFIX = "FORGET/IGNORE: "
+
+try:
+    import ahocorasick
+    HAS_AHOCORASICK = True
+except ImportError:
+    HAS_AHOCORASICK = False
+
+
+class _Automaton:
+    """Pure Python Aho-Corasick automaton reporting the first match."""
+
+    def __init__(self, patterns: Iterable[str]):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.output: List[Optional[str]] = [None]
+
+        for pattern in patterns:
+            state = 0
+            for char in pattern:
+                next_state = self.goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto[state][char] = next_state
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append(None)
+                state = next_state
+            self.output[state] = pattern
+
+        # Breadth-first pass to link each state to its longest proper suffix
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(char, 0)
+                self.fail[next_state] = target if target != next_state else 0
+                if self.output[next_state] is None:
+                    self.output[next_state] = self.output[self.fail[next_state]]
+
+    def first_match(self, text: str) -> Optional[str]:
+        state = 0
+        goto, fail, output = self.goto, self.fail, self.output
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state] is not None:
+                return output[state]
+        return None
+
+
+class ForgetRegistry:
+    """
+    Registry of forgotten content for one client.
+
+    Every change bumps ``version``; the automaton is recompiled lazily the
+    next time a match is requested after a change.
+    """
+
+    def __init__(self, items: Optional[Iterable[str]] = None):
+        """
+        Initialize the registry.
+
+        Args:
+            items: Optional initial forgotten items
+        """
+        self.version = 0
+        self.loaded = False
+        self._items: Dict[str, str] = {}
+        self._automaton = None
+        self._compiled_version = -1
+        self._lock = threading.Lock()
+        if items:
+            self.load(items)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, item: str) -> bool:
+        return item.strip().lower() in self._items
+
+    @property
+    def items(self) -> List[str]:
+        """Forgotten items as originally written."""
+        return list(self._items.values())
+
+    def add(self, item: str) -> bool:
+        """
+        Register an item to forget.
+
+        Args:
+            item: Text that should be filtered out of search results
+
+        Returns:
+            True if the item was new
+        """
+        key = item.strip().lower()
+        if not key or key in self._items:
+            return False
+        with self._lock:
+            self._items[key] = item.strip()
+            self.version += 1
+        return True
+
+    def add_instruction(self, content: str) -> bool:
+        """
+        Register the item named by a "FORGET/IGNORE: ..." memory.
+
+        Args:
+            content: Memory content
+
+        Returns:
+            True if the content was a forget instruction for a new item
+        """
+        if not content.startswith(FORGET_PREFIX):
+            return False
+        return self.add(content[len(FORGET_PREFIX):])
+
+    def load(self, contents: Iterable[str]) -> None:
+        """
+        Replace the registry with the instructions found in stored memories.
+
+        Args:
+            contents: Contents of the longterm memories
+        """
+        with self._lock:
+            self._items.clear()
+            self.version += 1
+        for content in contents:
+            self.add_instruction(content)
+        self.loaded = True
+
+    def reset(self) -> None:
+        """Forget every forget instruction (e.g. when longterm is cleared)."""
+        with self._lock:
+            self._items.clear()
+            self.version += 1
+
+    def _compile(self):
+        """Return the automaton for the current version, rebuilding if stale."""
+        if self._compiled_version == self.version:
+            return self._automaton
+
+        with self._lock:
+            if self._compiled_version != self.version:
+                patterns = list(self._items)
+                if not patterns:
+                    automaton = None
+                elif HAS_AHOCORASICK:
+                    automaton = ahocorasick.Automaton()
+                    for pattern in patterns:
+                        automaton.add_word(pattern, pattern)
+                    automaton.make_automaton()
+                else:
+                    automaton = _Automaton(patterns)
+                self._automaton = automaton
+                self._compiled_version = self.version
+            return self._automaton
+
+    def match(self, content: str) -> Optional[str]:
+        """
+        Find a forgotten item contained in some content.
+
+        Args:
+            content: Text to check (case-insensitive)
+
+        Returns:
+            The matching forgotten item, or None
+        """
+        automaton = self._compile()
+        if automaton is None:
+            return None
+
+        text = content.lower()
+        if HAS_AHOCORASICK:
+            for _, pattern in automaton.iter(text):
+                return self._items.get(pattern, pattern)
+            return None
+
+        pattern = automaton.first_match(text)
+        return self._items.get(pattern, pattern) if pattern is not None else None
+
+    def filter(self, results: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Drop search results whose content contains a forgotten item.
+
+        Args:
+            results: Search results with a "content" field
+
+        Returns:
+            Tuple of (kept results, number removed)
+        """
+        if not self._items:
+            return results, 0
+
+        kept = []
+        for result in results:
+            forgotten = self.match(result.get("content", ""))
+            if forgotten is None:
+                kept.append(result)
+            else:
+                logger.debug(f"Filtered out memory containing: {forgotten}")
+        return kept, len(results) - len(kept)
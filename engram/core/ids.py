@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Memory ID Generation
+
+Provides collision-free, time-sortable IDs for memories, shared by every
+memory store. An ID is a namespace or category prefix followed by a
+26-character ULID:
+
+    projects-01J9ZK3X7M4Q8R2T6V0W5Y1B3C
+
+The ULID is a 48-bit millisecond timestamp followed by 80 random bits,
+both in Crockford base32, so IDs with the same prefix sort by creation
+time as plain strings. IDs generated in the same millisecond increment
+the random part instead of drawing a new one, which keeps them unique and
+in order within a process however fast they are created.
+
+ULIDs contain no "-", so everything before the first "-" is still the
+category, as get_memory expects.
+"""
+
+import base64
+import hashlib
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple, Union
+
+# Crockford base32, in ASCII order so encoded values sort like the numbers
+CROCKFORD = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_RFC4648 = "ABCDEFGHIJKLMNOPQRSTUVWXYZ234567"
+_TO_CROCKFORD = bytes.maketrans(_RFC4648.encode(), CROCKFORD.encode())
+_DECODE = {char: value for value, char in enumerate(CROCKFORD)}
+
+TIME_CHARS = 10
+RANDOM_CHARS = 16
+ULID_CHARS = TIME_CHARS + RANDOM_CHARS
+
+_RANDOM_BITS = 80
+_RANDOM_MAX = (1 << _RANDOM_BITS) - 1
+
+
+def _encode_time(milliseconds: int) -> str:
+    """Encode a 48-bit millisecond timestamp as 10 Crockford characters."""
+    chars = []
+    for _ in range(TIME_CHARS):
+        chars.append(CROCKFORD[milliseconds & 31])
+        milliseconds >>= 5
+    return "".join(reversed(chars))
+
+
+def _encode_random(value: int) -> str:
+    """Encode an 80-bit integer as 16 Crockford characters."""
+    return base64.b32encode(value.to_bytes(10, "big")).translate(_TO_CROCKFORD).decode("ascii")
+
+
+class IdGenerator:
+    """
+    Thread-safe monotonic ULID generator.
+    """
+
+    def __init__(self):
+        """Initialize the generator."""
+        self._lock = threading.Lock()
+        self._last_ms = -1
+        self._last_random = 0
+        self._time_part = ""
+
+    def _next(self, count: int) -> Tuple[str, int]:
+        """
+        Reserve `count` consecutive random values.
+
+        Returns:
+            (encoded timestamp, first random value)
+        """
+        with self._lock:
+            now_ms = time.time_ns() // 1_000_000
+            if now_ms > self._last_ms:
+                self._last_ms = now_ms
+                self._time_part = _encode_time(now_ms)
+                # Leave room to increment without overflowing the random part
+                self._last_random = int.from_bytes(os.urandom(10), "big") >> 1
+            elif self._last_random + count > _RANDOM_MAX:
+                # Exhausted this millisecond (or the clock went back): borrow the next one
+                self._last_ms += 1
+                self._time_part = _encode_time(self._last_ms)
+                self._last_random = int.from_bytes(os.urandom(10), "big") >> 1
+            else:
+                self._last_random += 1
+            first = self._last_random
+            self._last_random += count - 1
+            return self._time_part, first
+
+    def ulid(self) -> str:
+        """Generate a single ULID."""
+        time_part, value = self._next(1)
+        return time_part + _encode_random(value)
+
+    def ulids(self, count: int) -> List[str]:
+        """
+        Generate consecutive ULIDs in one step.
+
+        Args:
+            count: Number of IDs
+
+        Returns:
+            List of ULIDs in ascending order
+        """
+        if count <= 0:
+            return []
+        time_part, first = self._next(count)
+        return [time_part + _encode_random(value) for value in range(first, first + count)]
+
+
+_generator = IdGenerator()
+
+
+def new_id(prefix: Optional[str] = None) -> str:
+    """
+    Generate a new memory ID.
+
+    Args:
+        prefix: Namespace or category prefix (optional)
+
+    Returns:
+        "<prefix>-<ulid>", or a bare ULID without a prefix
+    """
+    ulid = _generator.ulid()
+    return f"{prefix}-{ulid}" if prefix else ulid
+
+
+def new_ids(prefix: Optional[str], count: int) -> List[str]:
+    """
+    Generate several memory IDs at once, for bulk inserts.
+
+    Args:
+        prefix: Namespace or category prefix (optional)
+        count: Number of IDs
+
+    Returns:
+        List of IDs in ascending order
+    """
+    ulids = _generator.ulids(count)
+    return [f"{prefix}-{ulid}" for ulid in ulids] if prefix else ulids
+
+
+def _ulid_part(memory_id: str) -> Optional[str]:
+    """Get the ULID of an ID, or None if it is not a ULID-based ID."""
+    ulid = memory_id.rsplit("-", 1)[-1]
+    if len(ulid) != ULID_CHARS or any(char not in _DECODE for char in ulid):
+        return None
+    return ulid
+
+
+def id_timestamp(memory_id: str) -> Optional[float]:
+    """
+    Get the creation time encoded in an ID.
+
+    Args:
+        memory_id: ID from new_id (with or without prefix)
+
+    Returns:
+        Unix timestamp in seconds, or None for IDs of another format
+    """
+    ulid = _ulid_part(memory_id)
+    if ulid is None:
+        return None
+    milliseconds = 0
+    for char in ulid[:TIME_CHARS]:
+        milliseconds = (milliseconds << 5) | _DECODE[char]
+    return milliseconds / 1000
+
+
+def id_datetime(memory_id: str) -> Optional[datetime]:
+    """
+    Get the creation time encoded in an ID as a UTC datetime.
+
+    Args:
+        memory_id: ID from new_id (with or without prefix)
+
+    Returns:
+        Timezone-aware datetime, or None for IDs of another format
+    """
+    timestamp = id_timestamp(memory_id)
+    return datetime.fromtimestamp(timestamp, timezone.utc) if timestamp is not None else None
+
+
+def order_key(memory_id: str, timestamp: Union[float, str, None] = None) -> str:
+    """
+    Get a key that sorts memories by creation time, for sorted indexes.
+
+    IDs from new_id sort by their ULID, so memories created in the same
+    millisecond keep their creation order. IDs of another format sort by
+    the given creation time instead, encoded the same way.
+
+    Args:
+        memory_id: Memory ID
+        timestamp: Creation time as Unix seconds or an ISO format string,
+            used for IDs of another format
+
+    Returns:
+        Sort key
+    """
+    ulid = _ulid_part(memory_id)
+    if ulid is not None:
+        return ulid
+    if isinstance(timestamp, str):
+        try:
+            timestamp = datetime.fromisoformat(timestamp).timestamp()
+        except ValueError:
+            timestamp = None
+    return _encode_time(int((timestamp or 0) * 1000)) + "0" * RANDOM_CHARS
+
+
+def numeric_id(memory_id: str) -> int:
+    """
+    Get a stable 63-bit integer for an ID, for stores that need integer keys.
+
+    Unlike hash(), the value is the same in every process.
+
+    Args:
+        memory_id: Memory ID
+
+    Returns:
+        Non-negative integer below 2**63
+    """
+    digest = hashlib.blake2b(memory_id.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") & ((1 << 63) - 1)
@@ -77,7 +77,7 @@ class MCPAdapter:
                 "parameters": {
                     "query": {"type": "string", "description": "Query to use for context retrieval"},
                     "namespaces": {"type": "array", "description": "Namespaces to include", "default": ["conversations", "thinking", "longterm"]},
-                    "limit": {"type": "integer", "description": "Results per namespace", "default": 3}
+                    "limit": {"type": "integer", "description": "Maximum results across all namespaces", "default": 3}
                 },
                 "returns": {"type": "object", "description": "Formatted context from memory"}
             },
@@ -11,11 +11,12 @@ from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Any, Optional, Union
 
+from engram.core.forget_registry import ForgetRegistry, FORGET_PREFIX
 from engram.core.memory.config import initialize_vector_db, USE_FALLBACK
 from engram.core.memory.storage import FileStorage
 from engram.core.memory.compartments import CompartmentManager
 from engram.core.memory.search import search_memory, get_relevant_context
-from engram.core.memory.utils import load_json_file, save_json_file
+from engram.core.memory.utils import load_json_file, save_json_file, split_items
 
 logger = logging.getLogger("engram.memory")
 
@@ -63,6 +64,9 @@ class MemoryService:
         self.storage = None
         self._initialize_storage()
         
+        # Forgotten items, loaded from longterm on first use
+        self.forget_registry = ForgetRegistry()
+        
     def _initialize_storage(self) -> None:
         """Initialize the appropriate storage backend."""
         # Check if vector DB is available
@@ -130,13 +134,81 @@ class MemoryService:
             namespace = "conversations"
             
         # Add memory using storage backend
-        return self.storage.add(content, namespace, metadata)
+        success = self.storage.add(content, namespace, metadata)
+        
+        # Keep the forget filter current without reloading it
+        if success and namespace == "longterm" and isinstance(content, str):
+            self.forget_registry.add_instruction(content)
+            
+        return success
+    
+    async def add_many(self,
+                      items: List[Union[str, List[Dict[str, str]], Dict[str, Any]]],
+                      namespace: str = "conversations") -> int:
+        """
+        Add a batch of memories, encoding and persisting them together.
+        
+        Args:
+            items: Memory contents, or dicts with "content" and optional "metadata"
+            namespace: The namespace to store in (default: "conversations")
+            
+        Returns:
+            Number of memories stored
+        """
+        # Validate namespace
+        valid_namespaces = self.namespaces + self.compartment_manager.get_compartment_namespaces()
+        
+        if namespace not in valid_namespaces:
+            # Invalid namespace, fall back to default
+            logger.warning(f"Invalid namespace: {namespace}, using 'conversations'")
+            namespace = "conversations"
+            
+        contents, metadatas = split_items(items)
+        
+        # Add memories using storage backend
+        if hasattr(self.storage, "add_many"):
+            stored = self.storage.add_many(contents, namespace, metadatas)
+        else:
+            stored = sum(
+                1 for content, metadata in zip(contents, metadatas)
+                if self.storage.add(content, namespace, metadata)
+            )
+        
+        # Keep the forget filter current without reloading it
+        if stored and namespace == "longterm":
+            for content in contents:
+                if isinstance(content, str):
+                    self.forget_registry.add_instruction(content)
+                    
+        return stored
+    
+    def get_forget_registry(self) -> ForgetRegistry:
+        """
+        Get the forget registry, building it from the longterm namespace once.
+        
+        Returns:
+            The client's forget registry
+        """
+        if not self.forget_registry.loaded:
+            try:
+                if hasattr(self.storage, "iter_contents"):
+                    contents = self.storage.iter_contents("longterm")
+                else:
+                    contents = [
+                        item.get("content", "")
+                        for item in self.storage.search(FORGET_PREFIX.strip(), "longterm", 10000)
+                    ]
+                self.forget_registry.load(contents)
+            except Exception as e:
+                logger.error(f"Error loading forgotten items: {e}")
+        return self.forget_registry
     
     async def search(self, 
                     query: str, 
                     namespace: str = "conversations", 
                     limit: int = 5,
-                    check_forget: bool = True) -> Dict[str, Any]:
+                    check_forget: bool = True,
+                    min_score: float = 0.0) -> Dict[str, Any]:
         """
         Search for memories based on a query.
         
@@ -145,6 +217,7 @@ class MemoryService:
             namespace: The namespace to search in (default: "conversations")
             limit: Maximum number of results to return
             check_forget: Whether to check for and filter out forgotten information
+            min_score: Minimum relevance in [0, 1]; lower-scoring results are dropped
             
         Returns:
             Dictionary with search results
@@ -154,20 +227,24 @@ class MemoryService:
             query=query,
             namespace=namespace,
             limit=limit,
-            check_forget=check_forget
+            check_forget=check_forget,
+            forget_registry=self.get_forget_registry() if check_forget else None,
+            min_score=min_score
         )
     
     async def get_relevant_context(self, 
                                   query: str, 
                                   namespaces: List[str] = None,
-                                  limit: int = 3) -> str:
+                                  limit: int = 3,
+                                  min_score: float = 0.0) -> str:
         """
         Get formatted context from multiple namespaces for a given query.
         
         Args:
             query: The query to search for
             namespaces: List of namespaces to search (default: all)
-            limit: Maximum memories per namespace
+            limit: Maximum memories across all namespaces
+            min_score: Minimum relevance in [0, 1]; lower-scoring results are dropped
             
         Returns:
             Formatted context string
@@ -176,7 +253,9 @@ class MemoryService:
             storage=self.storage,
             query=query,
             namespaces=namespaces,
-            limit=limit
+            limit=limit,
+            forget_registry=self.get_forget_registry(),
+            min_score=min_score
         )
     
     async def get_namespaces(self) -> List[str]:
@@ -207,7 +286,12 @@ class MemoryService:
             return False
             
         # Clear namespace using storage backend
-        return self.storage.clear_namespace(namespace)
+        success = self.storage.clear_namespace(namespace)
+        
+        if success and namespace == "longterm":
+            self.forget_registry.reset()
+            
+        return success
     
     async def create_compartment(self, name: str, description: str = None, parent: str = None) -> Optional[str]:
         """
@@ -332,4 +416,12 @@ class MemoryService:
             return False
         except Exception as e:
             logger.error(f"Error keeping memory: {e}")
-            return False
\ No newline at end of file
+            return False
+    
+    def close(self) -> None:
+        """Flush pending writes and release storage resources."""
+        try:
+            if hasattr(self.storage, "close"):
+                self.storage.close()
+        except Exception as e:
+            logger.error(f"Error closing memory storage: {e}")
@@ -76,7 +76,8 @@ def initialize_vector_db() -> Tuple[bool, Optional[Dict[str, Any]], Optional[Any
         try:
             from sentence_transformers import SentenceTransformer
             model_name = "all-MiniLM-L6-v2"  # Small, fast model with good performance
-            vector_model = SentenceTransformer(model_name)
+            from engram.core.embedding_cache import cached_encoder
+            vector_model = cached_encoder(SentenceTransformer(model_name), model_name)
             vector_db_info["model"] = model_name
             vector_db_info["model_dim"] = vector_model.get_sentence_embedding_dimension()
         except ImportError:
@@ -5,20 +5,52 @@ Memory Search Module
 Provides search functionality across memory namespaces with relevance ranking.
 """
 
+import asyncio
+import functools
+import heapq
 import logging
 from datetime import datetime
-from typing import Dict, List, Any, Optional, Union
+from typing import Dict, List, Any, Optional, Tuple, Union
 
+from engram.core.forget_registry import ForgetRegistry
 from engram.core.memory.utils import truncate_content
 
 logger = logging.getLogger("engram.memory.search")
 
+async def _lookup_forget_registry(storage) -> Optional[ForgetRegistry]:
+    """
+    Build a one-off forget registry from FORGET/IGNORE memories in longterm.
+    
+    Args:
+        storage: Storage backend to use (file or vector)
+        
+    Returns:
+        Forget registry, or None if the lookup failed
+    """
+    try:
+        # Search for FORGET instructions
+        forget_results = await search_memory(
+            storage=storage,
+            query="FORGET/IGNORE",
+            namespace="longterm",
+            limit=100,
+            check_forget=False  # Prevent recursion
+        )
+        return ForgetRegistry(
+            item.get("content", "") for item in forget_results.get("results", [])
+        )
+    except Exception as e:
+        logger.error(f"Error checking for forgotten items: {e}")
+        return None
+
 async def search_memory(
     storage, 
     query: str, 
     namespace: str = "conversations", 
     limit: int = 5,
-    check_forget: bool = True
+    check_forget: bool = True,
+    forget_registry: Optional[ForgetRegistry] = None,
+    min_score: float = 0.0
 ) -> Dict[str, Any]:
     """
     Search for memories based on a query.
@@ -29,54 +61,27 @@ async def search_memory(
         namespace: The namespace to search in
         limit: Maximum number of results to return
         check_forget: Whether to check for and filter out forgotten information
+        forget_registry: Registry of forgotten items; if omitted, FORGET/IGNORE
+            instructions are looked up in the longterm namespace
+        min_score: Minimum relevance in [0, 1]; lower-scoring results are dropped
         
     Returns:
         Dictionary with search results
     """
     # Get forgotten items if needed
-    forgotten_items = []
-    if check_forget and namespace != "longterm":
-        try:
-            # Search for FORGET instructions
-            forget_results = await search_memory(
-                storage=storage,
-                query="FORGET/IGNORE",
-                namespace="longterm",
-                limit=100,
-                check_forget=False  # Prevent recursion
-            )
-            
-            # Extract the forgotten items
-            for item in forget_results.get("results", []):
-                content = item.get("content", "")
-                if content.startswith("FORGET/IGNORE: "):
-                    forgotten_text = content[len("FORGET/IGNORE: "):]
-                    forgotten_items.append(forgotten_text)
-        except Exception as e:
-            logger.error(f"Error checking for forgotten items: {e}")
+    if check_forget and namespace != "longterm" and forget_registry is None:
+        forget_registry = await _lookup_forget_registry(storage)
     
     # Perform the search
-    results = storage.search(query, namespace, limit * 2)  # Get extra for filtering
-    
-    # Filter out forgotten items
-    if forgotten_items:
-        filtered_results = []
-        for result in results:
-            should_include = True
-            content = result.get("content", "")
-            
-            # Check if any forgotten item appears in this content
-            for forgotten in forgotten_items:
-                if forgotten.lower() in content.lower():
-                    # This memory contains forgotten information
-                    should_include = False
-                    logger.debug(f"Filtered out memory containing: {forgotten}")
-                    break
-            
-            if should_include:
-                filtered_results.append(result)
-        
-        results = filtered_results
+    # Only pass the threshold when set, so storages without it keep working
+    search_kwargs = {"min_score": min_score} if min_score > 0 else {}
+    results = storage.search(query, namespace, limit * 2, **search_kwargs)  # Get extra for filtering
+    
+    # Filter out forgotten items in a single pass over each result
+    forgotten_count = 0
+    if check_forget and namespace != "longterm" and forget_registry is not None:
+        results, _ = forget_registry.filter(results)
+        forgotten_count = len(forget_registry)
     
     # Limit the results
     results = results[:limit]
@@ -85,14 +90,16 @@ async def search_memory(
         "results": results,
         "count": len(results),
         "namespace": namespace,
-        "forgotten_count": len(forgotten_items) if forgotten_items else 0
+        "forgotten_count": forgotten_count
     }
 
 async def get_relevant_context(
     storage,
     query: str, 
     namespaces: List[str] = None,
-    limit: int = 3
+    limit: int = 3,
+    forget_registry: Optional[ForgetRegistry] = None,
+    min_score: float = 0.0
 ) -> str:
     """
     Get formatted context from multiple namespaces for a given query.
@@ -101,7 +108,9 @@ async def get_relevant_context(
         storage: Storage backend to use (file or vector)
         query: The query to search for
         namespaces: List of namespaces to search (default: standard namespaces)
-        limit: Maximum memories per namespace
+        limit: Maximum memories across all namespaces
+        forget_registry: Registry of forgotten items shared by every namespace
+        min_score: Minimum relevance in [0, 1]; lower-scoring memories are left out
         
     Returns:
         Formatted context string
@@ -118,32 +127,52 @@ async def get_relevant_context(
             for compartment_id in active_compartments:
                 namespaces.append(f"compartment-{compartment_id}")
     
-    all_results = []
+    # Look up forgotten items once for every namespace
+    if forget_registry is None:
+        forget_registry = await _lookup_forget_registry(storage)
     
-    # Search each namespace
-    for namespace in namespaces:
-        results = await search_memory(
-            storage=storage,
-            query=query, 
-            namespace=namespace, 
-            limit=limit
+    # Encode the query once for every namespace
+    search_kwargs = {"min_score": min_score} if min_score > 0 else {}
+    if hasattr(storage, "encode_query"):
+        search_kwargs["query_embedding"] = storage.encode_query(query)
+    
+    # Search all namespaces concurrently; storage calls block, so run them
+    # in the default thread pool
+    loop = asyncio.get_running_loop()
+    searches = [
+        loop.run_in_executor(
+            None,
+            functools.partial(storage.search, query, namespace, limit * 2, **search_kwargs)
         )
-        
-        for item in results.get("results", []):
-            all_results.append({
-                "namespace": namespace,
-                "content": item.get("content", ""),
-                "metadata": item.get("metadata", {})
-            })
+        for namespace in namespaces
+    ]
+    namespace_hits = await asyncio.gather(*searches, return_exceptions=True)
+    
+    # Filter forgotten items in one pass and pool the hits of every namespace
+    candidates: List[Tuple[str, Dict[str, Any]]] = []
+    for namespace, hits in zip(namespaces, namespace_hits):
+        if isinstance(hits, Exception):
+            logger.error(f"Error searching namespace {namespace}: {hits}")
+            continue
+        if forget_registry is not None and namespace != "longterm":
+            hits, _ = forget_registry.filter(hits)
+        candidates.extend((namespace, hit) for hit in hits)
+    
+    # Keep the global top-k and group it by namespace for formatting
+    results_by_namespace: Dict[str, List[Dict[str, Any]]] = {}
+    for namespace, hit in heapq.nlargest(
+        limit, candidates, key=lambda pair: pair[1].get("relevance", 0.0)
+    ):
+        results_by_namespace.setdefault(namespace, []).append(hit)
     
     # Format the context
-    if not all_results:
+    if not results_by_namespace:
         return ""
     
     context_parts = ["### Memory Context\n"]
     
     for namespace in namespaces:
-        namespace_results = [r for r in all_results if r["namespace"] == namespace]
+        namespace_results = results_by_namespace.get(namespace)
         
         if namespace_results:
             # Format header based on namespace
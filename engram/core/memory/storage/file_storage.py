@@ -3,24 +3,32 @@
 File-based Memory Storage
 
 Provides fallback file-based storage for when vector DB is not available.
+
+Memories are persisted as a JSON snapshot plus an append-only JSON lines log.
+Writes only append to the log; the log is folded into the snapshot once it
+grows as large as the snapshot itself, so the cost of a write stays constant
+regardless of how many memories a client has. Keyword search is served by
+a BM25 inverted index per namespace, persisted alongside the snapshot.
 """
 
-import json
 import logging
-import os
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Any, Optional, Union
 
+from engram.core.append_log import AppendLog, atomic_write_json
+from engram.core.text_index import InvertedIndex, load_indexes, save_indexes
 from engram.core.memory.utils import (
-    generate_memory_id, 
+    generate_memory_ids,
     format_content,
-    load_json_file,
-    save_json_file
+    load_json_file
 )
 
 logger = logging.getLogger("engram.memory.file_storage")
 
+# Never compact a log shorter than this, however small the snapshot is
+MIN_COMPACTION_RECORDS = 1000
+
 class FileStorage:
     """
     File-based memory storage implementation.
@@ -40,38 +48,157 @@ class FileStorage:
         self.client_id = client_id
         self.data_dir = data_dir
         self.fallback_file = data_dir / f"{client_id}-memories.json"
+        self.log = AppendLog(data_dir / f"{client_id}-memories.log")
+        self.index_file = data_dir / f"{client_id}-memories.index.json"
+        self.compaction_threshold = MIN_COMPACTION_RECORDS
+
+        # Memory ID -> namespace, so updates don't scan every namespace
+        self._namespace_by_id: Dict[str, str] = {}
+        self.text_indexes: Dict[str, InvertedIndex] = {}
         self.memories = self._load_memories()
         
     def _load_memories(self) -> Dict[str, List[Dict[str, Any]]]:
         """
-        Load memories from file.
+        Load memories from the snapshot and replay the log on top of it.
         
         Returns:
             Dictionary of memories by namespace
         """
+        memories = {}
         if self.fallback_file.exists():
-            try:
-                with open(self.fallback_file, "r") as f:
-                    return json.load(f)
-            except Exception as e:
-                logger.error(f"Error loading fallback memories: {e}")
+            memories = load_json_file(self.fallback_file) or {}
+
+        self._namespace_by_id = {
+            memory.get("id"): namespace
+            for namespace, namespace_memories in memories.items()
+            for memory in namespace_memories
+        }
+
+        # The persisted text index matches the snapshot, not the log
+        self.text_indexes = load_indexes(self.index_file, memories)
+
+        try:
+            for record in self.log.replay():
+                self._apply(memories, record)
+        except Exception as e:
+            logger.error(f"Error replaying memory log: {e}")
         
-        return {}
+        return memories
+
+    def _apply(self, memories: Dict[str, List[Dict[str, Any]]], record: Dict[str, Any]) -> bool:
+        """
+        Apply a single log record to the in-memory state.
+
+        Args:
+            memories: Dictionary of memories by namespace
+            record: Log record with an "op" of add, update or clear
+
+        Returns:
+            Boolean indicating whether the record matched existing state
+        """
+        op = record.get("op")
+
+        if op == "add":
+            memory = record["memory"]
+            # A crash between writing a snapshot and truncating the log
+            # replays adds the snapshot already holds
+            if memory["id"] in self._namespace_by_id:
+                return False
+            namespace = record["namespace"]
+            namespace_memories = memories.setdefault(namespace, [])
+            self.text_indexes.setdefault(namespace, InvertedIndex()).add(
+                len(namespace_memories), memory.get("content", "")
+            )
+            namespace_memories.append(memory)
+            self._namespace_by_id[memory["id"]] = namespace
+            return True
+
+        if op == "update":
+            namespace = self._namespace_by_id.get(record["id"])
+            if namespace is None:
+                return False
+            # Search newest first; updates almost always target recent memories
+            for memory in reversed(memories.get(namespace, [])):
+                if memory.get("id") == record["id"]:
+                    memory.setdefault("metadata", {}).update(record["metadata"])
+                    return True
+            return False
+
+        if op == "clear":
+            namespace = record["namespace"]
+            for memory in memories.get(namespace, []):
+                self._namespace_by_id.pop(memory.get("id"), None)
+            memories[namespace] = []
+            self.text_indexes.setdefault(namespace, InvertedIndex()).clear()
+            return True
+
+        logger.warning(f"Unknown memory log operation: {op}")
+        return False
+
+    def _append(self, record: Dict[str, Any]) -> bool:
+        """
+        Append a record to the log and compact if the log has grown too large.
+
+        Args:
+            record: Log record to persist
+
+        Returns:
+            Boolean indicating success
+        """
+        return self._append_many([record])
+
+    def _append_many(self, records: List[Dict[str, Any]]) -> bool:
+        """
+        Append a batch of records to the log, compacting at most once.
+
+        Args:
+            records: Log records to persist
+
+        Returns:
+            Boolean indicating success
+        """
+        if not self.log.append_many(records):
+            return False
+
+        total = sum(len(memories) for memories in self.memories.values())
+        if self.log.record_count >= max(self.compaction_threshold, total):
+            self.compact()
+        return True
         
     def _save_memories(self) -> bool:
         """
         Save memories to file.
         
+        Returns:
+            Boolean indicating success
+        """
+        return self.compact()
+
+    def compact(self) -> bool:
+        """
+        Fold the log into a new snapshot and truncate the log.
+
         Returns:
             Boolean indicating success
         """
         try:
-            with open(self.fallback_file, "w") as f:
-                json.dump(self.memories, f, indent=2)
+            self.log.sync()
+            if not atomic_write_json(self.fallback_file, self.memories):
+                return False
+            self.log.truncate()
+            save_indexes(self.index_file, self.text_indexes, self.memories)
             return True
         except Exception as e:
-            logger.error(f"Error saving fallback memories: {e}")
+            logger.error(f"Error compacting fallback memories: {e}")
             return False
+
+    def flush(self) -> None:
+        """Force pending log records to stable storage."""
+        self.log.sync()
+
+    def close(self) -> None:
+        """Sync and close the log."""
+        self.log.close()
             
     def initialize_namespace(self, namespace: str) -> None:
         """
@@ -82,6 +209,8 @@ class FileStorage:
         """
         if namespace not in self.memories:
             self.memories[namespace] = []
+        if namespace not in self.text_indexes:
+            self.text_indexes[namespace] = InvertedIndex()
             
     def add(self, 
            content: Union[str, List[Dict[str, str]]],
@@ -98,39 +227,64 @@ class FileStorage:
         Returns:
             Boolean indicating success
         """
+        return self.add_many([content], namespace, [metadata]) == 1
+
+    def add_many(self,
+                contents: List[Union[str, List[Dict[str, str]]]],
+                namespace: str,
+                metadatas: Optional[List[Optional[Dict[str, Any]]]] = None) -> int:
+        """
+        Add a batch of memories with a single log write.
+
+        Args:
+            contents: The memory contents (strings or message objects)
+            namespace: The namespace to store in
+            metadatas: Optional metadata for each memory
+
+        Returns:
+            Number of memories stored
+        """
+        if not contents:
+            return 0
+
         # Initialize namespace if needed
         self.initialize_namespace(namespace)
         
-        # Format content to string if needed
-        content_str = format_content(content)
+        if metadatas is None:
+            metadatas = [None] * len(contents)
+        timestamp = datetime.now().isoformat()
+
+        records = []
+        memory_ids = generate_memory_ids(namespace, len(contents))
+        for memory_id, content, metadata in zip(memory_ids, contents, metadatas):
+            # Format content to string if needed
+            content_str = format_content(content)
         
-        # Generate a unique memory ID
-        memory_id = generate_memory_id(namespace, content_str)
+            # Prepare metadata
+            metadata = dict(metadata or {})
+            metadata["timestamp"] = timestamp
+            metadata["client_id"] = self.client_id
         
-        # Prepare metadata
-        if metadata is None:
-            metadata = {}
-            
-        metadata["timestamp"] = datetime.now().isoformat()
-        metadata["client_id"] = self.client_id
-        
-        # Create memory object
-        memory_obj = {
-            "id": memory_id,
-            "content": content_str,
-            "metadata": metadata
-        }
+            # Create memory object with a unique memory ID
+            memory_obj = {
+                "id": memory_id,
+                "content": content_str,
+                "metadata": metadata
+            }
         
-        # Add to memory storage
-        self.memories[namespace].append(memory_obj)
+            # Add to memory storage and the text index
+            record = {"op": "add", "namespace": namespace, "memory": memory_obj}
+            self._apply(self.memories, record)
+            records.append(record)
         
-        # Save to file
-        return self._save_memories()
+        # Append to the log
+        return len(records) if self._append_many(records) else 0
         
     def search(self,
               query: str,
               namespace: str,
-              limit: int = 5) -> List[Dict[str, Any]]:
+              limit: int = 5,
+              min_score: float = 0.0) -> List[Dict[str, Any]]:
         """
         Search for memories based on a query.
         
@@ -138,36 +292,68 @@ class FileStorage:
             query: The search query
             namespace: The namespace to search in
             limit: Maximum number of results to return
+            min_score: Minimum relevance (relative to the best keyword hit)
             
         Returns:
             List of matching memory objects
         """
-        # Initialize results list
-        results = []
-        
         # Check if namespace exists
         if namespace not in self.memories:
-            return results
+            return []
             
-        # Simple keyword matching for fallback
-        for memory in self.memories[namespace]:
-            content = memory.get("content", "")
-            if query.lower() in content.lower():
-                results.append({
-                    "id": memory.get("id", ""),
-                    "content": content,
-                    "metadata": memory.get("metadata", {}),
-                    "relevance": 1.0  # No real relevance score in fallback
-                })
-        
-        # Sort by timestamp (newest first) and limit results
-        results.sort(
-            key=lambda x: x.get("metadata", {}).get("timestamp", ""), 
-            reverse=True
-        )
-        results = results[:limit]
-        
-        return results
+        namespace_memories = self.memories[namespace]
+        
+        # An empty query lists the namespace, newest first
+        if not query.strip():
+            results = [self._format_result(memory, 1.0) for memory in namespace_memories]
+            results.sort(
+                key=lambda x: x.get("metadata", {}).get("timestamp", ""),
+                reverse=True
+            )
+            return results[:limit]
+        
+        # Rank by BM25; relevance is relative to the best hit
+        hits = self.text_indexes[namespace].search(query, limit)
+        if not hits:
+            return []
+
+        best = hits[0][1] or 1.0
+        return [
+            self._format_result(namespace_memories[offset], score / best)
+            for offset, score in hits
+            if score / best >= min_score
+        ]
+
+    @staticmethod
+    def _format_result(memory: Dict[str, Any], relevance: float) -> Dict[str, Any]:
+        """
+        Format a stored memory as a search result.
+
+        Args:
+            memory: Stored memory object
+            relevance: Relevance score in [0, 1]
+
+        Returns:
+            Search result dictionary
+        """
+        return {
+            "id": memory.get("id", ""),
+            "content": memory.get("content", ""),
+            "metadata": memory.get("metadata", {}),
+            "relevance": relevance
+        }
+
+    def iter_contents(self, namespace: str) -> List[str]:
+        """
+        List the content of every memory in a namespace.
+
+        Args:
+            namespace: The namespace to list
+
+        Returns:
+            Memory contents in insertion order
+        """
+        return [memory.get("content", "") for memory in self.memories.get(namespace, [])]
         
     def clear_namespace(self, namespace: str) -> bool:
         """
@@ -184,10 +370,11 @@ class FileStorage:
             return True  # Nothing to clear
             
         # Clear the namespace
-        self.memories[namespace] = []
+        record = {"op": "clear", "namespace": namespace}
+        self._apply(self.memories, record)
         
         # Save changes
-        return self._save_memories()
+        return self._append(record)
         
     def update_memory(self,
                      memory_id: str,
@@ -202,15 +389,10 @@ class FileStorage:
         Returns:
             Boolean indicating success
         """
-        # Find the memory
-        for namespace, memories in self.memories.items():
-            for i, memory in enumerate(memories):
-                if memory.get("id") == memory_id:
-                    # Update metadata
-                    memory["metadata"].update(metadata)
-                    
-                    # Save changes
-                    return self._save_memories()
+        record = {"op": "update", "id": memory_id, "metadata": metadata}
+        if self._apply(self.memories, record):
+            # Save changes
+            return self._append(record)
         
         # Memory not found
         logger.warning(f"Memory {memory_id} not found in fallback storage")
@@ -13,12 +13,15 @@ from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Any, Optional, Union, Tuple
 
+from engram.core.embedding_cache import cached_encoder
+from engram.core.ids import numeric_id
 from engram.core.memory.utils import (
-    generate_memory_id, 
+    generate_memory_ids,
     format_content,
     load_json_file,
     save_json_file
 )
+from engram.core.scoring import METRIC_COSINE, METRIC_INNER_PRODUCT, METRIC_L2, relevance as score_relevance
 
 logger = logging.getLogger("engram.memory.vector_storage")
 
@@ -46,7 +49,7 @@ class VectorStorage:
         """
         self.client_id = client_id
         self.data_dir = data_dir
-        self.vector_model = vector_model
+        self.vector_model = cached_encoder(vector_model)
         self.vector_db_name = vector_db_name
         self.vector_dim = vector_model.get_sentence_embedding_dimension()
         
@@ -80,9 +83,12 @@ class VectorStorage:
             # Initialize FAISS vector store
             logger.info("Initializing FAISS vector database")
             
-            # TODO: Implement proper FAISS integration
-            # This is a placeholder for actual FAISS setup
-            self.vector_client = VectorStore(str(vector_db_path))
+            # One ID-mapped index per namespace, sized for the embedding model
+            self.vector_client = VectorStore(
+                data_path=str(vector_db_path),
+                dimension=self.vector_dim,
+                embedding_model=self.vector_model
+            )
             
             logger.info("FAISS vector database initialized")
         except ImportError as e:
@@ -149,6 +155,23 @@ class VectorStorage:
         if hasattr(self, '_original_validate'):
             self.vector_client._validate_collection_info = self._original_validate
             
+    @staticmethod
+    def _normalize(embedding: Any) -> Any:
+        """
+        Scale embeddings to unit length so every backend ranks by cosine similarity.
+        
+        Args:
+            embedding: A single embedding or a batch of embeddings
+            
+        Returns:
+            2D float32 array of unit-length embeddings
+        """
+        import numpy as np
+        
+        vectors = np.atleast_2d(np.asarray(embedding, dtype=np.float32))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-10)
+        
     def ensure_collection(self, namespace: str) -> bool:
         """
         Ensure collection exists for namespace.
@@ -171,7 +194,8 @@ class VectorStorage:
                 # ChromaDB implementation
                 collection = self.vector_client.get_or_create_collection(
                     name=collection_name,
-                    embedding_function=None  # We'll provide embeddings explicitly
+                    embedding_function=None,  # We'll provide embeddings explicitly
+                    metadata={"hnsw:space": "cosine"}
                 )
                 logger.info(f"Retrieved or created collection {collection_name}")
                 
@@ -214,9 +238,10 @@ class VectorStorage:
                 self._restore_qdrant_validation()
                 
             elif self.vector_db_name == "faiss":
-                # FAISS implementation
-                # TODO: Implement FAISS collection creation
-                pass
+                # FAISS implementation - load the saved index or start an empty one
+                if not self.vector_client.ensure_compartment(collection_name):
+                    logger.error(f"Failed to open FAISS index for {collection_name}")
+                    return False
             else:
                 raise ValueError(f"Unknown vector database: {self.vector_db_name}")
                 
@@ -243,58 +268,84 @@ class VectorStorage:
         Returns:
             Boolean indicating success
         """
+        return self.add_many([content], namespace, [metadata]) == 1
+    
+    def add_many(self,
+                contents: List[Union[str, List[Dict[str, str]]]],
+                namespace: str,
+                metadatas: Optional[List[Optional[Dict[str, Any]]]] = None) -> int:
+        """
+        Add a batch of memories with one encode call and one write.
+        
+        Args:
+            contents: The memory contents (strings or message objects)
+            namespace: The namespace to store in
+            metadatas: Optional metadata for each memory
+            
+        Returns:
+            Number of memories stored
+        """
+        if not contents:
+            return 0
+            
         # Ensure collection exists
         if not self.ensure_collection(namespace):
             logger.error(f"Failed to ensure collection for namespace {namespace}")
-            return False
+            return 0
             
         # Get collection name
         collection_name = self.namespace_collections.get(namespace)
         if not collection_name:
             logger.error(f"No collection found for namespace: {namespace}")
-            return False
+            return 0
             
         # Format content to string if needed
-        content_str = format_content(content)
+        content_strs = [format_content(content) for content in contents]
         
-        # Generate a unique memory ID
-        memory_id = generate_memory_id(namespace, content_str)
+        # Generate a unique memory ID for each memory
+        memory_ids = generate_memory_ids(namespace, len(content_strs))
         
         # Prepare metadata
-        if metadata is None:
-            metadata = {}
-            
-        metadata["timestamp"] = datetime.now().isoformat()
-        metadata["client_id"] = self.client_id
-        metadata["namespace"] = namespace
+        if metadatas is None:
+            metadatas = [None] * len(contents)
+        timestamp = datetime.now().isoformat()
+        metadatas = [dict(metadata or {}) for metadata in metadatas]
+        for metadata in metadatas:
+            metadata["timestamp"] = timestamp
+            metadata["client_id"] = self.client_id
+            metadata["namespace"] = namespace
         
         try:
-            # Generate embedding for the content
-            embedding = self.vector_model.encode(content_str)
+            # Generate embeddings for the whole batch at once
+            embeddings = self._normalize(self.vector_model.encode(content_strs))
             
             # Store based on vector DB type
             if self.vector_db_name == "chromadb":
                 # ChromaDB implementation
                 collection = self.vector_client.get_collection(name=collection_name)
                 
-                # Add the document with its embedding
+                # Add the documents with their embeddings
                 collection.add(
-                    ids=[memory_id],
-                    embeddings=[embedding.tolist()],
-                    documents=[content_str],
+                    ids=memory_ids,
+                    embeddings=embeddings.tolist(),
+                    documents=content_strs,
                     metadatas=[{
                         "id": memory_id,
                         "timestamp": metadata.get("timestamp", ""),
                         "client_id": metadata.get("client_id", ""),
                         "namespace": namespace
-                    }]
+                    } for memory_id, metadata in zip(memory_ids, metadatas)]
                 )
                 
-                logger.debug(f"Added memory to ChromaDB in namespace {namespace} with ID {memory_id}")
-                return True
+                logger.debug(f"Added {len(memory_ids)} memories to ChromaDB in namespace {namespace}")
+                return len(memory_ids)
                 
             elif self.vector_db_name == "qdrant":
                 # Qdrant implementation
+                payloads = [
+                    {"id": memory_id, "content": content_str, "metadata": metadata}
+                    for memory_id, content_str, metadata in zip(memory_ids, content_strs, metadatas)
+                ]
                 try:
                     # Try with the newer API style
                     from qdrant_client.http import models
@@ -302,14 +353,11 @@ class VectorStorage:
                         collection_name=collection_name,
                         points=[
                             models.PointStruct(
-                                id=hash(memory_id) % (2**63-1),  # Ensure it's a valid ID
+                                id=numeric_id(payload["id"]),  # Stable across processes
                                 vector=embedding.tolist(),
-                                payload={
-                                    "id": memory_id,
-                                    "content": content_str,
-                                    "metadata": metadata
-                                }
+                                payload=payload
                             )
+                            for payload, embedding in zip(payloads, embeddings)
                         ]
                     )
                 except (ImportError, AttributeError):
@@ -317,45 +365,75 @@ class VectorStorage:
                     self.vector_client.upsert(
                         collection_name=collection_name,
                         points=[{
-                            "id": hash(memory_id) % (2**63-1),
+                            "id": numeric_id(payload["id"]),
                             "vector": embedding.tolist(),
-                            "payload": {
-                                "id": memory_id,
-                                "content": content_str,
-                                "metadata": metadata
-                            }
-                        }]
+                            "payload": payload
+                        } for payload, embedding in zip(payloads, embeddings)]
                     )
                 
-                logger.debug(f"Added memory to Qdrant in namespace {namespace} with ID {memory_id}")
-                return True
+                logger.debug(f"Added {len(memory_ids)} memories to Qdrant in namespace {namespace}")
+                return len(memory_ids)
                 
             elif self.vector_db_name == "faiss":
-                # FAISS implementation
-                # TODO: Implement FAISS memory addition
-                pass
+                # FAISS implementation: one index.add for the batch
+                ids = self.vector_client.add(
+                    compartment=collection_name,
+                    texts=content_strs,
+                    metadatas=[
+                        {"memory_id": memory_id, **metadata}
+                        for memory_id, metadata in zip(memory_ids, metadatas)
+                    ],
+                    embeddings=embeddings
+                )
+                if not ids:
+                    return 0
+                
+                # The store logs the batch and writes the index in the background
+                logger.debug(f"Added {len(ids)} memories to FAISS in namespace {namespace}")
+                return len(ids)
                 
             else:
                 raise ValueError(f"Unknown vector database: {self.vector_db_name}")
                 
         except Exception as e:
-            logger.error(f"Error adding memory to vector database: {e}")
-            return False
+            logger.error(f"Error adding memories to vector database: {e}")
+            return 0
+            
+    def encode_query(self, query: str) -> Any:
+        """
+        Encode a query so it can be reused across namespace searches.
+        
+        Args:
+            query: The search query
             
+        Returns:
+            Query embedding
+        """
+        return self.vector_model.encode(query)
+        
     def search(self,
               query: str,
               namespace: str,
-              limit: int = 5) -> List[Dict[str, Any]]:
+              limit: int = 5,
+              query_embedding: Optional[Any] = None,
+              min_score: float = 0.0) -> List[Dict[str, Any]]:
         """
         Search for memories based on a query.
         
+        Every backend reports "relevance" as the cosine similarity between
+        query and memory clipped to [0, 1] (see engram.core.scoring), so
+        scores from different namespaces and backends can be compared.
+        
         Args:
             query: The search query
             namespace: The namespace to search in
             limit: Maximum number of results to return
+            query_embedding: Optional embedding from encode_query()
+            min_score: Minimum relevance; the search stops at the first
+                result below it, so fewer than limit results may be returned
             
         Returns:
-            List of matching memory objects
+            List of matching memory objects, best first
         """
         # Ensure collection exists
         if not self.ensure_collection(namespace):
@@ -370,7 +448,9 @@ class VectorStorage:
             
         try:
             # Generate embedding for the query
-            query_embedding = self.vector_model.encode(query)
+            if query_embedding is None:
+                query_embedding = self.encode_query(query)
+            query_embedding = self._normalize(query_embedding)[0]
             
             # Search based on vector DB type
             if self.vector_db_name == "chromadb":
@@ -383,6 +463,11 @@ class VectorStorage:
                     n_results=limit * 2  # Request more results to account for filtering
                 )
                 
+                # Collections created before cosine spaces were used report
+                # squared L2 distances ("ip" distances are 1 - inner product)
+                space = (collection.metadata or {}).get("hnsw:space", "l2")
+                metric = METRIC_L2 if space == "l2" else METRIC_COSINE
+                
                 # Format the results
                 formatted_results = []
                 
@@ -393,10 +478,11 @@ class VectorStorage:
                 distances = search_results.get('distances', [[]])[0]
                 
                 for i in range(len(ids)):
-                    # Convert distances to relevance scores (lower distance = higher relevance)
-                    # Normalize to 0-1 range where 1 is highest relevance
-                    distance = distances[i] if i < len(distances) else 1.0
-                    relevance = 1.0 - min(distance, 1.0)  # Cap at 1.0
+                    # Results come closest first, so the rest score lower still
+                    distance = distances[i] if i < len(distances) else 2.0
+                    relevance = score_relevance(distance, metric)
+                    if relevance < min_score:
+                        break
                     
                     metadata = metadatas[i] if i < len(metadatas) else {}
                     document = documents[i] if i < len(documents) else ""
@@ -416,19 +502,24 @@ class VectorStorage:
                 
             elif self.vector_db_name == "qdrant":
                 # Qdrant implementation
+                # Collections use cosine distance, so Qdrant scores are cosine
+                # similarities and it can apply the threshold itself
+                threshold = {"score_threshold": min_score} if min_score > 0 else {}
                 try:
                     # Try with standard API
                     search_results = self.vector_client.search(
                         collection_name=collection_name,
                         query_vector=query_embedding.tolist(),
-                        limit=limit * 2  # Request more results to account for filtering
+                        limit=limit * 2,  # Request more results to account for filtering
+                        **threshold
                     )
                 except TypeError:
                     # Fall back to alternate API
                     search_results = self.vector_client.search(
                         collection_name=collection_name,
                         vector=query_embedding.tolist(),
-                        limit=limit * 2
+                        limit=limit * 2,
+                        **threshold
                     )
                 
                 # Format the results
@@ -450,12 +541,16 @@ class VectorStorage:
                             if not payload and hasattr(result, '__dict__'):
                                 payload = result.__dict__
                             score = 1.0
+                        
+                        relevance = score_relevance(score, METRIC_INNER_PRODUCT)
+                        if relevance < min_score:
+                            break
                                 
                         formatted_results.append({
                             "id": payload.get("id", ""),
                             "content": payload.get("content", ""),
                             "metadata": payload.get("metadata", {}),
-                            "relevance": score
+                            "relevance": relevance
                         })
                     except Exception as e:
                         logger.warning(f"Error formatting Qdrant result: {e}, skipping")
@@ -464,8 +559,28 @@ class VectorStorage:
                 
             elif self.vector_db_name == "faiss":
                 # FAISS implementation
-                # TODO: Implement FAISS search
-                pass
+                search_results = self.vector_client.search(
+                    compartment=collection_name,
+                    query=query,
+                    top_k=limit,
+                    query_embedding=query_embedding,
+                    min_score=min_score
+                )
+                
+                # Format the results
+                formatted_results = []
+                for result in search_results:
+                    metadata = dict(result.get("metadata", {}))
+                    memory_id = metadata.pop("memory_id", result.get("id", ""))
+                    
+                    formatted_results.append({
+                        "id": memory_id,
+                        "content": result.get("text", ""),
+                        "metadata": metadata,
+                        "relevance": result.get("score", 0.0)
+                    })
+                    
+                return formatted_results
                 
             else:
                 raise ValueError(f"Unknown vector database: {self.vector_db_name}")
@@ -474,6 +589,52 @@ class VectorStorage:
             logger.error(f"Error searching vector database: {e}")
             return []
             
+    def iter_contents(self, namespace: str) -> List[str]:
+        """
+        List the content of every memory in a namespace.
+        
+        Args:
+            namespace: The namespace to list
+            
+        Returns:
+            Memory contents
+        """
+        if not self.ensure_collection(namespace):
+            return []
+            
+        collection_name = self.namespace_collections[namespace]
+        
+        try:
+            if self.vector_db_name == "chromadb":
+                collection = self.vector_client.get_collection(name=collection_name)
+                return collection.get(include=["documents"]).get("documents") or []
+                
+            elif self.vector_db_name == "qdrant":
+                contents = []
+                offset = None
+                while True:
+                    points, offset = self.vector_client.scroll(
+                        collection_name=collection_name,
+                        limit=1000,
+                        offset=offset,
+                        with_payload=True,
+                        with_vectors=False
+                    )
+                    contents.extend(point.payload.get("content", "") for point in points)
+                    if offset is None:
+                        return contents
+                        
+            elif self.vector_db_name == "faiss":
+                entries = self.vector_client.get_metadata(collection_name).values()
+                return [entry.get("text", "") for entry in entries]
+                
+            else:
+                raise ValueError(f"Unknown vector database: {self.vector_db_name}")
+                
+        except Exception as e:
+            logger.error(f"Error listing memories in namespace {namespace}: {e}")
+            return []
+            
     def clear_namespace(self, namespace: str) -> bool:
         """
         Clear all memories in a namespace.
@@ -516,9 +677,9 @@ class VectorStorage:
                     )
                     
             elif self.vector_db_name == "faiss":
-                # FAISS implementation
-                # TODO: Implement FAISS namespace clearing
-                pass
+                # FAISS implementation - drop the index files and start empty
+                self.vector_client.delete(collection_name)
+                self.vector_client.ensure_compartment(collection_name)
                 
             else:
                 raise ValueError(f"Unknown vector database: {self.vector_db_name}")
@@ -528,4 +689,12 @@ class VectorStorage:
             
         except Exception as e:
             logger.error(f"Error clearing namespace in vector storage: {e}")
-            return False
\ No newline at end of file
+            return False
+    
+    def close(self) -> None:
+        """Write any index changes the vector store has not yet persisted."""
+        try:
+            if self.vector_db_name == "faiss" and self.vector_client is not None:
+                self.vector_client.close()
+        except Exception as e:
+            logger.error(f"Error closing vector storage: {e}")
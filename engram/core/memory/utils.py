@@ -8,10 +8,11 @@ formatting, timestamp handling, and helper functions.
 
 import json
 import logging
-import time
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Union
+from typing import Dict, List, Any, Optional, Tuple, Union
+
+from engram.core.ids import new_id, new_ids
 
 logger = logging.getLogger("engram.memory.utils")
 
@@ -38,18 +39,51 @@ def format_content(content: Union[str, List[Dict[str, str]]]) -> str:
     else:
         return content
 
-def generate_memory_id(namespace: str, content: str) -> str:
+def split_items(items: List[Any]) -> Tuple[List[Any], List[Optional[Dict[str, Any]]]]:
+    """
+    Split batch items into contents and metadata.
+    
+    Args:
+        items: Memory contents, or dicts with "content" and optional "metadata"
+        
+    Returns:
+        Tuple of (contents, metadata for each content)
+    """
+    contents, metadatas = [], []
+    for item in items:
+        if isinstance(item, dict):
+            contents.append(item.get("content", ""))
+            metadatas.append(item.get("metadata"))
+        else:
+            contents.append(item)
+            metadatas.append(None)
+    return contents, metadatas
+
+def generate_memory_id(namespace: str, content: str = None) -> str:
     """
-    Generate a unique ID for a memory.
+    Generate a unique, time-sortable ID for a memory.
     
     Args:
         namespace: The namespace for the memory
-        content: The content of the memory
+        content: The content of the memory (unused; kept for compatibility)
+        
+    Returns:
+        Unique memory ID of the form "<namespace>-<ulid>"
+    """
+    return new_id(namespace)
+
+def generate_memory_ids(namespace: str, count: int) -> List[str]:
+    """
+    Generate unique, time-sortable IDs for a batch of memories.
+    
+    Args:
+        namespace: The namespace for the memories
+        count: Number of IDs to generate
         
     Returns:
-        Unique memory ID
+        List of memory IDs in ascending order
     """
-    return f"{namespace}-{int(time.time())}-{hash(content) % 10000}"
+    return new_ids(namespace, count)
 
 def load_json_file(file_path: Path) -> Dict:
     """
@@ -9,14 +9,15 @@ and common memory operations across different namespaces.
 import json
 import logging
 import os
-import time
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Any, Optional, Union
 
 # Import from refactored structure
 from ..utils.logging import setup_logger
-from ..utils.helpers import is_valid_namespace
+from engram.core.forget_registry import ForgetRegistry, FORGET_PREFIX
+from engram.core.ids import new_id, new_ids
+from ..utils.helpers import is_valid_namespace, format_memory_for_storage
 
 # Initialize logger
 logger = setup_logger("engram.memory")
@@ -75,6 +76,10 @@ class MemoryService:
             fallback_info = setup_file_storage(self.data_dir, self.client_id, self.namespaces, self.compartments)
             self.fallback_file = fallback_info["file"]
             self.fallback_memories = fallback_info["memories"]
+            self.text_indexes = fallback_info["text_indexes"]
+        
+        # Forgotten items, loaded from longterm on first use
+        self.forget_registry = ForgetRegistry()
     
     def _load_compartments(self) -> Dict[str, Dict[str, Any]]:
         """Load compartment definitions from file."""
@@ -98,6 +103,26 @@ class MemoryService:
             logger.error(f"Error saving compartments: {e}")
             return False
     
+    def get_forget_registry(self) -> ForgetRegistry:
+        """
+        Get the forget registry, building it from the longterm namespace once.
+        
+        Returns:
+            The client's forget registry
+        """
+        if not self.forget_registry.loaded:
+            try:
+                if self.vector_available:
+                    collection_name = self.namespace_collections.get("longterm")
+                    entries = self.vector_store.get_metadata(collection_name).values()
+                    contents = [entry.get("text", "") for entry in entries]
+                else:
+                    contents = [m.get("content", "") for m in self.fallback_memories.get("longterm", [])]
+                self.forget_registry.load(contents)
+            except Exception as e:
+                logger.error(f"Error loading forgotten items: {e}")
+        return self.forget_registry
+    
     def _ensure_compartment_collection(self, compartment_id: str) -> bool:
         """Ensure vector collection or fallback storage exists for the given compartment."""
         from ..storage.vector import ensure_vector_compartment
@@ -163,7 +188,11 @@ class MemoryService:
             content_str = content
         
         # Generate a unique memory ID
-        memory_id = f"{namespace}-{int(time.time())}-{hash(content_str) % 10000}"
+        memory_id = new_id(namespace)
+        
+        # Keep the forget filter current without reloading it
+        if namespace == "longterm" and content_str.startswith(FORGET_PREFIX):
+            self.forget_registry.add_instruction(content_str)
         
         # Store in vector database if available
         if self.vector_available:
@@ -193,12 +222,88 @@ class MemoryService:
                 namespace=namespace,
                 memory_id=memory_id,
                 content=content_str,
-                metadata=metadata
+                metadata=metadata,
+                text_indexes=getattr(self, "text_indexes", None)
             )
         except Exception as e:
             logger.error(f"Error adding memory to fallback storage: {e}")
             return False
     
+    async def add_many(self,
+                       items: List[Union[str, List[Dict[str, str]], Dict[str, Any]]],
+                       namespace: str = "conversations") -> int:
+        """
+        Add a batch of memories, encoding and persisting them together.
+        
+        Args:
+            items: Memory contents, or dicts with "content" and optional "metadata"
+            namespace: The namespace to store in (default: "conversations")
+            
+        Returns:
+            Number of memories stored
+        """
+        from ..storage.vector import add_many_to_vector_store
+        from ..storage.file import add_many_to_file_store
+        from engram.core.memory.utils import split_items
+        
+        if not items:
+            return 0
+        
+        # Check if namespace is a valid base namespace or a compartment
+        if not is_valid_namespace(namespace, self.namespaces, self.compartments):
+            logger.warning(f"Invalid namespace: {namespace}, using 'conversations'")
+            namespace = "conversations"
+        
+        timestamp = datetime.now().isoformat()
+        contents, metadatas = split_items(items)
+        
+        content_strs = [format_memory_for_storage(content) for content in contents]
+        metadatas = [
+            {**(metadata or {}), "timestamp": timestamp, "client_id": self.client_id}
+            for metadata in metadatas
+        ]
+        memory_ids = new_ids(namespace, len(content_strs))
+        
+        # Keep the forget filter current without reloading it
+        if namespace == "longterm":
+            for content_str in content_strs:
+                self.forget_registry.add_instruction(content_str)
+        
+        # Store in vector database if available
+        if self.vector_available:
+            try:
+                if add_many_to_vector_store(
+                    vector_store=self.vector_store,
+                    namespace=namespace,
+                    namespace_collections=self.namespace_collections,
+                    client_id=self.client_id,
+                    memory_ids=memory_ids,
+                    contents=content_strs,
+                    metadatas=metadatas
+                ):
+                    return len(memory_ids)
+                # Fall back to local storage if vector storage fails
+            except Exception as e:
+                logger.error(f"Error adding memories to vector store: {e}")
+                # Fall back to local storage
+        
+        # Store in fallback memory
+        try:
+            if add_many_to_file_store(
+                fallback_memories=self.fallback_memories,
+                fallback_file=self.fallback_file,
+                namespace=namespace,
+                memory_ids=memory_ids,
+                contents=content_strs,
+                metadatas=metadatas,
+                text_indexes=getattr(self, "text_indexes", None)
+            ):
+                return len(memory_ids)
+            return 0
+        except Exception as e:
+            logger.error(f"Error adding memories to fallback storage: {e}")
+            return 0
+    
     async def get_namespaces(self) -> List[str]:
         """Get available namespaces."""
         base_namespaces = ["conversations", "thinking", "longterm", "projects", "compartments", "session"]
@@ -233,6 +338,9 @@ class MemoryService:
             logger.warning(f"Invalid namespace: {namespace}")
             return False
         
+        if namespace == "longterm":
+            self.forget_registry.reset()
+        
         # Clear vector database if available
         if self.vector_available:
             try:
@@ -251,7 +359,8 @@ class MemoryService:
             return clear_file_namespace(
                 fallback_memories=self.fallback_memories,
                 fallback_file=self.fallback_file,
-                namespace=namespace
+                namespace=namespace,
+                text_indexes=getattr(self, "text_indexes", None)
             )
         except Exception as e:
             logger.error(f"Error clearing namespace in fallback storage: {e}")
@@ -273,4 +382,84 @@ class MemoryService:
             return await self.add(content=content, namespace="session", metadata=metadata)
         except Exception as e:
             logger.error(f"Error writing session memory: {e}")
-            return False
\ No newline at end of file
+            return False
+    
+    async def keep_memory(self, memory_id: str, days: int = 30) -> bool:
+        """
+        Keep a memory for a specified number of days by setting expiration.
+        
+        Args:
+            memory_id: The ID of the memory to keep
+            days: Number of days to keep the memory
+            
+        Returns:
+            Boolean indicating success
+        """
+        from ..compartments import keep_memory
+        
+        return await keep_memory(self, memory_id, days)
+    
+    async def evict_expired(self) -> int:
+        """
+        Remove expired memories and the memories of expired compartments.
+        
+        Returns:
+            Number of memories removed
+        """
+        from ..compartments import evict_expired
+        
+        return await evict_expired(self)
+    
+    async def search(self, 
+                     query: str, 
+                     namespace: str = "conversations", 
+                     limit: int = 5,
+                     check_forget: bool = True,
+                     min_score: float = 0.0) -> Dict[str, Any]:
+        """
+        Search for memories based on a query.
+        
+        Args:
+            query: The search query
+            namespace: The namespace to search in (default: "conversations")
+            limit: Maximum number of results to return
+            check_forget: Whether to check for and filter out forgotten information
+            min_score: Minimum relevance in [0, 1]; lower-scoring results are dropped
+            
+        Returns:
+            Dictionary with search results
+        """
+        from ..search import search
+        
+        return await search(
+            memory_service=self,
+            query=query,
+            namespace=namespace,
+            limit=limit,
+            check_forget=check_forget,
+            min_score=min_score
+        )
+    
+    async def get_relevant_context(self, 
+                                   query: str, 
+                                   namespaces: List[str] = None,
+                                   limit: int = 3) -> str:
+        """
+        Get formatted context from multiple namespaces for a given query.
+        
+        Args:
+            query: The query to search for
+            namespaces: List of namespaces to search (default: all)
+            limit: Maximum memories across all namespaces
+            
+        Returns:
+            Formatted context string
+        """
+        from ..search import get_relevant_context
+        
+        return await get_relevant_context(
+            memory_service=self,
+            query=query,
+            namespaces=namespaces,
+            limit=limit
+        )
@@ -1,9 +1,9 @@
 """Compartment management for memory service."""
 
 from .manager import create_compartment, activate_compartment, deactivate_compartment, list_compartments
-from .expiration import set_compartment_expiration, keep_memory
+from .expiration import set_compartment_expiration, keep_memory, evict_expired
 
 __all__ = [
     "create_compartment", "activate_compartment", "deactivate_compartment", "list_compartments",
-    "set_compartment_expiration", "keep_memory"
+    "set_compartment_expiration", "keep_memory", "evict_expired"
 ]
\ No newline at end of file
@@ -3,6 +3,7 @@
 Memory compartment expiration functionality
 """
 
+import json
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
 
@@ -12,6 +13,16 @@ from ..utils.logging import setup_logger
 # Initialize logger
 logger = setup_logger("engram.memory.compartments")
 
+def _has_expired(expiration: Optional[str], now: datetime) -> bool:
+    """Check whether an ISO expiration date has passed."""
+    if not expiration:
+        return False
+    try:
+        return datetime.fromisoformat(expiration) < now
+    except (TypeError, ValueError) as e:
+        logger.error(f"Error parsing expiration date: {e}")
+        return False
+
 async def set_compartment_expiration(
     memory_service,
     compartment_id: str, 
@@ -65,6 +76,21 @@ async def keep_memory(
         Boolean indicating success
     """
     try:
+        expiration_date = datetime.now() + timedelta(days=days)
+        
+        # Find the memory in vector storage
+        if memory_service.vector_available:
+            vector_store = memory_service.vector_store
+            for collection_name in memory_service.namespace_collections.values():
+                for vector_id, entry in vector_store.get_metadata(collection_name).items():
+                    if entry.get("id") == memory_id:
+                        return vector_store.update_metadata(
+                            collection_name, vector_id, {"expiration": expiration_date.isoformat()}
+                        )
+            
+            logger.warning(f"Memory {memory_id} not found")
+            return False
+        
         # Find the memory in fallback storage
         for namespace, memories in memory_service.fallback_memories.items():
             for memory in memories:
@@ -73,21 +99,86 @@ async def keep_memory(
                     if "metadata" not in memory:
                         memory["metadata"] = {}
                     
-                    expiration_date = datetime.now() + timedelta(days=days)
                     memory["metadata"]["expiration"] = expiration_date.isoformat()
                     
-                    # Save to file if using fallback storage
-                    if not memory_service.vector_available:
-                        with open(memory_service.fallback_file, "w") as f:
-                            json.dump(memory_service.fallback_memories, f, indent=2)
+                    # Save to file
+                    with open(memory_service.fallback_file, "w") as f:
+                        json.dump(memory_service.fallback_memories, f, indent=2)
                     
                     return True
         
-        # If using vector storage, we would need to implement a way to update metadata
-        # This would require finding and updating the vector entry
-        
         logger.warning(f"Memory {memory_id} not found")
         return False
     except Exception as e:
         logger.error(f"Error keeping memory: {e}")
-        return False
\ No newline at end of file
+        return False
+
+async def evict_expired(
+    memory_service,
+    now: Optional[datetime] = None
+) -> int:
+    """
+    Remove memories whose expiration has passed, along with every memory in
+    an expired compartment.
+    
+    Expired compartments keep their definition, so they are still listed
+    with include_expired, but hold no memories.
+    
+    Args:
+        memory_service: The memory service instance
+        now: Time to compare expirations against (default: now)
+        
+    Returns:
+        Number of memories removed
+    """
+    from ..storage.vector import remove_from_vector_store
+    from ..storage.file import remove_from_file_store
+    
+    now = now or datetime.now()
+    expired_compartments = {
+        f"compartment-{compartment_id}"
+        for compartment_id, data in memory_service.compartments.items()
+        if _has_expired(data.get("expiration"), now)
+    }
+    
+    try:
+        removed = 0
+        if memory_service.vector_available:
+            vector_store = memory_service.vector_store
+            for namespace in set(memory_service.namespace_collections) | expired_compartments:
+                collection_name = memory_service.namespace_collections.get(namespace)
+                entries = vector_store.get_metadata(collection_name).values() if collection_name else []
+                memory_ids = [
+                    entry.get("id") for entry in entries
+                    if namespace in expired_compartments or _has_expired(entry.get("expiration"), now)
+                ]
+                if memory_ids:
+                    removed += remove_from_vector_store(
+                        vector_store=vector_store,
+                        namespace=namespace,
+                        namespace_collections=memory_service.namespace_collections,
+                        client_id=memory_service.client_id,
+                        memory_ids=memory_ids
+                    )
+        else:
+            for namespace, memories in list(memory_service.fallback_memories.items()):
+                memory_ids = [
+                    memory.get("id") for memory in memories
+                    if namespace in expired_compartments or
+                    _has_expired(memory.get("metadata", {}).get("expiration"), now)
+                ]
+                if memory_ids:
+                    removed += remove_from_file_store(
+                        fallback_memories=memory_service.fallback_memories,
+                        fallback_file=memory_service.fallback_file,
+                        namespace=namespace,
+                        memory_ids=memory_ids,
+                        text_indexes=getattr(memory_service, "text_indexes", None)
+                    )
+        
+        if removed:
+            logger.info(f"Evicted {removed} expired memories")
+        return removed
+    except Exception as e:
+        logger.error(f"Error evicting expired memories: {e}")
+        return 0
@@ -3,7 +3,9 @@
 Context retrieval functionality
 """
 
-from typing import Dict, List, Any, Optional
+import asyncio
+import heapq
+from typing import Dict, List, Any, Optional, Tuple
 
 # Import from the utilities
 from ..utils.logging import setup_logger
@@ -24,7 +26,7 @@ async def get_relevant_context(
         memory_service: The memory service instance
         query: The query to search for
         namespaces: List of namespaces to search (default: all)
-        limit: Maximum memories per namespace
+        limit: Maximum memories across all namespaces
         
     Returns:
         Formatted context string
@@ -37,27 +39,53 @@ async def get_relevant_context(
         for compartment_id in memory_service.active_compartments:
             namespaces.append(f"compartment-{compartment_id}")
     
-    all_results = []
+    from .search import search
     
-    # Search each namespace
-    for namespace in namespaces:
-        results = await memory_service.search(query, namespace=namespace, limit=limit)
-        
-        for item in results.get("results", []):
-            all_results.append({
-                "namespace": namespace,
-                "content": item.get("content", ""),
-                "metadata": item.get("metadata", {})
-            })
+    # Encode the query once for every namespace
+    query_embedding = None
+    if memory_service.vector_available:
+        query_embedding = memory_service.vector_model.encode(query)
+    
+    # Search all namespaces concurrently, deferring forget filtering
+    searches = await asyncio.gather(*[
+        search(
+            memory_service,
+            query,
+            namespace=namespace,
+            limit=limit * 2,
+            check_forget=False,
+            query_embedding=query_embedding
+        )
+        for namespace in namespaces
+    ], return_exceptions=True)
+    
+    # Filter forgotten items in one pass and pool the hits of every namespace
+    forget_registry = memory_service.get_forget_registry()
+    candidates: List[Tuple[str, Dict[str, Any]]] = []
+    for namespace, results in zip(namespaces, searches):
+        if isinstance(results, Exception):
+            logger.error(f"Error searching namespace {namespace}: {results}")
+            continue
+        hits = results.get("results", [])
+        if namespace != "longterm":
+            hits, _ = forget_registry.filter(hits)
+        candidates.extend((namespace, hit) for hit in hits)
+    
+    # Keep the global top-k and group it by namespace for formatting
+    results_by_namespace: Dict[str, List[Dict[str, Any]]] = {}
+    for namespace, hit in heapq.nlargest(
+        limit, candidates, key=lambda pair: pair[1].get("relevance", 0.0)
+    ):
+        results_by_namespace.setdefault(namespace, []).append(hit)
     
     # Format the context
-    if not all_results:
+    if not results_by_namespace:
         return ""
     
     context_parts = ["### Memory Context\n"]
     
     for namespace in namespaces:
-        namespace_results = [r for r in all_results if r["namespace"] == namespace]
+        namespace_results = results_by_namespace.get(namespace)
         
         if namespace_results:
             if namespace == "conversations":
@@ -16,7 +16,8 @@ async def keyword_search(
     query: str, 
     namespace: str = "conversations", 
     limit: int = 5,
-    check_forget: bool = True
+    check_forget: bool = True,
+    min_score: float = 0.0
 ) -> Dict[str, Any]:
     """
     Search for memories using keyword matching.
@@ -27,77 +28,62 @@ async def keyword_search(
         namespace: The namespace to search in
         limit: Maximum number of results to return
         check_forget: Whether to check for and filter out forgotten information
+        min_score: Minimum relevance (relative to the best keyword hit)
         
     Returns:
         Dictionary with search results
     """
     try:
-        # Get forgotten items if needed
-        forgotten_items = []
+        # Get the compiled forget filter if needed
+        forget_registry = None
         if check_forget and namespace != "longterm":
-            try:
-                # Search for FORGET instructions
-                forget_results = await memory_service.search(
-                    query="FORGET/IGNORE",
-                    namespace="longterm",
-                    limit=100,
-                    check_forget=False  # Prevent recursion
-                )
-                
-                # Extract the forgotten items
-                for item in forget_results.get("results", []):
-                    content = item.get("content", "")
-                    if content.startswith("FORGET/IGNORE: "):
-                        forgotten_text = content[len("FORGET/IGNORE: "):]
-                        forgotten_items.append(forgotten_text)
-            except Exception as e:
-                logger.error(f"Error checking for forgotten items: {e}")
+            forget_registry = memory_service.get_forget_registry()
         
-        # Simple keyword matching for fallback
-        results = []
+        namespace_memories = memory_service.fallback_memories.get(namespace, [])
         
-        for memory in memory_service.fallback_memories.get(namespace, []):
-            content = memory.get("content", "")
-            if query.lower() in content.lower():
-                results.append({
+        if query.strip():
+            # Rank with the BM25 keyword index; relevance is relative to the best hit
+            index = memory_service.text_indexes.get(namespace)
+            hits = index.search(query, limit * 2) if index is not None else []
+            best = hits[0][1] if hits and hits[0][1] else 1.0
+            results = [
+                {
+                    "id": namespace_memories[offset].get("id", ""),
+                    "content": namespace_memories[offset].get("content", ""),
+                    "metadata": namespace_memories[offset].get("metadata", {}),
+                    "relevance": score / best
+                }
+                for offset, score in hits
+                if score / best >= min_score
+            ]
+        else:
+            # An empty query lists the namespace, newest first
+            results = [
+                {
                     "id": memory.get("id", ""),
-                    "content": content,
+                    "content": memory.get("content", ""),
                     "metadata": memory.get("metadata", {}),
-                    "relevance": 1.0  # No real relevance score in fallback
-                })
+                    "relevance": 1.0
+                }
+                for memory in namespace_memories
+            ]
+            results.sort(
+                key=lambda x: x.get("metadata", {}).get("timestamp", ""), 
+                reverse=True
+            )
         
-        # Sort by timestamp (newest first) and limit results
-        results.sort(
-            key=lambda x: x.get("metadata", {}).get("timestamp", ""), 
-            reverse=True
-        )
-        results = results[:limit]
+        # Filter out forgotten items in a single pass over each result
+        if forget_registry is not None:
+            results, _ = forget_registry.filter(results)
         
-        # Filter results if needed
-        if forgotten_items:
-            filtered_results = []
-            for result in results:
-                should_include = True
-                content = result.get("content", "")
-                
-                # Check if any forgotten item appears in this content
-                for forgotten in forgotten_items:
-                    if forgotten.lower() in content.lower():
-                        # This memory contains forgotten information
-                        should_include = False
-                        logger.debug(f"Filtered out fallback memory containing: {forgotten}")
-                        break
-                
-                if should_include:
-                    filtered_results.append(result)
-            
-            results = filtered_results
+        # Limit the results
+        results = results[:limit]
         
         return {
             "results": results,
             "count": len(results),
             "namespace": namespace,
-            "forgotten_count": len(forgotten_items) if forgotten_items else 0
+            "forgotten_count": len(forget_registry) if forget_registry is not None else 0
         }
     except Exception as e:
         logger.error(f"Error performing keyword search: {e}")
@@ -19,7 +19,9 @@ async def search(
     query: str, 
     namespace: str = "conversations", 
     limit: int = 5,
-    check_forget: bool = True
+    check_forget: bool = True,
+    query_embedding: Optional[Any] = None,
+    min_score: float = 0.0
 ) -> Dict[str, Any]:
     """
     Search for memories based on a query.
@@ -30,6 +32,8 @@ async def search(
         namespace: The namespace to search in
         limit: Maximum number of results to return
         check_forget: Whether to check for and filter out forgotten information
+        query_embedding: Optional precomputed query embedding (vector search only)
+        min_score: Minimum relevance in [0, 1]; lower-scoring results are dropped
         
     Returns:
         Dictionary with search results
@@ -48,7 +52,9 @@ async def search(
             query=query, 
             namespace=namespace, 
             limit=limit,
-            check_forget=check_forget
+            check_forget=check_forget,
+            query_embedding=query_embedding,
+            min_score=min_score
         )
     else:
         return await keyword_search(
@@ -56,5 +62,6 @@ async def search(
             query=query, 
             namespace=namespace, 
             limit=limit,
-            check_forget=check_forget
+            check_forget=check_forget,
+            min_score=min_score
         )
\ No newline at end of file
@@ -3,6 +3,8 @@
 Vector-based memory search functionality
 """
 
+import asyncio
+import functools
 from typing import Dict, List, Any, Optional
 
 # Import from the utilities
@@ -16,7 +18,9 @@ async def vector_search(
     query: str, 
     namespace: str = "conversations", 
     limit: int = 5,
-    check_forget: bool = True
+    check_forget: bool = True,
+    query_embedding: Optional[Any] = None,
+    min_score: float = 0.0
 ) -> Dict[str, Any]:
     """
     Search for memories using vector similarity.
@@ -27,6 +31,9 @@ async def vector_search(
         namespace: The namespace to search in
         limit: Maximum number of results to return
         check_forget: Whether to check for and filter out forgotten information
+        query_embedding: Optional precomputed query embedding
+        min_score: Minimum relevance in [0, 1]; the search stops at the first
+            result below it
         
     Returns:
         Dictionary with search results
@@ -36,26 +43,10 @@ async def vector_search(
         return {"results": [], "count": 0, "namespace": namespace}
     
     try:
-        # Get forgotten items if needed
-        forgotten_items = []
+        # Get the compiled forget filter if needed
+        forget_registry = None
         if check_forget and namespace != "longterm":
-            try:
-                # Search for FORGET instructions
-                forget_results = await memory_service.search(
-                    query="FORGET/IGNORE",
-                    namespace="longterm",
-                    limit=100,
-                    check_forget=False  # Prevent recursion
-                )
-                
-                # Extract the forgotten items
-                for item in forget_results.get("results", []):
-                    content = item.get("content", "")
-                    if content.startswith("FORGET/IGNORE: "):
-                        forgotten_text = content[len("FORGET/IGNORE: "):]
-                        forgotten_items.append(forgotten_text)
-            except Exception as e:
-                logger.error(f"Error checking for forgotten items: {e}")
+            forget_registry = memory_service.get_forget_registry()
         
         # Get the appropriate collection
         collection_name = memory_service.namespace_collections.get(namespace)
@@ -66,16 +57,24 @@ async def vector_search(
         if not collection_name:
             raise ValueError(f"No collection found for namespace: {namespace}")
         
-        # Search using vector store
-        search_results = memory_service.vector_store.search(
+        # Search using vector store; FAISS releases the GIL, so run it in a
+        # worker thread to let concurrent namespace searches overlap
+        loop = asyncio.get_running_loop()
+        search_results = await loop.run_in_executor(None, functools.partial(
+            memory_service.vector_store.search,
             compartment=collection_name,
             query=query,
-            top_k=limit * 2  # Request more to account for filtering
-        )
+            top_k=limit * 2,  # Request more to account for filtering
+            query_embedding=query_embedding,
+            min_score=min_score
+        ))
         
-        # Format the results
+        # Format the results, skipping the empty placeholder rows older
+        # versions added to new collections
         formatted_results = []
         for result in search_results:
+            if result.get("metadata", {}).get("placeholder"):
+                continue
             formatted_results.append({
                 "id": result.get("id", ""),
                 "content": result.get("text", ""),
@@ -83,25 +82,9 @@ async def vector_search(
                 "relevance": result.get("score", 0.0)
             })
         
-        # Filter out forgotten items
-        if forgotten_items:
-            filtered_results = []
-            for result in formatted_results:
-                should_include = True
-                content = result.get("content", "")
-                
-                # Check if any forgotten item appears in this content
-                for forgotten in forgotten_items:
-                    if forgotten.lower() in content.lower():
-                        # This memory contains forgotten information
-                        should_include = False
-                        logger.debug(f"Filtered out memory containing: {forgotten}")
-                        break
-                
-                if should_include:
-                    filtered_results.append(result)
-            
-            formatted_results = filtered_results
+        # Filter out forgotten items in a single pass over each result
+        if forget_registry is not None:
+            formatted_results, _ = forget_registry.filter(formatted_results)
         
         # Limit the results
         formatted_results = formatted_results[:limit]
@@ -110,7 +93,7 @@ async def vector_search(
             "results": formatted_results,
             "count": len(formatted_results),
             "namespace": namespace,
-            "forgotten_count": len(forgotten_items) if forgotten_items else 0
+            "forgotten_count": len(forget_registry) if forget_registry is not None else 0
         }
     except Exception as e:
         logger.error(f"Error performing vector search: {e}")
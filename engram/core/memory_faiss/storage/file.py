@@ -3,16 +3,60 @@
 Fallback file-based storage implementation
 """
 
+import atexit
 import json
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Union
+from typing import Dict, List, Any, Optional, Tuple, Union
 
 # Import from the utilities
 from ..utils.logging import setup_logger
+from engram.core.text_index import InvertedIndex, build_indexes, load_indexes, save_indexes
 
 # Initialize logger
 logger = setup_logger("engram.memory.file")
 
+# Keyword indexes are saved once every this many writes of their fallback
+# file, and at exit; loading rebuilds an index that fell behind
+INDEX_SAVE_WRITES = 100
+
+# Fallback file -> (writes since its indexes were saved, memories, indexes)
+_unsaved_indexes: Dict[Path, Tuple[int, Dict[str, List[Dict[str, Any]]], Dict[str, InvertedIndex]]] = {}
+
+def _index_file(fallback_file: Path) -> Path:
+    """Path of the keyword indexes persisted next to the fallback file."""
+    return fallback_file.with_suffix(".index.json")
+
+def _save_file_store(
+    fallback_file: Path,
+    fallback_memories: Dict[str, List[Dict[str, Any]]],
+    text_indexes: Optional[Dict[str, InvertedIndex]]
+) -> None:
+    """Write the fallback memories to disk, and their keyword indexes now and then."""
+    with open(fallback_file, "w") as f:
+        json.dump(fallback_memories, f, indent=2)
+    if text_indexes is None:
+        return
+    
+    writes = _unsaved_indexes.pop(fallback_file, (0,))[0] + 1
+    if writes >= INDEX_SAVE_WRITES:
+        save_indexes(_index_file(fallback_file), text_indexes, fallback_memories)
+    else:
+        _unsaved_indexes[fallback_file] = (writes, fallback_memories, text_indexes)
+
+def save_pending_indexes() -> None:
+    """Save the keyword indexes changed since they were last saved."""
+    for fallback_file in list(_unsaved_indexes):
+        entry = _unsaved_indexes.pop(fallback_file, None)
+        if entry is None:
+            continue
+        _, fallback_memories, text_indexes = entry
+        try:
+            save_indexes(_index_file(fallback_file), text_indexes, fallback_memories)
+        except Exception as e:
+            logger.error(f"Error saving keyword indexes for {fallback_file}: {e}")
+
+atexit.register(save_pending_indexes)
+
 def setup_file_storage(
     data_dir: Path,
     client_id: str,
@@ -57,9 +101,13 @@ def setup_file_storage(
         if compartment_ns not in fallback_memories:
             fallback_memories[compartment_ns] = []
     
+    # Keyword index per namespace, reusing a persisted one if it is current
+    text_indexes = load_indexes(_index_file(fallback_file), fallback_memories)
+    
     return {
         "file": fallback_file,
-        "memories": fallback_memories
+        "memories": fallback_memories,
+        "text_indexes": text_indexes
     }
 
 def ensure_file_compartment(
@@ -91,7 +139,8 @@ def add_to_file_store(
     namespace: str,
     memory_id: str,
     content: str,
-    metadata: Dict[str, Any]
+    metadata: Dict[str, Any],
+    text_indexes: Optional[Dict[str, InvertedIndex]] = None
 ) -> bool:
     """
     Add a memory to the file store.
@@ -103,6 +152,7 @@ def add_to_file_store(
         memory_id: Unique memory identifier
         content: Memory content
         metadata: Memory metadata
+        text_indexes: Optional keyword indexes to keep in sync
         
     Returns:
         Boolean indicating success
@@ -114,11 +164,13 @@ def add_to_file_store(
             "metadata": metadata
         }
         
-        fallback_memories.setdefault(namespace, []).append(memory_obj)
+        namespace_memories = fallback_memories.setdefault(namespace, [])
+        if text_indexes is not None:
+            text_indexes.setdefault(namespace, InvertedIndex()).add(len(namespace_memories), content)
+        namespace_memories.append(memory_obj)
         
         # Save to file
-        with open(fallback_file, "w") as f:
-            json.dump(fallback_memories, f, indent=2)
+        _save_file_store(fallback_file, fallback_memories, text_indexes)
         
         logger.debug(f"Added memory to fallback storage in namespace {namespace}")
         return True
@@ -126,10 +178,55 @@ def add_to_file_store(
         logger.error(f"Error adding memory to fallback storage: {e}")
         return False
 
+def add_many_to_file_store(
+    fallback_memories: Dict[str, List[Dict[str, Any]]],
+    fallback_file: Path,
+    namespace: str,
+    memory_ids: List[str],
+    contents: List[str],
+    metadatas: List[Dict[str, Any]],
+    text_indexes: Optional[Dict[str, InvertedIndex]] = None
+) -> bool:
+    """
+    Add a batch of memories to the file store with a single write.
+    
+    Args:
+        fallback_memories: Dictionary of fallback memories
+        fallback_file: Path to the fallback file
+        namespace: Namespace to add to
+        memory_ids: Unique memory identifiers
+        contents: Memory contents
+        metadatas: Memory metadata
+        text_indexes: Optional keyword indexes to keep in sync
+        
+    Returns:
+        Boolean indicating success
+    """
+    try:
+        namespace_memories = fallback_memories.setdefault(namespace, [])
+        for memory_id, content, metadata in zip(memory_ids, contents, metadatas):
+            if text_indexes is not None:
+                text_indexes.setdefault(namespace, InvertedIndex()).add(len(namespace_memories), content)
+            namespace_memories.append({
+                "id": memory_id,
+                "content": content,
+                "metadata": metadata
+            })
+        
+        # Save to file
+        _save_file_store(fallback_file, fallback_memories, text_indexes)
+        
+        logger.debug(f"Added {len(memory_ids)} memories to fallback storage in namespace {namespace}")
+        return True
+    except Exception as e:
+        logger.error(f"Error adding memories to fallback storage: {e}")
+        return False
+
 def clear_file_namespace(
     fallback_memories: Dict[str, List[Dict[str, Any]]],
     fallback_file: Path,
-    namespace: str
+    namespace: str,
+    text_indexes: Optional[Dict[str, InvertedIndex]] = None
 ) -> bool:
     """
     Clear all memories in a namespace in the file store.
@@ -138,19 +235,63 @@ def clear_file_namespace(
         fallback_memories: Dictionary of fallback memories
         fallback_file: Path to the fallback file
         namespace: Namespace to clear
+        text_indexes: Optional keyword indexes to keep in sync
         
     Returns:
         Boolean indicating success
     """
     try:
         fallback_memories[namespace] = []
+        if text_indexes is not None:
+            text_indexes.setdefault(namespace, InvertedIndex()).clear()
         
         # Save to file
-        with open(fallback_file, "w") as f:
-            json.dump(fallback_memories, f, indent=2)
+        _save_file_store(fallback_file, fallback_memories, text_indexes)
         
         logger.info(f"Cleared namespace {namespace} in fallback storage")
         return True
     except Exception as e:
         logger.error(f"Error clearing namespace in fallback storage: {e}")
-        return False
\ No newline at end of file
+        return False
+
+def remove_from_file_store(
+    fallback_memories: Dict[str, List[Dict[str, Any]]],
+    fallback_file: Path,
+    namespace: str,
+    memory_ids: List[str],
+    text_indexes: Optional[Dict[str, InvertedIndex]] = None
+) -> int:
+    """
+    Remove individual memories from the file store.
+    
+    Args:
+        fallback_memories: Dictionary of fallback memories
+        fallback_file: Path to the fallback file
+        namespace: Namespace holding the memories
+        memory_ids: IDs of the memories to remove
+        text_indexes: Optional keyword indexes to keep in sync
+        
+    Returns:
+        Number of memories removed
+    """
+    try:
+        wanted = set(memory_ids)
+        namespace_memories = fallback_memories.get(namespace, [])
+        kept = [memory for memory in namespace_memories if memory.get("id") not in wanted]
+        removed = len(namespace_memories) - len(kept)
+        if not removed:
+            return 0
+        
+        fallback_memories[namespace] = kept
+        if text_indexes is not None:
+            # Document IDs are list offsets, which shift after a removal
+            text_indexes.update(build_indexes({namespace: kept}))
+        
+        # Save to file
+        _save_file_store(fallback_file, fallback_memories, text_indexes)
+        
+        logger.debug(f"Removed {removed} memories from fallback storage in namespace {namespace}")
+        return removed
+    except Exception as e:
+        logger.error(f"Error removing memories from fallback storage: {e}")
+        return 0
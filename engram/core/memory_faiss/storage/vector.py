@@ -29,6 +29,7 @@ if not USE_FALLBACK:
         import numpy as np
         from engram.core.vector_store import VectorStore
         from engram.core.simple_embedding import SimpleEmbedding
+        from engram.core.embedding_cache import cached_encoder
         
         HAS_VECTOR_DB = True
         VECTOR_DB_NAME = "faiss"
@@ -46,6 +47,14 @@ if not USE_FALLBACK:
         logger.warning("FAISS not found, using fallback file-based implementation")
         logger.info("Memory will still work but without vector search capabilities")
 
+def _collection_for(namespace: str, namespace_collections: Dict[str, str], client_id: str) -> Optional[str]:
+    """Get the collection name of a namespace, including compartments not set up yet."""
+    collection_name = namespace_collections.get(namespace)
+    if not collection_name and namespace.startswith("compartment-"):
+        compartment_id = namespace[len("compartment-"):]
+        collection_name = f"engram-{client_id}-compartment-{compartment_id}"
+    return collection_name
+
 def setup_vector_storage(
     data_dir: Path,
     client_id: str,
@@ -78,7 +87,7 @@ def setup_vector_storage(
     
     # Initialize SimpleEmbedding for embeddings
     vector_dim = 128
-    vector_model = SimpleEmbedding(vector_size=vector_dim)
+    vector_model = cached_encoder(SimpleEmbedding(vector_size=vector_dim))
     
     # Initialize VectorStore
     try:
@@ -87,44 +96,20 @@ def setup_vector_storage(
             dimension=vector_dim
         )
         
-        # Initialize namespace collections
+        # Map namespaces to collections; the vector store loads each
+        # collection on first use
         namespace_collections = {}
         
         # Initialize collections for each namespace
         for namespace in namespaces:
             collection_name = f"engram-{client_id}-{namespace}"
             namespace_collections[namespace] = collection_name
-            
-            # Try to load existing compartment
-            loaded = vector_store.load(collection_name)
-            if not loaded:
-                # Create empty compartment with placeholder
-                logger.info(f"Creating new FAISS index for {collection_name}")
-                vector_store.add(
-                    compartment=collection_name,
-                    texts=[""],
-                    metadatas=[{"placeholder": True}]
-                )
-                # Save the compartment
-                vector_store.save(collection_name)
         
         # Initialize collections for existing compartments
         for compartment_id in compartments:
             namespace = f"compartment-{compartment_id}"
             collection_name = f"engram-{client_id}-{namespace}"
             namespace_collections[namespace] = collection_name
-            
-            # Try to load existing compartment
-            loaded = vector_store.load(collection_name)
-            if not loaded:
-                # Create empty compartment with placeholder
-                logger.info(f"Creating new FAISS index for compartment {compartment_id}")
-                vector_store.add(
-                    compartment=collection_name,
-                    texts=[""],
-                    metadatas=[{"placeholder": True}]
-                )
-                vector_store.save(collection_name)
         
         logger.info(f"Initialized FAISS vector database for client {client_id}")
         logger.info(f"Using dimension: {vector_dim}")
@@ -168,21 +153,10 @@ def ensure_vector_compartment(
         namespace = f"compartment-{compartment_id}"
         collection_name = f"engram-{client_id}-{namespace}"
         
-        # Add to namespace collections mapping
+        # Add to namespace collections mapping; the vector store creates
+        # the collection on first use
         namespace_collections[namespace] = collection_name
         
-        # Try to load existing compartment
-        loaded = vector_store.load(collection_name)
-        if not loaded:
-            # Create empty compartment with placeholder
-            logger.info(f"Creating new FAISS index for compartment {compartment_id}")
-            vector_store.add(
-                compartment=collection_name,
-                texts=[""],
-                metadatas=[{"placeholder": True}]
-            )
-            vector_store.save(collection_name)
-            
         return True
     except Exception as e:
         logger.error(f"Error creating vector collection for compartment {compartment_id}: {e}")
@@ -214,10 +188,7 @@ def add_to_vector_store(
     """
     try:
         # Get the appropriate collection
-        collection_name = namespace_collections.get(namespace)
-        if not collection_name and namespace.startswith("compartment-"):
-            compartment_id = namespace[len("compartment-"):]
-            collection_name = f"engram-{client_id}-compartment-{compartment_id}"
+        collection_name = _collection_for(namespace, namespace_collections, client_id)
         
         if not collection_name:
             raise ValueError(f"No collection found for namespace: {namespace}")
@@ -235,15 +206,62 @@ def add_to_vector_store(
             }]
         )
         
-        # Save the updated collection
-        vector_store.save(collection_name)
-        
         logger.debug(f"Added memory to vector store in namespace {namespace} with ID {memory_id}")
         return True
     except Exception as e:
         logger.error(f"Error adding memory to vector store: {e}")
         return False
 
+def add_many_to_vector_store(
+    vector_store: Any,
+    namespace: str,
+    namespace_collections: Dict[str, str],
+    client_id: str,
+    memory_ids: List[str],
+    contents: List[str],
+    metadatas: List[Dict[str, Any]]
+) -> bool:
+    """
+    Add a batch of memories to the vector store with one index add.
+    
+    Args:
+        vector_store: Vector store instance
+        namespace: Namespace to add to
+        namespace_collections: Mapping of namespaces to collections
+        client_id: Client identifier
+        memory_ids: Unique memory identifiers
+        contents: Memory contents
+        metadatas: Memory metadata
+        
+    Returns:
+        Boolean indicating success
+    """
+    try:
+        # Get the appropriate collection
+        collection_name = _collection_for(namespace, namespace_collections, client_id)
+        
+        if not collection_name:
+            raise ValueError(f"No collection found for namespace: {namespace}")
+        
+        # Add to vector store; the texts are encoded as one batch
+        vector_store.add(
+            compartment=collection_name,
+            texts=contents,
+            metadatas=[{
+                "id": memory_id,
+                "timestamp": metadata.get("timestamp", ""),
+                "client_id": metadata.get("client_id", ""),
+                "namespace": namespace,
+                **metadata
+            } for memory_id, metadata in zip(memory_ids, metadatas)]
+        )
+        
+        logger.debug(f"Added {len(memory_ids)} memories to vector store in namespace {namespace}")
+        return True
+    except Exception as e:
+        logger.error(f"Error adding memories to vector store: {e}")
+        return False
+
 def clear_vector_namespace(
     vector_store: Any,
     namespace: str,
@@ -264,26 +282,50 @@ def clear_vector_namespace(
     """
     try:
         # Get the appropriate collection name
-        collection_name = namespace_collections.get(namespace)
-        if not collection_name and namespace.startswith("compartment-"):
-            compartment_id = namespace[len("compartment-"):]
-            collection_name = f"engram-{client_id}-compartment-{compartment_id}"
+        collection_name = _collection_for(namespace, namespace_collections, client_id)
         
         if collection_name:
-            # Delete and recreate the collection
+            # Delete the collection; it is recreated on first use
             vector_store.delete(collection_name)
             
-            # Create a new empty collection
-            vector_store.add(
-                compartment=collection_name,
-                texts=[""],
-                metadatas=[{"placeholder": True}]
-            )
-            vector_store.save(collection_name)
-            
             logger.info(f"Cleared namespace {namespace} in vector storage")
             return True
         return False
     except Exception as e:
         logger.error(f"Error clearing namespace in vector storage: {e}")
-        return False
\ No newline at end of file
+        return False
+
+def remove_from_vector_store(
+    vector_store: Any,
+    namespace: str,
+    namespace_collections: Dict[str, str],
+    client_id: str,
+    memory_ids: List[str]
+) -> int:
+    """
+    Remove individual memories from the vector store.
+    
+    Args:
+        vector_store: Vector store instance
+        namespace: Namespace holding the memories
+        namespace_collections: Mapping of namespaces to collections
+        client_id: Client identifier
+        memory_ids: IDs of the memories to remove
+        
+    Returns:
+        Number of memories removed
+    """
+    try:
+        collection_name = _collection_for(namespace, namespace_collections, client_id)
+        if not collection_name:
+            return 0
+        
+        wanted = set(memory_ids)
+        vector_ids = [
+            vector_id for vector_id, entry in vector_store.get_metadata(collection_name).items()
+            if entry.get("id") in wanted
+        ]
+        return vector_store.remove(collection_name, vector_ids) if vector_ids else 0
+    except Exception as e:
+        logger.error(f"Error removing memories from vector store: {e}")
+        return 0
@@ -23,6 +23,7 @@ logger = logging.getLogger("engram.memory_manager")
 from engram.core.memory import MemoryService
 from engram.core.structured_memory import StructuredMemory
 from engram.core.nexus import NexusInterface
+from engram.core.embedding_cache import get_embedding_cache
 
 class MemoryManager:
     """
@@ -215,8 +216,12 @@ class MemoryManager:
             # Clean up idle clients
             for client_id in idle_clients:
                 logger.info(f"Cleaning up idle client: {client_id}")
-                self.memory_services.pop(client_id, None)
-                self.structured_memories.pop(client_id, None)
+                service = self.memory_services.pop(client_id, None)
+                if service is not None and hasattr(service, "close"):
+                    service.close()
+                structured = self.structured_memories.pop(client_id, None)
+                if structured is not None and hasattr(structured, "close"):
+                    structured.close()
                 self.nexus_interfaces.pop(client_id, None)
                 cleanup_count += 1
             
@@ -227,12 +232,30 @@ class MemoryManager:
         Shutdown the memory manager and release resources.
         """
         async with self.lock:
+            # Flush pending writes before dropping the services
+            for service in self.memory_services.values():
+                if hasattr(service, "close"):
+                    service.close()
+            for structured in self.structured_memories.values():
+                if hasattr(structured, "close"):
+                    structured.close()
+
+            # Force-write any vector indexes still waiting on the write-behind timer
+            try:
+                from engram.core.vector_store import flush_open_stores
+                flush_open_stores()
+            except ImportError:
+                pass
+
             # Clear all service instances
             self.memory_services.clear()
             self.structured_memories.clear()
             self.nexus_interfaces.clear()
             self.last_access.clear()
             
+            # Flush the on-disk embedding cache, if enabled
+            get_embedding_cache().close()
+            
             logger.info("Memory manager shut down")
 
 
@@ -14,6 +14,8 @@ from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Any, Optional, Union, Tuple
 
+from engram.core.structured.utils import content_digest
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -430,21 +432,22 @@ class NexusInterface:
         # Combine results (prioritizing structured memory)
         combined = structured_results.copy()
         
-        # Add legacy results that aren't duplicates
-        structured_contents = [m.get("content", "") for m in structured_results]
+        # Add legacy results that aren't duplicates (by normalized content)
+        seen_digests = {content_digest(m.get("content", "")) for m in structured_results}
         for legacy_memory in results["legacy"]:
             content = legacy_memory.get("content", "")
-            if content not in structured_contents:
+            digest = content_digest(content)
+            if digest not in seen_digests:
                 # Convert legacy format to structured format
                 combined.append({
-                    "id": legacy_memory.get("id", f"legacy-{hash(content)}"),
+                    "id": legacy_memory.get("id", f"legacy-{digest}"),
                     "content": content,
                     "category": "legacy",
                     "importance": 3,  # Default importance
                     "metadata": legacy_memory.get("metadata", {}),
                     "tags": ["legacy"]
                 })
-                structured_contents.append(content)
+                seen_digests.add(digest)
                 
                 # Stop if we've reached the limit
                 if len(combined) >= limit:
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Similarity Scoring
+
+Provides the relevance score shared by every vector backend. Each backend
+reports closeness in its own unit (squared L2 distance, cosine distance or
+inner product); for unit-length embeddings they all determine the cosine
+similarity, which is used as the relevance:
+
+    inner product           cos = value
+    cosine distance         cos = 1 - value
+    squared L2 distance     cos = 1 - value / 2
+
+Relevance is the cosine clipped to [0, 1], so scores are comparable across
+namespaces and backends and a min_score threshold means the same thing
+everywhere.
+"""
+
+# Units backends report closeness in
+METRIC_INNER_PRODUCT = "ip"
+METRIC_COSINE = "cosine"
+METRIC_L2 = "l2"
+
+
+def cosine_similarity(value: float, metric: str) -> float:
+    """
+    Convert a backend's closeness value between unit vectors to cosine similarity.
+
+    Args:
+        value: Inner product, cosine distance or squared L2 distance
+        metric: METRIC_INNER_PRODUCT, METRIC_COSINE or METRIC_L2
+
+    Returns:
+        Cosine similarity in [-1, 1]
+
+    Raises:
+        ValueError: For an unknown metric
+    """
+    if metric == METRIC_INNER_PRODUCT:
+        cosine = float(value)
+    elif metric == METRIC_COSINE:
+        cosine = 1.0 - float(value)
+    elif metric == METRIC_L2:
+        cosine = 1.0 - float(value) / 2.0
+    else:
+        raise ValueError(f"Unknown similarity metric: {metric}")
+    return max(-1.0, min(1.0, cosine))
+
+
+def relevance(value: float, metric: str) -> float:
+    """
+    Convert a backend's closeness value between unit vectors to a relevance score.
+
+    Args:
+        value: Inner product, cosine distance or squared L2 distance
+        metric: METRIC_INNER_PRODUCT, METRIC_COSINE or METRIC_L2
+
+    Returns:
+        Relevance in [0, 1]; unrelated and opposed vectors score 0
+    """
+    return max(0.0, cosine_similarity(value, metric))
@@ -1,103 +1,140 @@
 #!/usr/bin/env python
 """
 Simple text embedding utility that doesn't require external models.
+
+Tokens are feature-hashed with blake2b into a fixed number of buckets, each
+bucket owning a row of a random projection matrix generated once from the
+seed. A batch is embedded as its sparse weighted token counts multiplied by
+that matrix, so encoding is a handful of NumPy operations per batch, memory
+is bounded by the matrix size, and the same text always gets the same
+embedding in every process.
 """
 
 import re
+import hashlib
+from functools import lru_cache
+from itertools import chain
+from typing import List, Union
+
 import numpy as np
-from typing import List, Dict, Union, Optional
+
+# Default number of hash buckets (rows of the projection matrix)
+DEFAULT_BUCKETS = 2 ** 14
+
+# Documents tokenized and hashed per block
+BLOCK_SIZE = 1024
+
+# Documents per count matrix, bounding its (documents x distinct tokens) size
+MATMUL_ROWS = 64
+
+_TOKEN_PATTERN = re.compile(r'\b\w+\b')
+
+
+@lru_cache(maxsize=2 ** 16)
+def _token_hash(token: str) -> int:
+    """Stable 64-bit hash of a token (unlike hash(), not salted per process)."""
+    return int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "little")
+
 
 class SimpleEmbedding:
     """
     A simple embedding generator using a deterministic approach.
-    This provides embedding generation without dependencies on libraries 
+    This provides embedding generation without dependencies on libraries
     that may have NumPy version conflicts.
     """
-    
-    def __init__(self, vector_size: int = 128, seed: int = 42):
+
+    def __init__(self, vector_size: int = 128, seed: int = 42, num_buckets: int = DEFAULT_BUCKETS):
         """
         Initialize the simple embedding generator
-        
+
         Args:
             vector_size: Dimension of the generated embeddings
             seed: Random seed for reproducibility
+            num_buckets: Number of hash buckets tokens are mapped to
         """
         self.vector_size = vector_size
         self.seed = seed
-        self.vocab: Dict[str, np.ndarray] = {}
-        self.rng = np.random.RandomState(seed)
-        
+        self.num_buckets = num_buckets
+
+        # One random row per bucket; PCG64 streams are stable across NumPy versions
+        rng = np.random.Generator(np.random.PCG64(seed))
+        self.projection = rng.standard_normal((num_buckets, vector_size), dtype=np.float32)
+
     def _tokenize(self, text: str) -> List[str]:
         """
         Simple tokenization by splitting on non-alphanumeric characters
         and converting to lowercase
         """
-        text = text.lower()
-        tokens = re.findall(r'\b\w+\b', text)
-        return tokens
-    
-    def _get_or_create_token_vector(self, token: str) -> np.ndarray:
-        """Generate a stable vector for a token"""
-        if token not in self.vocab:
-            # Generate a stable random vector for this token
-            # We use the hash of the token to seed the random generator
-            # This ensures the same token always gets the same vector
-            token_hash = hash(token) % 2**32
-            token_rng = np.random.RandomState(token_hash)
-            self.vocab[token] = token_rng.randn(self.vector_size).astype(np.float32)
-        return self.vocab[token]
-    
-    def encode(self, texts: Union[str, List[str]], 
+        return _TOKEN_PATTERN.findall(text.lower())
+
+    def _bucket(self, token: str) -> int:
+        """Get the projection row of a token"""
+        return _token_hash(token) % self.num_buckets
+
+    def _encode_block(self, texts: List[str]) -> np.ndarray:
+        """Embed a block of texts as weighted token counts times the projection matrix"""
+        result = np.zeros((len(texts), self.vector_size), dtype=np.float32)
+
+        token_lists = list(map(_TOKEN_PATTERN.findall, map(str.lower, texts)))
+        tokens = list(chain.from_iterable(token_lists))
+        if not tokens:
+            return result
+
+        # Hash each distinct token once, then map every occurrence to its bucket
+        num_buckets = self.num_buckets
+        bucket_of = {token: _token_hash(token) % num_buckets for token in dict.fromkeys(tokens)}
+        buckets = np.fromiter(map(bucket_of.__getitem__, tokens), dtype=np.int64, count=len(tokens))
+        docs = np.repeat(np.arange(len(texts)), list(map(len, token_lists)))
+
+        # Count (document, bucket) pairs
+        keys, counts = np.unique(docs * num_buckets + buckets, return_counts=True)
+        rows, buckets = np.divmod(keys, num_buckets)
+
+        # Higher weight for tokens that appear less frequently in this document
+        # (similar to TF-IDF concept, but very simplified)
+        weights = 1.0 / (1.0 + np.log(counts.astype(np.float32)))
+
+        # Per slice of documents, multiply the weighted counts over the buckets
+        # the slice uses by their projection rows; rows come out sorted
+        bounds = np.searchsorted(rows, np.arange(0, len(texts) + MATMUL_ROWS, MATMUL_ROWS))
+        for first, (lo, hi) in zip(range(0, len(texts), MATMUL_ROWS), zip(bounds, bounds[1:])):
+            if lo == hi:
+                continue
+            used, columns = np.unique(buckets[lo:hi], return_inverse=True)
+            counts_matrix = np.zeros((min(MATMUL_ROWS, len(texts) - first), len(used)), dtype=np.float32)
+            counts_matrix[rows[lo:hi] - first, columns] = weights[lo:hi]
+            result[first:first + MATMUL_ROWS] = counts_matrix @ self.projection[used]
+        return result
+
+    def encode(self, texts: Union[str, List[str]],
                normalize: bool = True) -> np.ndarray:
         """
         Encode text(s) into fixed-size vectors using a simple TF-IDF
         like approach with random vectors for words.
-        
+
         Args:
             texts: Text or list of texts to encode
             normalize: Whether to normalize the vectors to unit length
-            
+
         Returns:
             Numpy array of embeddings with shape (n_texts, vector_size)
         """
         if isinstance(texts, str):
             texts = [texts]
-            
+
         result = np.zeros((len(texts), self.vector_size), dtype=np.float32)
-        
-        for i, text in enumerate(texts):
-            tokens = self._tokenize(text)
-            if not tokens:
-                continue
-                
-            # Create the embedding by averaging token vectors
-            token_vectors = np.stack([self._get_or_create_token_vector(t) for t in tokens])
-            
-            # Apply TF component (token frequency)
-            token_counts = {}
-            for token in tokens:
-                token_counts[token] = token_counts.get(token, 0) + 1
-            
-            # Calculate embedding as weighted average of token vectors
-            embedding = np.zeros(self.vector_size, dtype=np.float32)
-            for token, count in token_counts.items():
-                # Higher weight for tokens that appear less frequently in this document
-                # (similar to TF-IDF concept, but very simplified)
-                weight = 1.0 / (1.0 + np.log(count))
-                embedding += weight * self._get_or_create_token_vector(token)
-            
-            # Store the result
-            result[i] = embedding
-        
+        for start in range(0, len(texts), BLOCK_SIZE):
+            result[start:start + BLOCK_SIZE] = self._encode_block(texts[start:start + BLOCK_SIZE])
+
         # Normalize if requested
         if normalize:
             norms = np.linalg.norm(result, axis=1, keepdims=True)
             # Avoid division by zero
             norms = np.maximum(norms, 1e-10)
             result = result / norms
-            
+
         return result
-    
+
     def similarity(self, a: np.ndarray, b: np.ndarray) -> float:
         """Calculate cosine similarity between two embeddings"""
-        return np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b))
\ No newline at end of file
+        return np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b))
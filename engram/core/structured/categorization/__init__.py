@@ -1,3 +1,17 @@
 from engram.core.structured.categorization.auto import auto_categorize_memory
+from engram.core.structured.categorization.rules import (
+    DEFAULT_RULES,
+    CompiledRules,
+    load_rules,
+    get_rules,
+    set_rules
+)
 
-__all__ = ['auto_categorize_memory']
\ No newline at end of file
+__all__ = [
+    'auto_categorize_memory',
+    'DEFAULT_RULES',
+    'CompiledRules',
+    'load_rules',
+    'get_rules',
+    'set_rules'
+]
\ No newline at end of file
@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+Categorization Rules
+
+Provides the keyword rules used to auto-categorize memories and compiles
+them into a single matcher.
+
+A rule set is plain data (so it can be loaded from a JSON file):
+
+    {
+        "categories": [
+            {
+                "category": "projects",
+                "keywords": ["project", "code", ...],
+                "tags": ["project"],
+                "importance": 3,          # optional fixed importance
+                "levels": [               # first matching level applies
+                    {"keywords": [...], "importance": 5, "tags": ["critical"]}
+                ],
+                "extra_tags": [           # every matching entry applies
+                    {"keywords": ["python"], "tags": ["python"]}
+                ]
+            },
+            ...                           # first matching category wins
+        ],
+        "importance": [                   # first matching entry applies
+            {"keywords": [...], "at_least": 5},
+            {"keywords": [...], "at_most": 2}
+        ],
+        "tags": [                         # every matching entry applies
+            {"keywords": [...], "tags": ["todo"]}
+        ]
+    }
+
+Keywords are lowercase words or phrases matched on word boundaries. All
+keywords of a rule set are compiled into one prefix-factored regular
+expression (a trie), so categorizing a message is a single scan that
+yields the set of keywords present, and every rule is then a set lookup.
+"""
+
+import json
+import logging
+import re
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple, Union
+
+logger = logging.getLogger("engram.structured.categorization.rules")
+
+DEFAULT_RULES: Dict[str, Any] = {
+    "categories": [
+        {
+            "category": "personal",
+            "keywords": ["i feel", "i think", "i believe", "my opinion", "personally",
+                         "my experience", "in my view", "i remember", "i recall"],
+            "tags": ["personal", "reflection"],
+            "levels": [
+                {"keywords": ["love", "hate", "excited", "sad", "angry", "happy", "worried", "anxious"],
+                 "importance": 4, "tags": ["emotional"]},
+            ],
+        },
+        {
+            "category": "projects",
+            "keywords": ["project", "feature", "implementation", "code", "develop", "program",
+                         "design", "architecture", "refactor", "test", "debug", "fix", "issue",
+                         "api", "database", "server", "client", "interface", "module", "class",
+                         "function"],
+            "tags": ["project"],
+            "levels": [
+                {"keywords": ["critical", "urgent", "important", "blocking", "priority"],
+                 "importance": 5, "tags": ["critical"]},
+                {"keywords": ["milestone", "release", "deadline", "launch"],
+                 "importance": 4, "tags": ["milestone"]},
+            ],
+            "extra_tags": [
+                {"keywords": [lang], "tags": [lang]}
+                for lang in ["python", "javascript", "typescript", "rust", "java", "c++", "go"]
+            ],
+        },
+        {
+            "category": "facts",
+            "keywords": ["fact", "definition", "concept", "principle", "theory", "equation",
+                         "algorithm", "formula", "theorem", "law", "rule", "guideline",
+                         "according to", "research shows", "studies indicate"],
+            "tags": ["fact"],
+            "levels": [
+                {"keywords": ["fundamental", "essential", "critical", "important", "key"],
+                 "importance": 4, "tags": ["fundamental"]},
+            ],
+            "extra_tags": [
+                {"keywords": ["math", "mathematics", "calculus", "algebra", "geometry", "equation"],
+                 "tags": ["math"]},
+                {"keywords": ["science", "physics", "chemistry", "biology", "astronomy"],
+                 "tags": ["science"]},
+                {"keywords": ["computer science", "algorithm", "data structure", "complexity"],
+                 "tags": ["cs"]},
+                {"keywords": ["history", "historical", "century", "era", "period", "ancient", "modern"],
+                 "tags": ["history"]},
+            ],
+        },
+        {
+            "category": "resources",
+            "keywords": ["link", "url", "website", "resource", "reference", "documentation",
+                         "book", "article", "paper", "publication", "tutorial", "guide",
+                         "http://", "https://"],
+            "tags": ["resource"],
+            "levels": [
+                {"keywords": ["important", "valuable", "useful", "essential", "recommended"],
+                 "importance": 4},
+            ],
+            "extra_tags": [
+                {"keywords": ["http://", "https://", "www."], "tags": ["website"]},
+                {"keywords": ["book", "isbn"], "tags": ["book"]},
+                {"keywords": ["paper", "journal", "conference", "publication"], "tags": ["paper"]},
+                {"keywords": ["video", "youtube", "watch"], "tags": ["video"]},
+            ],
+        },
+        {
+            "category": "private",
+            "keywords": ["password", "secret", "sensitive", "private", "confidential",
+                         "api key", "token", "credential", "personal info",
+                         "ssh", "aws", "login", "encrypt"],
+            "tags": ["sensitive", "security"],
+            # Security-related content is automatically high importance
+            "importance": 5,
+        },
+    ],
+    "importance": [
+        {"keywords": ["critical", "crucial", "vital", "essential"], "at_least": 5},
+        {"keywords": ["important", "significant", "major", "key"], "at_least": 4},
+        {"keywords": ["useful", "helpful", "good to know"], "at_least": 3},
+        {"keywords": ["minor", "trivial", "not important"], "at_most": 2},
+    ],
+    "tags": [
+        {"keywords": ["todo", "task", "action item", "reminder"], "tags": ["todo"]},
+        {"keywords": ["idea", "concept", "suggestion", "proposal"], "tags": ["idea"]},
+        {"keywords": ["question", "query", "ask", "wondering"], "tags": ["question"]},
+        {"keywords": ["decision", "choice", "select", "choose"], "tags": ["decision"]},
+    ],
+}
+
+
+def _guarded(keyword: str) -> Tuple[str, str]:
+    """Get the word-boundary guards for a keyword (only beside word characters)."""
+    before = r"(?<!\w)" if re.match(r"\w", keyword) else ""
+    after = r"(?!\w)" if re.search(r"\w$", keyword) else ""
+    return before, after
+
+
+def _trie_pattern(keywords: Iterable[str]) -> str:
+    """
+    Build a prefix-factored regular expression matching any of the keywords.
+
+    Longer keywords are tried before their prefixes, so the longest keyword
+    at a position wins.
+    """
+    trie: Dict[str, Any] = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = _guarded(keyword)[1]
+
+    def emit(node: Dict[str, Any]) -> str:
+        alternatives = [re.escape(char) + emit(child)
+                        for char, child in sorted(node.items()) if char]
+        if "" in node:
+            alternatives.append(node[""])
+        if len(alternatives) == 1:
+            return alternatives[0]
+        return "(?:" + "|".join(alternatives) + ")"
+
+    return emit(trie)
+
+
+class CompiledRules:
+    """
+    A rule set compiled into a single-scan keyword matcher.
+    """
+
+    def __init__(self, rules: Dict[str, Any]):
+        """
+        Compile a rule set.
+
+        Args:
+            rules: Rule set dictionary (see the module docstring)
+
+        Raises:
+            ValueError: If the rule set has no keywords
+        """
+        self.rules = rules
+        keywords: Set[str] = set()
+
+        def group(entry: Dict[str, Any]) -> FrozenSet[str]:
+            words = frozenset(keyword.lower() for keyword in entry.get("keywords", []))
+            keywords.update(words)
+            return words
+
+        # Categories as (category, keywords, tags, importance, levels, extra tags)
+        self.categories = [
+            (
+                entry["category"],
+                group(entry),
+                list(entry.get("tags", [])),
+                entry.get("importance"),
+                [(group(level), level.get("importance"), list(level.get("tags", [])))
+                 for level in entry.get("levels", [])],
+                [(group(extra), list(extra.get("tags", []))) for extra in entry.get("extra_tags", [])],
+            )
+            for entry in rules.get("categories", [])
+        ]
+        self.importance = [
+            (group(entry), entry.get("at_least"), entry.get("at_most"))
+            for entry in rules.get("importance", [])
+        ]
+        self.tags = [(group(entry), list(entry.get("tags", []))) for entry in rules.get("tags", [])]
+
+        if not keywords:
+            raise ValueError("Categorization rules contain no keywords")
+
+        starts_with_word = sorted(k for k in keywords if re.match(r"\w", k))
+        other = sorted(k for k in keywords if not re.match(r"\w", k))
+        alternatives = []
+        if starts_with_word:
+            alternatives.append(r"(?<!\w)" + _trie_pattern(starts_with_word))
+        if other:
+            alternatives.append(_trie_pattern(other))
+        self.pattern = re.compile("|".join(alternatives))
+
+        # A matched phrase also counts as a match for keywords inside it
+        # ("computer science" contains "science"), since the scan consumes it.
+        # Only keywords with spaces or punctuation can contain another one.
+        patterns = {keyword: re.compile(re.escape(keyword).join(_guarded(keyword)))
+                    for keyword in keywords}
+        self.contained: Dict[str, Tuple[str, ...]] = {}
+        for keyword in keywords:
+            if re.fullmatch(r"\w+", keyword):
+                continue
+            inner = tuple(other for other in keywords
+                          if len(other) < len(keyword) and patterns[other].search(keyword))
+            if inner:
+                self.contained[keyword] = inner
+
+    def scan(self, content: str) -> Set[str]:
+        """
+        Find every keyword present in the content with a single scan.
+
+        Args:
+            content: Text to scan
+
+        Returns:
+            Set of matched keywords
+        """
+        found = set(self.pattern.findall(content.lower()))
+        for keyword in [keyword for keyword in found if keyword in self.contained]:
+            found.update(self.contained[keyword])
+        return found
+
+    def categorize(self, content: str) -> Tuple[str, int, List[str]]:
+        """
+        Categorize content.
+
+        Args:
+            content: The memory content to categorize
+
+        Returns:
+            Tuple of (category, importance, tags)
+        """
+        found = self.scan(content)
+        category = "session"
+        importance = 3
+        tags: List[str] = []
+
+        for name, keywords, category_tags, fixed_importance, levels, extra_tags in self.categories:
+            if keywords.isdisjoint(found):
+                continue
+            category = name
+            tags.extend(category_tags)
+            if fixed_importance is not None:
+                importance = fixed_importance
+            for extra_keywords, extra in extra_tags:
+                if not extra_keywords.isdisjoint(found):
+                    tags.extend(extra)
+            for level_keywords, level_importance, level_tags in levels:
+                if not level_keywords.isdisjoint(found):
+                    if level_importance is not None:
+                        importance = level_importance
+                    tags.extend(level_tags)
+                    break
+            break
+
+        for keywords, at_least, at_most in self.importance:
+            if not keywords.isdisjoint(found):
+                if at_least is not None:
+                    importance = max(importance, at_least)
+                if at_most is not None:
+                    importance = min(importance, at_most)
+                break
+
+        for keywords, extra in self.tags:
+            if not keywords.isdisjoint(found):
+                tags.extend(extra)
+
+        # Ensure we have at least one tag
+        if not tags:
+            tags.append(category)
+        return category, importance, list(dict.fromkeys(tags))
+
+
+def load_rules(source: Optional[Union[str, Path, Dict[str, Any]]] = None) -> CompiledRules:
+    """
+    Load and compile a rule set.
+
+    Args:
+        source: Rule set dictionary or path of a JSON rule file (defaults
+            to DEFAULT_RULES)
+
+    Returns:
+        CompiledRules for the rule set, or for DEFAULT_RULES if the source
+        cannot be loaded
+    """
+    if source is None:
+        return CompiledRules(DEFAULT_RULES)
+    try:
+        if not isinstance(source, dict):
+            with open(Path(source).expanduser(), "r") as f:
+                source = json.load(f)
+        return CompiledRules(source)
+    except Exception as e:
+        logger.error(f"Error loading categorization rules, using defaults: {e}")
+        return CompiledRules(DEFAULT_RULES)
+
+
+_compiled: Optional[CompiledRules] = None
+
+
+def get_rules() -> CompiledRules:
+    """
+    Get the compiled rules configured by the categorization_rules setting.
+
+    Returns:
+        CompiledRules, compiled on first use
+    """
+    global _compiled
+    if _compiled is None:
+        from engram.core.config import get_config
+        _compiled = load_rules(get_config().get("categorization_rules"))
+    return _compiled
+
+
+def set_rules(source: Optional[Union[str, Path, Dict[str, Any]]] = None) -> CompiledRules:
+    """
+    Replace the active rules.
+
+    Args:
+        source: Rule set dictionary or path of a JSON rule file (defaults
+            to DEFAULT_RULES)
+
+    Returns:
+        The newly compiled rules
+    """
+    global _compiled
+    _compiled = load_rules(source)
+    return _compiled
@@ -1,5 +1,6 @@
 from engram.core.structured.memory.base import StructuredMemory
 from engram.core.structured.memory.index import (
+    MetadataIndexStore,
     load_metadata_index,
     save_metadata_index,
     initialize_metadata_index,
@@ -7,10 +8,22 @@ from engram.core.structured.memory.index import (
     update_memory_importance,
     remove_memory_from_index
 )
+from engram.core.structured.memory.content_index import ContentIndex
+from engram.core.structured.memory.digest_index import DigestIndex
+from engram.core.structured.memory.order_index import OrderIndex
+from engram.core.structured.memory.semantic_index import SemanticIndex
+from engram.core.structured.memory.tag_index import TagIndex, parse_tag_query
 from engram.core.structured.memory.migration import migrate_from_memory_service
 
 __all__ = [
     'StructuredMemory',
+    'MetadataIndexStore',
+    'ContentIndex',
+    'DigestIndex',
+    'OrderIndex',
+    'SemanticIndex',
+    'TagIndex',
+    'parse_tag_query',
     'load_metadata_index',
     'save_metadata_index',
     'initialize_metadata_index',
@@ -18,11 +18,10 @@ from engram.core.structured.constants import (
     DEFAULT_CATEGORY_IMPORTANCE,
     IMPORTANCE_LEVELS
 )
-from engram.core.structured.memory.index import (
-    load_metadata_index,
-    initialize_metadata_index,
-    save_metadata_index
-)
+from engram.core.structured.memory.content_index import ContentIndex
+from engram.core.structured.memory.index import MetadataIndexStore
+from engram.core.structured.memory.semantic_index import SemanticIndex
+from engram.core.structured.utils import content_digest
 from engram.core.structured.storage.file_storage import MemoryStorage
 from engram.core.structured.operations.add import add_memory, add_auto_categorized_memory
 from engram.core.structured.operations.retrieve import (
@@ -53,13 +52,17 @@ class StructuredMemory:
     - Context-aware memory loading
     """
     
-    def __init__(self, client_id: str = "default", data_dir: Optional[str] = None):
+    def __init__(self, client_id: str = "default", data_dir: Optional[str] = None,
+                 dedupe: Optional[bool] = None):
         """
         Initialize the structured memory service.
         
         Args:
             client_id: Unique identifier for the client (default: "default")
             data_dir: Directory to store memory data (default: ~/.engram/structured)
+            dedupe: Whether adding a memory whose content already exists in its
+                category returns the existing memory (default: the
+                structured_dedupe setting)
         """
         self.client_id = client_id
         
@@ -92,17 +95,79 @@ class StructuredMemory:
         # Import importance level descriptions
         self.importance_levels = IMPORTANCE_LEVELS
         
+        # The vector index lives in a hidden directory so storage doesn't take
+        # it for a category; move it from where it was first kept
+        vector_dir = self.base_dir / ".vectors"
+        legacy_vector_dir = self.base_dir / "vectors"
+        if legacy_vector_dir.is_dir() and not vector_dir.exists():
+            legacy_vector_dir.rename(vector_dir)
+        
         # Initialize storage
         self.storage = MemoryStorage(client_id, self.base_dir)
         
         # Initialize metadata index
         self.metadata_index_file = self.base_dir / f"{client_id}_metadata_index.json"
-        self.metadata_index = load_metadata_index(self.metadata_index_file, client_id)
+        self.index_store = MetadataIndexStore(self.metadata_index_file, client_id)
+        self.metadata_index = self.index_store.index
+        self.tag_index = self.index_store.tag_index
+        self.order_index = self.index_store.order_index
+        self.digest_index = self.index_store.digest_index
+        self._backfill_digests()
+        
+        if dedupe is None:
+            from engram.core.config import get_config
+            dedupe = bool(get_config().get("structured_dedupe", False))
+        self.dedupe = dedupe
+        
+        # Initialize full-text index, catching up with any memories it missed
+        self.content_index = ContentIndex(self.base_dir / f"{client_id}_content_index.json")
+        self.content_index.reconcile(self.metadata_index, self._load_content)
+        
+        # Initialize vector index for semantic search
+        self.semantic_index = SemanticIndex(vector_dir, client_id)
+        self.semantic_index.reconcile(self.metadata_index, self._load_content)
+    
+    def _load_content(self, memory_id: str, category: str) -> Optional[str]:
+        """Read a memory's content straight from its segment."""
+        memory = self.storage.read_memory(memory_id, category)
+        return memory.get("content") if memory else None
+    
+    def _backfill_digests(self) -> None:
+        """Record content digests for memories indexed before digests existed."""
+        missing = [
+            (memory_id, category)
+            for category, category_index in self.metadata_index["categories"].items()
+            for memory_id in category_index["memories"]
+            if memory_id not in self.digest_index
+        ]
+        for memory_id, category in missing:
+            content = self._load_content(memory_id, category)
+            if content is not None:
+                self.index_store.set_digest(memory_id, category, content_digest(content))
+        if missing:
+            logger.info(f"Recorded content digests for {len(missing)} memories")
+    
+    def flush(self) -> bool:
+        """
+        Write pending metadata index changes to disk.
+        
+        Returns:
+            Boolean indicating success
+        """
+        return self.index_store.flush()
+    
+    def close(self) -> None:
+        """Flush pending index changes, close the index log and segments."""
+        self.index_store.close()
+        self.content_index.close()
+        self.semantic_index.close()
+        self.storage.close()
     
     # Delegate methods to the appropriate modules
     async def add_memory(self, content: str, category: str = "session",
                       importance: int = None, metadata: Optional[Dict[str, Any]] = None,
-                      tags: Optional[List[str]] = None) -> Optional[str]:
+                      tags: Optional[List[str]] = None,
+                      dedupe: Optional[bool] = None) -> Optional[str]:
         """
         Add a new memory with structured metadata and importance ranking.
         
@@ -112,21 +177,25 @@ class StructuredMemory:
             importance: Importance ranking 1-5 (5 being most important)
             metadata: Additional metadata for the memory
             tags: Tags for easier searching and categorization
+            dedupe: Whether to return an existing memory with the same content
+                instead of storing a copy (default: self.dedupe)
             
         Returns:
             Memory ID if successful, None otherwise
         """
         return await add_memory(
             storage=self.storage,
-            metadata_index=self.metadata_index,
-            metadata_index_file=self.metadata_index_file,
+            index_store=self.index_store,
+            content_index=self.content_index,
+            semantic_index=self.semantic_index,
             client_id=self.client_id,
             category_importance=self.category_importance,
             content=content,
             category=category,
             importance=importance,
             metadata=metadata,
-            tags=tags
+            tags=tags,
+            dedupe=self.dedupe if dedupe is None else dedupe
         )
     
     async def get_memory(self, memory_id: str) -> Optional[Dict[str, Any]]:
@@ -164,17 +233,19 @@ class StructuredMemory:
     
     async def search_memories(self, query: str = None, categories: List[str] = None,
                           tags: List[str] = None, min_importance: int = 1,
-                          limit: int = 10, sort_by: str = "importance") -> List[Dict[str, Any]]:
+                          limit: int = 10, sort_by: str = "importance",
+                          tag_query: str = None) -> List[Dict[str, Any]]:
         """
         Search for memories based on multiple criteria.
         
         Args:
             query: Text to search for in memory content (optional)
             categories: List of categories to search in (defaults to all)
-            tags: List of tags to filter by (optional)
+            tags: List of tags to filter by, matching any of them (optional)
             min_importance: Minimum importance level (1-5)
             limit: Maximum number of results to return
             sort_by: How to sort results ("importance", "recency", or "relevance")
+            tag_query: Tag expression with AND/OR/NOT, e.g. "python AND NOT draft" (optional)
             
         Returns:
             List of matching memory data dictionaries
@@ -187,6 +258,7 @@ class StructuredMemory:
             query=query,
             categories=categories,
             tags=tags,
+            tag_query=tag_query,
             min_importance=min_importance,
             limit=limit,
             sort_by=sort_by
@@ -255,8 +327,7 @@ class StructuredMemory:
         return await set_memory_importance(
             self=self,
             storage=self.storage,
-            metadata_index=self.metadata_index,
-            metadata_index_file=self.metadata_index_file,
+            index_store=self.index_store,
             memory_id=memory_id,
             importance=importance
         )
@@ -274,8 +345,9 @@ class StructuredMemory:
         return await delete_memory(
             self=self,
             storage=self.storage,
-            metadata_index=self.metadata_index,
-            metadata_index_file=self.metadata_index_file,
+            index_store=self.index_store,
+            content_index=self.content_index,
+            semantic_index=self.semantic_index,
             memory_id=memory_id
         )
     
@@ -310,7 +382,7 @@ class StructuredMemory:
         """
         return await get_memories_by_tag(
             storage=self.storage,
-            metadata_index=self.metadata_index,
+            tag_index=self.tag_index,
             tag=tag,
             max_memories=max_memories
         )
@@ -329,6 +401,7 @@ class StructuredMemory:
         return await get_context_memories(
             storage=self.storage,
             metadata_index=self.metadata_index,
+            content_index=self.content_index,
             text=text,
             max_memories=max_memories
         )
@@ -348,6 +421,8 @@ class StructuredMemory:
         return await get_semantic_memories(
             storage=self.storage,
             metadata_index=self.metadata_index,
+            content_index=self.content_index,
+            semantic_index=self.semantic_index,
             query=query,
             max_memories=max_memories
         )
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Content Index
+
+Provides the full-text index over structured memories: a BM25 inverted
+index (see engram.core.text_index) keyed by stable integer document IDs,
+updated as memories are added and deleted and saved to
+{client_id}_content_index.json once enough has changed.
+
+The saved index may lag the metadata index after a crash. On load it is
+reconciled against the metadata index: memories that disappeared are
+dropped and memories it never saw are read and indexed, so the work is
+proportional to the difference rather than to the number of memories.
+"""
+
+import json
+import logging
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from engram.core.append_log import atomic_write_json
+from engram.core.text_index import InvertedIndex
+
+logger = logging.getLogger("engram.structured.memory.content_index")
+
+# Never save after fewer changes than this, however small the index is
+MIN_SAVE_CHANGES = 1000
+
+
+class ContentIndex:
+    """
+    Persistent BM25 index over the content of structured memories.
+    """
+
+    def __init__(self, index_file: Path):
+        """
+        Initialize the content index, loading the saved index if present.
+
+        Args:
+            index_file: Path of the saved index
+        """
+        self.index_file = Path(index_file)
+        self.text_index = InvertedIndex()
+        self.doc_ids: Dict[str, int] = {}
+        # Document ID -> (memory ID, category)
+        self.docs: Dict[int, Tuple[str, str]] = {}
+        self.next_doc_id = 0
+        self.changes = 0
+        self.save_threshold = MIN_SAVE_CHANGES
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def _load(self) -> None:
+        """Load the saved index, starting empty if it is missing or unreadable."""
+        if not self.index_file.exists():
+            return
+        try:
+            with open(self.index_file, "r") as f:
+                data = json.load(f)
+            self.docs = {int(doc_id): tuple(doc) for doc_id, doc in data.get("docs", {}).items()}
+            self.doc_ids = {memory_id: doc_id for doc_id, (memory_id, _) in self.docs.items()}
+            self.next_doc_id = data.get("next_doc_id", max(self.docs, default=-1) + 1)
+            self.text_index = InvertedIndex.from_dict(data.get("index", {}))
+        except Exception as e:
+            logger.error(f"Error loading content index {self.index_file}: {e}")
+            self.text_index = InvertedIndex()
+            self.doc_ids = {}
+            self.docs = {}
+            self.next_doc_id = 0
+
+    def reconcile(self, metadata_index: Dict[str, Any],
+                  load_content: Callable[[str, str], Optional[str]]) -> int:
+        """
+        Bring the index in line with the memories in a metadata index.
+
+        Args:
+            metadata_index: Metadata index dictionary
+            load_content: Returns the content of a memory given its ID and category
+
+        Returns:
+            Number of memories added or removed
+        """
+        indexed = {
+            memory_id: category
+            for category, category_index in metadata_index.get("categories", {}).items()
+            for memory_id in category_index.get("memories", {})
+        }
+
+        stale = [memory_id for memory_id in self.doc_ids if memory_id not in indexed]
+        for memory_id in stale:
+            self.remove(memory_id)
+
+        missing = [(memory_id, category) for memory_id, category in indexed.items()
+                   if memory_id not in self.doc_ids]
+        for memory_id, category in missing:
+            content = load_content(memory_id, category)
+            if content is not None:
+                self.add(memory_id, category, content)
+
+        if stale or missing:
+            logger.info(f"Content index reconciled: {len(missing)} added, {len(stale)} removed")
+            self.save()
+        return len(stale) + len(missing)
+
+    def add(self, memory_id: str, category: str, content: str) -> None:
+        """
+        Index a memory, replacing any earlier version with the same ID.
+
+        Args:
+            memory_id: ID of the memory
+            category: Category of the memory
+            content: Memory content
+        """
+        if memory_id in self.doc_ids:
+            self.remove(memory_id)
+
+        doc_id = self.next_doc_id
+        self.next_doc_id += 1
+        self.doc_ids[memory_id] = doc_id
+        self.docs[doc_id] = (memory_id, category)
+        self.text_index.add(doc_id, content)
+        self._changed()
+
+    def remove(self, memory_id: str, content: Optional[str] = None) -> None:
+        """
+        Remove a memory from the index.
+
+        Args:
+            memory_id: ID of the memory
+            content: The memory content, if known (makes removal cheaper)
+        """
+        doc_id = self.doc_ids.pop(memory_id, None)
+        if doc_id is None:
+            return
+        del self.docs[doc_id]
+        self.text_index.remove(doc_id, content)
+        self._changed()
+
+    def _changed(self) -> None:
+        """Count a change and save once the changes rival the index in size."""
+        self.changes += 1
+        if self.changes >= max(self.save_threshold, len(self.docs)):
+            self.save()
+
+    def search(self, query: str, limit: Optional[int] = None, prefix: bool = True,
+               allowed: Optional[Callable[[str, str], bool]] = None) -> List[Tuple[str, str, float]]:
+        """
+        Rank memories against a query.
+
+        Args:
+            query: Query text (quoted phrases and term* prefixes supported)
+            limit: Maximum number of results (all matches if None)
+            prefix: Whether every query term also matches as a prefix
+            allowed: Optional filter on (memory ID, category), applied before ranking
+
+        Returns:
+            List of (memory ID, category, score) tuples, best first
+        """
+        doc_filter = None
+        if allowed is not None:
+            doc_filter = lambda doc_id: allowed(*self.docs[doc_id])
+
+        ranked = self.text_index.search(query, limit=limit, prefix=prefix, allowed=doc_filter)
+        return [(*self.docs[doc_id], score) for doc_id, score in ranked]
+
+    def save(self) -> bool:
+        """
+        Save the index atomically.
+
+        Returns:
+            Boolean indicating success
+        """
+        if atomic_write_json(self.index_file, {
+            "next_doc_id": self.next_doc_id,
+            "docs": self.docs,
+            "index": self.text_index.to_dict(),
+        }):
+            self.changes = 0
+            return True
+        return False
+
+    def close(self) -> None:
+        """Save the index if it has unsaved changes."""
+        if self.changes:
+            self.save()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Digest Index
+
+Provides an in-memory index from content digests to memories, so a memory
+can be found by its exact content, and duplicates detected when it is
+added, without loading any memory file. Digests are hashes of normalized
+content (see engram.core.structured.utils.content_digest) and are kept in
+the metadata index, which persists them.
+"""
+
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("engram.structured.memory.digest_index")
+
+
+class DigestIndex:
+    """
+    Map from content digests to the memories with that content.
+    """
+
+    def __init__(self):
+        """Initialize an empty digest index."""
+        # Digest -> {memory ID: category}, in insertion order
+        self.memories: Dict[str, Dict[str, str]] = {}
+        # Memory ID -> digest
+        self.digests: Dict[str, str] = {}
+
+    @classmethod
+    def from_metadata_index(cls, index: Dict[str, Any]) -> "DigestIndex":
+        """
+        Build a digest index from a metadata index.
+
+        Args:
+            index: Metadata index dictionary
+
+        Returns:
+            DigestIndex covering every memory whose digest is recorded
+        """
+        digest_index = cls()
+        for category, category_index in index.get("categories", {}).items():
+            for memory_id, meta in category_index.get("memories", {}).items():
+                if meta.get("digest"):
+                    digest_index.add(memory_id, category, meta["digest"])
+        return digest_index
+
+    def __len__(self) -> int:
+        return len(self.digests)
+
+    def __contains__(self, memory_id: str) -> bool:
+        return memory_id in self.digests
+
+    def add(self, memory_id: str, category: str, digest: str) -> None:
+        """
+        Add or replace a memory in the index.
+
+        Args:
+            memory_id: ID of the memory
+            category: Category of the memory
+            digest: Digest of the memory's content
+        """
+        if memory_id in self.digests:
+            self.remove(memory_id)
+        self.digests[memory_id] = digest
+        self.memories.setdefault(digest, {})[memory_id] = category
+
+    def remove(self, memory_id: str) -> None:
+        """
+        Remove a memory from the index.
+
+        Args:
+            memory_id: ID of the memory
+        """
+        digest = self.digests.pop(memory_id, None)
+        if digest is None:
+            return
+        memories = self.memories[digest]
+        memories.pop(memory_id, None)
+        if not memories:
+            del self.memories[digest]
+
+    def lookup(self, digest: str, category: Optional[str] = None) -> List[Tuple[str, str]]:
+        """
+        Find the memories with a content digest.
+
+        Args:
+            digest: Content digest
+            category: Optional category to restrict the lookup to
+
+        Returns:
+            List of (memory ID, category) tuples, oldest first
+        """
+        return [(memory_id, memory_category)
+                for memory_id, memory_category in self.memories.get(digest, {}).items()
+                if category is None or memory_category == category]
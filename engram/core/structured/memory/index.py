@@ -2,17 +2,51 @@
 """
 Metadata Index Management
 
-Provides functions for managing the memory metadata index.
+Provides functions for managing the memory metadata index, and the
+MetadataIndexStore that persists it.
+
+The index is kept in memory as a plain dictionary. Changes are recorded as
+small records in an append-only log next to the JSON snapshot; records are
+buffered and written in batches by a background timer (write-behind), and
+the log is folded back into the snapshot once it grows as large as the
+index. The cost of an add, importance update or delete therefore no longer
+depends on how many memories the index holds.
 """
 
+import atexit
 import json
 import logging
+import threading
+import weakref
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterable, List, Optional
+
+from engram.core.append_log import AppendLog, atomic_write_json
+from engram.core.structured.memory.digest_index import DigestIndex
+from engram.core.structured.memory.order_index import OrderIndex
+from engram.core.structured.memory.tag_index import TagIndex
 
 logger = logging.getLogger("engram.structured.memory.index")
 
+# Never compact a log shorter than this, however small the index is
+MIN_COMPACTION_RECORDS = 1000
+
+# Stores that may hold buffered records when the interpreter exits
+_open_stores: "weakref.WeakSet[MetadataIndexStore]" = weakref.WeakSet()
+
+
+def _close_open_stores() -> None:
+    """Flush every open index store at interpreter shutdown."""
+    for store in list(_open_stores):
+        try:
+            store.close()
+        except Exception as e:
+            logger.error(f"Error closing metadata index {store.metadata_index_file}: {e}")
+
+
+atexit.register(_close_open_stores)
+
 def load_metadata_index(metadata_index_file: Path, client_id: str) -> Dict[str, Any]:
     """
     Load the metadata index from file or initialize if it doesn't exist.
@@ -84,16 +118,15 @@ def save_metadata_index(metadata_index_file: Path, index: Dict[str, Any]) -> boo
         # Update the last_updated timestamp
         index["last_updated"] = datetime.now().isoformat()
         
-        with open(metadata_index_file, "w") as f:
-            json.dump(index, f, indent=2)
-        return True
+        return atomic_write_json(metadata_index_file, index)
     except Exception as e:
         logger.error(f"Error saving metadata index: {e}")
         return False
         
 def update_memory_in_index(index: Dict[str, Any], memory_id: str, 
                              category: str, importance: int, 
-                             tags: list, timestamp: str) -> None:
+                             tags: list, timestamp: str,
+                             digest: Optional[str] = None) -> None:
     """
     Update or add a memory in the metadata index.
     
@@ -104,13 +137,22 @@ def update_memory_in_index(index: Dict[str, Any], memory_id: str,
         importance: Importance level of the memory
         tags: Tags associated with the memory
         timestamp: ISO format timestamp
+        digest: Digest of the memory's content (optional)
     """
-    # Update global counters
-    index["memory_count"] += 1
-    index["importance_counters"][str(importance)] += 1
-    
-    # Update category metrics
-    index["categories"][category]["memory_count"] += 1
+    existing = index["categories"][category]["memories"].get(memory_id)
+    if existing is None:
+        # Update global counters
+        index["memory_count"] += 1
+        index["importance_counters"][str(importance)] += 1
+        
+        # Update category metrics
+        index["categories"][category]["memory_count"] += 1
+    else:
+        # Already indexed (as when the log is replayed over a snapshot that
+        # includes it): only its importance and tags can change
+        index["importance_counters"][str(existing["importance"])] -= 1
+        index["importance_counters"][str(importance)] += 1
+        _remove_tags(index, memory_id, [tag for tag in existing.get("tags", []) if tag not in tags])
     index["categories"][category]["last_updated"] = datetime.now().isoformat()
     
     # Add/update memory in category index
@@ -119,13 +161,12 @@ def update_memory_in_index(index: Dict[str, Any], memory_id: str,
         "timestamp": timestamp,
         "tags": tags
     }
+    if digest:
+        index["categories"][category]["memories"][memory_id]["digest"] = digest
     
-    # Update tag index
+    # Update tag index (tag -> {memory_id: None}, an ordered set that stays JSON)
     for tag in tags:
-        if tag not in index["tags"]:
-            index["tags"][tag] = []
-        if memory_id not in index["tags"][tag]:
-            index["tags"][tag].append(memory_id)
+        index["tags"].setdefault(tag, {})[memory_id] = None
             
 def update_memory_importance(index: Dict[str, Any], memory_id: str,
                                 category: str, original_importance: int,
@@ -140,12 +181,17 @@ def update_memory_importance(index: Dict[str, Any], memory_id: str,
         original_importance: Original importance level
         new_importance: New importance level
     """
-    # Update importance counters
-    index["importance_counters"][str(original_importance)] -= 1
+    memory = index["categories"][category]["memories"].get(memory_id)
+    if memory is None:
+        return
+    
+    # Update importance counters from the indexed level, which a replayed
+    # change may already have moved
+    index["importance_counters"][str(memory["importance"])] -= 1
     index["importance_counters"][str(new_importance)] += 1
     
     # Update memory metadata
-    index["categories"][category]["memories"][memory_id]["importance"] = new_importance
+    memory["importance"] = new_importance
     index["categories"][category]["last_updated"] = datetime.now().isoformat()
     
 def remove_memory_from_index(index: Dict[str, Any], memory_id: str,
@@ -161,20 +207,234 @@ def remove_memory_from_index(index: Dict[str, Any], memory_id: str,
         importance: Importance level of the memory
         tags: Tags associated with the memory
     """
+    memory = index["categories"][category]["memories"].pop(memory_id, None)
+    if memory is None:
+        return
+    
     # Update global counters
     index["memory_count"] -= 1
-    index["importance_counters"][str(importance)] -= 1
+    index["importance_counters"][str(memory["importance"])] -= 1
     
     # Update category metrics
-    if memory_id in index["categories"][category]["memories"]:
-        index["categories"][category]["memory_count"] -= 1
-        del index["categories"][category]["memories"][memory_id]
+    index["categories"][category]["memory_count"] -= 1
     
     # Remove from tag indices
+    _remove_tags(index, memory_id, set(tags) | set(memory.get("tags", [])))
+    
+def _remove_tags(index: Dict[str, Any], memory_id: str, tags: Iterable[str]) -> None:
+    """Remove a memory from the index entries of the given tags."""
     for tag in tags:
         if tag in index["tags"] and memory_id in index["tags"][tag]:
-            index["tags"][tag].remove(memory_id)
+            del index["tags"][tag][memory_id]
             
             # Clean up empty tag entries
             if not index["tags"][tag]:
-                del index["tags"][tag]
\ No newline at end of file
+                del index["tags"][tag]
+
+
+class MetadataIndexStore:
+    """
+    Metadata index persisted as a snapshot plus an append-only change log.
+    
+    Mutations update ``index`` and the derived ``tag_index``,
+    ``order_index`` and ``digest_index`` immediately and queue a log record. Queued
+    records are written every ``flush_interval`` seconds, or as soon as
+    ``flush_batch`` of them are waiting, and always on flush() and close().
+    """
+    
+    def __init__(self, metadata_index_file: Path, client_id: str,
+                 flush_batch: int = 256, flush_interval: float = 0.5):
+        """
+        Load the index snapshot and replay the change log on top of it.
+        
+        Args:
+            metadata_index_file: Path to the metadata index snapshot
+            client_id: Client identifier for the index
+            flush_batch: Number of queued records that triggers a write
+            flush_interval: Maximum seconds a record stays queued
+        """
+        self.metadata_index_file = Path(metadata_index_file)
+        self.log = AppendLog(self.metadata_index_file.with_suffix(".log"))
+        self.flush_batch = max(1, flush_batch)
+        self.flush_interval = flush_interval
+        self.compaction_threshold = MIN_COMPACTION_RECORDS
+        
+        self._pending: List[Dict[str, Any]] = []
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.RLock()
+        
+        self.index = load_metadata_index(self.metadata_index_file, client_id)
+        
+        # Older snapshots stored each tag's memory IDs as a list
+        self.index["tags"] = {
+            tag: dict.fromkeys(memory_ids) for tag, memory_ids in self.index.get("tags", {}).items()
+        }
+        self.tag_index = TagIndex.from_metadata_index(self.index)
+        self.order_index = OrderIndex.from_metadata_index(self.index)
+        self.digest_index = DigestIndex.from_metadata_index(self.index)
+        
+        try:
+            for record in self.log.replay():
+                self._apply(record)
+        except Exception as e:
+            logger.error(f"Error replaying metadata index log: {e}")
+        
+        _open_stores.add(self)
+    
+    def _apply(self, record: Dict[str, Any]) -> None:
+        """
+        Apply a single change record to the in-memory index.
+        
+        Args:
+            record: Change record with an "op" of add, importance, digest or remove
+        """
+        op = record.get("op")
+        if op == "add":
+            update_memory_in_index(self.index, record["id"], record["category"],
+                                   record["importance"], record["tags"], record["timestamp"],
+                                   record.get("digest"))
+            self.tag_index.add(record["id"], record["category"], record["importance"], record["tags"])
+            self.order_index.add(record["id"], record["category"], record["importance"], record["timestamp"])
+            if record.get("digest"):
+                self.digest_index.add(record["id"], record["category"], record["digest"])
+        elif op == "importance":
+            update_memory_importance(self.index, record["id"], record["category"],
+                                     record["original"], record["importance"])
+            self.tag_index.set_importance(record["id"], record["importance"])
+            self.order_index.set_importance(record["id"], record["importance"])
+        elif op == "digest":
+            meta = self.index["categories"][record["category"]]["memories"].get(record["id"])
+            if meta is not None:
+                meta["digest"] = record["digest"]
+                self.digest_index.add(record["id"], record["category"], record["digest"])
+        elif op == "remove":
+            remove_memory_from_index(self.index, record["id"], record["category"],
+                                     record["importance"], record["tags"])
+            self.tag_index.remove(record["id"])
+            self.order_index.remove(record["id"])
+            self.digest_index.remove(record["id"])
+        else:
+            logger.warning(f"Unknown metadata index operation: {op}")
+    
+    def _record(self, record: Dict[str, Any]) -> None:
+        """
+        Apply a change to the index and queue it for the log.
+        
+        Args:
+            record: Change record to apply and persist
+        """
+        with self._lock:
+            self._apply(record)
+            self._pending.append(record)
+            
+            if len(self._pending) >= self.flush_batch:
+                self.flush()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+    
+    def add_memory(self, memory_id: str, category: str, importance: int,
+                   tags: list, timestamp: str, digest: Optional[str] = None) -> None:
+        """
+        Add a memory to the index.
+        
+        Args:
+            memory_id: ID of the memory
+            category: Category of the memory
+            importance: Importance level of the memory
+            tags: Tags associated with the memory
+            timestamp: ISO format timestamp
+            digest: Digest of the memory's content (optional)
+        """
+        record = {"op": "add", "id": memory_id, "category": category,
+                  "importance": importance, "tags": list(tags), "timestamp": timestamp}
+        if digest:
+            record["digest"] = digest
+        self._record(record)
+    
+    def set_digest(self, memory_id: str, category: str, digest: str) -> None:
+        """
+        Record the content digest of an indexed memory.
+        
+        Args:
+            memory_id: ID of the memory
+            category: Category of the memory
+            digest: Digest of the memory's content
+        """
+        self._record({"op": "digest", "id": memory_id, "category": category, "digest": digest})
+    
+    def set_importance(self, memory_id: str, category: str,
+                       original_importance: int, new_importance: int) -> None:
+        """
+        Change the importance level of an indexed memory.
+        
+        Args:
+            memory_id: ID of the memory
+            category: Category of the memory
+            original_importance: Original importance level
+            new_importance: New importance level
+        """
+        self._record({"op": "importance", "id": memory_id, "category": category,
+                      "original": original_importance, "importance": new_importance})
+    
+    def remove_memory(self, memory_id: str, category: str, importance: int, tags: list) -> None:
+        """
+        Remove a memory from the index.
+        
+        Args:
+            memory_id: ID of the memory
+            category: Category of the memory
+            importance: Importance level of the memory
+            tags: Tags associated with the memory
+        """
+        self._record({"op": "remove", "id": memory_id, "category": category,
+                      "importance": importance, "tags": list(tags)})
+    
+    def flush(self) -> bool:
+        """
+        Write queued records to the log, compacting if the log has grown too large.
+        
+        Returns:
+            Boolean indicating success
+        """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            
+            if self._pending:
+                if not self.log.append_many(self._pending):
+                    return False
+                self._pending = []
+            
+            if self.log.record_count >= max(self.compaction_threshold, self.index["memory_count"]):
+                return self.compact()
+            return True
+    
+    def compact(self) -> bool:
+        """
+        Fold the log into a new snapshot and truncate the log.
+        
+        Returns:
+            Boolean indicating success
+        """
+        with self._lock:
+            try:
+                if self._pending:
+                    self.log.append_many(self._pending)
+                    self._pending = []
+                self.log.sync()
+                if not save_metadata_index(self.metadata_index_file, self.index):
+                    return False
+                self.log.truncate()
+                return True
+            except Exception as e:
+                logger.error(f"Error compacting metadata index: {e}")
+                return False
+    
+    def close(self) -> None:
+        """Write queued records and sync and close the log."""
+        self.flush()
+        self.log.close()
+        _open_stores.discard(self)
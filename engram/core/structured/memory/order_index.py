@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Order Index
+
+Provides sorted secondary indexes over the structured memory metadata
+index, so the most important or most recent memories of any set of
+categories can be listed without loading memory files.
+
+Memories are kept in one list per (category, importance) bucket, sorted by
+ID. Memory IDs are ULIDs, which sort in creation order (IDs of an older
+format sort by their timestamp), so new memories land at the end of their
+bucket and inserts stay cheap; importance order walks the buckets from level 5 down,
+and recency order lazily merges them newest first. Reading the top k
+therefore touches about k entries however many memories exist.
+"""
+
+import heapq
+import logging
+from bisect import bisect_left, insort
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from engram.core.ids import order_key
+
+logger = logging.getLogger("engram.structured.memory.order_index")
+
+ORDERS = ("importance", "recency")
+
+
+class OrderIndex:
+    """
+    Per-category memory orderings by (importance, creation) and by creation.
+    """
+
+    def __init__(self):
+        """Initialize an empty order index."""
+        # Category -> importance -> [(order key, memory_id)] in creation order
+        self.buckets: Dict[str, Dict[int, List[Tuple[str, str]]]] = {}
+        # Memory ID -> (category, importance, timestamp)
+        self.entries: Dict[str, Tuple[str, int, str]] = {}
+
+    @classmethod
+    def from_metadata_index(cls, index: Dict[str, Any]) -> "OrderIndex":
+        """
+        Build an order index from a metadata index.
+
+        Args:
+            index: Metadata index dictionary
+
+        Returns:
+            OrderIndex covering every memory in the metadata index
+        """
+        order_index = cls()
+        for category, category_index in index.get("categories", {}).items():
+            buckets = order_index.buckets.setdefault(category, {})
+            for memory_id, meta in category_index.get("memories", {}).items():
+                importance = meta.get("importance", 3)
+                timestamp = meta.get("timestamp", "")
+                buckets.setdefault(importance, []).append((order_key(memory_id, timestamp), memory_id))
+                order_index.entries[memory_id] = (category, importance, timestamp)
+            for bucket in buckets.values():
+                bucket.sort()
+        return order_index
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def add(self, memory_id: str, category: str, importance: int, timestamp: str) -> None:
+        """
+        Add or replace a memory in the index.
+
+        Args:
+            memory_id: ID of the memory
+            category: Category of the memory
+            importance: Importance level of the memory
+            timestamp: ISO format timestamp
+        """
+        if memory_id in self.entries:
+            self.remove(memory_id)
+        bucket = self.buckets.setdefault(category, {}).setdefault(importance, [])
+        insort(bucket, (order_key(memory_id, timestamp), memory_id))
+        self.entries[memory_id] = (category, importance, timestamp)
+
+    def set_importance(self, memory_id: str, importance: int) -> None:
+        """
+        Move an indexed memory to another importance level.
+
+        Args:
+            memory_id: ID of the memory
+            importance: New importance level
+        """
+        entry = self.entries.get(memory_id)
+        if entry is not None:
+            self.add(memory_id, entry[0], importance, entry[2])
+
+    def remove(self, memory_id: str) -> None:
+        """
+        Remove a memory from the index.
+
+        Args:
+            memory_id: ID of the memory
+        """
+        entry = self.entries.pop(memory_id, None)
+        if entry is None:
+            return
+        category, importance, timestamp = entry
+        bucket = self.buckets[category][importance]
+        item = (order_key(memory_id, timestamp), memory_id)
+        position = bisect_left(bucket, item)
+        if position < len(bucket) and bucket[position] == item:
+            del bucket[position]
+
+    def iter_ordered(self, categories: Optional[Iterable[str]] = None, min_importance: int = 1,
+                     order: str = "importance") -> Iterator[Tuple[str, str]]:
+        """
+        Lazily iterate memories in order.
+
+        Args:
+            categories: Categories to include (defaults to all)
+            min_importance: Minimum importance level (1-5)
+            order: "importance" for importance then newest first, or
+                "recency" for newest first
+
+        Yields:
+            (memory ID, category) tuples
+        """
+        if order not in ORDERS:
+            raise ValueError(f"Unknown order: {order}")
+        if categories is None:
+            categories = list(self.buckets)
+
+        # (category, importance, bucket) for every bucket passing the filters
+        selected = [
+            (category, importance, bucket)
+            for category in categories
+            for importance, bucket in self.buckets.get(category, {}).items()
+            if importance >= min_importance and bucket
+        ]
+
+        def newest_first(category, bucket):
+            return ((key, memory_id, category) for key, memory_id in reversed(bucket))
+
+        if order == "recency":
+            groups = [[(category, bucket) for category, _, bucket in selected]]
+        else:
+            levels = sorted({importance for _, importance, _ in selected}, reverse=True)
+            groups = [
+                [(category, bucket) for category, importance, bucket in selected if importance == level]
+                for level in levels
+            ]
+
+        for group in groups:
+            merged = heapq.merge(*(newest_first(category, bucket) for category, bucket in group),
+                                 reverse=True)
+            for _, memory_id, category in merged:
+                yield memory_id, category
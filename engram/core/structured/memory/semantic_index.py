@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Semantic Index
+
+Provides the vector index over structured memories: one VectorStore
+compartment per client, with one vector per memory whose metadata carries
+the memory ID and category. Memories are embedded as they are added and
+removed as they are deleted, and a query is a single vector search across
+every category whose hits map straight back to memory IDs.
+
+The VectorStore logs every change and writes the index in the background,
+so the saved vectors may lag the metadata index only by changes lost in a
+crash; they are reconciled against it on load.
+"""
+
+import logging
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("engram.structured.memory.semantic_index")
+
+# Memories embedded per batch while reconciling
+RECONCILE_BATCH = 256
+
+# Initial number of hits fetched per requested result when filtering
+OVERSAMPLE = 4
+
+
+class SemanticIndex:
+    """
+    Vector index from memory embeddings to structured memory IDs.
+    """
+
+    def __init__(self, data_path: Path, client_id: str, embedding_model: Optional[Any] = None):
+        """
+        Initialize the semantic index, loading the saved vectors if present.
+
+        Args:
+            data_path: Directory holding the vector store files
+            client_id: Client identifier (names the compartment)
+            embedding_model: Optional model with an encode() method; defaults
+                to the VectorStore's SimpleEmbedding
+        """
+        self.compartment = f"structured_{client_id}"
+        self.vector_ids: Dict[str, int] = {}
+        self.store = None
+
+        try:
+            from engram.core.vector_store import VectorStore, HAS_FAISS
+        except ImportError:
+            HAS_FAISS = False
+        if not HAS_FAISS:
+            logger.info("Vector search not available, semantic search will use keyword search")
+            return
+
+        self.store = VectorStore(data_path=str(data_path), embedding_model=embedding_model)
+        if not self.store.ensure_compartment(self.compartment):
+            self.store = None
+            return
+        for vector_id, entry in self.store.metadata[self.compartment].items():
+            self.vector_ids[entry["memory_id"]] = vector_id
+
+    @property
+    def available(self) -> bool:
+        """Whether vector search is available."""
+        return self.store is not None
+
+    def __len__(self) -> int:
+        return len(self.vector_ids)
+
+    def reconcile(self, metadata_index: Dict[str, Any],
+                  load_content: Callable[[str, str], Optional[str]]) -> int:
+        """
+        Bring the index in line with the memories in a metadata index.
+
+        Args:
+            metadata_index: Metadata index dictionary
+            load_content: Returns the content of a memory given its ID and category
+
+        Returns:
+            Number of memories added or removed
+        """
+        if not self.available:
+            return 0
+
+        indexed = {
+            memory_id: category
+            for category, category_index in metadata_index.get("categories", {}).items()
+            for memory_id in category_index.get("memories", {})
+        }
+
+        stale = [memory_id for memory_id in self.vector_ids if memory_id not in indexed]
+        for memory_id in stale:
+            self.remove(memory_id)
+
+        missing = [(memory_id, category) for memory_id, category in indexed.items()
+                   if memory_id not in self.vector_ids]
+        for start in range(0, len(missing), RECONCILE_BATCH):
+            batch = []
+            for memory_id, category in missing[start:start + RECONCILE_BATCH]:
+                content = load_content(memory_id, category)
+                if content is not None:
+                    batch.append((memory_id, category, content))
+            self.add_many(batch)
+
+        if stale or missing:
+            logger.info(f"Semantic index reconciled: {len(missing)} added, {len(stale)} removed")
+            self.save()
+        return len(stale) + len(missing)
+
+    def add(self, memory_id: str, category: str, content: str) -> None:
+        """
+        Embed and index a memory, replacing any earlier version with the same ID.
+
+        Args:
+            memory_id: ID of the memory
+            category: Category of the memory
+            content: Memory content
+        """
+        self.add_many([(memory_id, category, content)])
+
+    def add_many(self, memories: List[Tuple[str, str, str]]) -> None:
+        """
+        Embed and index several memories in one batch.
+
+        Args:
+            memories: (memory ID, category, content) tuples
+        """
+        if not self.available or not memories:
+            return
+        for memory_id, _, _ in memories:
+            self.remove(memory_id)
+
+        vector_ids = self.store.add(
+            self.compartment,
+            texts=[content for _, _, content in memories],
+            metadatas=[{"memory_id": memory_id, "category": category}
+                       for memory_id, category, _ in memories]
+        )
+        for (memory_id, _, _), vector_id in zip(memories, vector_ids):
+            self.vector_ids[memory_id] = vector_id
+
+    def remove(self, memory_id: str) -> None:
+        """
+        Remove a memory from the index.
+
+        Args:
+            memory_id: ID of the memory
+        """
+        vector_id = self.vector_ids.pop(memory_id, None)
+        if vector_id is None:
+            return
+        self.store.remove(self.compartment, [vector_id])
+
+    def search(self, query: str, limit: int = 10,
+               allowed: Optional[Callable[[str, str], bool]] = None) -> List[Tuple[str, str, float]]:
+        """
+        Find the memories most similar to a query.
+
+        Args:
+            query: Query text
+            limit: Maximum number of results
+            allowed: Optional filter on (memory ID, category)
+
+        Returns:
+            List of (memory ID, category, score) tuples, best first
+        """
+        if not self.available or not self.vector_ids or not query:
+            return []
+
+        # Widen the search until enough hits pass the filter (the query
+        # embedding is cached by the store's encoder)
+        total = len(self.vector_ids)
+        top_k = min(total, limit if allowed is None else limit * OVERSAMPLE)
+        while True:
+            hits = self.store.search(self.compartment, query, top_k=top_k)
+            results = []
+            for hit in hits:
+                memory_id = hit["metadata"]["memory_id"]
+                category = hit["metadata"]["category"]
+                if allowed is None or allowed(memory_id, category):
+                    results.append((memory_id, category, hit["score"]))
+                    if len(results) >= limit:
+                        return results
+            if top_k >= total:
+                return results
+            top_k = min(total, top_k * 2)
+
+    def save(self) -> bool:
+        """
+        Save the vectors and their metadata.
+
+        Returns:
+            Boolean indicating success
+        """
+        if not self.available:
+            return False
+        try:
+            return self.store.flush(self.compartment)
+        except Exception as e:
+            logger.error(f"Error saving semantic index: {e}")
+            return False
+
+    def close(self) -> None:
+        """Write unsaved changes and close the vector store."""
+        if self.available:
+            self.store.close()
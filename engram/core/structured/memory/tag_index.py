@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Tag Index
+
+Provides an in-memory inverted index from tags to memories for the
+structured memory system. Every memory gets a small integer document ID
+and each tag maps to the set of document IDs carrying it. Tag expressions
+are answered with set operations, and the category and importance of each
+candidate are kept alongside, so results are filtered and ranked before
+any memory file is opened.
+
+Tag expressions combine tags with AND, OR and NOT (case-insensitive) and
+parentheses. Adjacent terms are ANDed, and tags containing spaces or
+reserved words can be double-quoted:
+
+    python AND (api OR http) AND NOT draft
+    "machine learning" NOT archived
+"""
+
+import logging
+import re
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger("engram.structured.memory.tag_index")
+
+_QUERY_TOKEN = re.compile(r'\s*(?:(\()|(\))|"([^"]*)"|([^\s()"]+))')
+_OPERATORS = {"AND", "OR", "NOT"}
+
+
+def parse_tag_query(query: str) -> Tuple:
+    """
+    Parse a tag expression into a nested tuple tree.
+
+    Nodes are ("tag", name), ("not", node), ("and", left, right) and
+    ("or", left, right). NOT binds tighter than AND, AND tighter than OR.
+
+    Args:
+        query: Tag expression
+
+    Returns:
+        Expression tree
+
+    Raises:
+        ValueError: If the expression is empty or malformed
+    """
+    tokens = []
+    position = 0
+    query = query.rstrip()
+    while position < len(query):
+        match = _QUERY_TOKEN.match(query, position)
+        if not match:
+            raise ValueError(f"Invalid tag query near: {query[position:]!r}")
+        position = match.end()
+        open_paren, close_paren, quoted, word = match.groups()
+        if open_paren or close_paren:
+            tokens.append((open_paren or close_paren, None))
+        elif quoted is not None:
+            tokens.append(("tag", quoted))
+        elif word.upper() in _OPERATORS:
+            tokens.append((word.upper(), None))
+        else:
+            tokens.append(("tag", word))
+
+    def peek():
+        return tokens[0][0] if tokens else None
+
+    def parse_or():
+        node = parse_and()
+        while peek() == "OR":
+            tokens.pop(0)
+            node = ("or", node, parse_and())
+        return node
+
+    def parse_and():
+        node = parse_not()
+        while peek() in ("AND", "NOT", "tag", "("):
+            if peek() == "AND":
+                tokens.pop(0)
+            node = ("and", node, parse_not())
+        return node
+
+    def parse_not():
+        if peek() == "NOT":
+            tokens.pop(0)
+            return ("not", parse_not())
+        return parse_term()
+
+    def parse_term():
+        if not tokens:
+            raise ValueError(f"Unexpected end of tag query: {query!r}")
+        kind, value = tokens.pop(0)
+        if kind == "tag":
+            return ("tag", value)
+        if kind == "(":
+            node = parse_or()
+            if peek() != ")":
+                raise ValueError(f"Missing closing parenthesis in tag query: {query!r}")
+            tokens.pop(0)
+            return node
+        raise ValueError(f"Unexpected {kind} in tag query: {query!r}")
+
+    tree = parse_or()
+    if tokens:
+        raise ValueError(f"Unexpected {tokens[0][0]} in tag query: {query!r}")
+    return tree
+
+
+def query_tags(tree: Tuple) -> Set[str]:
+    """
+    Get the tags a memory can match positively in an expression tree.
+
+    Args:
+        tree: Expression tree from parse_tag_query
+
+    Returns:
+        Set of tags that are not under a NOT
+    """
+    if tree[0] == "tag":
+        return {tree[1]}
+    if tree[0] == "not":
+        return set()
+    return query_tags(tree[1]) | query_tags(tree[2])
+
+
+class TagIndex:
+    """
+    Inverted index from tags to memories.
+    """
+
+    def __init__(self):
+        """Initialize an empty tag index."""
+        # Memory ID -> document ID, and document ID -> (memory ID, category, importance)
+        self.doc_ids: Dict[str, int] = {}
+        self.docs: Dict[int, Tuple[str, str, int]] = {}
+        self.next_doc_id = 0
+
+        self.postings: Dict[str, Set[int]] = {}
+        self.doc_tags: Dict[int, Tuple[str, ...]] = {}
+
+    @classmethod
+    def from_metadata_index(cls, index: Dict[str, Any]) -> "TagIndex":
+        """
+        Build a tag index from a metadata index.
+
+        Args:
+            index: Metadata index dictionary
+
+        Returns:
+            TagIndex covering every memory in the metadata index
+        """
+        tag_index = cls()
+        for category, category_index in index.get("categories", {}).items():
+            for memory_id, meta in category_index.get("memories", {}).items():
+                tag_index.add(memory_id, category, meta.get("importance", 3), meta.get("tags", []))
+        return tag_index
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def add(self, memory_id: str, category: str, importance: int, tags: Iterable[str]) -> None:
+        """
+        Add or replace a memory in the index.
+
+        Args:
+            memory_id: ID of the memory
+            category: Category of the memory
+            importance: Importance level of the memory
+            tags: Tags associated with the memory
+        """
+        if memory_id in self.doc_ids:
+            self.remove(memory_id)
+
+        doc_id = self.next_doc_id
+        self.next_doc_id += 1
+        tags = tuple(dict.fromkeys(tags))
+
+        self.doc_ids[memory_id] = doc_id
+        self.docs[doc_id] = (memory_id, category, importance)
+        self.doc_tags[doc_id] = tags
+        for tag in tags:
+            self.postings.setdefault(tag, set()).add(doc_id)
+
+    def set_importance(self, memory_id: str, importance: int) -> None:
+        """
+        Change the importance level of an indexed memory.
+
+        Args:
+            memory_id: ID of the memory
+            importance: New importance level
+        """
+        doc_id = self.doc_ids.get(memory_id)
+        if doc_id is None:
+            return
+        _, category, _ = self.docs[doc_id]
+        self.docs[doc_id] = (memory_id, category, importance)
+
+    def remove(self, memory_id: str) -> None:
+        """
+        Remove a memory from the index.
+
+        Args:
+            memory_id: ID of the memory
+        """
+        doc_id = self.doc_ids.pop(memory_id, None)
+        if doc_id is None:
+            return
+        del self.docs[doc_id]
+        for tag in self.doc_tags.pop(doc_id):
+            postings = self.postings[tag]
+            postings.discard(doc_id)
+            if not postings:
+                del self.postings[tag]
+
+    def _evaluate(self, tree: Tuple, universe: Optional[Set[int]]) -> Set[int]:
+        """
+        Evaluate an expression tree to the set of matching document IDs.
+
+        Args:
+            tree: Expression tree from parse_tag_query
+            universe: Document IDs to evaluate within (None for all)
+
+        Returns:
+            Set of matching document IDs
+        """
+        kind = tree[0]
+        if kind == "tag":
+            postings = self.postings.get(tree[1], set())
+            return postings & universe if universe is not None else set(postings)
+        if kind == "not":
+            base = universe if universe is not None else self.docs.keys()
+            return base - self._evaluate(tree[1], universe)
+        left = self._evaluate(tree[1], universe)
+        if kind == "and":
+            # Only documents matching the left side need checking on the right
+            return self._evaluate(tree[2], left) if left else left
+        return left | self._evaluate(tree[2], universe)
+
+    def query(self, tags: Optional[List[str]] = None, tag_query: Optional[str] = None,
+              categories: Optional[Iterable[str]] = None,
+              min_importance: int = 1) -> List[Tuple[str, str, int, int]]:
+        """
+        Find memories matching tags and filters without loading any memory.
+
+        Args:
+            tags: Tags of which a memory must have at least one (optional)
+            tag_query: Tag expression a memory must satisfy (optional)
+            categories: Categories to restrict the search to (defaults to all)
+            min_importance: Minimum importance level (1-5)
+
+        Returns:
+            List of (memory ID, category, importance, matched tag count) tuples
+
+        Raises:
+            ValueError: If tag_query is malformed
+        """
+        candidates = None
+        matched_tags = set()
+
+        if tags:
+            matched_tags |= set(tags)
+            candidates = set().union(*(self.postings.get(tag, set()) for tag in tags))
+        if tag_query:
+            tree = parse_tag_query(tag_query)
+            matched_tags |= query_tags(tree)
+            candidates = self._evaluate(tree, candidates)
+        if candidates is None:
+            candidates = self.docs.keys()
+
+        categories = set(categories) if categories is not None else None
+        results = []
+        for doc_id in candidates:
+            memory_id, category, importance = self.docs[doc_id]
+            if importance < min_importance or (categories is not None and category not in categories):
+                continue
+            match_count = sum(1 for tag in self.doc_tags[doc_id] if tag in matched_tags)
+            results.append((memory_id, category, importance, match_count))
+        return results
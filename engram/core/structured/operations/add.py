@@ -10,22 +10,25 @@ from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Any, Optional
 
-from engram.core.structured.utils import generate_memory_id
-from engram.core.structured.memory.index import update_memory_in_index, save_metadata_index
+from engram.core.structured.utils import generate_memory_id, content_digest
 from engram.core.structured.categorization.auto import auto_categorize_memory
 
 logger = logging.getLogger("engram.structured.operations.add")
 
-async def add_memory(storage, metadata_index, metadata_index_file, client_id, 
-                  category_importance, content, category="session",
-                  importance=None, metadata=None, tags=None) -> Optional[str]:
+async def add_memory(storage, index_store, content_index, semantic_index, client_id, category_importance, content, category="session",
+                  importance=None, metadata=None, tags=None, dedupe=False) -> Optional[str]:
     """
     Add a new memory with structured metadata and importance ranking.
     
+    With dedupe, a memory whose normalized content matches an existing
+    memory in the same category is not stored again; the existing
+    memory's ID is returned instead.
+    
     Args:
         storage: MemoryStorage instance
-        metadata_index: Current metadata index dictionary
-        metadata_index_file: Path to metadata index file
+        index_store: MetadataIndexStore holding the metadata index
+        content_index: ContentIndex for full-text search
+        semantic_index: SemanticIndex for vector search
         client_id: Client identifier
         category_importance: Dictionary mapping categories to importance settings
         content: The memory content to store
@@ -33,6 +36,7 @@ async def add_memory(storage, metadata_index, metadata_index_file, client_id,
         importance: Importance ranking 1-5 (5 being most important)
         metadata: Additional metadata for the memory
         tags: Tags for easier searching and categorization
+        dedupe: Whether to return an existing memory with the same content
         
     Returns:
         Memory ID if successful, None otherwise
@@ -58,6 +62,13 @@ async def add_memory(storage, metadata_index, metadata_index_file, client_id,
         tags = []
         
     try:
+        digest = content_digest(content)
+        if dedupe:
+            duplicates = index_store.digest_index.lookup(digest, category)
+            if duplicates:
+                logger.info(f"Memory duplicates {duplicates[0][0]} in {category}, not stored again")
+                return duplicates[0][0]
+                
         # Generate memory ID
         memory_id = generate_memory_id(category, content)
         
@@ -81,18 +92,17 @@ async def add_memory(storage, metadata_index, metadata_index_file, client_id,
             logger.error(f"Failed to store memory {memory_id}")
             return None
             
-        # Update metadata index
-        update_memory_in_index(
-            index=metadata_index,
+        # Update metadata index (persisted in the background)
+        index_store.add_memory(
             memory_id=memory_id,
             category=category,
             importance=importance,
             tags=tags,
-            timestamp=memory_data["metadata"]["timestamp"]
+            timestamp=memory_data["metadata"]["timestamp"],
+            digest=digest
         )
-        
-        # Save updated index
-        save_metadata_index(metadata_index_file, metadata_index)
+        content_index.add(memory_id, category, content)
+        semantic_index.add(memory_id, category, content)
         
         logger.info(f"Added memory {memory_id} to {category} with importance {importance}")
         return memory_id
@@ -8,19 +8,18 @@ Provides functions for deleting memories from the structured memory system.
 import logging
 from typing import Dict, Any, Optional, List
 
-from engram.core.structured.memory.index import save_metadata_index, remove_memory_from_index
-
 logger = logging.getLogger("engram.structured.operations.delete")
 
-async def delete_memory(self, storage, metadata_index, metadata_index_file, memory_id) -> bool:
+async def delete_memory(self, storage, index_store, content_index, semantic_index, memory_id) -> bool:
     """
     Delete a memory from storage.
     
     Args:
         self: StructuredMemory instance
         storage: MemoryStorage instance
-        metadata_index: Current metadata index dictionary
-        metadata_index_file: Path to metadata index file
+        index_store: MetadataIndexStore holding the metadata index
+        content_index: ContentIndex for full-text search
+        semantic_index: SemanticIndex for vector search
         memory_id: The ID of the memory to delete
         
     Returns:
@@ -43,15 +42,15 @@ async def delete_memory(self, storage, metadata_index, metadata_index_file, memo
             return False
             
         # Update the metadata index
-        if memory_id in metadata_index["categories"][category]["memories"]:
-            remove_memory_from_index(
-                index=metadata_index,
+        if memory_id in index_store.index["categories"][category]["memories"]:
+            index_store.remove_memory(
                 memory_id=memory_id,
                 category=category,
                 importance=importance,
                 tags=tags
             )
-            save_metadata_index(metadata_index_file, metadata_index)
+        content_index.remove(memory_id, memory.get("content"))
+        semantic_index.remove(memory_id)
             
         return True
     except Exception as e:
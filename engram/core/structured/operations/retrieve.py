@@ -8,7 +8,7 @@ Provides functions for retrieving memories from the structured memory system.
 import logging
 from typing import Dict, List, Any, Optional
 
-from engram.core.structured.utils import format_memory_digest
+from engram.core.structured.utils import format_memory_digest, content_digest
 from engram.core.structured.search.content import search_by_content
 from engram.core.structured.search.tags import search_by_tags
 from engram.core.structured.search.context import search_context_memories
@@ -114,6 +114,9 @@ async def get_memory_by_content(self, category_importance, content, category=Non
     """
     Find a memory by its content.
     
+    Candidates come from the content digest index, so only memories with
+    the same normalized content are loaded to confirm an exact match.
+    
     Args:
         self: StructuredMemory instance
         category_importance: Dictionary mapping categories to importance settings
@@ -124,31 +127,27 @@ async def get_memory_by_content(self, category_importance, content, category=Non
         Memory data if found, None otherwise
     """
     try:
-        categories_to_search = [category] if category else category_importance.keys()
-        
-        for cat in categories_to_search:
-            if cat not in category_importance:
-                continue
-                
-            # Search through the metadata index for this category
-            for memory_id in self.metadata_index["categories"][cat]["memories"]:
-                memory = await self.get_memory(memory_id)
+        if category and category not in category_importance:
+            return None
+            
+        for memory_id, memory_category in self.digest_index.lookup(content_digest(content), category):
+            memory = await self.storage.load_memory(memory_id, memory_category)
+            
+            if memory and memory["content"] == content:
+                return memory
                 
-                if memory and memory["content"] == content:
-                    return memory
-                    
         return None
     except Exception as e:
         logger.error(f"Error finding memory by content: {e}")
         return None
 
-async def get_memories_by_tag(storage, metadata_index, tag, max_memories=10) -> List[Dict[str, Any]]:
+async def get_memories_by_tag(storage, tag_index, tag, max_memories=10) -> List[Dict[str, Any]]:
     """
     Get memories with a specific tag.
     
     Args:
         storage: MemoryStorage instance
-        metadata_index: Current metadata index dictionary
+        tag_index: TagIndex of the structured memory
         tag: The tag to search for
         max_memories: Maximum number of memories to return
         
@@ -157,18 +156,19 @@ async def get_memories_by_tag(storage, metadata_index, tag, max_memories=10) ->
     """
     return await search_by_tags(
         storage=storage,
-        metadata_index=metadata_index,
+        tag_index=tag_index,
         tags=[tag],
         limit=max_memories
     )
 
-async def get_context_memories(storage, metadata_index, text, max_memories=5) -> List[Dict[str, Any]]:
+async def get_context_memories(storage, metadata_index, content_index, text, max_memories=5) -> List[Dict[str, Any]]:
     """
     Get memories relevant to the given context text.
     
     Args:
         storage: MemoryStorage instance
         metadata_index: Current metadata index dictionary
+        content_index: ContentIndex of the structured memory
         text: The context text to find relevant memories for
         max_memories: Maximum number of memories to return
         
@@ -178,11 +178,12 @@ async def get_context_memories(storage, metadata_index, text, max_memories=5) ->
     return await search_context_memories(
         storage=storage,
         metadata_index=metadata_index,
+        content_index=content_index,
         text=text,
         limit=max_memories
     )
 
-async def get_semantic_memories(storage, metadata_index, query, max_memories=10) -> List[Dict[str, Any]]:
+async def get_semantic_memories(storage, metadata_index, content_index, semantic_index, query, max_memories=10) -> List[Dict[str, Any]]:
     """
     Get semantically similar memories using vector search if available,
     falling back to keyword search if vector search is not available.
@@ -190,6 +191,8 @@ async def get_semantic_memories(storage, metadata_index, query, max_memories=10)
     Args:
         storage: MemoryStorage instance
         metadata_index: Current metadata index dictionary
+        content_index: ContentIndex of the structured memory
+        semantic_index: SemanticIndex of the structured memory
         query: The semantic query to search for
         max_memories: Maximum number of memories to return
         
@@ -199,6 +202,8 @@ async def get_semantic_memories(storage, metadata_index, query, max_memories=10)
     return await search_semantic_memories(
         storage=storage,
         metadata_index=metadata_index,
+        content_index=content_index,
+        semantic_index=semantic_index,
         query=query,
         limit=max_memories
     )
\ No newline at end of file
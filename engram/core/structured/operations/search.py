@@ -8,13 +8,14 @@ Provides functions for searching memories in the structured memory system.
 import logging
 from typing import Dict, List, Any, Optional
 
+from engram.core.ids import order_key
 from engram.core.structured.search.content import search_by_content
 from engram.core.structured.search.tags import search_by_tags
 
 logger = logging.getLogger("engram.structured.operations.search")
 
 async def search_memories(self, storage, metadata_index, category_importance,
-                        query=None, categories=None, tags=None,
+                        query=None, categories=None, tags=None, tag_query=None,
                         min_importance=1, limit=10, sort_by="importance") -> List[Dict[str, Any]]:
     """
     Search for memories based on multiple criteria.
@@ -26,7 +27,8 @@ async def search_memories(self, storage, metadata_index, category_importance,
         category_importance: Dictionary mapping categories to importance settings
         query: Text to search for in memory content (optional)
         categories: List of categories to search in (defaults to all)
-        tags: List of tags to filter by (optional)
+        tags: List of tags to filter by, matching any of them (optional)
+        tag_query: Tag expression with AND/OR/NOT, e.g. "python AND NOT draft" (optional)
         min_importance: Minimum importance level (1-5)
         limit: Maximum number of results to return
         sort_by: How to sort results ("importance", "recency", or "relevance")
@@ -46,11 +48,13 @@ async def search_memories(self, storage, metadata_index, category_importance,
             return []
             
         # If tags are specified, search by tags first
-        if tags:
+        if tags or tag_query:
             memories = await search_by_tags(
                 storage=storage,
-                metadata_index=metadata_index,
+                tag_index=self.tag_index,
                 tags=tags,
+                tag_query=tag_query,
+                categories=valid_categories,
                 min_importance=min_importance,
                 limit=limit
             )
@@ -59,33 +63,35 @@ async def search_memories(self, storage, metadata_index, category_importance,
             memories = await search_by_content(
                 storage=storage,
                 metadata_index=metadata_index,
+                content_index=self.content_index,
                 query=query,
                 categories=valid_categories,
                 min_importance=min_importance,
                 limit=limit
             )
-        # Otherwise, get all memories in the categories
+        # Otherwise, walk the precomputed ordering and load only the top memories
         else:
+            order = "recency" if sort_by == "recency" else "importance"
             memories = []
-            for category in valid_categories:
-                category_memories = metadata_index["categories"][category]["memories"]
-                
-                # Filter by minimum importance
-                for memory_id, metadata in category_memories.items():
-                    if metadata["importance"] >= min_importance:
-                        memory = await self.get_memory(memory_id)
-                        if memory:
-                            memories.append(memory)
+            for memory_id, category in self.order_index.iter_ordered(
+                    valid_categories, min_importance, order):
+                memory = await storage.load_memory(memory_id, category)
+                if memory:
+                    memories.append(memory)
+                    if len(memories) >= limit:
+                        break
             
-        # Sort memories
+        # Sort memories; IDs sort in creation order
+        def created(memory):
+            return order_key(memory.get("id", ""), memory.get("metadata", {}).get("timestamp"))
+        
         if sort_by == "importance":
-            # Sort by importance (higher first), then by timestamp (newest first)
-            memories.sort(key=lambda x: (-(x.get("importance", 0)), 
-                                       x.get("metadata", {}).get("timestamp", "")))
-        elif sort_by == "recency":
-            # Sort by timestamp (newest first)
-            memories.sort(key=lambda x: x.get("metadata", {}).get("timestamp", ""), 
+            # Sort by importance (higher first), then newest first
+            memories.sort(key=lambda x: (x.get("importance", 0), created(x)),
                         reverse=True)
+        elif sort_by == "recency":
+            # Sort newest first
+            memories.sort(key=created, reverse=True)
         elif sort_by == "relevance" and query:
             # Simple relevance scoring
             for memory in memories:
@@ -9,20 +9,16 @@ import logging
 from datetime import datetime
 from typing import Dict, Any, Optional, List, Tuple, Union
 
-from engram.core.structured.memory.index import save_metadata_index, update_memory_importance
-
 logger = logging.getLogger("engram.structured.operations.update")
 
-async def set_memory_importance(self, storage, metadata_index, metadata_index_file, 
-                             memory_id, importance) -> bool:
+async def set_memory_importance(self, storage, index_store, memory_id, importance) -> bool:
     """
     Update the importance of an existing memory.
     
     Args:
         self: StructuredMemory instance
         storage: MemoryStorage instance
-        metadata_index: Current metadata index dictionary
-        metadata_index_file: Path to metadata index file
+        index_store: MetadataIndexStore holding the metadata index
         memory_id: The ID of the memory to update
         importance: New importance level (1-5)
         
@@ -54,14 +50,12 @@ async def set_memory_importance(self, storage, metadata_index, metadata_index_fi
             return False
             
         # Update metadata index
-        update_memory_importance(
-            index=metadata_index,
+        index_store.set_importance(
             memory_id=memory_id,
             category=category,
             original_importance=original_importance,
             new_importance=importance
         )
-        save_metadata_index(metadata_index_file, metadata_index)
         
         return True
     except Exception as e:
@@ -13,13 +13,14 @@ from engram.core.structured.search.content import search_by_content
 
 logger = logging.getLogger("engram.structured.search.context")
 
-async def search_context_memories(storage, metadata_index, text, limit=5) -> List[Dict[str, Any]]:
+async def search_context_memories(storage, metadata_index, content_index, text, limit=5) -> List[Dict[str, Any]]:
     """
     Find memories relevant to the provided context text.
     
     Args:
         storage: MemoryStorage instance
         metadata_index: Current metadata index dictionary
+        content_index: ContentIndex of the structured memory
         text: Context text to find relevant memories for
         limit: Maximum number of memories to return
         
@@ -42,6 +43,7 @@ async def search_context_memories(storage, metadata_index, text, limit=5) -> Lis
         return await search_by_content(
             storage=storage,
             metadata_index=metadata_index,
+            content_index=content_index,
             query=context_query,
             min_importance=2,  # Only moderately+ important memories for context
             limit=limit
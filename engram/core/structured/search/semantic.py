@@ -12,78 +12,50 @@ from engram.core.structured.search.content import search_by_content
 
 logger = logging.getLogger("engram.structured.search.semantic")
 
-async def search_semantic_memories(storage, metadata_index, query, limit=10) -> List[Dict[str, Any]]:
+async def search_semantic_memories(storage, metadata_index, content_index, semantic_index, query,
+                                   categories=None, min_importance=1, limit=10) -> List[Dict[str, Any]]:
     """
     Search memories using semantic similarity if available, falling back to keyword search.
     
-    This function attempts to use vector embeddings for semantic search, but falls back
-    to keyword-based search if vector search is not available.
+    The semantic index holds one vector per memory, so a query is a single
+    vector search across all categories and only the top matches are loaded.
+    Keyword search is used when vector search is unavailable or finds nothing.
     
     Args:
         storage: MemoryStorage instance
         metadata_index: Current metadata index dictionary
+        content_index: ContentIndex of the structured memory
+        semantic_index: SemanticIndex of the structured memory
         query: Semantic query text
+        categories: List of categories to search (defaults to all)
+        min_importance: Minimum importance level (1-5)
         limit: Maximum number of results to return
         
     Returns:
         List of semantically relevant memory dictionaries
     """
     try:
-        # Try to import MemoryService for vector search
-        try:
-            from engram.core.memory import MemoryService
-            has_vector_search = True
-        except ImportError:
-            has_vector_search = False
-            logger.info("Vector search not available, falling back to keyword search")
-            
-        # If vector search is available, use it
-        if has_vector_search:
+        if semantic_index is not None and semantic_index.available:
             try:
-                # Instantiate MemoryService
-                memory_service = MemoryService()
+                category_filter = set(categories) if categories is not None else None
                 
-                # Create an empty list for results
-                vector_results = []
-                
-                # Get categories from metadata
-                categories = list(metadata_index["categories"].keys())
+                def allowed(memory_id, category):
+                    if category_filter is not None and category not in category_filter:
+                        return False
+                    meta = metadata_index["categories"].get(category, {}).get("memories", {}).get(memory_id)
+                    return meta is not None and meta["importance"] >= min_importance
                 
-                # Search each category
-                for category in categories:
-                    # Create a namespace for the category
-                    namespace = f"structured_{category}"
-                    
-                    # Perform semantic search
-                    search_results = await memory_service.search(
-                        query=query,
-                        namespace=namespace,
-                        limit=limit // len(categories) + 1  # Distribute limit
-                    )
-                    
-                    # Process results
-                    for result in search_results.get("results", []):
-                        content = result.get("content")
-                        score = result.get("score", 0)
+                vector_results = []
+                for memory_id, category, score in semantic_index.search(query, limit=limit, allowed=allowed):
+                    memory = await storage.load_memory(memory_id, category)
+                    if memory:
+                        # Add semantic score
+                        memory["relevance"] = score * 10  # Scale up vector scores
+                        vector_results.append(memory)
                         
-                        # Find matching memory by content
-                        memory = None
-                        for memory_id, meta in metadata_index["categories"][category]["memories"].items():
-                            memory_data = await storage.load_memory(memory_id, category)
-                            if memory_data and memory_data["content"] == content:
-                                memory = memory_data
-                                break
-                                
-                        if memory:
-                            # Add semantic score
-                            memory["relevance"] = score * 10  # Scale up vector scores
-                            vector_results.append(memory)
-                            
                 # If we got vector results, return them
                 if vector_results:
-                    # Sort by relevance
-                    vector_results.sort(key=lambda x: x.get("relevance", 0), reverse=True)
-                    return vector_results[:limit]
+                    return vector_results
             except Exception as e:
                 logger.warning(f"Error in vector search, falling back to keyword search: {e}")
                 
@@ -91,9 +63,12 @@ async def search_semantic_memories(storage, metadata_index, query, limit=10) ->
         return await search_by_content(
             storage=storage,
             metadata_index=metadata_index,
+            content_index=content_index,
             query=query,
+            categories=categories,
+            min_importance=min_importance,
             limit=limit
         )
     except Exception as e:
         logger.error(f"Error in semantic memory search: {e}")
-        return []
\ No newline at end of file
+        return []
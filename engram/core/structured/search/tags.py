@@ -10,14 +10,20 @@ from typing import Dict, List, Any, Optional
 
 logger = logging.getLogger("engram.structured.search.tags")
 
-async def search_by_tags(storage, metadata_index, tags, min_importance=1, limit=10) -> List[Dict[str, Any]]:
+async def search_by_tags(storage, tag_index, tags=None, tag_query=None, categories=None,
+                        min_importance=1, limit=10) -> List[Dict[str, Any]]:
     """
-    Search memories by their tags, returning those that match any of the specified tags.
+    Search memories by their tags.
+    
+    Matching, filtering and ranking happen on the tag index; only the memories
+    that make the final result are loaded from storage.
     
     Args:
         storage: MemoryStorage instance
-        metadata_index: Current metadata index dictionary
-        tags: List of tags to search for
+        tag_index: TagIndex of the structured memory
+        tags: List of tags, of which a memory must have at least one (optional)
+        tag_query: Tag expression with AND/OR/NOT, e.g. "python AND NOT draft" (optional)
+        categories: List of categories to search in (defaults to all)
         min_importance: Minimum importance level (1-5)
         limit: Maximum number of results to return
         
@@ -25,54 +31,43 @@ async def search_by_tags(storage, metadata_index, tags, min_importance=1, limit=
         List of matching memory dictionaries
     """
     try:
-        if not tags:
+        if not tags and not tag_query:
             logger.warning("No tags provided for tag search")
             return []
             
-        # Get all memory IDs that match any of the tags
-        matching_memory_ids = set()
-        
-        for tag in tags:
-            if tag in metadata_index["tags"]:
-                matching_memory_ids.update(metadata_index["tags"][tag])
+        try:
+            matches = tag_index.query(
+                tags=tags,
+                tag_query=tag_query,
+                categories=categories,
+                min_importance=min_importance
+            )
+        except ValueError as e:
+            logger.warning(f"Invalid tag query: {e}")
+            return []
                 
-        if not matching_memory_ids:
-            logger.info(f"No memories found with tags: {tags}")
+        if not matches:
+            logger.info(f"No memories found with tags: {tag_query or tags}")
             return []
             
-        # Load and filter memories
+        # Relevance combines tag matches and importance
+        ranked = sorted(
+            ((match_count * 2 + importance, memory_id, category)
+             for memory_id, category, importance, match_count in matches),
+            reverse=True
+        )
+        
+        # Load only the memories that make the cut
         memories = []
-        for memory_id in matching_memory_ids:
-            # Determine category from ID
-            if "-" not in memory_id:
-                continue
-                
-            category = memory_id.split("-")[0]
-            
-            # Check if memory exists in the index
-            if category not in metadata_index["categories"] or \
-               memory_id not in metadata_index["categories"][category]["memories"]:
-                continue
-                
-            # Check importance
-            memory_meta = metadata_index["categories"][category]["memories"][memory_id]
-            if memory_meta["importance"] < min_importance:
-                continue
-                
-            # Load the memory
+        for relevance, memory_id, category in ranked:
             memory = await storage.load_memory(memory_id, category)
             if memory:
-                # Calculate tag match score for relevance
-                memory_tags = set(memory.get("tags", []))
-                tag_match_count = len(memory_tags.intersection(set(tags)))
-                
-                # Add relevance score combining tag matches and importance
-                memory["relevance"] = tag_match_count * 2 + memory["importance"]
+                memory["relevance"] = relevance
                 memories.append(memory)
+                if len(memories) >= limit:
+                    break
                 
-        # Sort by relevance and limit results
-        memories.sort(key=lambda x: x.get("relevance", 0), reverse=True)
-        return memories[:limit]
+        return memories
     except Exception as e:
         logger.error(f"Error in tag search: {e}")
-        return []
\ No newline at end of file
+        return []
@@ -1,3 +1,5 @@
 from engram.core.structured.storage.file_storage import MemoryStorage
+from engram.core.structured.storage.cache import MemoryCache
+from engram.core.structured.storage.segments import SegmentStore
 
-__all__ = ['MemoryStorage']
\ No newline at end of file
+__all__ = ['MemoryStorage', 'MemoryCache', 'SegmentStore']
\ No newline at end of file
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Structured Memory Cache
+
+Provides a least-recently-used cache of loaded memories bounded by an
+estimate of their size in bytes, with hit, miss and eviction counters.
+Every operation is O(1) apart from sizing a new entry.
+"""
+
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger("engram.structured.storage.cache")
+
+# Default cache budget (64 MiB)
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+
+# Rough per-entry overhead of the cached dictionaries beyond their JSON size
+ENTRY_OVERHEAD = 512
+
+
+def estimate_size(memory: Dict[str, Any]) -> int:
+    """
+    Estimate the memory footprint of a cached memory.
+
+    Args:
+        memory: Memory data dictionary
+
+    Returns:
+        Approximate size in bytes
+    """
+    try:
+        return len(json.dumps(memory, separators=(",", ":"), default=str)) + ENTRY_OVERHEAD
+    except (TypeError, ValueError):
+        return ENTRY_OVERHEAD
+
+
+class MemoryCache:
+    """
+    LRU cache of memories keyed by memory ID, with a byte budget.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_BYTES):
+        """
+        Initialize the cache.
+
+        Args:
+            max_bytes: Total estimated size the cache may hold (0 disables caching)
+        """
+        self.max_bytes = max_bytes
+        self.entries: "OrderedDict[str, Tuple[Dict[str, Any], int]]" = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, memory_id: str) -> bool:
+        return memory_id in self.entries
+
+    def get(self, memory_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a memory, marking it as recently used.
+
+        Args:
+            memory_id: ID of the memory
+
+        Returns:
+            The cached memory, or None
+        """
+        with self._lock:
+            entry = self.entries.get(memory_id)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(memory_id)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, memory_id: str, memory: Dict[str, Any]) -> None:
+        """
+        Cache a memory, evicting least recently used entries to stay in budget.
+
+        Args:
+            memory_id: ID of the memory
+            memory: Memory data dictionary
+        """
+        size = estimate_size(memory)
+        with self._lock:
+            previous = self.entries.pop(memory_id, None)
+            if previous is not None:
+                self.bytes -= previous[1]
+            if size > self.max_bytes:
+                return
+
+            self.entries[memory_id] = (memory, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, evicted_size) = self.entries.popitem(last=False)
+                self.bytes -= evicted_size
+                self.evictions += 1
+
+    def pop(self, memory_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Remove a memory from the cache.
+
+        Args:
+            memory_id: ID of the memory
+
+        Returns:
+            The removed memory, or None if it was not cached
+        """
+        with self._lock:
+            entry = self.entries.pop(memory_id, None)
+            if entry is None:
+                return None
+            self.bytes -= entry[1]
+            return entry[0]
+
+    def clear(self) -> None:
+        """Remove every entry (counters are kept)."""
+        with self._lock:
+            self.entries.clear()
+            self.bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache metrics.
+
+        Returns:
+            Dictionary of entry count, bytes used, budget, hits, misses,
+            evictions and hit rate
+        """
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
@@ -3,35 +3,41 @@
 Structured Memory Storage
 
 Provides the MemoryStorage class for file-based memory operations.
+
+Memories are packed into append-only segment files, one segment store per
+category under {category}/{client_id}/segments (see segments.py). Memories
+saved one JSON file each by earlier versions are moved into the segments
+the first time a client's storage is opened.
 """
 
 import logging
-import os
-import json
 from pathlib import Path
-from datetime import datetime
-from typing import Dict, List, Any, Optional, Union
+from typing import Dict, List, Any, Optional
 
-from engram.core.structured.utils import load_json_file, save_json_file
+from engram.core.structured.storage.cache import MemoryCache, DEFAULT_CACHE_BYTES
+from engram.core.structured.storage.segments import SegmentStore
 
 logger = logging.getLogger("engram.structured.storage")
 
 class MemoryStorage:
     """
-    File-based storage for structured memories with caching.
+    Segment-file storage for structured memories with caching.
     """
     
-    def __init__(self, client_id: str, base_dir: Path):
+    def __init__(self, client_id: str, base_dir: Path, cache_bytes: Optional[int] = None):
         """
         Initialize memory storage.
         
         Args:
             client_id: Unique identifier for the client
             base_dir: Base directory for memory storage
+            cache_bytes: Memory cache budget in bytes (default: the
+                structured_cache_bytes setting)
         """
         self.client_id = client_id
         self.base_dir = base_dir
         self.memory_dirs = {}
+        self.segments: Dict[str, SegmentStore] = {}
         
         # Set up category directories
         for category_dir in base_dir.iterdir():
@@ -41,14 +47,41 @@ class MemoryStorage:
                 # Ensure client dir exists
                 client_dir = category_dir / client_id
                 client_dir.mkdir(exist_ok=True)
+                
+                # Open the category's segments, packing any per-memory files
+                segments = SegmentStore(client_dir / "segments")
+                segments.migrate_files(client_dir)
+                self.segments[category_dir.name] = segments
         
-        # Memory cache to avoid repeated disk reads
-        self.memory_cache = {}
-        self.cache_size_limit = 1000  # Maximum number of memories to cache
+        # LRU memory cache to avoid repeated disk reads
+        if cache_bytes is None:
+            from engram.core.config import get_config
+            cache_bytes = get_config().get("structured_cache_bytes", DEFAULT_CACHE_BYTES)
+        self.memory_cache = MemoryCache(cache_bytes)
+    
+    def read_memory(self, memory_id: str, category: str) -> Optional[Dict[str, Any]]:
+        """
+        Read a memory from its segment, bypassing the cache.
+        
+        Args:
+            memory_id: ID of the memory
+            category: Category of the memory
+            
+        Returns:
+            Memory data if found, None otherwise
+        """
+        segments = self.segments.get(category)
+        if segments is None:
+            return None
+        try:
+            return segments.get(memory_id)
+        except Exception as e:
+            logger.error(f"Error reading memory {memory_id}: {e}")
+            return None
         
     async def store_memory(self, memory_data: Dict[str, Any]) -> bool:
         """
-        Store a memory to the filesystem.
+        Store a memory in its category's segments.
         
         Args:
             memory_data: Memory data to store
@@ -64,17 +97,10 @@ class MemoryStorage:
                 logger.warning(f"Invalid category '{category}' for memory {memory_id}")
                 return False
                 
-            # Construct file path
-            memory_file = self.memory_dirs[category] / self.client_id / f"{memory_id}.json"
-            
-            # Save to filesystem
-            if save_json_file(memory_file, memory_data):
+            # Append to the category's segments
+            if self.segments[category].put(memory_id, memory_data):
                 # Update cache
-                self.memory_cache[memory_id] = memory_data
-                
-                # Trim cache if needed
-                self._trim_cache()
-                
+                self.memory_cache.put(memory_id, memory_data)
                 return True
             else:
                 return False
@@ -84,7 +110,7 @@ class MemoryStorage:
             
     async def load_memory(self, memory_id: str, category: str) -> Optional[Dict[str, Any]]:
         """
-        Load a memory from cache or filesystem.
+        Load a memory from cache or segments.
         
         Args:
             memory_id: ID of the memory to load
@@ -95,25 +121,20 @@ class MemoryStorage:
         """
         try:
             # Check cache first
-            if memory_id in self.memory_cache:
-                return self.memory_cache[memory_id]
+            memory_data = self.memory_cache.get(memory_id)
+            if memory_data is not None:
+                return memory_data
                 
-            # Construct file path
             if category not in self.memory_dirs:
                 logger.warning(f"Invalid category '{category}' for memory {memory_id}")
                 return None
                 
-            memory_file = self.memory_dirs[category] / self.client_id / f"{memory_id}.json"
-            
-            # Load from filesystem
-            memory_data = load_json_file(memory_file)
+            # Read from the category's segments
+            memory_data = self.read_memory(memory_id, category)
             
             if memory_data:
                 # Update cache
-                self.memory_cache[memory_id] = memory_data
-                
-                # Trim cache if needed
-                self._trim_cache()
+                self.memory_cache.put(memory_id, memory_data)
                 
             return memory_data
         except Exception as e:
@@ -122,7 +143,7 @@ class MemoryStorage:
             
     async def delete_memory(self, memory_id: str, category: str) -> bool:
         """
-        Delete a memory from filesystem and cache.
+        Delete a memory from segments and cache.
         
         Args:
             memory_id: ID of the memory to delete
@@ -132,42 +153,33 @@ class MemoryStorage:
             Boolean indicating success
         """
         try:
-            # Construct file path
             if category not in self.memory_dirs:
                 logger.warning(f"Invalid category '{category}' for memory {memory_id}")
                 return False
                 
-            memory_file = self.memory_dirs[category] / self.client_id / f"{memory_id}.json"
-            
             # Remove from cache
-            if memory_id in self.memory_cache:
-                del self.memory_cache[memory_id]
+            self.memory_cache.pop(memory_id)
                 
-            # Delete file if it exists
-            if memory_file.exists():
-                memory_file.unlink()
+            # Append a tombstone if the memory is stored
+            if self.segments[category].delete(memory_id):
                 return True
             else:
-                logger.warning(f"Memory file not found: {memory_file}")
+                logger.warning(f"Memory not found in {category} segments: {memory_id}")
                 return False
         except Exception as e:
             logger.error(f"Error deleting memory: {e}")
             return False
-            
-    def _trim_cache(self) -> None:
+    
+    def cache_stats(self) -> Dict[str, Any]:
         """
-        Trim the memory cache if it exceeds the size limit.
+        Get memory cache metrics.
+        
+        Returns:
+            Dictionary of cache size, hits, misses and evictions
         """
-        if len(self.memory_cache) > self.cache_size_limit:
-            # Simple strategy: remove oldest cached entries
-            excess = len(self.memory_cache) - self.cache_size_limit
-            
-            # Sort by timestamp (oldest first)
-            sorted_ids = sorted(
-                self.memory_cache.keys(),
-                key=lambda x: self.memory_cache[x].get("metadata", {}).get("timestamp", "")
-            )
-            
-            # Remove oldest entries
-            for memory_id in sorted_ids[:excess]:
-                del self.memory_cache[memory_id]
\ No newline at end of file
+        return self.memory_cache.stats()
+    
+    def close(self) -> None:
+        """Sync and close every category's segments."""
+        for segments in self.segments.values():
+            segments.close()
@@ -0,0 +1,437 @@
+#!/usr/bin/env python3
+"""
+Segment Store
+
+Provides packed, append-only storage for structured memories. Instead of
+one JSON file per memory, a directory holds numbered segment files of
+records, one per line:
+
+    <memory_id> TAB <memory JSON> NEWLINE
+
+A memory is stored by appending a record and deleted by appending a
+tombstone (an empty payload). An in-memory offset index maps each memory
+ID to the segment, offset and length of its latest record, and reads slice
+the record out of a memory-mapped segment. When a segment reaches
+SEGMENT_MAX_BYTES it is sealed and its index entries are written to a
+sidecar .idx file, so loading reads the sidecars and scans only the
+active segment. Once superseded and deleted records make up more than
+half of the bytes, a background thread rewrites the live records into
+fresh segments.
+"""
+
+import json
+import logging
+import mmap
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger("engram.structured.storage.segments")
+
+# Size at which the active segment is sealed
+SEGMENT_MAX_BYTES = 8 * 1024 * 1024
+
+# Fraction of dead bytes that triggers compaction
+COMPACTION_RATIO = 0.5
+
+# Never compact to reclaim fewer bytes than this
+MIN_COMPACTION_BYTES = 1024 * 1024
+
+SEGMENT_SUFFIX = ".seg"
+INDEX_SUFFIX = ".idx"
+
+
+class SegmentStore:
+    """
+    Append-only packed memory records with an offset index.
+    """
+
+    def __init__(self, directory: Path, max_segment_bytes: int = SEGMENT_MAX_BYTES,
+                 compaction_ratio: float = COMPACTION_RATIO,
+                 min_compaction_bytes: int = MIN_COMPACTION_BYTES, background: bool = True):
+        """
+        Open a segment directory, loading its offset index.
+
+        Args:
+            directory: Directory holding the segment files
+            max_segment_bytes: Size at which the active segment is sealed
+            compaction_ratio: Fraction of dead bytes that triggers compaction
+            min_compaction_bytes: Minimum dead bytes before compacting
+            background: Whether compaction runs on a background thread
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_segment_bytes = max_segment_bytes
+        self.compaction_ratio = compaction_ratio
+        self.min_compaction_bytes = min_compaction_bytes
+        self.background = background
+
+        # Memory ID -> (segment number, payload offset, payload length)
+        self.offsets: Dict[str, Tuple[int, int, int]] = {}
+        self.live_bytes = 0
+        self.dead_bytes = 0
+
+        self._lock = threading.RLock()
+        self._views: Dict[int, mmap.mmap] = {}
+        self._handle = None
+        self._active = 0
+        self._active_size = 0
+        self._active_entries: List[List[Any]] = []
+        self._compaction: Optional[threading.Thread] = None
+
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def __contains__(self, memory_id: str) -> bool:
+        return memory_id in self.offsets
+
+    def ids(self) -> List[str]:
+        """Get the IDs of all stored memories."""
+        with self._lock:
+            return list(self.offsets)
+
+    def _path(self, segment: int, suffix: str = SEGMENT_SUFFIX) -> Path:
+        return self.directory / f"{segment:06d}{suffix}"
+
+    def _segments(self) -> List[int]:
+        """Get the numbers of the segment files on disk, in order."""
+        return sorted(int(path.stem) for path in self.directory.glob(f"*{SEGMENT_SUFFIX}")
+                      if path.stem.isdigit())
+
+    def _apply(self, segment: int, memory_id: str, offset: int, length: int) -> None:
+        """Apply a record or tombstone (length 0) to the offset index."""
+        previous = self.offsets.pop(memory_id, None)
+        if previous is not None:
+            self.live_bytes -= previous[2]
+            self.dead_bytes += previous[2]
+        if length:
+            self.offsets[memory_id] = (segment, offset, length)
+            self.live_bytes += length
+        else:
+            self.dead_bytes += len(memory_id) + 2
+
+    def _scan(self, segment: int) -> List[List[Any]]:
+        """
+        Read the index entries of a segment without a sidecar.
+
+        A torn final record (from a crash mid-write) is cut off.
+        """
+        path = self._path(segment)
+        with open(path, "rb") as f:
+            data = f.read()
+
+        entries = []
+        position = 0
+        while position < len(data):
+            end = data.find(b"\n", position)
+            if end < 0:
+                logger.warning(f"Truncating torn record at {path}:{position}")
+                with open(path, "r+b") as f:
+                    f.truncate(position)
+                break
+            tab = data.find(b"\t", position, end)
+            if tab < 0:
+                logger.warning(f"Skipping corrupt record at {path}:{position}")
+            else:
+                memory_id = data[position:tab].decode("utf-8")
+                entries.append([memory_id, tab + 1, end - tab - 1])
+            position = end + 1
+        return entries
+
+    def _load(self) -> None:
+        """Rebuild the offset index from sidecars and segment scans."""
+        segments = self._segments()
+        entries = []
+        sealed = True
+        for segment in segments:
+            sidecar = self._path(segment, INDEX_SUFFIX)
+            sealed = sidecar.exists()
+            entries = None
+            if sealed:
+                try:
+                    with open(sidecar, "r") as f:
+                        entries = json.load(f)
+                except Exception as e:
+                    logger.warning(f"Rescanning segment with unreadable sidecar {sidecar}: {e}")
+            if entries is None:
+                entries = self._scan(segment)
+            for memory_id, offset, length in entries:
+                self._apply(segment, memory_id, offset, length)
+
+        # A last segment without a sidecar is still the active one
+        if segments and not sealed:
+            self._active = segments[-1]
+            self._active_size = self._path(self._active).stat().st_size
+            self._active_entries = entries
+        else:
+            self._active = (segments[-1] + 1) if segments else 1
+
+    def _open_active(self):
+        """Open the active segment for appending."""
+        if self._handle is None:
+            self._handle = open(self._path(self._active), "ab")
+        return self._handle
+
+    def _seal(self) -> None:
+        """Close the active segment, write its sidecar and start a new one."""
+        if self._handle is not None:
+            self._handle.flush()
+            os.fsync(self._handle.fileno())
+            self._handle.close()
+            self._handle = None
+        if self._active_entries:
+            sidecar = self._path(self._active, INDEX_SUFFIX)
+            tmp_path = sidecar.with_name(sidecar.name + ".tmp")
+            with open(tmp_path, "w") as f:
+                json.dump(self._active_entries, f, separators=(",", ":"))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, sidecar)
+            self._active += 1
+        self._active_size = 0
+        self._active_entries = []
+
+    def _write(self, chunks: List[bytes]) -> None:
+        """Write encoded records to the active segment."""
+        if chunks:
+            handle = self._open_active()
+            handle.write(b"".join(chunks))
+            handle.flush()
+
+    def _append(self, records: List[Tuple[str, bytes]]) -> None:
+        """Append records (empty payloads are tombstones), sealing full segments."""
+        chunks = []
+        for memory_id, payload in records:
+            if self._active_size >= self.max_segment_bytes:
+                self._write(chunks)
+                chunks = []
+                self._seal()
+
+            key = memory_id.encode("utf-8")
+            offset = self._active_size + len(key) + 1
+            chunks.append(key + b"\t" + payload + b"\n")
+            self._active_size = offset + len(payload) + 1
+            self._active_entries.append([memory_id, offset, len(payload)])
+            self._apply(self._active, memory_id, offset, len(payload))
+        self._write(chunks)
+
+    def _view(self, segment: int, end: int) -> mmap.mmap:
+        """Get a read-only map of a segment covering at least `end` bytes."""
+        view = self._views.get(segment)
+        if view is None or len(view) < end:
+            if view is not None:
+                view.close()
+            with open(self._path(segment), "rb") as f:
+                view = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._views[segment] = view
+        return view
+
+    def put(self, memory_id: str, memory: Dict[str, Any]) -> bool:
+        """
+        Store a memory, superseding any earlier version.
+
+        Args:
+            memory_id: ID of the memory
+            memory: Memory data dictionary
+
+        Returns:
+            Boolean indicating success
+        """
+        return self.put_many([(memory_id, memory)])
+
+    def put_many(self, memories: List[Tuple[str, Dict[str, Any]]]) -> bool:
+        """
+        Store several memories with a single write.
+
+        Args:
+            memories: (memory ID, memory data) pairs
+
+        Returns:
+            Boolean indicating success
+        """
+        try:
+            records = [(memory_id, json.dumps(memory, separators=(",", ":")).encode("utf-8"))
+                       for memory_id, memory in memories]
+            with self._lock:
+                self._append(records)
+            self._maybe_compact()
+            return True
+        except Exception as e:
+            logger.error(f"Error writing to segment store {self.directory}: {e}")
+            return False
+
+    def get(self, memory_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Read a memory.
+
+        Args:
+            memory_id: ID of the memory
+
+        Returns:
+            Memory data dictionary, or None if not stored
+        """
+        with self._lock:
+            location = self.offsets.get(memory_id)
+            if location is None:
+                return None
+            segment, offset, length = location
+            try:
+                payload = self._view(segment, offset + length)[offset:offset + length]
+            except Exception as e:
+                logger.error(f"Error reading {memory_id} from segment {segment}: {e}")
+                return None
+        return json.loads(payload)
+
+    def delete(self, memory_id: str) -> bool:
+        """
+        Delete a memory by appending a tombstone.
+
+        Args:
+            memory_id: ID of the memory
+
+        Returns:
+            Boolean indicating whether the memory existed
+        """
+        try:
+            with self._lock:
+                if memory_id not in self.offsets:
+                    return False
+                self._append([(memory_id, b"")])
+            self._maybe_compact()
+            return True
+        except Exception as e:
+            logger.error(f"Error deleting {memory_id} from segment store {self.directory}: {e}")
+            return False
+
+    def items(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Iterate over (memory ID, memory data) pairs of all stored memories."""
+        for memory_id in self.ids():
+            memory = self.get(memory_id)
+            if memory is not None:
+                yield memory_id, memory
+
+    def _maybe_compact(self) -> None:
+        """Start compaction once dead bytes dominate."""
+        if self.dead_bytes < max(self.min_compaction_bytes,
+                                 self.compaction_ratio * (self.live_bytes + self.dead_bytes)):
+            return
+        if not self.background:
+            self.compact()
+            return
+        with self._lock:
+            if self._compaction is not None and self._compaction.is_alive():
+                return
+            self._compaction = threading.Thread(target=self.compact, daemon=True,
+                                                name=f"segment-compaction-{self.directory.name}")
+            self._compaction.start()
+
+    def compact(self) -> bool:
+        """
+        Rewrite live records into new segments and remove the old ones.
+
+        Old segments are removed oldest first after the new ones are synced,
+        so a crash part way through never resurrects a deleted memory.
+
+        Returns:
+            Boolean indicating success
+        """
+        with self._lock:
+            try:
+                self._seal()
+                old_segments = self._segments()
+                live = sorted(self.offsets.items(), key=lambda item: item[1])
+
+                # Start the rewrite after every existing segment
+                self._active = (old_segments[-1] + 1) if old_segments else self._active
+                self.offsets = {}
+                self.live_bytes = 0
+                self.dead_bytes = 0
+                batch = []
+                for memory_id, (segment, offset, length) in live:
+                    batch.append((memory_id, self._view(segment, offset + length)[offset:offset + length]))
+                    if len(batch) >= 1024:
+                        self._append(batch)
+                        batch = []
+                self._append(batch)
+                self._seal()
+
+                for segment in old_segments:
+                    view = self._views.pop(segment, None)
+                    if view is not None:
+                        view.close()
+                    self._path(segment).unlink()
+                    self._path(segment, INDEX_SUFFIX).unlink(missing_ok=True)
+
+                logger.info(f"Compacted {self.directory}: {len(live)} live memories")
+                return True
+            except Exception as e:
+                logger.error(f"Error compacting segment store {self.directory}: {e}")
+                return False
+
+    def wait(self) -> None:
+        """Wait for a running background compaction to finish."""
+        thread = self._compaction
+        if thread is not None:
+            thread.join()
+
+    def migrate_files(self, directory: Path) -> int:
+        """
+        Move memories stored one JSON file each into the segment store.
+
+        Files are removed once their memories are written and synced; a
+        memory already present in the store is not overwritten.
+
+        Args:
+            directory: Directory holding <memory_id>.json files
+
+        Returns:
+            Number of memories migrated
+        """
+        files = sorted(Path(directory).glob("*.json"))
+        if not files:
+            return 0
+
+        migrated = []
+        with self._lock:
+            batch = []
+            for path in files:
+                memory_id = path.stem
+                if memory_id in self.offsets:
+                    migrated.append(path)
+                    continue
+                try:
+                    with open(path, "r") as f:
+                        batch.append((memory_id, json.load(f)))
+                    migrated.append(path)
+                except Exception as e:
+                    logger.error(f"Skipping unreadable memory file {path}: {e}")
+            if batch and not self.put_many(batch):
+                return 0
+            self.sync()
+
+        for path in migrated:
+            path.unlink()
+        logger.info(f"Migrated {len(migrated)} memory files from {directory} into segments")
+        return len(migrated)
+
+    def sync(self) -> None:
+        """Force appended records to stable storage."""
+        with self._lock:
+            if self._handle is not None:
+                self._handle.flush()
+                os.fsync(self._handle.fileno())
+
+    def close(self) -> None:
+        """Wait for compaction, sync the active segment and release maps."""
+        self.wait()
+        with self._lock:
+            self.sync()
+            if self._handle is not None:
+                self._handle.close()
+                self._handle = None
+            for view in self._views.values():
+                view.close()
+            self._views.clear()
@@ -5,28 +5,60 @@ Structured Memory Utilities
 Utility functions for the structured memory system.
 """
 
+import hashlib
 import json
 import logging
-import time
+import re
+import unicodedata
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Any, Optional
 
+from engram.core.ids import new_id
+
 logger = logging.getLogger("engram.structured.utils")
 
-def generate_memory_id(category: str, content: str) -> str:
+def generate_memory_id(category: str, content: str = None) -> str:
     """
-    Generate a unique ID for a memory.
+    Generate a unique, time-sortable ID for a memory.
     
     Args:
         category: The memory category
-        content: The memory content
+        content: The memory content (unused; kept for compatibility)
         
     Returns:
         Unique memory ID with category prefix
     """
-    timestamp = int(time.time())
-    return f"{category}-{timestamp}-{hash(content) % 10000}"
+    return new_id(category)
+
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_content(content: str) -> str:
+    """
+    Normalize memory content for duplicate detection.
+    
+    Unicode is NFKC-normalized and case-folded, and runs of whitespace are
+    collapsed, so trivially different copies of a memory compare equal.
+    
+    Args:
+        content: The memory content
+        
+    Returns:
+        Normalized content
+    """
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", content).casefold()).strip()
+
+def content_digest(content: str) -> str:
+    """
+    Get the digest of a memory's normalized content.
+    
+    Args:
+        content: The memory content
+        
+    Returns:
+        Hex digest identifying the normalized content
+    """
+    return hashlib.blake2b(normalize_content(content).encode("utf-8"), digest_size=16).hexdigest()
 
 def load_json_file(file_path: Path) -> Dict[str, Any]:
     """
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Inverted Text Index
+
+Provides an in-memory positional inverted index with BM25 ranking for
+keyword search over memories. Documents are identified by integer IDs
+(memory offsets within a namespace), postings are maintained incrementally,
+and quoted phrases in a query are matched by intersecting posting lists
+and checking token positions. A sorted vocabulary lets query terms written
+as ``term*`` (or every term, with prefix=True) match all tokens starting
+with them.
+"""
+
+import heapq
+import json
+import logging
+import math
+import re
+from bisect import bisect_left, insort
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from engram.core.append_log import atomic_write_json
+
+logger = logging.getLogger("engram.text_index")
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+_PHRASE_PATTERN = re.compile(r'"([^"]+)"')
+_PREFIX_PATTERN = re.compile(r"(\w+)\*")
+
+# Most frequent expansions scored per prefix term
+MAX_PREFIX_EXPANSIONS = 128
+
+# Score multiplier for tokens that only match a term as a prefix
+PREFIX_MATCH_WEIGHT = 0.5
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercase word tokens.
+
+    Args:
+        text: Text to tokenize
+
+    Returns:
+        List of tokens in document order
+    """
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+def parse_query(query: str) -> Tuple[List[str], List[List[str]]]:
+    """
+    Split a query into scoring terms and quoted phrases.
+
+    Args:
+        query: Query text; double-quoted segments are phrases
+
+    Returns:
+        Tuple of (all terms, list of phrases as token lists)
+    """
+    phrases = [tokens for tokens in (tokenize(p) for p in _PHRASE_PATTERN.findall(query)) if tokens]
+    return tokenize(query.replace('"', " ")), phrases
+
+
+class InvertedIndex:
+    """
+    Positional inverted index with BM25 scoring.
+
+    Postings map each token to the documents containing it and the token
+    positions within each document.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        """
+        Initialize an empty index.
+
+        Args:
+            k1: BM25 term-frequency saturation
+            b: BM25 document-length normalization
+        """
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[int, List[int]]] = {}
+        self.doc_lengths: Dict[int, int] = {}
+        self.total_length = 0
+        # Sorted list of every token in postings, for prefix lookups
+        self.vocabulary: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    def add(self, doc_id: int, text: str) -> None:
+        """
+        Index a document.
+
+        Args:
+            doc_id: Integer document ID
+            text: Document text
+        """
+        if doc_id in self.doc_lengths:
+            self.remove(doc_id)
+
+        tokens = tokenize(text)
+        for position, token in enumerate(tokens):
+            docs = self.postings.get(token)
+            if docs is None:
+                docs = self.postings[token] = {}
+                insort(self.vocabulary, token)
+            docs.setdefault(doc_id, []).append(position)
+
+        self.doc_lengths[doc_id] = len(tokens)
+        self.total_length += len(tokens)
+
+    def remove(self, doc_id: int, text: Optional[str] = None) -> None:
+        """
+        Remove a document from the index.
+
+        Args:
+            doc_id: Integer document ID
+            text: The document's text, if known; limits the work to its
+                tokens instead of the whole vocabulary
+        """
+        if doc_id not in self.doc_lengths:
+            return
+
+        tokens = set(tokenize(text)) if text is not None else list(self.postings)
+        for token in tokens:
+            docs = self.postings.get(token)
+            if docs is not None and docs.pop(doc_id, None) is not None and not docs:
+                del self.postings[token]
+                del self.vocabulary[bisect_left(self.vocabulary, token)]
+
+        self.total_length -= self.doc_lengths.pop(doc_id)
+
+    def clear(self) -> None:
+        """Remove every document from the index."""
+        self.postings.clear()
+        self.doc_lengths.clear()
+        self.vocabulary.clear()
+        self.total_length = 0
+
+    def expand_prefix(self, prefix: str) -> List[str]:
+        """
+        Get the indexed tokens starting with a prefix, most frequent first.
+
+        Args:
+            prefix: Token prefix
+
+        Returns:
+            Up to MAX_PREFIX_EXPANSIONS matching tokens
+        """
+        start = bisect_left(self.vocabulary, prefix)
+        end = bisect_left(self.vocabulary, prefix + "\U0010ffff", start)
+        tokens = self.vocabulary[start:end]
+        if len(tokens) > MAX_PREFIX_EXPANSIONS:
+            tokens = heapq.nlargest(MAX_PREFIX_EXPANSIONS, tokens, key=lambda t: len(self.postings[t]))
+        return tokens
+
+    def _matches_phrase(self, doc_id: int, phrase: List[str]) -> bool:
+        """Check whether the tokens of a phrase appear consecutively in a document."""
+        starts = set(self.postings[phrase[0]][doc_id])
+        for offset, token in enumerate(phrase[1:], 1):
+            positions = self.postings[token][doc_id]
+            starts &= {p - offset for p in positions}
+            if not starts:
+                return False
+        return True
+
+    def _phrase_candidates(self, phrases: List[List[str]]) -> Optional[set]:
+        """Intersect posting lists to find documents containing every phrase."""
+        candidates = None
+        for phrase in phrases:
+            if any(token not in self.postings for token in phrase):
+                return set()
+
+            # Intersect starting from the rarest token
+            ordered = sorted(set(phrase), key=lambda t: len(self.postings[t]))
+            docs = set(self.postings[ordered[0]])
+            for token in ordered[1:]:
+                docs.intersection_update(self.postings[token])
+            if candidates is not None:
+                docs &= candidates
+
+            candidates = {doc_id for doc_id in docs if self._matches_phrase(doc_id, phrase)}
+            if not candidates:
+                break
+        return candidates
+
+    def search(self, query: str, limit: Optional[int] = None, prefix: bool = False,
+               allowed: Optional[Callable[[int], bool]] = None) -> List[Tuple[int, float]]:
+        """
+        Rank documents against a query.
+
+        Args:
+            query: Query text; double-quoted segments must match as phrases
+                and terms ending in * match as prefixes
+            limit: Maximum number of results (all matches if None)
+            prefix: Whether every term also matches as a prefix
+            allowed: Optional filter; only documents it accepts are ranked
+
+        Returns:
+            List of (doc_id, score) pairs, best first; ties go to newer documents
+        """
+        terms, phrases = parse_query(query)
+        if not terms or not self.doc_lengths:
+            return []
+        prefix_terms = set(terms) if prefix else set(_PREFIX_PATTERN.findall(query.lower()))
+
+        candidates = self._phrase_candidates(phrases) if phrases else None
+        if candidates is not None and not candidates:
+            return []
+
+        doc_count = len(self.doc_lengths)
+        avg_length = self.total_length / doc_count or 1.0
+        scores: Dict[int, float] = {}
+
+        for term in set(terms):
+            # A prefix term scores each document by its best-matching expansion,
+            # with longer tokens weighted below an exact match
+            expansions = self.expand_prefix(term) if term in prefix_terms else [term]
+            term_scores: Dict[int, float] = {}
+
+            for token in expansions:
+                docs = self.postings.get(token)
+                if not docs:
+                    continue
+
+                weight = 1.0 if token == term else PREFIX_MATCH_WEIGHT
+                idf = weight * math.log(1.0 + (doc_count - len(docs) + 0.5) / (len(docs) + 0.5))
+                for doc_id, positions in docs.items():
+                    if candidates is not None and doc_id not in candidates:
+                        continue
+                    tf = len(positions)
+                    norm = self.k1 * (1.0 - self.b + self.b * self.doc_lengths[doc_id] / avg_length)
+                    score = idf * tf * (self.k1 + 1.0) / (tf + norm)
+                    if score > term_scores.get(doc_id, 0.0):
+                        term_scores[doc_id] = score
+
+            for doc_id, score in term_scores.items():
+                scores[doc_id] = scores.get(doc_id, 0.0) + score
+
+        ranked = scores.items()
+        if allowed is not None:
+            ranked = [item for item in ranked if allowed(item[0])]
+        if limit is None:
+            return sorted(ranked, key=lambda item: (item[1], item[0]), reverse=True)
+        return heapq.nlargest(limit, ranked, key=lambda item: (item[1], item[0]))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the index to JSON-compatible data."""
+        return {
+            "doc_lengths": self.doc_lengths,
+            "postings": self.postings,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "InvertedIndex":
+        """Rebuild an index serialized by to_dict()."""
+        index = cls()
+        index.doc_lengths = {int(k): v for k, v in data.get("doc_lengths", {}).items()}
+        index.postings = {
+            token: {int(doc_id): positions for doc_id, positions in docs.items()}
+            for token, docs in data.get("postings", {}).items()
+        }
+        index.total_length = sum(index.doc_lengths.values())
+        index.vocabulary = sorted(index.postings)
+        return index
+
+
+def build_indexes(memories: Dict[str, List[Dict[str, Any]]]) -> Dict[str, InvertedIndex]:
+    """
+    Build one index per namespace, using list offsets as document IDs.
+
+    Args:
+        memories: Dictionary of memories by namespace
+
+    Returns:
+        Dictionary of indexes by namespace
+    """
+    indexes = {}
+    for namespace, namespace_memories in memories.items():
+        index = InvertedIndex()
+        for offset, memory in enumerate(namespace_memories):
+            index.add(offset, memory.get("content", ""))
+        indexes[namespace] = index
+    return indexes
+
+
+def _fingerprint(namespace_memories: List[Dict[str, Any]]) -> List[Any]:
+    """Identify the memories an index was built from (count and last ID)."""
+    return [len(namespace_memories), namespace_memories[-1].get("id") if namespace_memories else None]
+
+
+def load_indexes(index_file: Path, memories: Dict[str, List[Dict[str, Any]]]) -> Dict[str, InvertedIndex]:
+    """
+    Load persisted indexes, rebuilding any namespace that is out of date.
+
+    Args:
+        index_file: Path of the persisted indexes
+        memories: Dictionary of memories by namespace the indexes must cover
+
+    Returns:
+        Dictionary of indexes by namespace
+    """
+    indexes = {}
+    if index_file.exists():
+        try:
+            with open(index_file, "r") as f:
+                data = json.load(f)
+            for namespace, entry in data.items():
+                if entry.get("fingerprint") == _fingerprint(memories.get(namespace, [])):
+                    indexes[namespace] = InvertedIndex.from_dict(entry)
+        except Exception as e:
+            logger.error(f"Error loading text index {index_file}: {e}")
+            indexes = {}
+
+    stale = {ns: mems for ns, mems in memories.items() if ns not in indexes}
+    if stale:
+        indexes.update(build_indexes(stale))
+    return indexes
+
+
+def save_indexes(index_file: Path,
+                 indexes: Dict[str, InvertedIndex],
+                 memories: Dict[str, List[Dict[str, Any]]]) -> bool:
+    """
+    Persist indexes atomically, tagged with the memories they cover.
+
+    Args:
+        index_file: Destination path
+        indexes: Dictionary of indexes by namespace
+        memories: Dictionary of memories by namespace the indexes were built from
+
+    Returns:
+        Boolean indicating success
+    """
+    return atomic_write_json(index_file, {
+        namespace: {"fingerprint": _fingerprint(memories.get(namespace, [])), **index.to_dict()}
+        for namespace, index in indexes.items()
+    })
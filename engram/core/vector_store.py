@@ -2,13 +2,56 @@
 """
 FAISS-based vector store for Engram memory system.
 Provides NumPy 2.x compatibility and efficient similarity search.
+
+Compartments are persisted write-behind. Every add, update and remove is
+appended to a JSON lines log next to the index ({compartment}.jsonl),
+carrying the metadata and the vector, so a change costs one small append
+rather than a rewrite of the compartment. Changed compartments are marked
+dirty and their index is written (atomically) by a background timer every
+flush_interval seconds, or as soon as flush_batch changes are waiting, and
+always on flush() and close(). Once the log outgrows the compartment it is
+folded into a metadata snapshot ({compartment}.json) and truncated.
+Loading reads the index and snapshot and replays the log on top, re-adding
+any vectors the index was not written with.
+
+Vectors are normalized to unit length and new indexes rank by inner
+product, i.e. cosine similarity. Indexes saved with L2 distance keep it;
+either way a hit's score is the calibrated relevance from
+engram.core.scoring.
+
+Compartments start as exact (flat) indexes. A compartment can instead be
+given a FAISS index factory string (e.g. "HNSW32", "IVF1024,PQ16",
+"IVF,SQ8"; a bare "IVF" picks the list count from the compartment size).
+Index types that need training are built in the background once the
+compartment holds enough vectors to train them, and replace the flat index
+when ready; types without training (HNSW) are used from the start.
+
+Individual vectors are removed by ID. Index types that cannot remove
+vectors (HNSW) keep them as tombstones, which searches filter out; once
+tombstones make up compaction_ratio of a compartment, its index is rebuilt
+from the live vectors in the background.
+
+Compartments are opened on first use rather than up front. Saved flat and
+HNSW indexes are memory-mapped (faiss.IO_FLAG_MMAP) instead of read into
+memory. Once the loaded indexes exceed memory_limit_mb, the least recently
+used compartments without unwritten changes are unloaded; they are loaded
+again the next time they are used.
 """
 
 import os
 import json
 import time
+import re
+import atexit
+import base64
+import fnmatch
 import logging
+import threading
+import weakref
 import numpy as np
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
 from typing import List, Dict, Any, Optional, Tuple, Union
 
 # Configure logging
@@ -25,98 +68,107 @@ except ImportError:
     HAS_FAISS = False
     logger.warning("FAISS not available. Vector search will not work.")
 
-class SimpleEmbedding:
+from engram.core.append_log import AppendLog, atomic_write_json
+from engram.core.scoring import METRIC_INNER_PRODUCT, METRIC_L2, cosine_similarity
+from engram.core.simple_embedding import SimpleEmbedding
+from engram.core.embedding_cache import cached_encoder
+
+# Never compact a metadata log shorter than this, however small the compartment is
+MIN_COMPACTION_RECORDS = 1000
+
+# Never train an index on fewer vectors than this; smaller compartments are
+# searched exactly
+MIN_TRAINING_VECTORS = 10000
+
+# Training vectors faiss wants per inverted list or PQ centroid
+TRAINING_VECTORS_PER_CENTROID = 39
+
+# Fraction of a compartment's vectors that may be tombstones before it is compacted
+TOMBSTONE_COMPACTION_RATIO = 0.2
+
+# Matches a bare "IVF" (no list count) in an index factory string
+_BARE_IVF = re.compile(r"IVF(?=[,_]|$)")
+
+# Stores that may hold unwritten compartments when the interpreter exits
+_open_stores: "weakref.WeakSet[VectorStore]" = weakref.WeakSet()
+
+
+def flush_open_stores() -> None:
+    """Write the dirty compartments of every open vector store."""
+    for store in list(_open_stores):
+        try:
+            store.flush()
+        except Exception as e:
+            logger.error(f"Error flushing vector store {store.data_path}: {e}")
+
+
+def _close_open_stores() -> None:
+    """Flush and close every open vector store at interpreter shutdown."""
+    for store in list(_open_stores):
+        try:
+            store.close()
+        except Exception as e:
+            logger.error(f"Error closing vector store {store.data_path}: {e}")
+
+
+atexit.register(_close_open_stores)
+
+
+def _encode_vector(vector: np.ndarray) -> str:
+    """Encode a float32 vector for the metadata log."""
+    return base64.b64encode(vector.tobytes()).decode("ascii")
+
+
+def _decode_vector(data: str) -> np.ndarray:
+    """Decode a vector written by _encode_vector."""
+    return np.frombuffer(base64.b64decode(data), dtype=np.float32)
+
+
+class _ReadWriteLock:
     """
-    A simple embedding generator using basic techniques
-    that don't require SentenceTransformers.
+    Lock admitting any number of readers or a single writer
     
-    This provides a deterministic embedding approach with minimal dependencies.
+    Waiting writers hold back new readers, so a steady stream of searches
+    cannot starve adds. Not reentrant.
     """
     
-    def __init__(self, vector_size: int = 128, seed: int = 42):
-        """
-        Initialize the simple embedding generator
-        
-        Args:
-            vector_size: Dimension of the generated embeddings
-            seed: Random seed for reproducibility
-        """
-        self.vector_size = vector_size
-        self.seed = seed
-        self.vocab: Dict[str, np.ndarray] = {}
-        self.rng = np.random.RandomState(seed)
-        
-    def _tokenize(self, text: str) -> List[str]:
-        """
-        Simple tokenization by splitting on non-alphanumeric characters
-        and converting to lowercase
-        """
-        import re
-        text = text.lower()
-        tokens = re.findall(r'\b\w+\b', text)
-        return tokens
-    
-    def _get_or_create_token_vector(self, token: str) -> np.ndarray:
-        """Generate a stable vector for a token"""
-        if token not in self.vocab:
-            # Generate a stable random vector for this token
-            # We use the hash of the token to seed the random generator
-            # This ensures the same token always gets the same vector
-            token_hash = hash(token) % 2**32
-            token_rng = np.random.RandomState(token_hash)
-            self.vocab[token] = token_rng.randn(self.vector_size).astype(np.float32)
-        return self.vocab[token]
-    
-    def encode(self, texts: Union[str, List[str]], 
-               normalize: bool = True) -> np.ndarray:
-        """
-        Encode text(s) into fixed-size vectors using a simple TF-IDF
-        like approach with random vectors for words.
-        
-        Args:
-            texts: Text or list of texts to encode
-            normalize: Whether to normalize the vectors to unit length
-            
-        Returns:
-            Numpy array of embeddings with shape (n_texts, vector_size)
-        """
-        if isinstance(texts, str):
-            texts = [texts]
-            
-        result = np.zeros((len(texts), self.vector_size), dtype=np.float32)
-        
-        for i, text in enumerate(texts):
-            tokens = self._tokenize(text)
-            if not tokens:
-                continue
-                
-            # Create the embedding by averaging token vectors
-            token_vectors = np.stack([self._get_or_create_token_vector(t) for t in tokens])
-            
-            # Apply TF component (token frequency)
-            token_counts = {}
-            for token in tokens:
-                token_counts[token] = token_counts.get(token, 0) + 1
-            
-            # Calculate embedding as weighted average of token vectors
-            embedding = np.zeros(self.vector_size, dtype=np.float32)
-            for token, count in token_counts.items():
-                # Higher weight for tokens that appear less frequently in this document
-                # (similar to TF-IDF concept, but very simplified)
-                weight = 1.0 / (1.0 + np.log(count))
-                embedding += weight * self._get_or_create_token_vector(token)
-            
-            # Store the result
-            result[i] = embedding
-        
-        # Normalize if requested
-        if normalize:
-            norms = np.linalg.norm(result, axis=1, keepdims=True)
-            # Avoid division by zero
-            norms = np.maximum(norms, 1e-10)
-            result = result / norms
-            
-        return result
+    def __init__(self) -> None:
+        self._condition = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writing = False
+        self._waiting_writers = 0
+    
+    @contextmanager
+    def read(self):
+        """Hold the lock shared"""
+        with self._condition:
+            while self._writing or self._waiting_writers:
+                self._condition.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._readers -= 1
+                if not self._readers:
+                    self._condition.notify_all()
+    
+    @contextmanager
+    def write(self):
+        """Hold the lock exclusively"""
+        with self._condition:
+            self._waiting_writers += 1
+            while self._writing or self._readers:
+                self._condition.wait()
+            self._waiting_writers -= 1
+            self._writing = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writing = False
+                self._condition.notify_all()
+
 
 class VectorStore:
     """
@@ -127,7 +179,16 @@ class VectorStore:
     def __init__(self, 
                  data_path: str = "vector_data",
                  dimension: int = 128,
-                 use_gpu: bool = False) -> None:
+                 use_gpu: bool = False,
+                 embedding_model: Optional[Any] = None,
+                 flush_interval: float = 5.0,
+                 flush_batch: int = 1024,
+                 index_factory: Optional[Union[str, Dict[str, str]]] = None,
+                 nprobe: Optional[int] = None,
+                 ef_search: Optional[int] = None,
+                 compaction_ratio: float = TOMBSTONE_COMPACTION_RATIO,
+                 memory_limit_mb: Optional[float] = None,
+                 mmap: Optional[bool] = None) -> None:
         """
         Initialize the vector store
         
@@ -135,13 +196,87 @@ class VectorStore:
             data_path: Directory to store vector indices and metadata
             dimension: Dimension of the vectors to store
             use_gpu: Whether to use GPU for FAISS if available
+            embedding_model: Optional model with an encode() method (e.g. a
+                SentenceTransformer); defaults to SimpleEmbedding
+            flush_interval: Maximum seconds a changed index stays unwritten
+            flush_batch: Number of changes to a compartment that triggers
+                an immediate background write
+            index_factory: FAISS index factory string for every compartment,
+                or a mapping of compartment name patterns (fnmatch) to factory
+                strings; defaults to the vector_index_factory setting, and
+                compartments without one use exact (flat) search
+            nprobe: Inverted lists visited per IVF search (default: the
+                vector_nprobe setting)
+            ef_search: Candidate list size of HNSW searches (default: the
+                vector_ef_search setting)
+            compaction_ratio: Fraction of removed-but-indexed vectors
+                (tombstones) at which a compartment's index is rebuilt
+            memory_limit_mb: Estimated size of the loaded indexes above which
+                least recently used compartments are unloaded (default: the
+                vector_memory_limit_mb setting; 0 never unloads)
+            mmap: Whether to memory-map saved indexes where the index type
+                allows it (default: the vector_mmap setting)
         """
+        if embedding_model is not None and hasattr(embedding_model, "get_sentence_embedding_dimension"):
+            dimension = embedding_model.get_sentence_embedding_dimension()
+            
         self.data_path = data_path
         self.dimension = dimension
         self.use_gpu = use_gpu
         self.indices: Dict[str, Any] = {}
-        self.metadata: Dict[str, List[Dict[str, Any]]] = {}
-        self.embedding = SimpleEmbedding(vector_size=dimension)
+        # Per-compartment metadata keyed by FAISS vector ID
+        self.metadata: Dict[str, Dict[int, Dict[str, Any]]] = {}
+        self.next_ids: Dict[str, int] = {}
+        self.embedding = cached_encoder(embedding_model or SimpleEmbedding(vector_size=dimension))
+        
+        # Write-behind state: per-compartment change logs and the number of
+        # changes not yet written to each compartment's index
+        self.flush_interval = flush_interval
+        self.flush_batch = max(1, flush_batch)
+        self.logs: Dict[str, AppendLog] = {}
+        self.dirty: Dict[str, int] = {}
+        self._timer: Optional[threading.Timer] = None
+        self._timer_due = 0.0
+        
+        # Locking: self._lock guards the store's dictionaries and is only held
+        # briefly. Each compartment has a reader/writer lock over its index
+        # and metadata (searches and index serialization read, changes
+        # write) and a save lock held while it is written to disk. They are
+        # taken in the order save lock, compartment lock, self._lock.
+        self._lock = threading.RLock()
+        self._locks: Dict[str, _ReadWriteLock] = {}
+        self._save_locks: Dict[str, threading.Lock] = {}
+        _open_stores.add(self)
+        
+        # Index types: the factory string each compartment should use, the
+        # type its current index was built as ("Flat" or a factory string),
+        # the factory each compartment is being migrated to, and the
+        # removed vectors still in indexes that cannot remove them
+        if None in (index_factory, nprobe, ef_search, memory_limit_mb, mmap):
+            from engram.core.config import get_config
+            config = get_config()
+            if index_factory is None:
+                index_factory = config.get("vector_index_factory")
+            nprobe = nprobe or config.get("vector_nprobe", 16)
+            ef_search = ef_search or config.get("vector_ef_search", 64)
+            if memory_limit_mb is None:
+                memory_limit_mb = config.get("vector_memory_limit_mb", 1024)
+            if mmap is None:
+                mmap = config.get("vector_mmap", True)
+        self.index_factory = index_factory
+        self.nprobe = nprobe
+        self.ef_search = ef_search
+        self.target_types: Dict[str, Optional[str]] = {}
+        self.index_types: Dict[str, str] = {}
+        self.migrations: Dict[str, str] = {}
+        self.tombstones: Dict[str, set] = {}
+        self.compaction_ratio = compaction_ratio
+        self._rebuild_threads: Dict[str, threading.Thread] = {}
+        
+        # Loaded compartments, least recently used first
+        self.memory_limit = int((memory_limit_mb or 0) * 1024 * 1024)
+        self.mmap = mmap
+        self._recent: "OrderedDict[str, None]" = OrderedDict()
         
         # Create data directory if it doesn't exist
         os.makedirs(data_path, exist_ok=True)
@@ -166,14 +301,79 @@ class VectorStore:
                 logger.warning("FAISS GPU support not available, falling back to CPU")
                 self.use_gpu = False
         
+    def index_factory_for(self, compartment: str) -> Optional[str]:
+        """
+        Get the index factory string configured for a compartment
+        
+        Args:
+            compartment: The compartment name
+            
+        Returns:
+            Factory string, or None for exact (flat) search
+        """
+        factory = self.index_factory
+        if isinstance(factory, dict):
+            factory = next((value for pattern, value in factory.items()
+                            if fnmatch.fnmatchcase(compartment, pattern)), None)
+        if not factory or factory.strip().lower() in ("flat", "idmap,flat"):
+            return None
+        return factory.strip()
+    
+    def _training_size(self, factory: str) -> int:
+        """Get the number of vectors needed before an index type is built"""
+        try:
+            if faiss.index_factory(self.dimension, _BARE_IVF.sub("IVF1", factory)).is_trained:
+                return 0
+        except Exception as e:
+            logger.error(f"Invalid index factory string '{factory}': {e}")
+            return -1
+        
+        size = MIN_TRAINING_VECTORS
+        lists = re.search(r"IVF(\d+)", factory)
+        if lists:
+            size = max(size, TRAINING_VECTORS_PER_CENTROID * int(lists.group(1)))
+        if re.search(r"PQ\d+", factory):
+            size = max(size, TRAINING_VECTORS_PER_CENTROID * 256)
+        return size
+    
+    def _build_index(self, factory: str, vectors: Optional[np.ndarray] = None,
+                     metric: Optional[int] = None) -> Any:
+        """
+        Build an ID-mapped index from a factory string, training it if needed
+        
+        Args:
+            factory: FAISS index factory string
+            vectors: Training vectors (required by index types that need training)
+            metric: FAISS metric type (default: inner product)
+            
+        Returns:
+            IndexIDMap2 wrapping the new, trained index
+        """
+        count = 0 if vectors is None else len(vectors)
+        lists = max(1, min(int(4 * np.sqrt(max(count, 1))), count // TRAINING_VECTORS_PER_CENTROID))
+        if metric is None:
+            metric = faiss.METRIC_INNER_PRODUCT
+        index = faiss.index_factory(self.dimension, _BARE_IVF.sub(f"IVF{lists}", factory), metric)
+        if not index.is_trained:
+            index.train(vectors)
+        return faiss.IndexIDMap2(index)
+    
     def _create_index(self, compartment: str) -> Any:
         """Create a new FAISS index for the given compartment"""
         if not HAS_FAISS:
             logger.error("FAISS not available. Cannot create index.")
             return None
-            
-        # Create a flat index (exact search)
-        index = faiss.IndexFlatL2(self.dimension)
+        
+        factory = self.target_types.get(compartment)
+        if factory and self._training_size(factory) == 0:
+            # Index types that need no training are used from the start
+            index = self._build_index(factory)
+            self.index_types[compartment] = factory
+        else:
+            # Create a flat index (exact search) wrapped in an ID map so that
+            # vectors keep stable IDs and can be removed individually
+            index = faiss.IndexIDMap2(faiss.IndexFlatIP(self.dimension))
+            self.index_types[compartment] = "Flat"
         
         # Optionally move to GPU
         if self.use_gpu:
@@ -188,12 +388,132 @@ class VectorStore:
             
         return index
     
-    def _ensure_compartment(self, compartment: str) -> None:
-        """Ensure the compartment exists, creating it if necessary"""
+    def _open(self, compartment: str) -> bool:
+        """Make a compartment current, loading it if it was saved (caller holds the lock)"""
         if compartment not in self.indices:
-            self.indices[compartment] = self._create_index(compartment)
-            self.metadata[compartment] = []
-            logger.info(f"Created new compartment '{compartment}'")
+            if not self._has_saved(compartment) or not self.load(compartment):
+                return False
+        self._recent[compartment] = None
+        self._recent.move_to_end(compartment)
+        return True
+    
+    def _compartment_lock(self, compartment: str) -> _ReadWriteLock:
+        """Get the reader/writer lock of a compartment's index and metadata"""
+        with self._lock:
+            lock = self._locks.get(compartment)
+            if lock is None:
+                lock = self._locks[compartment] = _ReadWriteLock()
+            return lock
+    
+    def _save_lock(self, compartment: str) -> threading.Lock:
+        """Get the lock held while a compartment is written to disk"""
+        with self._lock:
+            lock = self._save_locks.get(compartment)
+            if lock is None:
+                lock = self._save_locks[compartment] = threading.Lock()
+            return lock
+    
+    def _ensure_compartment(self, compartment: str) -> None:
+        """Ensure the compartment exists, loading or creating it if necessary"""
+        self.target_types.setdefault(compartment, self.index_factory_for(compartment))
+        if self._open(compartment):
+            return
+        self.indices[compartment] = self._create_index(compartment)
+        self.metadata[compartment] = {}
+        self.next_ids[compartment] = 0
+        self.tombstones[compartment] = set()
+        self._recent[compartment] = None
+        logger.info(f"Created new compartment '{compartment}'")
+    
+    def ensure_compartment(self, compartment: str) -> bool:
+        """
+        Make a compartment available, loading it from disk if it was saved
+        before and creating an empty one otherwise.
+        
+        Args:
+            compartment: The compartment to open
+            
+        Returns:
+            True if the compartment is available
+        """
+        if not HAS_FAISS:
+            logger.error("FAISS not available. Cannot open compartment.")
+            return False
+            
+        with self._lock:
+            self._ensure_compartment(compartment)
+            available = self.indices[compartment] is not None
+        self._unload_idle()
+        return available
+    
+    def get_metadata(self, compartment: str) -> Dict[int, Dict[str, Any]]:
+        """
+        Get the metadata of every vector in a compartment, loading it if necessary
+        
+        Args:
+            compartment: The compartment name
+            
+        Returns:
+            Metadata keyed by vector ID; empty if the compartment doesn't exist
+        """
+        with self._compartment_lock(compartment).read():
+            with self._lock:
+                metadata = self.metadata[compartment] if self._open(compartment) else {}
+        self._unload_idle()
+        return metadata
+    
+    def _resident_bytes(self, compartment: str) -> int:
+        """Estimate the memory used by a compartment's index (caller holds the lock)"""
+        index = self.indices[compartment]
+        try:
+            per_vector = faiss.downcast_index(index.index).sa_code_size()
+        except Exception:
+            # Graph-based and GPU indexes don't report a code size
+            per_vector = 4 * index.d
+        # Plus the vector's ID in the ID map
+        return index.ntotal * (per_vector + 8)
+    
+    def _unload(self, compartment: str) -> None:
+        """Drop a compartment from memory (caller holds its save and write locks and self._lock)"""
+        log = self.logs.pop(compartment, None)
+        if log is not None:
+            log.close()
+        for state in (self.indices, self.metadata, self.next_ids, self.dirty,
+                      self.index_types, self.migrations, self.tombstones, self._recent):
+            state.pop(compartment, None)
+    
+    def _unload_idle(self) -> None:
+        """Unload least recently used compartments while the loaded indexes exceed the memory limit"""
+        if not self.memory_limit or len(self.indices) < 2:
+            return
+        with self._lock:
+            if sum(self._resident_bytes(name) for name in self.indices) <= self.memory_limit:
+                return
+            # Never unload the compartment in use
+            candidates = list(self._recent)[:-1]
+        
+        for compartment in candidates:
+            with self._save_lock(compartment), self._compartment_lock(compartment).write(), self._lock:
+                if sum(self._resident_bytes(name) for name in self.indices) <= self.memory_limit:
+                    return
+                # Compartments used meanwhile, with unwritten changes or with a
+                # rebuild in progress stay
+                if (compartment not in self.indices or compartment == next(reversed(self._recent)) or
+                        self.dirty.get(compartment) or compartment in self._rebuild_threads):
+                    continue
+                self._unload(compartment)
+                logger.info(f"Unloaded idle compartment '{compartment}'")
+    
+    def _encode(self, texts: Union[str, List[str]]) -> np.ndarray:
+        """Encode text(s) into a 2D float32 array of unit vectors"""
+        return self._unit(self.embedding.encode(texts))
+    
+    @staticmethod
+    def _unit(vectors: Any) -> np.ndarray:
+        """Copy vectors into a 2D float32 array scaled to unit length"""
+        vectors = np.array(np.atleast_2d(vectors), dtype=np.float32, order="C")
+        faiss.normalize_L2(vectors)
+        return vectors
     
     def _get_index_path(self, compartment: str) -> str:
         """Get the path for storing a compartment's index"""
@@ -203,35 +523,169 @@ class VectorStore:
         """Get the path for storing a compartment's metadata"""
         return os.path.join(self.data_path, f"{compartment}.json")
     
-    def save(self, compartment: str) -> None:
-        """Save the compartment to disk"""
-        if not HAS_FAISS:
-            logger.error("FAISS not available. Cannot save index.")
-            return
-            
-        if compartment not in self.indices:
-            logger.warning(f"Compartment '{compartment}' doesn't exist, nothing to save")
-            return
-        
-        index_path = self._get_index_path(compartment)
-        metadata_path = self._get_metadata_path(compartment)
-        
-        # FAISS CPU index for saving
+    def _get_log_path(self, compartment: str) -> str:
+        """Get the path of a compartment's change log"""
+        return os.path.join(self.data_path, f"{compartment}.jsonl")
+    
+    def _has_saved(self, compartment: str) -> bool:
+        """Whether a compartment has an index or change log on disk"""
+        return (os.path.exists(self._get_index_path(compartment)) or
+                os.path.exists(self._get_log_path(compartment)))
+    
+    def _log(self, compartment: str) -> AppendLog:
+        """Get a compartment's change log, opening it if necessary"""
+        log = self.logs.get(compartment)
+        if log is None:
+            log = self.logs[compartment] = AppendLog(Path(self._get_log_path(compartment)))
+        return log
+    
+    def _mark_dirty(self, compartment: str, count: int) -> None:
+        """Count unwritten changes and schedule a background write (caller holds the lock)"""
+        self.dirty[compartment] = self.dirty.get(compartment, 0) + count
+        delay = 0.0 if self.dirty[compartment] >= self.flush_batch else self.flush_interval
+        due = time.monotonic() + delay
+        if self._timer is not None:
+            if self._timer_due <= due:
+                return
+            self._timer.cancel()
+        self._timer = threading.Timer(delay, self.flush)
+        self._timer.daemon = True
+        self._timer_due = due
+        self._timer.start()
+    
+    def _cpu_index(self, compartment: str) -> Any:
+        """Get a compartment's index on the CPU, for writing"""
         index = self.indices[compartment]
         if self.use_gpu:
             index = faiss.index_gpu_to_cpu(index)
+        return index
+    
+    @staticmethod
+    def _write_file(path: str, data: Any) -> None:
+        """Write bytes atomically (temp file + fsync + rename)"""
+        tmp_path = path + ".tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(memoryview(data))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+    
+    def save(self, compartment: str) -> bool:
+        """
+        Write a compartment to disk now, whether or not it has unwritten changes
+        
+        The index is written atomically. The metadata log is folded into a
+        new metadata snapshot once it holds more records than the compartment.
+        Only this compartment is locked while it is written.
+        
+        Args:
+            compartment: The compartment to write
+            
+        Returns:
+            Boolean indicating success
+        """
+        if not HAS_FAISS:
+            logger.error("FAISS not available. Cannot save index.")
+            return False
         
-        # Save index
-        faiss.write_index(index, index_path)
+        with self._save_lock(compartment):
+            changes = 0
+            try:
+                with self._lock:
+                    if compartment not in self.indices:
+                        logger.warning(f"Compartment '{compartment}' doesn't exist, nothing to save")
+                        return False
+                    log = self._log(compartment)
+                    compact = log.record_count >= max(MIN_COMPACTION_RECORDS, len(self.metadata[compartment]))
+                
+                lock = self._compartment_lock(compartment)
+                # Searches may go on while the index is copied. Compacting
+                # excludes changes: the snapshot and truncated log must not
+                # miss any.
+                with (lock.write() if compact else lock.read()):
+                    with self._lock:
+                        changes = self.dirty.pop(compartment, 0)
+                        index = self._cpu_index(compartment)
+                        metadata = self.metadata[compartment]
+                    data = faiss.serialize_index(index)
+                    if compact:
+                        log.sync()
+                        self._write_file(self._get_index_path(compartment), data)
+                        if not atomic_write_json(Path(self._get_metadata_path(compartment)),
+                                                 {str(k): v for k, v in metadata.items()}):
+                            raise IOError("metadata snapshot not written")
+                        log.truncate()
+                        data = None
+                
+                if data is not None:
+                    self._write_file(self._get_index_path(compartment), data)
+                logger.debug(f"Saved compartment '{compartment}' ({changes} changes)")
+                return True
+            except Exception as e:
+                logger.error(f"Failed to save compartment '{compartment}': {str(e)}")
+                with self._lock:
+                    if compartment in self.indices:
+                        self.dirty[compartment] = self.dirty.get(compartment, 0) + changes
+                return False
+    
+    def flush(self, compartment: Optional[str] = None) -> bool:
+        """
+        Write compartments with unwritten changes to disk
         
-        # Save metadata
-        with open(metadata_path, 'w') as f:
-            json.dump(self.metadata[compartment], f)
+        Args:
+            compartment: Only flush this compartment (default: all of them)
+            
+        Returns:
+            Boolean indicating success
+        """
+        with self._lock:
+            if compartment is None and self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            dirty = [name for name in self.dirty if compartment in (None, name)]
+            logs = list(self.logs.values())
+            save_locks = [lock for name, lock in self._save_locks.items() if compartment in (None, name)]
+        for log in logs:
+            log.sync()
+        
+        # Wait for background writes in progress (they hold the save lock
+        # from taking their compartment out of self.dirty until it is on disk)
+        for lock in save_locks:
+            with lock:
+                pass
         
-        logger.info(f"Saved compartment '{compartment}' to {index_path} and {metadata_path}")
+        success = True
+        for name in dirty:
+            success = self.save(name) and success
+        return success
+    
+    def close(self) -> None:
+        """Finish migrations, write unwritten changes and close the change logs"""
+        self.wait()
+        self.flush()
+        with self._lock:
+            for log in self.logs.values():
+                log.close()
+            self.logs.clear()
+        _open_stores.discard(self)
+    
+    def _read_index(self, path: str) -> Any:
+        """Read a saved index, memory-mapping it if its type can be changed while mapped"""
+        if self.mmap and not self.use_gpu:
+            index = faiss.read_index(path, faiss.IO_FLAG_MMAP)
+            inner = index.index if isinstance(index, (faiss.IndexIDMap, faiss.IndexIDMap2)) else index
+            # Mapped inverted lists (IVF) are read-only
+            if isinstance(faiss.downcast_index(inner), (faiss.IndexFlat, faiss.IndexHNSW)):
+                return index
+        return faiss.read_index(path)
     
     def load(self, compartment: str) -> bool:
-        """Load a compartment from disk"""
+        """Load a compartment from disk, replaying its change log"""
         if not HAS_FAISS:
             logger.error("FAISS not available. Cannot load index.")
             return False
@@ -239,43 +693,280 @@ class VectorStore:
         index_path = self._get_index_path(compartment)
         metadata_path = self._get_metadata_path(compartment)
         
-        if not os.path.exists(index_path) or not os.path.exists(metadata_path):
+        if not self._has_saved(compartment):
             logger.warning(f"Compartment '{compartment}' files not found")
             return False
         
+        with self._lock:
+            try:
+                metadata: Dict[int, Dict[str, Any]] = {}
+                if os.path.exists(index_path):
+                    # Load index
+                    index = self._read_index(index_path)
+                    if not isinstance(index, (faiss.IndexIDMap, faiss.IndexIDMap2)):
+                        index = self._wrap_with_ids(index)
+                    
+                    # Load metadata
+                    if os.path.exists(metadata_path):
+                        with open(metadata_path, 'r') as f:
+                            metadata = json.load(f)
+                        
+                        if isinstance(metadata, list):
+                            # Older format: positional metadata list over a bare flat index
+                            metadata = {i: entry for i, entry in enumerate(metadata)}
+                        else:
+                            metadata = {int(k): v for k, v in metadata.items()}
+                else:
+                    # Changes logged before the index was first written
+                    index = faiss.IndexIDMap2(faiss.IndexFlatIP(self.dimension))
+                
+                # Replay the change log; vectors the index was written without
+                # are re-added from the log
+                indexed = set(faiss.vector_to_array(index.id_map).tolist())
+                next_id = max(indexed, default=-1) + 1
+                missing: Dict[int, np.ndarray] = {}
+                removed: List[int] = []
+                for record in self._log(compartment).replay():
+                    op = record.get("op")
+                    if op == "add":
+                        entry = record["entry"]
+                        vector_id = int(record.get("vector_id", entry["id"]))
+                        metadata[vector_id] = entry
+                        next_id = max(next_id, vector_id + 1)
+                        if vector_id not in indexed and "vector" in record:
+                            missing[vector_id] = _decode_vector(record["vector"])
+                    elif op == "update":
+                        entry = metadata.get(int(record["vector_id"]))
+                        if entry is not None:
+                            entry.update(record["metadata"])
+                    elif op == "remove":
+                        for vector_id in record["ids"]:
+                            metadata.pop(vector_id, None)
+                            missing.pop(vector_id, None)
+                            if vector_id in indexed:
+                                removed.append(vector_id)
+                    else:
+                        logger.warning(f"Unknown vector store log operation: {op}")
+                
+                # IDs are never reused, so removals can be applied in one pass
+                if removed:
+                    self._remove_vectors(index, removed)
+                
+                if missing:
+                    index.add_with_ids(np.vstack(list(missing.values())),
+                                       np.asarray(list(missing), dtype=np.int64))
+                
+                # Optionally move to GPU
+                if self.use_gpu:
+                    try:
+                        res = faiss.StandardGpuResources()
+                        index = faiss.index_cpu_to_gpu(res, 0, index)
+                    except Exception as e:
+                        logger.warning(f"Failed to move index to GPU: {str(e)}")
+                
+                # Store in memory
+                self.target_types.setdefault(compartment, self.index_factory_for(compartment))
+                inner = faiss.downcast_index(index.index)
+                if isinstance(inner, faiss.IndexFlat):
+                    self.index_types[compartment] = "Flat"
+                else:
+                    self.index_types[compartment] = self.target_types[compartment] or type(inner).__name__
+                self.indices[compartment] = index
+                self.metadata[compartment] = metadata
+                self._recent[compartment] = None
+                self.next_ids[compartment] = max(next_id, max(metadata, default=-1) + 1)
+                self.dirty.pop(compartment, None)
+                if missing or removed:
+                    self._mark_dirty(compartment, len(missing) + len(removed))
+                
+                # Vectors the index could not remove
+                if self.use_gpu:
+                    self.tombstones[compartment] = set()
+                else:
+                    ids = faiss.vector_to_array(index.id_map)
+                    live = np.fromiter(metadata, dtype=np.int64, count=len(metadata))
+                    self.tombstones[compartment] = set(ids[~np.isin(ids, live)].tolist())
+                self._maybe_migrate(compartment)
+                self._maybe_compact(compartment)
+                
+                logger.info(f"Loaded compartment '{compartment}' with {len(metadata)} items")
+                return True
+                
+            except Exception as e:
+                logger.error(f"Failed to load compartment '{compartment}': {str(e)}")
+                return False
+    
+    def set_index_factory(self, compartment: str, factory: Optional[str]) -> None:
+        """
+        Choose the index type of a compartment
+        
+        A flat compartment is migrated in the background once it holds
+        enough vectors to train the new type. Compartments that already use
+        a trained index keep it until they are deleted.
+        
+        Args:
+            compartment: The compartment name
+            factory: FAISS index factory string, or None for exact search
+        """
+        with self._lock:
+            if not isinstance(self.index_factory, dict):
+                self.index_factory = {"*": self.index_factory} if self.index_factory else {}
+            self.index_factory = {compartment: factory or "Flat", **self.index_factory}
+            self.target_types[compartment] = self.index_factory_for(compartment)
+            if compartment in self.indices:
+                self._maybe_migrate(compartment)
+    
+    def _maybe_migrate(self, compartment: str) -> None:
+        """Start building a compartment's configured index type if it is due (caller holds the lock)"""
+        factory = self.target_types.get(compartment)
+        if (not factory or self.use_gpu or self.index_types.get(compartment) != "Flat" or
+                self.migrations.get(compartment) == factory):
+            return
+        
+        size = self._training_size(factory)
+        if size < 0 or self.indices[compartment].ntotal < max(size, 1):
+            if size < 0:
+                # Don't retry an invalid factory string on every add
+                self.migrations[compartment] = factory
+            return
+        
+        self.migrations[compartment] = factory
+        self._start_rebuild(compartment, factory)
+    
+    def _maybe_compact(self, compartment: str) -> None:
+        """Start rebuilding a compartment without its tombstones if there are too many (caller holds the lock)"""
+        tombstones = len(self.tombstones.get(compartment, ()))
+        if (tombstones and compartment not in self._rebuild_threads and
+                tombstones >= self.compaction_ratio * self.indices[compartment].ntotal):
+            self._start_rebuild(compartment, None)
+    
+    def _start_rebuild(self, compartment: str, factory: Optional[str]) -> None:
+        """Rebuild a compartment's index in a background thread (caller holds the lock)"""
+        thread = threading.Thread(target=self._rebuild, args=(compartment, factory),
+                                  name=f"vector-rebuild-{compartment}", daemon=True)
+        self._rebuild_threads[compartment] = thread
+        thread.start()
+    
+    def _rebuild(self, compartment: str, factory: Optional[str]) -> None:
+        """
+        Replace a compartment's index with a newly built one of the live vectors
+        
+        Used both to migrate a flat index to the configured type and to
+        compact away tombstones. The live vectors are copied while the
+        compartment is held shared and the new index is trained and filled
+        without any lock; changes made meanwhile are applied to the new
+        index before it is swapped in.
+        
+        Args:
+            compartment: The compartment to rebuild
+            factory: FAISS index factory string to build, or None for an
+                empty copy of the current index (keeping its parameters and
+                training)
+        """
+        lock = self._compartment_lock(compartment)
         try:
-            # Load index
-            index = faiss.read_index(index_path)
-            
-            # Optionally move to GPU
-            if self.use_gpu:
-                try:
-                    res = faiss.StandardGpuResources()
-                    index = faiss.index_cpu_to_gpu(res, 0, index)
-                except Exception as e:
-                    logger.warning(f"Failed to move index to GPU: {str(e)}")
+            with lock.read(), self._lock:
+                source = self.indices.get(compartment)
+                if source is None:
+                    return
+                ids = faiss.vector_to_array(source.id_map).copy()
+                vectors = faiss.downcast_index(source.index).reconstruct_n(0, source.ntotal)
+                live = np.isin(ids, np.fromiter(self.metadata[compartment], dtype=np.int64))
+                ids, vectors = ids[live], vectors[live]
             
-            # Load metadata
-            with open(metadata_path, 'r') as f:
-                metadata = json.load(f)
+            start = time.time()
+            if factory:
+                index = self._build_index(factory, vectors, source.metric_type)
+            else:
+                inner = faiss.clone_index(faiss.downcast_index(source.index))
+                inner.reset()
+                index = faiss.IndexIDMap2(inner)
+            index.add_with_ids(vectors, ids)
+            del vectors
             
-            # Store in memory
-            self.indices[compartment] = index
-            self.metadata[compartment] = metadata
-            
-            logger.info(f"Loaded compartment '{compartment}' with {len(metadata)} items")
-            return True
+            with lock.write(), self._lock:
+                if self.indices.get(compartment) is not source:
+                    # Deleted or reloaded meanwhile
+                    self.migrations.pop(compartment, None)
+                    return
+                
+                current = np.fromiter(self.metadata[compartment], dtype=np.int64)
+                added = current[~np.isin(current, ids)]
+                if len(added):
+                    index.add_with_ids(np.vstack([source.reconstruct(int(i)) for i in added]), added)
+                gone = ids[~np.isin(ids, current)]
+                tombstones = set()
+                if len(gone) and not self._remove_vectors(index, gone):
+                    tombstones = set(gone.tolist())
+                
+                self.indices[compartment] = index
+                if factory:
+                    self.index_types[compartment] = factory
+                self.tombstones[compartment] = tombstones
+                self._mark_dirty(compartment, index.ntotal)
+                kind = self.index_types[compartment]
             
+            logger.info(f"Rebuilt compartment '{compartment}' as '{kind}' "
+                        f"({index.ntotal} vectors, {time.time() - start:.1f}s)")
         except Exception as e:
-            logger.error(f"Failed to load compartment '{compartment}': {str(e)}")
-            return False
+            logger.error(f"Failed to rebuild compartment '{compartment}': {str(e)}")
+        finally:
+            self._rebuild_threads.pop(compartment, None)
+    
+    def wait(self) -> None:
+        """Wait for background index rebuilds to finish"""
+        for thread in list(self._rebuild_threads.values()):
+            thread.join()
+    
+    @staticmethod
+    def _remove_vectors(index: Any, ids: Any) -> int:
+        """
+        Remove vectors from an index
+        
+        Returns:
+            Number of vectors removed; 0 for index types without removal (HNSW)
+        """
+        try:
+            return int(index.remove_ids(np.asarray(ids, dtype=np.int64)))
+        except RuntimeError:
+            return 0
+    
+    def _search_parameters(self, index: Any, nprobe: Optional[int],
+                           ef_search: Optional[int], selector: Any = None) -> Any:
+        """Get the search-time parameters for an index, or None if it needs none"""
+        if self.use_gpu:
+            return None
+        inner = faiss.downcast_index(index.index)
+        if isinstance(inner, faiss.IndexHNSW):
+            return faiss.SearchParametersHNSW(efSearch=ef_search or self.ef_search, sel=selector)
+        if not isinstance(inner, faiss.IndexFlat):
+            try:
+                faiss.extract_index_ivf(inner)
+                return faiss.SearchParametersIVF(nprobe=nprobe or self.nprobe, sel=selector)
+            except RuntimeError:
+                pass
+        return faiss.SearchParameters(sel=selector) if selector is not None else None
+    
+    def _wrap_with_ids(self, index: Any) -> Any:
+        """Rebuild an index without an ID map, using positions as IDs"""
+        vectors = index.reconstruct_n(0, index.ntotal) if index.ntotal else None
+        wrapped = faiss.IndexIDMap2(faiss.IndexFlat(index.d, index.metric_type))
+        if vectors is not None:
+            wrapped.add_with_ids(vectors, np.arange(index.ntotal, dtype=np.int64))
+        return wrapped
     
     def get_compartments(self) -> List[str]:
-        """Get all compartment names"""
-        return list(self.indices.keys())
+        """Get all compartment names, including saved ones not loaded yet"""
+        compartments = dict.fromkeys(self.indices)
+        for name in sorted(os.listdir(self.data_path)):
+            for suffix in (".index", ".jsonl"):
+                if name.endswith(suffix):
+                    compartments.setdefault(name[:-len(suffix)])
+        return list(compartments)
     
     def add(self, compartment: str, texts: List[str], 
-            metadatas: Optional[List[Dict[str, Any]]] = None) -> List[int]:
+            metadatas: Optional[List[Dict[str, Any]]] = None,
+            embeddings: Optional[np.ndarray] = None) -> List[int]:
         """
         Add texts and their metadata to the vector store
         
@@ -283,6 +974,7 @@ class VectorStore:
             compartment: The compartment to add to
             texts: The texts to add
             metadatas: Optional metadata associated with each text
+            embeddings: Optional precomputed embeddings, one row per text
             
         Returns:
             List of IDs assigned to the added texts
@@ -300,37 +992,58 @@ class VectorStore:
         elif len(metadatas) != len(texts):
             raise ValueError(f"Number of texts ({len(texts)}) and metadata ({len(metadatas)}) must match")
         
-        # Ensure compartment exists
-        self._ensure_compartment(compartment)
-        
         # Convert texts to embeddings
-        embeddings = self.embedding.encode(texts)
-        
-        # Current count in the index
-        start_id = len(self.metadata[compartment])
-        
-        # Add embeddings to the index
-        self.indices[compartment].add(embeddings)
-        
-        # Store metadata with generated IDs
-        ids = list(range(start_id, start_id + len(texts)))
-        
-        # Add timestamp to metadata
-        timestamp = time.time()
-        for i, (text, meta) in enumerate(zip(texts, metadatas)):
-            # Store the original text, metadata, and timestamp
-            entry = {
-                "id": ids[i],
-                "text": text,
-                "timestamp": timestamp,
-                **meta
-            }
-            self.metadata[compartment].append(entry)
-        
-        logger.info(f"Added {len(texts)} texts to compartment '{compartment}'")
+        if embeddings is None:
+            embeddings = self._encode(texts)
+        else:
+            embeddings = self._unit(embeddings)
+        
+        with self._compartment_lock(compartment).write():
+            with self._lock:
+                # Ensure compartment exists
+                self._ensure_compartment(compartment)
+                
+                # Allocate IDs after the highest one ever used in this compartment
+                start_id = self.next_ids[compartment]
+                ids = list(range(start_id, start_id + len(texts)))
+                self.next_ids[compartment] = start_id + len(texts)
+                index = self.indices[compartment]
+                entries = self.metadata[compartment]
+                log = self._log(compartment)
+            
+            # Add embeddings to the index
+            index.add_with_ids(embeddings, np.asarray(ids, dtype=np.int64))
+            
+            # Add timestamp to metadata
+            timestamp = time.time()
+            records = []
+            for i, (text, meta) in enumerate(zip(texts, metadatas)):
+                # Store the original text, metadata, and timestamp
+                entry = {
+                    "id": ids[i],
+                    "text": text,
+                    "timestamp": timestamp,
+                    **meta
+                }
+                entries[ids[i]] = entry
+                records.append({"op": "add", "vector_id": ids[i], "entry": entry,
+                                "vector": _encode_vector(embeddings[i])})
+            
+            # Log the change now, write the index later
+            log.append_many(records)
+            with self._lock:
+                self._mark_dirty(compartment, len(ids))
+                self._maybe_migrate(compartment)
+        
+        self._unload_idle()
+        logger.debug(f"Added {len(texts)} texts to compartment '{compartment}'")
         return ids
     
-    def search(self, compartment: str, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
+    def search(self, compartment: str, query: str, top_k: int = 5,
+               query_embedding: Optional[np.ndarray] = None,
+               nprobe: Optional[int] = None,
+               ef_search: Optional[int] = None,
+               min_score: float = 0.0) -> List[Dict[str, Any]]:
         """
         Search for similar texts in the vector store
         
@@ -338,70 +1051,151 @@ class VectorStore:
             compartment: The compartment to search in
             query: The search query
             top_k: Number of results to return
+            query_embedding: Optional precomputed embedding of the query
+            nprobe: Inverted lists to visit, for IVF indexes (default: the
+                store's nprobe); higher is more accurate and slower
+            ef_search: Candidate list size, for HNSW indexes (default: the
+                store's ef_search); higher is more accurate and slower
+            min_score: Stop at the first hit whose score is below this
             
         Returns:
-            List of matching documents with metadata and scores
+            List of matching documents with metadata, best first. "score" is
+            the relevance in [0, 1] (cosine similarity clipped at 0) and
+            "distance" the cosine distance (1 - cosine similarity)
         """
         if not HAS_FAISS:
             logger.error("FAISS not available. Cannot search.")
             return []
             
-        if compartment not in self.indices:
-            logger.warning(f"Compartment '{compartment}' doesn't exist")
-            return []
+        with self._lock:
+            if compartment not in self.indices and not self._has_saved(compartment):
+                logger.warning(f"Compartment '{compartment}' doesn't exist")
+                return []
         
         # Create query embedding
-        query_embedding = self.embedding.encode(query)
-        
-        # Search the index
-        distances, indices = self.indices[compartment].search(query_embedding, top_k)
+        if query_embedding is None:
+            query_embedding = self._encode(query)
+        else:
+            query_embedding = self._unit(query_embedding)
         
-        # Format results
-        results = []
-        for i, (distance, idx) in enumerate(zip(distances[0], indices[0])):
-            # Skip invalid indices
-            if idx < 0 or idx >= len(self.metadata[compartment]):
-                continue
-                
-            # Get metadata
-            metadata = self.metadata[compartment][idx]
+        # Search the index. The compartment is only held shared, so searches
+        # of this and other compartments run concurrently.
+        with self._compartment_lock(compartment).read():
+            with self._lock:
+                if not self._open(compartment):
+                    logger.warning(f"Compartment '{compartment}' doesn't exist")
+                    return []
+                index = self.indices[compartment]
+                entries = self.metadata[compartment]
+                tombstones = list(self.tombstones.get(compartment, ()))
             
-            # Calculate score (convert distance to similarity score)
-            # FAISS returns L2 distance, so we convert to a similarity score
-            # where 1.0 is most similar and 0.0 is least similar
-            max_distance = 100.0  # Arbitrary max distance to normalize
-            score = max(0.0, 1.0 - (distance / max_distance))
+            # Filter out vectors the index could not remove
+            selector = None
+            if tombstones:
+                removed = faiss.IDSelectorBatch(np.asarray(tombstones, dtype=np.int64))
+                selector = faiss.IDSelectorNot(removed)
+            distances, indices = index.search(
+                query_embedding, top_k,
+                params=self._search_parameters(index, nprobe, ef_search, selector))
+            metric = METRIC_INNER_PRODUCT if index.metric_type == faiss.METRIC_INNER_PRODUCT else METRIC_L2
             
-            # Add to results
-            results.append({
-                "id": metadata["id"],
-                "text": metadata["text"],
-                "score": score,
-                "metadata": {k: v for k, v in metadata.items() 
-                         if k not in ["id", "text"]}
-            })
+            # Format results
+            results = []
+            for distance, idx in zip(distances[0], indices[0]):
+                # Skip invalid indices
+                metadata = entries.get(int(idx))
+                if metadata is None:
+                    continue
+                
+                # Hits come best first, so the rest score lower still
+                similarity = cosine_similarity(distance, metric)
+                score = max(0.0, similarity)
+                if score < min_score:
+                    break
+                
+                # Add to results
+                results.append({
+                    "id": metadata["id"],
+                    "text": metadata["text"],
+                    "score": score,
+                    "distance": 1.0 - similarity,
+                    "metadata": {k: v for k, v in metadata.items() 
+                             if k not in ["id", "text"]}
+                })
         
+        self._unload_idle()
         return results
     
+    def remove(self, compartment: str, ids: List[int]) -> int:
+        """
+        Remove individual vectors from a compartment
+        
+        Index types that cannot remove vectors (HNSW) keep them as
+        tombstones until the compartment is compacted.
+        
+        Args:
+            compartment: The compartment to remove from
+            ids: IDs returned by add()
+            
+        Returns:
+            Number of vectors removed
+        """
+        with self._compartment_lock(compartment).write(), self._lock:
+            if not self._open(compartment):
+                logger.warning(f"Compartment '{compartment}' doesn't exist")
+                return 0
+            
+            removed = [int(vector_id) for vector_id in ids
+                       if self.metadata[compartment].pop(int(vector_id), None) is not None]
+            if removed:
+                if not self._remove_vectors(self.indices[compartment], removed):
+                    self.tombstones[compartment].update(removed)
+                    self._maybe_compact(compartment)
+                self._log(compartment).append({"op": "remove", "ids": removed})
+                self._mark_dirty(compartment, len(removed))
+        
+        logger.info(f"Removed {len(removed)} vectors from compartment '{compartment}'")
+        return len(removed)
+    
+    def update_metadata(self, compartment: str, vector_id: int,
+                        metadata: Dict[str, Any]) -> bool:
+        """
+        Update the metadata stored with a vector
+        
+        Args:
+            compartment: The compartment holding the vector
+            vector_id: ID returned by add()
+            metadata: Keys to set
+            
+        Returns:
+            True if the vector exists
+        """
+        with self._compartment_lock(compartment).write(), self._lock:
+            entry = self.metadata[compartment].get(int(vector_id)) if self._open(compartment) else None
+            if entry is None:
+                return False
+            entry.update(metadata)
+            self._log(compartment).append({"op": "update", "vector_id": int(vector_id),
+                                           "metadata": metadata})
+            self._mark_dirty(compartment, 1)
+        return True
+    
     def delete(self, compartment: str) -> bool:
         """Delete a compartment and its files"""
-        if compartment not in self.indices:
+        if compartment not in self.indices and not self._has_saved(compartment):
             logger.warning(f"Compartment '{compartment}' doesn't exist")
             return False
         
-        # Delete files
-        index_path = self._get_index_path(compartment)
-        metadata_path = self._get_metadata_path(compartment)
-        
-        if os.path.exists(index_path):
-            os.remove(index_path)
-        
-        if os.path.exists(metadata_path):
-            os.remove(metadata_path)
-        
-        # Remove from memory
-        del self.indices[compartment]
-        del self.metadata[compartment]
+        with self._save_lock(compartment), self._compartment_lock(compartment).write(), self._lock:
+            # Remove from memory
+            self._unload(compartment)
+            
+            # Delete files
+            for path in (self._get_index_path(compartment),
+                         self._get_metadata_path(compartment),
+                         self._get_log_path(compartment)):
+                if os.path.exists(path):
+                    os.remove(path)
         
         logger.info(f"Deleted compartment '{compartment}'")
         return True
\ No newline at end of file
@@ -3,11 +3,12 @@ Helper utilities for the Hermes Memory Adapter.
 """
 
 import json
-import time
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Any, Union, Optional
 
+from engram.core.ids import new_id
+
 from ..core.imports import logger
 
 
@@ -39,16 +40,16 @@ def format_conversation(content: Union[str, List[Dict[str, str]]]) -> str:
 
 def generate_memory_id(namespace: str, content: str) -> str:
     """
-    Generate a unique memory ID.
+    Generate a unique, time-sortable memory ID.
     
     Args:
         namespace: Namespace for the memory
-        content: Content of the memory
+        content: Content of the memory (unused; kept for compatibility)
         
     Returns:
-        Unique memory ID
+        Unique memory ID of the form "<namespace>-<ulid>"
     """
-    return f"{namespace}-{int(time.time())}-{hash(content) % 10000}"
+    return new_id(namespace)
 
 
 def validate_namespace(namespace: str, valid_namespaces: List[str], 
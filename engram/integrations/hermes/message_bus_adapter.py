@@ -9,10 +9,11 @@ enabling asynchronous communication between Tekton components.
 import asyncio
 import json
 import logging
-import time
 from datetime import datetime
 from typing import Dict, List, Any, Optional, Union, Callable, Awaitable
 
+from engram.core.ids import new_id
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -155,7 +156,7 @@ class MessageBusAdapter:
                 "topic": topic,
                 "content": message_str,
                 "metadata": metadata,
-                "id": f"{topic}-{int(time.time())}-{hash(message_str) % 10000}"
+                "id": new_id(topic)
             }
             
             # Put in fallback queue
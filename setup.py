@@ -25,6 +25,7 @@ requirements = [
 # Optional requirements (vector database for memory capabilities)
 extras_require = {
     "vector": ["faiss-cpu>=1.7.4"],
+    "fast": ["pyahocorasick>=2.0.0"],
 }
 
 setup(
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Tests for the compiled auto-categorization rules
+"""
+
+import asyncio
+import json
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from engram.core.structured.categorization import auto_categorize_memory, load_rules, set_rules
+
+@pytest.fixture
+def temp_data_dir():
+    """Create a temporary directory for test data."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        yield Path(temp_dir)
+
+def test_default_rules_categorize_in_one_scan():
+    """Test categories, importance levels and tags from the default rules."""
+    rules = load_rules()
+
+    assert rules.categorize("I feel so excited about the trip") == \
+        ("personal", 4, ["personal", "reflection", "emotional"])
+
+    category, importance, tags = rules.categorize("Urgent: fix the Python and C++ API client")
+    assert (category, importance) == ("projects", 5)
+    assert {"project", "python", "c++", "critical"} <= set(tags)
+    # Keywords must match whole words
+    assert "go" not in tags and "java" not in tags
+
+    # A phrase also matches the keywords inside it
+    category, _, tags = rules.categorize("A theorem from computer science")
+    assert category == "facts" and {"cs", "science"} <= set(tags)
+
+    assert rules.categorize("See https://example.com for details")[2] == ["resource", "website"]
+    assert rules.categorize("My password is hunter2")[:2] == ("private", 5)
+    assert rules.categorize("A trivial reminder")[1:] == (2, ["todo"])
+    assert rules.categorize("Lunch was nice") == ("session", 3, ["session"])
+
+def test_rules_load_from_file(temp_data_dir):
+    """Test that a JSON rule file replaces the default rules."""
+    rules_file = temp_data_dir / "rules.json"
+    with open(rules_file, "w") as f:
+        json.dump({
+            "categories": [{"category": "facts", "keywords": ["recipe"], "tags": ["cooking"]}],
+            "tags": [{"keywords": ["bake"], "tags": ["oven"]}],
+        }, f)
+
+    try:
+        set_rules(str(rules_file))
+        result = asyncio.run(auto_categorize_memory("How to bake the recipe"))
+        assert result == ("facts", 3, ["cooking", "oven"])
+    finally:
+        set_rules(None)
+
+    # An unreadable rule file falls back to the defaults
+    assert load_rules(str(temp_data_dir / "missing.json")).categorize("debug the server")[0] == "projects"
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Tests for multi-namespace context retrieval
+
+These tests verify that get_relevant_context fans out over namespaces,
+applies the forget filter once and keeps a global top-k grouped by
+namespace.
+"""
+
+import asyncio
+import tempfile
+from pathlib import Path
+
+from engram.core.forget_registry import ForgetRegistry, FORGET_PREFIX
+from engram.core.memory.search import get_relevant_context
+from engram.core.memory.storage.file_storage import FileStorage
+
+class FixedStorage:
+    """Storage that returns fixed hits for each namespace."""
+
+    def __init__(self, hits):
+        self.hits = hits
+
+    def search(self, query, namespace, limit=5):
+        return self.hits.get(namespace, [])[:limit]
+
+class CountingStorage(FileStorage):
+    """FileStorage that records how often the query is encoded."""
+
+    encodings = 0
+
+    def encode_query(self, query):
+        self.encodings += 1
+        return query
+
+    def search(self, query, namespace, limit=5, query_embedding=None):
+        assert query_embedding == query
+        return super().search(query, namespace, limit)
+
+def test_context_groups_namespaces_and_filters_once():
+    """Test that context is grouped by namespace with forgotten items removed."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        storage = CountingStorage("test", Path(temp_dir))
+        storage.add("Casey prefers tea over coffee", namespace="conversations")
+        storage.add("Casey dislikes coffee", namespace="conversations")
+        storage.add("Casey thinks about tea ceremonies", namespace="thinking")
+        storage.add("Casey is allergic to nuts", namespace="longterm")
+
+        registry = ForgetRegistry([f"{FORGET_PREFIX}dislikes coffee"])
+        context = asyncio.run(get_relevant_context(
+            storage, "Casey tea", limit=3, forget_registry=registry
+        ))
+
+        assert storage.encodings == 1
+        assert "#### Previous Conversations" in context
+        assert "1. Casey prefers tea over coffee" in context
+        assert "dislikes coffee" not in context
+        assert "#### Thoughts" in context
+        assert "#### Important Information" in context
+        storage.close()
+
+def test_context_limit_is_global_across_namespaces():
+    """Test that the limit caps the whole context, not each namespace."""
+    storage = FixedStorage({
+        "conversations": [
+            {"content": "strong conversation", "relevance": 0.9},
+            {"content": "good conversation", "relevance": 0.7},
+        ],
+        "thinking": [{"content": "weak thought", "relevance": 0.2}],
+        "longterm": [{"content": "strong fact", "relevance": 0.8}],
+    })
+
+    context = asyncio.run(get_relevant_context(
+        storage, "query", limit=3, forget_registry=ForgetRegistry([])
+    ))
+
+    assert "1. strong conversation" in context
+    assert "2. good conversation" in context
+    assert "1. strong fact" in context
+    assert "#### Thoughts" not in context
+    assert "weak thought" not in context
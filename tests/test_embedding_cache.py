@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Tests for the embedding cache and the cached encoder wrapper
+"""
+
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from engram.core.embedding_cache import CachedEncoder, DiskTier, EmbeddingCache
+from engram.core.simple_embedding import SimpleEmbedding
+
+class CountingModel(SimpleEmbedding):
+    """SimpleEmbedding that records every text it encodes."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.encoded = []
+
+    def encode(self, texts, **kwargs):
+        self.encoded.extend([texts] if isinstance(texts, str) else texts)
+        return super().encode(texts, **kwargs)
+
+@pytest.fixture
+def temp_data_dir():
+    """Create a temporary directory for test data."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        yield Path(temp_dir)
+
+def test_repeated_texts_skip_the_model():
+    """Test that only unseen texts reach the model and output shapes are kept."""
+    model = CountingModel(vector_size=16)
+    encoder = CachedEncoder(model, cache=EmbeddingCache(max_entries=100))
+
+    first = encoder.encode(["alpha", "beta", "alpha"])
+    assert model.encoded == ["alpha", "beta"]
+
+    again = encoder.encode(["beta", "alpha"])
+    assert model.encoded == ["alpha", "beta"]
+    assert np.allclose(again, first[[1, 0]])
+
+    single = encoder.encode("alpha")
+    assert single.shape == model.encode("alpha").shape == (1, 16)
+    assert encoder.cache.stats()["hits"] >= 3
+    assert encoder.vector_size == 16
+
+def test_lru_evicts_least_recently_used():
+    """Test that the memory tier keeps the most recently used entries."""
+    cache = EmbeddingCache(max_entries=2)
+    cache.put("model", "a", np.ones(4))
+    cache.put("model", "b", np.ones(4))
+    assert cache.get("model", "a") is not None
+    cache.put("model", "c", np.ones(4))
+
+    assert cache.get("model", "b") is None
+    assert cache.get("model", "a") is not None
+    assert cache.stats()["misses"] == 1
+
+def test_disk_tier_survives_restart(temp_data_dir):
+    """Test that embeddings written to the disk tier are found by a new cache."""
+    cache = EmbeddingCache(max_entries=10, disk_dir=temp_data_dir, disk_entries=4)
+    encoder = CachedEncoder(CountingModel(vector_size=8), cache=cache)
+    expected = encoder.encode(["one", "two"])
+    cache.close()
+
+    model = CountingModel(vector_size=8)
+    restarted = CachedEncoder(model, cache=EmbeddingCache(max_entries=10, disk_dir=temp_data_dir))
+    assert np.allclose(restarted.encode(["two", "one"]), expected[[1, 0]])
+    assert model.encoded == []
+    assert restarted.cache.stats()["disk_hits"] == 2
+
+def test_disk_tier_never_returns_an_overwritten_vector(temp_data_dir):
+    """Test a crash after a slot was overwritten but before its new owner was logged."""
+    tier = DiskTier(temp_data_dir, "model", 4, capacity=1)
+    tier.put("old", np.ones(4))
+    tier.log.append = lambda record: True
+    tier.put("new", np.full(4, 2.0))
+    tier.close()
+
+    reopened = DiskTier(temp_data_dir, "model", 4, capacity=1)
+    assert reopened.get("old") is None
+    reopened.close()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Tests for the file-based memory storage
+
+These tests verify that the append-only log and snapshot compaction used by
+FileStorage preserve every write across restarts.
+"""
+
+import tempfile
+import time
+from pathlib import Path
+
+import pytest
+
+from engram.core.append_log import AppendLog
+from engram.core.memory.storage.file_storage import FileStorage
+
+@pytest.fixture
+def temp_data_dir():
+    """Create a temporary directory for test data."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        yield Path(temp_dir)
+
+def test_writes_survive_restart(temp_data_dir):
+    """Test that adds, updates and clears are replayed from the log."""
+    storage = FileStorage("test", temp_data_dir)
+    assert storage.add("keep this memory", namespace="longterm") is True
+    assert storage.add("a passing thought", namespace="thinking") is True
+    memory_id = storage.memories["longterm"][0]["id"]
+    assert storage.update_memory(memory_id, {"expiration": "2099-01-01"}) is True
+    assert storage.clear_namespace("thinking") is True
+    storage.close()
+
+    # Nothing has been compacted yet, so the state lives only in the log
+    assert not storage.fallback_file.exists()
+
+    reloaded = FileStorage("test", temp_data_dir)
+    assert [m["content"] for m in reloaded.memories["longterm"]] == ["keep this memory"]
+    assert reloaded.memories["longterm"][0]["metadata"]["expiration"] == "2099-01-01"
+    assert reloaded.memories["thinking"] == []
+    reloaded.close()
+
+def test_compaction_folds_log_into_snapshot(temp_data_dir):
+    """Test that compaction writes a snapshot and empties the log."""
+    storage = FileStorage("test", temp_data_dir)
+    storage.compaction_threshold = 10
+    for i in range(25):
+        storage.add(f"memory {i}", namespace="conversations")
+
+    assert storage.fallback_file.exists()
+    assert storage.log.record_count < 25
+    storage.close()
+
+    reloaded = FileStorage("test", temp_data_dir)
+    assert len(reloaded.memories["conversations"]) == 25
+    reloaded.close()
+
+def test_log_replayed_over_its_snapshot_adds_nothing_twice(temp_data_dir):
+    """Test a crash after compaction wrote the snapshot but before it truncated the log."""
+    storage = FileStorage("test", temp_data_dir)
+    storage.add("first memory", namespace="conversations")
+    storage.add("second memory", namespace="conversations")
+    storage.log.truncate = lambda: None
+    assert storage.compact() is True
+    storage.close()
+    assert storage.log.path.stat().st_size > 0
+
+    reloaded = FileStorage("test", temp_data_dir)
+    assert [m["content"] for m in reloaded.memories["conversations"]] == ["first memory", "second memory"]
+    assert len(reloaded.search("memory", namespace="conversations", limit=5)) == 2
+    reloaded.close()
+
+def test_torn_log_record_is_ignored(temp_data_dir):
+    """Test that a partially written final record does not break loading."""
+    storage = FileStorage("test", temp_data_dir)
+    storage.add("complete memory", namespace="conversations")
+    storage.close()
+
+    with open(storage.log.path, "a") as f:
+        f.write('{"op": "add", "namespace": "conv')
+
+    reloaded = FileStorage("test", temp_data_dir)
+    assert [m["content"] for m in reloaded.memories["conversations"]] == ["complete memory"]
+    reloaded.close()
+
+def test_keyword_search_is_ranked_and_survives_compaction(temp_data_dir):
+    """Test that search uses the text index before and after compaction."""
+    storage = FileStorage("test", temp_data_dir)
+    storage.add("notes on the python packaging guide", namespace="projects")
+    storage.add("python python python internals", namespace="projects")
+    storage.add("weekly grocery list", namespace="projects")
+
+    results = storage.search("python", namespace="projects", limit=5)
+    assert [r["content"] for r in results] == [
+        "python python python internals",
+        "notes on the python packaging guide",
+    ]
+    assert results[0]["relevance"] == 1.0
+    assert len(storage.search("", namespace="projects", limit=5)) == 3
+
+    storage.compact()
+    storage.close()
+    assert storage.index_file.exists()
+
+    reloaded = FileStorage("test", temp_data_dir)
+    assert reloaded.search('"grocery list"', namespace="projects")[0]["content"] == "weekly grocery list"
+    reloaded.close()
+
+def test_add_many_writes_one_batch(temp_data_dir):
+    """Test that a batch add stores every memory and survives a restart."""
+    storage = FileStorage("test", temp_data_dir)
+    contents = [f"bulk memory {i}" for i in range(50)]
+    metadatas = [{"key": f"k{i}"} for i in range(50)]
+    assert storage.add_many(contents, namespace="conversations", metadatas=metadatas) == 50
+    assert storage.add_many([], namespace="conversations") == 0
+    storage.close()
+
+    reloaded = FileStorage("test", temp_data_dir)
+    memories = reloaded.memories["conversations"]
+    assert [m["content"] for m in memories] == contents
+    assert memories[7]["metadata"]["key"] == "k7"
+    assert len({m["id"] for m in memories}) == 50
+    reloaded.close()
+
+def test_log_syncs_within_interval_without_further_appends(temp_data_dir):
+    """Test that a lone record is synced by the timer, not the next append."""
+    log = AppendLog(temp_data_dir / "test.log", fsync_batch=100, fsync_interval=0.05)
+    log.sync()
+    assert log.append({"op": "add"}) is True
+    assert log._unsynced == 1
+
+    deadline = time.monotonic() + 5
+    while log._unsynced and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert log._unsynced == 0
+    log.close()
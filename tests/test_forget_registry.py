@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Tests for the forget registry
+
+These tests verify the compiled FORGET/IGNORE filter and its use by
+search_memory in place of the nested longterm search.
+"""
+
+import asyncio
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from engram.core import forget_registry as registry_module
+from engram.core.forget_registry import ForgetRegistry, FORGET_PREFIX
+from engram.core.memory.search import search_memory
+from engram.core.memory.storage.file_storage import FileStorage
+
+@pytest.fixture(params=[False, True], ids=["python", "pyahocorasick"])
+def automaton_backend(request, monkeypatch):
+    """Run each test with the pure Python automaton and, if installed, pyahocorasick."""
+    if request.param and not registry_module.HAS_AHOCORASICK:
+        pytest.skip("pyahocorasick not installed")
+    monkeypatch.setattr(registry_module, "HAS_AHOCORASICK", request.param)
+
+def test_matches_any_forgotten_item(automaton_backend):
+    """Test that overlapping and suffix patterns are all found."""
+    registry = ForgetRegistry()
+    registry.load([
+        f"{FORGET_PREFIX}he",
+        f"{FORGET_PREFIX}She Sells",
+        f"{FORGET_PREFIX}hers",
+        "an ordinary longterm memory",
+    ])
+
+    assert len(registry) == 3
+    assert registry.match("USHERS") in {"he", "hers"}
+    assert registry.match("she sells sea shells") is not None
+    assert registry.match("nothing to see") is None
+
+def test_version_tracks_changes(automaton_backend):
+    """Test that changes bump the version and recompile the filter."""
+    registry = ForgetRegistry()
+    assert registry.match("secret plan") is None
+
+    version = registry.version
+    assert registry.add_instruction(f"{FORGET_PREFIX}secret") is True
+    assert registry.add_instruction(f"{FORGET_PREFIX}Secret") is False
+    assert registry.version == version + 1
+    assert registry.match("the SECRET plan") == "secret"
+
+    registry.reset()
+    assert registry.match("the secret plan") is None
+
+def test_search_memory_filters_with_registry():
+    """Test that search results are filtered by the registry without a longterm search."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        storage = FileStorage("test", Path(temp_dir))
+        storage.add("Casey lives in Springfield", namespace="conversations")
+        storage.add("Casey likes Python", namespace="conversations")
+
+        registry = ForgetRegistry([f"{FORGET_PREFIX}springfield"])
+        results = asyncio.run(search_memory(
+            storage, "Casey", namespace="conversations", forget_registry=registry
+        ))
+        assert [r["content"] for r in results["results"]] == ["Casey likes Python"]
+        assert results["forgotten_count"] == 1
+
+        # Without a registry the instructions are still read from longterm
+        storage.add(f"{FORGET_PREFIX}Python", namespace="longterm")
+        results = asyncio.run(search_memory(storage, "Casey", namespace="conversations"))
+        assert [r["content"] for r in results["results"]] == ["Casey lives in Springfield"]
+        storage.close()
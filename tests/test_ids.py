@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Tests for memory ID generation
+"""
+
+import threading
+import time
+
+from engram.core.ids import id_timestamp, new_id, new_ids, numeric_id, order_key
+from engram.core.structured.utils import generate_memory_id
+
+def test_bulk_ids_are_unique_and_sorted():
+    """Test that IDs generated faster than the clock ticks never collide."""
+    ids = new_ids("facts", 100000) + [new_id("facts") for _ in range(10000)]
+    assert len(set(ids)) == len(ids)
+    assert ids == sorted(ids)
+
+    # The category prefix is still everything before the first "-"
+    assert all(memory_id.split("-")[0] == "facts" for memory_id in ids[:10])
+    assert generate_memory_id("projects", "content").startswith("projects-")
+
+def test_ids_are_unique_across_threads():
+    """Test that concurrent generators share one monotonic sequence."""
+    ids = []
+
+    def generate():
+        ids.extend(new_id("session") for _ in range(5000))
+
+    threads = [threading.Thread(target=generate) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(set(ids)) == 20000
+
+def test_ids_encode_their_creation_time():
+    """Test timestamp decoding and creation-order keys."""
+    before = time.time()
+    memory_id = new_id("facts")
+    assert before - 0.001 <= id_timestamp(memory_id) <= time.time()
+    assert id_timestamp("facts-1700000000-1234") is None
+
+    # Keys ignore the prefix, and older IDs sort by their creation time
+    later = new_id("personal")
+    assert order_key(memory_id) < order_key(later)
+    assert order_key("facts-1700000000-1234", before - 60) < order_key(memory_id)
+    assert order_key(memory_id) < order_key("facts-1700000000-1234", time.time() + 60)
+
+def test_numeric_ids_are_stable():
+    """Test that numeric IDs don't depend on the per-process hash salt."""
+    assert 0 <= numeric_id("anything") < 2 ** 63
+    assert numeric_id("a") == 4681665781835383343
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Tests for the LanceDB vector store
+
+These tests verify that compartments hold only real rows and that search
+and lookup work without materializing the table.
+"""
+
+import tempfile
+from pathlib import Path
+
+import pytest
+
+lancedb = pytest.importorskip("lancedb")
+
+from vector.lancedb.vector_store import VectorStore
+from vector.lancedb.vector_store.operations.index import DEFAULT_NPROBES, DEFAULT_REFINE_FACTOR
+
+@pytest.fixture
+def temp_data_dir():
+    """Create a temporary directory for test data."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        yield Path(temp_dir)
+
+def test_search_and_lookup(temp_data_dir):
+    """Test that an empty compartment has no rows and search returns metadata."""
+    store = VectorStore(str(temp_data_dir), dimension=16)
+    assert store.create_compartment("notes") is True
+    assert store.vector_search("anything", "notes") == []
+
+    ids = store.add("notes", ["the cat sat", "quantum physics"], [{"tag": "a"}, {"tag": "b"}])
+    assert ids == [1, 2]
+    assert store.tables["notes"].count_rows() == 2
+
+    results = store.vector_search("the cat sat", "notes", top_k=1)
+    assert results[0]["text"] == "the cat sat"
+    assert results[0]["metadata"] == {"tag": "a"}
+
+    # Bypass the metadata cache so the lookup goes to the table
+    store.metadata_cache.cache["notes"] = []
+    assert store.get_by_id(2, "notes")["metadata"] == {"tag": "b"}
+
+def test_legacy_placeholder_is_removed(temp_data_dir):
+    """Test that the id=0 placeholder of older tables never shows up."""
+    db = lancedb.connect(str(temp_data_dir))
+    db.create_table("legacy", [
+        {"id": 0, "text": "initialization placeholder", "vector": [0.0] * 16, "timestamp": 0.0},
+        {"id": 1, "text": "hello world", "vector": [0.1] * 16, "timestamp": 1.0},
+    ])
+
+    store = VectorStore(str(temp_data_dir), dimension=16)
+    results = store.vector_search("hello", "legacy", top_k=5)
+    assert [r["id"] for r in results] == [1]
+    assert store.tables["legacy"].count_rows() == 1
+
+def test_index_built_and_refreshed_after_threshold(temp_data_dir):
+    """Test that crossing the row threshold builds an index that later absorbs new rows."""
+    store = VectorStore(str(temp_data_dir), dimension=16, index_threshold=300)
+    store.add("notes", [f"memory number {i}" for i in range(299)])
+    store.wait_for_index("notes")
+    assert not store.index_manager.has_index("notes", store.tables["notes"])
+
+    store.add("notes", ["memory number 299"])
+    store.wait_for_index("notes")
+    assert store.index_manager.indexed_rows["notes"] == 300
+
+    store.add("notes", [f"later memory {i}" for i in range(60)])
+    store.wait_for_index("notes")
+    assert store.index_manager.indexed_rows["notes"] == 360
+    assert store.index_manager.trained_rows["notes"] == 300
+
+    results = store.vector_search("later memory 7", "notes", top_k=3, nprobes=4, refine_factor=5)
+    assert len(results) == 3
+
+def test_failed_table_write_assigns_no_ids(temp_data_dir):
+    """Test that rows LanceDB rejected are neither reported nor cached as stored."""
+    store = VectorStore(str(temp_data_dir), dimension=16)
+    assert store.add("notes", ["stored memory"]) == [1]
+
+    def failing_add(*args, **kwargs):
+        raise OSError("disk full")
+
+    store.tables["notes"].add = failing_add
+    assert store.add("notes", ["lost memory"]) == []
+    assert [item["text"] for item in store.metadata_cache.load("notes")] == ["stored memory"]
+
+def test_search_refines_by_default(temp_data_dir):
+    """Test that searches re-rank index candidates unless told otherwise."""
+    store = VectorStore(str(temp_data_dir), dimension=16)
+    store.add("notes", ["the cat sat", "quantum physics"])
+    table = store.tables["notes"]
+    search = table.search
+    calls = []
+
+    class RecordingQuery:
+        """Query builder wrapper recording the settings applied to it."""
+
+        def __init__(self, query):
+            self.query = query
+
+        def __getattr__(self, name):
+            def call(*args):
+                calls.append((name,) + args)
+                result = getattr(self.query, name)(*args)
+                return self if result is self.query else result
+            return call
+
+    table.search = lambda *args, **kwargs: RecordingQuery(search(*args, **kwargs))
+    assert store.vector_search("the cat sat", "notes", top_k=1)[0]["text"] == "the cat sat"
+    assert ("refine_factor", DEFAULT_REFINE_FACTOR) in calls
+    assert ("nprobes", DEFAULT_NPROBES) in calls
+
+    calls.clear()
+    store.vector_search("the cat sat", "notes", top_k=1, nprobes=5, refine_factor=2)
+    assert ("refine_factor", 2) in calls and ("nprobes", 5) in calls
@@ -24,7 +24,10 @@ def temp_data_dir():
 def memory_service(temp_data_dir):
     """Create a memory service instance for testing."""
     service = MemoryService(client_id="test", data_dir=temp_data_dir)
-    return service
+    yield service
+    # Write the vector store before the data directory is removed
+    if service.vector_available:
+        service.vector_store.close()
 
 def test_memory_service_init(memory_service):
     """Test that the memory service initializes correctly."""
@@ -146,4 +149,93 @@ def test_get_relevant_context(memory_service):
     assert "Claude's Thoughts" in context
     assert "Important Information" in context
     assert "Casey likes Python" in context
-    assert "prefers concise explanations" in context
\ No newline at end of file
+    assert "prefers concise explanations" in context
+
+def test_add_many(memory_service):
+    """Test storing a batch of memories in one call."""
+    items = [
+        {"content": "first bulk memory", "metadata": {"key": "one"}},
+        "second bulk memory",
+        {"content": "third bulk memory"},
+    ]
+    stored = asyncio.run(memory_service.add_many(items, namespace="conversations"))
+    assert stored == 3
+
+    search_result = asyncio.run(memory_service.search(
+        query="bulk memory",
+        namespace="conversations",
+        limit=10
+    ))
+    contents = [r["content"] for r in search_result["results"] if "bulk" in r["content"]]
+    assert sorted(contents) == ["first bulk memory", "second bulk memory", "third bulk memory"]
+
+def test_keep_memory_and_evict_expired(memory_service):
+    """Test that memories past their expiration are removed for good."""
+    asyncio.run(memory_service.add_many(["short lived note", "lasting note"], namespace="projects"))
+    results = asyncio.run(memory_service.search("note", namespace="projects", limit=5))["results"]
+    ids = {r["content"]: r["id"] for r in results}
+
+    assert asyncio.run(memory_service.keep_memory(ids["short lived note"], days=-1)) is True
+    assert asyncio.run(memory_service.keep_memory(ids["lasting note"], days=30)) is True
+    assert asyncio.run(memory_service.evict_expired()) == 1
+
+    # A fresh instance sees the eviction
+    if memory_service.vector_available:
+        memory_service.vector_store.close()
+    reloaded = MemoryService(client_id="test", data_dir=str(memory_service.data_dir))
+    results = asyncio.run(reloaded.search("note", namespace="projects", limit=5))["results"]
+    assert [r["content"] for r in results] == ["lasting note"]
+    if reloaded.vector_available:
+        reloaded.vector_store.close()
+
+def test_vector_collections_load_on_first_use(memory_service):
+    """Test that starting a service opens no collections."""
+    if not memory_service.vector_available:
+        pytest.skip("FAISS not available")
+    assert memory_service.vector_store.indices == {}
+
+    asyncio.run(memory_service.add("lazy memory", namespace="projects"))
+    assert list(memory_service.vector_store.indices) == ["engram-test-projects"]
+
+def test_namespace_searches_overlap(memory_service):
+    """Test that context searches of different namespaces run concurrently."""
+    if not memory_service.vector_available:
+        pytest.skip("FAISS not available")
+    import threading
+    import time
+
+    asyncio.run(memory_service.add("Casey likes Python programming", namespace="conversations"))
+    asyncio.run(memory_service.add("Casey prefers concise explanations", namespace="thinking"))
+
+    class SlowIndex:
+        """Index wrapper recording when each search runs."""
+        spans = []
+
+        def __init__(self, index):
+            self._index = index
+
+        def __getattr__(self, name):
+            return getattr(self._index, name)
+
+        def search(self, *args, **kwargs):
+            start = time.monotonic()
+            time.sleep(0.3)
+            result = self._index.search(*args, **kwargs)
+            SlowIndex.spans.append((start, time.monotonic(), threading.get_ident()))
+            return result
+
+    store = memory_service.vector_store
+    for namespace in ("conversations", "thinking"):
+        collection = memory_service.namespace_collections[namespace]
+        store.indices[collection] = SlowIndex(store.indices[collection])
+
+    context = asyncio.run(memory_service.get_relevant_context(
+        query="Casey preferences",
+        namespaces=["conversations", "thinking"],
+        limit=2
+    ))
+    assert "Casey likes Python" in context
+
+    (first_start, first_end, first_thread), (second_start, second_end, second_thread) = SlowIndex.spans
+    assert first_thread != second_thread
+    assert max(first_start, second_start) < min(first_end, second_end)
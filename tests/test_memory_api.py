@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Tests for the core memory API
+
+These tests verify the batch storage endpoint of the core memory router.
+"""
+
+import json
+import tempfile
+
+import pytest
+
+pytest.importorskip("httpx")
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from engram.api.controllers.core_memory import router
+from engram.api.dependencies import get_memory_service
+from engram.core.memory import MemoryService
+
+@pytest.fixture
+def memory_service():
+    """Create a memory service in a temporary directory."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        service = MemoryService(client_id="test", data_dir=temp_dir)
+        yield service
+        service.close()
+
+@pytest.fixture
+def client(memory_service):
+    """Create a test client for an app serving the core memory router."""
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[get_memory_service] = lambda: memory_service
+    return TestClient(app)
+
+def test_store_batch_ndjson(client):
+    """Test that a newline-delimited body is stored in batches."""
+    body = "\n".join(json.dumps(entry) for entry in [
+        "first streamed memory",
+        {"key": "second", "value": "second streamed memory"},
+        {"content": "third streamed memory", "metadata": {"source": "test"}},
+    ]) + "\n"
+    response = client.post("/memory/store_batch?namespace=thinking&batch_size=2", content=body,
+                           headers={"Content-Type": "application/x-ndjson"})
+    assert response.status_code == 200
+    result = response.json()
+    assert result["success"] is True
+    assert (result["received"], result["stored"], result["batches"]) == (3, 3, 2)
+    assert result["namespace"] == "thinking"
+    assert result["errors"] == []
+
+def test_store_batch_json_array(client):
+    """Test that a JSON array body is stored and invalid entries are reported."""
+    response = client.post("/memory/store_batch", json=[
+        "first listed memory",
+        {"key": "second", "value": "second listed memory"},
+        {"key": "empty"},
+    ])
+    assert response.status_code == 200
+    result = response.json()
+    assert result["success"] is False
+    assert (result["received"], result["stored"]) == (3, 2)
+    assert result["errors"] == [{"entry": 3, "error": "missing value"}]
+
+    response = client.post("/memory/store_batch", json={"value": "not a list"})
+    assert response.status_code == 400
+
+def test_store_batch_reports_malformed_lines(client):
+    """Test that a malformed NDJSON line is reported without losing the rest."""
+    body = '"good memory"\n{"value": broken\n\n{"value": "another good memory"}'
+    response = client.post("/memory/store_batch", content=body,
+                           headers={"Content-Type": "application/x-ndjson"})
+    assert response.status_code == 200
+    result = response.json()
+    assert (result["received"], result["stored"]) == (3, 2)
+    assert len(result["errors"]) == 1
+    assert result["errors"][0]["entry"] == 2
+    assert result["errors"][0]["error"].startswith("invalid JSON")
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Tests for the model-free SimpleEmbedding encoder
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from engram.core.simple_embedding import SimpleEmbedding
+
+ROOT = Path(__file__).parent.parent
+
+def test_batch_matches_single_encoding():
+    """Test that batched encoding equals encoding texts one at a time."""
+    embedding = SimpleEmbedding(vector_size=32)
+    texts = [f"memory {i} about topic {i % 7} and topic {i % 3}" for i in range(150)] + ["", "!!"]
+
+    batch = embedding.encode(texts)
+    single = np.vstack([embedding.encode(text) for text in texts])
+    assert batch.shape == (152, 32)
+    assert np.allclose(batch, single, atol=1e-5)
+    assert not batch[-2:].any()
+    assert np.allclose(np.linalg.norm(batch[:-2], axis=1), 1.0, atol=1e-5)
+
+def test_embeddings_are_stable_across_processes():
+    """Test that a fresh interpreter with another hash seed produces the same vector."""
+    script = (
+        "from engram.core.simple_embedding import SimpleEmbedding;"
+        "print(list(SimpleEmbedding(vector_size=8).encode('the cat sat')[0]))"
+    )
+    outputs = set()
+    for hash_seed in ("1", "2"):
+        env = dict(os.environ, PYTHONHASHSEED=hash_seed)
+        result = subprocess.run([sys.executable, "-c", script], cwd=ROOT, env=env,
+                                capture_output=True, text=True, check=True)
+        outputs.add(result.stdout.strip())
+
+    assert len(outputs) == 1
+    assert outputs.pop() == str(list(SimpleEmbedding(vector_size=8).encode("the cat sat")[0]))
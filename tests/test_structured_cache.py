@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Tests for the structured memory LRU cache
+"""
+
+import asyncio
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from engram.core.structured.memory import StructuredMemory
+from engram.core.structured.storage.cache import MemoryCache, estimate_size
+
+@pytest.fixture
+def temp_data_dir():
+    """Create a temporary directory for test data."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        yield Path(temp_dir)
+
+def test_evicts_least_recently_used_within_byte_budget():
+    """Test that reads keep entries resident and the byte budget is respected."""
+    memories = {f"m{i}": {"id": f"m{i}", "content": "x" * 100} for i in range(4)}
+    size = estimate_size(memories["m0"])
+    cache = MemoryCache(max_bytes=3 * size)
+
+    for memory_id in ("m0", "m1", "m2"):
+        cache.put(memory_id, memories[memory_id])
+    assert cache.get("m0") is memories["m0"]
+    cache.put("m3", memories["m3"])
+
+    assert "m1" not in cache
+    assert all(memory_id in cache for memory_id in ("m0", "m2", "m3"))
+    assert cache.bytes == 3 * size
+    assert cache.get("m1") is None
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (1, 1, 1)
+
+def test_oversized_and_removed_entries():
+    """Test that entries larger than the budget are not cached and pop frees bytes."""
+    cache = MemoryCache(max_bytes=1024)
+    cache.put("big", {"content": "x" * 4096})
+    assert len(cache) == 0
+
+    cache.put("small", {"content": "hi"})
+    assert cache.pop("small") == {"content": "hi"}
+    assert cache.bytes == 0
+
+def test_storage_uses_configured_budget(temp_data_dir):
+    """Test that MemoryStorage serves repeated reads from the cache."""
+    memory = StructuredMemory(client_id="test", data_dir=str(temp_data_dir))
+    memory_id = asyncio.run(memory.add_memory("cached memory", category="facts"))
+    memory.storage.memory_cache.clear()
+
+    asyncio.run(memory.get_memory(memory_id))
+    asyncio.run(memory.get_memory(memory_id))
+    stats = memory.storage.cache_stats()
+    assert stats["entries"] == 1
+    assert stats["hits"] >= 1 and stats["misses"] >= 1
+    assert stats["max_bytes"] > 0
+    memory.close()
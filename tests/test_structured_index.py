@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Tests for the structured memory metadata index
+
+These tests verify that index changes are logged, replayed after a restart
+and folded into the snapshot by compaction.
+"""
+
+import asyncio
+import json
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from engram.core.ids import new_id
+from engram.core.structured.memory import (
+    MetadataIndexStore,
+    OrderIndex,
+    StructuredMemory,
+    TagIndex,
+    parse_tag_query
+)
+
+@pytest.fixture
+def temp_data_dir():
+    """Create a temporary directory for test data."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        yield Path(temp_dir)
+
+def test_changes_survive_restart(temp_data_dir):
+    """Test that adds, importance updates and deletes are replayed from the log."""
+    memory = StructuredMemory(client_id="test", data_dir=str(temp_data_dir))
+    keep_id = asyncio.run(memory.add_memory("keep this", category="facts", importance=3, tags=["a"]))
+    drop_id = asyncio.run(memory.add_memory("drop this", category="facts", importance=2, tags=["a", "b"]))
+    assert asyncio.run(memory.set_memory_importance(keep_id, 5)) is True
+    assert asyncio.run(memory.delete_memory(drop_id)) is True
+    memory.close()
+
+    # The snapshot is still the empty initial index; the changes live in the log
+    snapshot = json.loads(memory.metadata_index_file.read_text())
+    assert snapshot["categories"]["facts"]["memories"] == {}
+
+    reloaded = StructuredMemory(client_id="test", data_dir=str(temp_data_dir))
+    facts = reloaded.metadata_index["categories"]["facts"]["memories"]
+    assert list(facts) == [keep_id]
+    assert facts[keep_id]["importance"] == 5
+    assert reloaded.metadata_index["tags"] == {"a": {keep_id: None}}
+    reloaded.close()
+
+def test_queued_changes_are_written_in_batches(temp_data_dir):
+    """Test that changes wait in the queue until a batch fills or flush is called."""
+    index_file = temp_data_dir / "test_metadata_index.json"
+    store = MetadataIndexStore(index_file, "test", flush_batch=3, flush_interval=60)
+    store.add_memory("m1", "facts", 3, [], "2024-01-01T00:00:00")
+    store.add_memory("m2", "facts", 3, [], "2024-01-01T00:00:00")
+    assert store.log.record_count == 0
+
+    store.add_memory("m3", "facts", 3, [], "2024-01-01T00:00:00")
+    assert store.log.record_count == 3
+
+    store.add_memory("m4", "facts", 3, [], "2024-01-01T00:00:00")
+    store.flush()
+    assert store.log.record_count == 4
+    store.close()
+
+def test_compaction_folds_log_into_snapshot(temp_data_dir):
+    """Test that a long log is compacted into the snapshot and then emptied."""
+    index_file = temp_data_dir / "test_metadata_index.json"
+    store = MetadataIndexStore(index_file, "test", flush_batch=1)
+    store.compaction_threshold = 10
+    for i in range(25):
+        store.add_memory(f"m{i}", "session", 2, ["bulk"], "2024-01-01T00:00:00")
+    store.close()
+    assert store.log.record_count < 25
+    snapshot = json.loads(index_file.read_text())
+    assert len(snapshot["categories"]["session"]["memories"]) == 25 - store.log.record_count
+
+    reloaded = MetadataIndexStore(index_file, "test")
+    assert len(reloaded.index["categories"]["session"]["memories"]) == 25
+    assert len(reloaded.index["tags"]["bulk"]) == 25
+    reloaded.close()
+
+def test_log_replayed_over_its_snapshot_keeps_counters(temp_data_dir):
+    """Test a crash after compaction wrote the snapshot but before it truncated the log."""
+    index_file = temp_data_dir / "test_metadata_index.json"
+    store = MetadataIndexStore(index_file, "test", flush_batch=1)
+    store.add_memory("m1", "facts", 3, ["a", "b"], "2024-01-01T00:00:00")
+    store.add_memory("m2", "facts", 2, ["a"], "2024-01-01T00:00:01")
+    store.set_importance("m1", "facts", 3, 5)
+    store.remove_memory("m2", "facts", 2, ["a"])
+    store.log.truncate = lambda: None
+    assert store.compact() is True
+    store.close()
+    assert store.log.record_count == 4
+
+    reloaded = MetadataIndexStore(index_file, "test")
+    assert reloaded.index["memory_count"] == 1
+    assert reloaded.index["categories"]["facts"]["memory_count"] == 1
+    assert list(reloaded.index["categories"]["facts"]["memories"]) == ["m1"]
+    counters = reloaded.index["importance_counters"]
+    assert (counters["2"], counters["3"], counters["5"]) == (0, 0, 1)
+    assert reloaded.index["tags"] == {"a": {"m1": None}, "b": {"m1": None}}
+    reloaded.close()
+
+def test_tag_query_parsing():
+    """Test operator precedence, implicit AND and quoted tags."""
+    assert parse_tag_query("a OR b c") == ("or", ("tag", "a"), ("and", ("tag", "b"), ("tag", "c")))
+    assert parse_tag_query('(a or b) not "x y"') == (
+        "and", ("or", ("tag", "a"), ("tag", "b")), ("not", ("tag", "x y"))
+    )
+    for bad in ("", "a AND", "(a OR b", "a )"):
+        with pytest.raises(ValueError):
+            parse_tag_query(bad)
+
+def test_tag_index_filters_before_loading():
+    """Test boolean tag queries combined with category and importance filters."""
+    index = TagIndex()
+    index.add("m1", "projects", 4, ["python", "api"])
+    index.add("m2", "projects", 2, ["python", "draft"])
+    index.add("m3", "facts", 5, ["python", "http"])
+    index.add("m4", "facts", 3, ["rust", "api"])
+
+    def ids(**kwargs):
+        return sorted(match[0] for match in index.query(**kwargs))
+
+    assert ids(tag_query="python AND (api OR http)") == ["m1", "m3"]
+    assert ids(tag_query="python NOT draft", categories=["projects"]) == ["m1"]
+    assert ids(tag_query="NOT python") == ["m4"]
+    assert ids(tags=["api", "http"], min_importance=4) == ["m1", "m3"]
+
+    index.set_importance("m2", 5)
+    index.remove("m1")
+    assert ids(tags=["python"], min_importance=4) == ["m2", "m3"]
+    assert "api" in index.postings and index.postings["api"] == {index.doc_ids["m4"]}
+
+def test_search_memories_with_tag_query(temp_data_dir):
+    """Test tag expressions through StructuredMemory.search_memories."""
+    memory = StructuredMemory(client_id="test", data_dir=str(temp_data_dir))
+    wanted = asyncio.run(memory.add_memory("ship the api", category="projects", importance=4,
+                                           tags=["engram", "api"]))
+    asyncio.run(memory.add_memory("draft api notes", category="projects", importance=4,
+                                  tags=["engram", "api", "draft"]))
+    asyncio.run(memory.add_memory("unrelated", category="facts", importance=5, tags=["misc"]))
+
+    results = asyncio.run(memory.search_memories(tag_query="engram AND api AND NOT draft"))
+    assert [r["id"] for r in results] == [wanted]
+    assert asyncio.run(memory.search_memories(tag_query="api AND (")) == []
+    memory.close()
+
+def test_order_index_orderings():
+    """Test importance-then-recency and pure recency orderings across categories."""
+    index = OrderIndex()
+    index.add("a", "facts", 3, "2024-01-01T00:00:01")
+    index.add("b", "projects", 5, "2024-01-01T00:00:02")
+    index.add("c", "facts", 5, "2024-01-01T00:00:03")
+    index.add("d", "projects", 1, "2024-01-01T00:00:04")
+
+    def ids(**kwargs):
+        return [memory_id for memory_id, _ in index.iter_ordered(**kwargs)]
+
+    assert ids(order="importance") == ["c", "b", "a", "d"]
+    assert ids(order="recency") == ["d", "c", "b", "a"]
+    assert ids(order="recency", categories=["facts"], min_importance=4) == ["c"]
+
+    index.set_importance("a", 5)
+    index.remove("c")
+    assert ids(order="importance") == ["b", "a", "d"]
+
+    # Memories with ULID IDs are ordered by ID, which keeps creation order
+    # across categories whatever their timestamps say
+    first = new_id("projects")
+    second = new_id("facts")
+    index.add(first, "projects", 2, "2024-01-02T00:00:00")
+    index.add(second, "facts", 2, "2024-01-02T00:00:00")
+    assert ids(order="recency", min_importance=2) == [second, first, "b", "a"]
+
+def test_search_without_query_loads_only_top_memories(temp_data_dir):
+    """Test that unfiltered searches open only as many memory files as they return."""
+    memory = StructuredMemory(client_id="test", data_dir=str(temp_data_dir))
+    for i in range(10):
+        asyncio.run(memory.add_memory(f"memory {i}", category="session", importance=i % 5 + 1))
+    memory.storage.memory_cache.clear()
+
+    loaded = []
+    load_memory = memory.storage.load_memory
+
+    async def counting_load(memory_id, category):
+        loaded.append(memory_id)
+        return await load_memory(memory_id, category)
+
+    memory.storage.load_memory = counting_load
+    results = asyncio.run(memory.search_memories(limit=2, sort_by="importance"))
+    assert [r["importance"] for r in results] == [5, 5]
+    assert len(loaded) == 2
+
+    results = asyncio.run(memory.search_memories(limit=3, sort_by="recency"))
+    timestamps = [r["metadata"]["timestamp"] for r in results]
+    assert timestamps == sorted(timestamps, reverse=True)
+    assert len(loaded) == 5
+    memory.close()
+
+def test_content_digest_lookup_and_dedupe(temp_data_dir):
+    """Test exact-content lookups, write-time dedupe and digest backfill."""
+    memory = StructuredMemory(client_id="test", data_dir=str(temp_data_dir))
+    first = asyncio.run(memory.add_memory("Deploys run on Fridays", category="projects"))
+    assert asyncio.run(memory.get_memory_by_content("Deploys run on Fridays"))["id"] == first
+    assert asyncio.run(memory.get_memory_by_content("Deploys run on Fridays", "facts")) is None
+    # Lookups stay exact even though digests are normalized
+    assert asyncio.run(memory.get_memory_by_content("deploys  run on fridays")) is None
+
+    duplicate = asyncio.run(memory.add_memory("  deploys run on\nFRIDAYS ", category="projects", dedupe=True))
+    assert duplicate == first
+    assert memory.metadata_index["categories"]["projects"]["memory_count"] == 1
+
+    # Digests of memories indexed without one are recorded on load
+    meta = memory.metadata_index["categories"]["projects"]["memories"][first]
+    del meta["digest"]
+    memory.index_store.compact()
+    memory.close()
+
+    reloaded = StructuredMemory(client_id="test", data_dir=str(temp_data_dir), dedupe=True)
+    assert first in reloaded.digest_index
+    assert asyncio.run(reloaded.add_memory("Deploys run on Fridays", category="projects")) == first
+    assert asyncio.run(reloaded.delete_memory(first)) is True
+    assert asyncio.run(reloaded.get_memory_by_content("Deploys run on Fridays")) is None
+    reloaded.close()
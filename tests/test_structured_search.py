@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Tests for full-text search over structured memories
+
+These tests verify BM25 ranking with prefix matching and filters, and that
+the content index catches up with memories it missed before a restart.
+"""
+
+import asyncio
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from engram.core.structured.memory import StructuredMemory
+from engram.core.vector_store import flush_open_stores
+
+@pytest.fixture
+def temp_data_dir():
+    """Create a temporary directory for test data."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        yield Path(temp_dir)
+        # Write what a test left unwritten while its directory still exists
+        flush_open_stores()
+
+def add(memory, content, category="facts", importance=3):
+    return asyncio.run(memory.add_memory(content, category=category, importance=importance))
+
+def test_content_search_ranks_globally_with_filters(temp_data_dir):
+    """Test prefix matching, global ranking and importance/category filters."""
+    memory = StructuredMemory(client_id="test", data_dir=str(temp_data_dir))
+    add(memory, "notes about lunch")
+    best = add(memory, "deployment checklist for the deployment pipeline", category="projects")
+    other = add(memory, "we deploy on fridays", importance=2)
+    add(memory, "unrelated grocery list")
+
+    results = asyncio.run(memory.search_memories(query="deploy", sort_by="relevance"))
+    # Exact matches outrank prefix matches
+    assert [r["id"] for r in results] == [other, best]
+
+    results = asyncio.run(memory.search_memories(query="deploy", min_importance=3))
+    assert [r["id"] for r in results] == [best]
+    results = asyncio.run(memory.search_memories(query="deploy", categories=["facts"]))
+    assert [r["id"] for r in results] == [other]
+
+    context = asyncio.run(memory.get_context_memories("how does the deployment pipeline work"))
+    assert context[0]["id"] == best
+    memory.close()
+
+def test_content_index_catches_up_after_restart(temp_data_dir):
+    """Test that memories added or deleted since the last save are reconciled on load."""
+    memory = StructuredMemory(client_id="test", data_dir=str(temp_data_dir))
+    kept = add(memory, "kubernetes cluster upgrade")
+    memory.close()
+
+    memory = StructuredMemory(client_id="test", data_dir=str(temp_data_dir))
+    assert len(memory.content_index) == 1
+    added = add(memory, "terraform state migration")
+    assert asyncio.run(memory.delete_memory(kept)) is True
+
+    # Persist the metadata index but not the content index, as after a crash
+    memory.flush()
+
+    reloaded = StructuredMemory(client_id="test", data_dir=str(temp_data_dir))
+    assert set(reloaded.content_index.doc_ids) == {added}
+    assert asyncio.run(reloaded.search_memories(query="kubernetes")) == []
+    assert [r["id"] for r in asyncio.run(reloaded.search_memories(query="terraform"))] == [added]
+    reloaded.close()
+
+def test_semantic_search_maps_vectors_to_memories(temp_data_dir):
+    """Test that semantic search uses the vector index and keeps it in sync."""
+    pytest.importorskip("faiss")
+    memory = StructuredMemory(client_id="test", data_dir=str(temp_data_dir))
+    target = add(memory, "postgres replication lag alerts", category="projects")
+    add(memory, "birthday party planning")
+    low = add(memory, "postgres vacuum tuning", importance=1)
+    assert memory.semantic_index.available and len(memory.semantic_index) == 3
+
+    results = asyncio.run(memory.get_semantic_memories("postgres replication lag alerts"))
+    assert results[0]["id"] == target
+    assert results[0]["relevance"] > results[-1]["relevance"]
+
+    assert asyncio.run(memory.delete_memory(target)) is True
+    results = asyncio.run(memory.get_semantic_memories("postgres replication lag alerts"))
+    assert target not in [r["id"] for r in results]
+    memory.close()
+
+    reloaded = StructuredMemory(client_id="test", data_dir=str(temp_data_dir))
+    assert set(reloaded.semantic_index.vector_ids) == set(reloaded.content_index.doc_ids)
+    assert low in reloaded.semantic_index.vector_ids
+    # The vector files are not mistaken for a memory category
+    assert set(reloaded.storage.memory_dirs) == set(reloaded.memory_dirs)
+    reloaded.close()
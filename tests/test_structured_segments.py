@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Tests for the structured memory segment store
+"""
+
+import asyncio
+import json
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from engram.core.structured.memory import StructuredMemory
+from engram.core.structured.storage.segments import SegmentStore
+
+@pytest.fixture
+def temp_data_dir():
+    """Create a temporary directory for test data."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        yield Path(temp_dir)
+
+def test_put_get_delete_survive_reopen(temp_data_dir):
+    """Test that records, updates and tombstones are replayed on reopen."""
+    store = SegmentStore(temp_data_dir, max_segment_bytes=256, background=False)
+    store.put_many([(f"m{i}", {"id": f"m{i}", "content": f"memory {i}"}) for i in range(20)])
+    store.put("m3", {"id": "m3", "content": "updated"})
+    assert store.delete("m5")
+    assert not store.delete("missing")
+    store.close()
+
+    # Several segments were sealed along the way
+    assert len(list(temp_data_dir.glob("*.idx"))) > 1
+
+    reopened = SegmentStore(temp_data_dir, max_segment_bytes=256, background=False)
+    assert len(reopened) == 19
+    assert reopened.get("m3")["content"] == "updated"
+    assert reopened.get("m5") is None
+    assert reopened.get("m19")["content"] == "memory 19"
+
+    reopened.put("m20", {"id": "m20", "content": "after reopen"})
+    assert reopened.get("m20")["content"] == "after reopen"
+    reopened.close()
+
+def test_torn_tail_is_truncated(temp_data_dir):
+    """Test that a partially written final record is dropped on load."""
+    store = SegmentStore(temp_data_dir, background=False)
+    store.put_many([("a", {"content": "first"}), ("b", {"content": "second"})])
+    store.close()
+
+    segment = next(temp_data_dir.glob("*.seg"))
+    with open(segment, "ab") as f:
+        f.write(b'c\t{"content": "tor')
+
+    reopened = SegmentStore(temp_data_dir, background=False)
+    assert sorted(reopened.ids()) == ["a", "b"]
+    reopened.put("c", {"content": "rewritten"})
+    reopened.close()
+
+    assert SegmentStore(temp_data_dir, background=False).get("c") == {"content": "rewritten"}
+
+def test_compaction_reclaims_dead_records(temp_data_dir):
+    """Test that overwritten and deleted records are compacted away."""
+    store = SegmentStore(temp_data_dir, max_segment_bytes=512, min_compaction_bytes=0,
+                         background=False)
+    for version in range(5):
+        store.put_many([(f"m{i}", {"content": f"v{version} of {i}"}) for i in range(10)])
+    store.delete("m0")
+
+    assert store.dead_bytes < store.live_bytes
+    assert len(store) == 9
+    store.close()
+
+    reopened = SegmentStore(temp_data_dir, background=False)
+    assert reopened.get("m0") is None
+    assert reopened.get("m9") == {"content": "v4 of 9"}
+    on_disk = sum(path.stat().st_size for path in temp_data_dir.glob("*.seg"))
+    assert on_disk < 2 * (reopened.live_bytes + 9 * len("m0\t\n"))
+    reopened.close()
+
+def test_structured_memory_migrates_json_files(temp_data_dir):
+    """Test that per-memory JSON files are packed into segments on open."""
+    client_dir = temp_data_dir / "structured" / "projects" / "test"
+    client_dir.mkdir(parents=True)
+    memory = {"id": "projects-1-1", "content": "legacy memory", "category": "projects",
+              "importance": 3, "metadata": {}, "tags": [], "timestamp": "2024-01-01T00:00:00"}
+    with open(client_dir / "projects-1-1.json", "w") as f:
+        json.dump(memory, f)
+
+    structured = StructuredMemory(client_id="test", data_dir=str(temp_data_dir))
+    assert not list(client_dir.glob("*.json"))
+    assert structured.storage.read_memory("projects-1-1", "projects") == memory
+
+    async def run():
+        memory_id = await structured.add_memory("packed memory", category="projects")
+        return memory_id, await structured.get_memory(memory_id)
+
+    memory_id, stored = asyncio.run(run())
+    assert stored["content"] == "packed memory"
+    structured.close()
+
+    reopened = StructuredMemory(client_id="test", data_dir=str(temp_data_dir))
+    assert reopened.storage.read_memory(memory_id, "projects")["content"] == "packed memory"
+    reopened.close()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Tests for the BM25 inverted text index
+
+These tests verify ranking, phrase matching and incremental maintenance of
+the keyword index used by the file-based memory storage.
+"""
+
+import json
+
+from engram.core.text_index import InvertedIndex, build_indexes, load_indexes, save_indexes
+
+def test_bm25_ranks_rarer_and_denser_matches_first():
+    """Test that documents are ranked by BM25 rather than insertion order."""
+    index = InvertedIndex()
+    index.add(0, "python is a language")
+    index.add(1, "python python python tips for python developers")
+    index.add(2, "gardening notes about tomatoes")
+
+    ranked = [doc_id for doc_id, _ in index.search("python")]
+    assert ranked == [1, 0]
+    assert index.search("tomatoes gardening")[0][0] == 2
+    assert index.search("missing") == []
+
+def test_phrase_query_requires_adjacent_tokens():
+    """Test that quoted phrases only match consecutive tokens."""
+    index = InvertedIndex()
+    index.add(0, "the vector store is fast")
+    index.add(1, "store the vector later")
+
+    assert [doc_id for doc_id, _ in index.search('"vector store"')] == [0]
+    assert len(index.search("vector store")) == 2
+
+def test_incremental_updates():
+    """Test that remove and clear keep postings consistent."""
+    index = InvertedIndex()
+    index.add(0, "alpha beta")
+    index.add(1, "beta gamma")
+    index.remove(0)
+
+    assert index.search("alpha") == []
+    assert [doc_id for doc_id, _ in index.search("beta")] == [1]
+
+    index.clear()
+    assert len(index) == 0
+    assert index.search("gamma") == []
+
+def test_persisted_indexes_are_rebuilt_when_stale(tmp_path):
+    """Test that a persisted index is only reused for the memories it covers."""
+    memories = {"conversations": [{"id": "a", "content": "hello world"}]}
+    index_file = tmp_path / "index.json"
+    save_indexes(index_file, build_indexes(memories), memories)
+
+    assert load_indexes(index_file, memories)["conversations"].search("hello")[0][0] == 0
+
+    changed = {"conversations": [{"id": "b", "content": "goodbye world"}]}
+    indexes = load_indexes(index_file, changed)
+    assert indexes["conversations"].search("hello") == []
+    assert indexes["conversations"].search("goodbye")[0][0] == 0
+
+def test_fallback_store_persists_its_indexes(tmp_path):
+    """Test that the memory service's file store writes the index it loads, but not on every add."""
+    from engram.core.memory_faiss.storage.file import (
+        add_to_file_store, save_pending_indexes, setup_file_storage
+    )
+
+    storage = setup_file_storage(tmp_path, "test", ["conversations"], {})
+    add_to_file_store(storage["memories"], storage["file"], "conversations", "a",
+                      "hello world", {}, storage["text_indexes"])
+
+    index_file = tmp_path / "test-memories.index.json"
+    assert not index_file.exists()
+    save_pending_indexes()
+    assert json.loads(index_file.read_text())["conversations"]["fingerprint"] == [1, "a"]
+    reloaded = setup_file_storage(tmp_path, "test", ["conversations"], {})
+    assert reloaded["text_indexes"]["conversations"].search("hello")[0][0] == 0
+
+def test_prefix_terms_and_filters():
+    """Test term* prefixes, prefix mode, filters and cheap removal with known text."""
+    index = InvertedIndex()
+    index.add(0, "deploy the service")
+    index.add(1, "deployment and deployments")
+    index.add(2, "redeploy later")
+
+    assert [doc_id for doc_id, _ in index.search("deploy")] == [0]
+    assert [doc_id for doc_id, _ in index.search("deploy*")] == [0, 1]
+    assert [doc_id for doc_id, _ in index.search("deploy", prefix=True, allowed=lambda d: d != 0)] == [1]
+
+    index.remove(1, "deployment and deployments")
+    assert "deployment" not in index.vocabulary
+    assert index.expand_prefix("deploy") == ["deploy"]
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Tests for the FAISS path of the vector-based memory storage
+
+These tests use SimpleEmbedding in place of a SentenceTransformer so they run
+without downloading a model.
+"""
+
+import json
+import time
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+faiss = pytest.importorskip("faiss")
+
+from engram.core.memory.storage.vector_storage import VectorStorage
+from engram.core.simple_embedding import SimpleEmbedding
+from engram.core.vector_store import VectorStore, flush_open_stores
+
+class SimpleModel(SimpleEmbedding):
+    """SimpleEmbedding exposing the SentenceTransformer dimension accessor."""
+
+    def get_sentence_embedding_dimension(self):
+        return self.vector_size
+
+@pytest.fixture
+def temp_data_dir():
+    """Create a temporary directory for test data."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        yield Path(temp_dir)
+        # Write what a test left unwritten while its directory still exists
+        flush_open_stores()
+
+def test_faiss_add_search_and_clear(temp_data_dir):
+    """Test that FAISS storage ranks hits, persists and clears."""
+    storage = VectorStorage("test", temp_data_dir, SimpleModel(vector_size=64))
+    assert storage.add("the cat sat on the mat", namespace="conversations") is True
+    assert storage.add("quantum physics lecture notes", namespace="conversations") is True
+
+    results = storage.search("cat on a mat", namespace="conversations", limit=2)
+    assert [r["content"] for r in results] == ["the cat sat on the mat", "quantum physics lecture notes"]
+    assert results[0]["relevance"] > results[1]["relevance"]
+    assert results[0]["id"].startswith("conversations-")
+
+    # A fresh instance loads the persisted index
+    reloaded = VectorStorage("test", temp_data_dir, SimpleModel(vector_size=64))
+    results = reloaded.search("physics", namespace="conversations", limit=1)
+    assert results[0]["content"] == "quantum physics lecture notes"
+
+    assert reloaded.clear_namespace("conversations") is True
+    assert reloaded.search("physics", namespace="conversations", limit=1) == []
+    reloaded.close()
+    storage.close()
+
+def test_vector_store_remove_keeps_other_ids(temp_data_dir):
+    """Test that removing a vector leaves the remaining IDs addressable."""
+    store = VectorStore(str(temp_data_dir), dimension=32)
+    ids = store.add("compartment", ["alpha", "beta", "gamma"])
+    assert store.remove("compartment", [ids[1]]) == 1
+
+    results = store.search("compartment", "gamma", top_k=3)
+    assert {r["text"] for r in results} == {"alpha", "gamma"}
+
+    # New IDs are never reused after a removal
+    assert store.add("compartment", ["delta"]) == [3]
+    store.close()
+
+def test_vector_store_migrates_positional_layout(temp_data_dir):
+    """Test that indexes saved before ID mapping load with their old IDs."""
+    embedding = SimpleEmbedding(vector_size=32)
+    index = faiss.IndexFlatL2(32)
+    index.add(embedding.encode(["alpha", "beta"]))
+    faiss.write_index(index, str(temp_data_dir / "legacy.index"))
+    with open(temp_data_dir / "legacy.json", "w") as f:
+        json.dump([{"id": 0, "text": "alpha"}, {"id": 1, "text": "beta"}], f)
+
+    store = VectorStore(str(temp_data_dir), dimension=32)
+    assert store.load("legacy") is True
+    assert store.search("legacy", "beta", top_k=1)[0]["text"] == "beta"
+    assert store.add("legacy", ["gamma"]) == [2]
+    store.close()
+
+def test_faiss_add_many_matches_single_adds(temp_data_dir):
+    """Test that a batch add is searchable and persisted like individual adds."""
+    storage = VectorStorage("test", temp_data_dir, SimpleModel(vector_size=64))
+    contents = ["the cat sat on the mat", "quantum physics lecture notes", "a recipe for bread"]
+    assert storage.add_many(contents, namespace="conversations",
+                            metadatas=[{"key": "cat"}, None, {"key": "bread"}]) == 3
+
+    reloaded = VectorStorage("test", temp_data_dir, SimpleModel(vector_size=64))
+    results = reloaded.search("bread recipe", namespace="conversations", limit=3)
+    assert len(results) == 3
+    assert results[0]["content"] == "a recipe for bread"
+    assert results[0]["metadata"]["key"] == "bread"
+    reloaded.close()
+    storage.close()
+
+def test_vector_store_writes_behind_and_replays_log(temp_data_dir):
+    """Test that adds are logged at once and the index is written later."""
+    store = VectorStore(str(temp_data_dir), dimension=32, flush_interval=60)
+    ids = store.add("compartment", ["alpha", "beta", "gamma"])
+    assert store.remove("compartment", [ids[0]]) == 1
+    assert (temp_data_dir / "compartment.jsonl").exists()
+    assert not (temp_data_dir / "compartment.index").exists()
+
+    # A store opened before the index is written rebuilds it from the log
+    reopened = VectorStore(str(temp_data_dir), dimension=32, flush_interval=60)
+    assert reopened.ensure_compartment("compartment") is True
+    assert {r["text"] for r in reopened.search("compartment", "beta", top_k=3)} == {"beta", "gamma"}
+    assert reopened.add("compartment", ["delta"]) == [3]
+    reopened.close()
+    store.close()
+
+    assert (temp_data_dir / "compartment.index").exists()
+    final = VectorStore(str(temp_data_dir), dimension=32)
+    assert final.load("compartment") is True
+    assert sorted(entry["text"] for entry in final.metadata["compartment"].values()) == \
+        ["beta", "delta", "gamma"]
+    assert final.indices["compartment"].ntotal == 3
+    final.close()
+
+def test_vector_store_flushes_in_background(temp_data_dir):
+    """Test that a full batch of changes is written without an explicit flush."""
+    store = VectorStore(str(temp_data_dir), dimension=32, flush_interval=60, flush_batch=4)
+    store.add("compartment", ["alpha", "beta", "gamma", "delta"])
+
+    index_path = temp_data_dir / "compartment.index"
+    deadline = time.monotonic() + 5
+    while not index_path.exists() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert index_path.exists()
+    assert faiss.read_index(str(index_path)).ntotal == 4
+    store.close()
+
+def test_vector_store_migrates_to_configured_index(temp_data_dir):
+    """Test that a flat compartment is rebuilt as its configured index type."""
+    vectors = np.random.default_rng(0).random((10000, 16), dtype=np.float32)
+    store = VectorStore(str(temp_data_dir), dimension=16, index_factory={"ivf-*": "IVF,Flat"})
+    store.add("ivf-compartment", [f"v{i}" for i in range(9999)], embeddings=vectors[:9999])
+    assert store.index_types["ivf-compartment"] == "Flat"
+
+    # Reaching the training size builds the new index in the background
+    store.add("ivf-compartment", ["v9999"], embeddings=vectors[9999:])
+    store.wait()
+    assert store.index_types["ivf-compartment"] == "IVF,Flat"
+    inner = faiss.downcast_index(store.indices["ivf-compartment"].index)
+    assert isinstance(inner, faiss.IndexIVFFlat) and inner.ntotal == 10000
+
+    # Visiting every list makes the search exact
+    results = store.search("ivf-compartment", "", top_k=1, query_embedding=vectors[42], nprobe=inner.nlist)
+    assert results[0]["text"] == "v42"
+    store.close()
+
+    reloaded = VectorStore(str(temp_data_dir), dimension=16, index_factory={"ivf-*": "IVF,Flat"})
+    assert reloaded.ensure_compartment("ivf-compartment") is True
+    assert reloaded.index_types["ivf-compartment"] == "IVF,Flat"
+    reloaded.close()
+
+def test_vector_store_hnsw_hides_removed_vectors(temp_data_dir):
+    """Test that index types without removal still drop removed vectors from results."""
+    store = VectorStore(str(temp_data_dir), dimension=32, index_factory="HNSW16")
+    ids = store.add("compartment", ["alpha", "beta", "gamma"])
+    assert store.index_types["compartment"] == "HNSW16"
+    assert store.remove("compartment", [ids[1]]) == 1
+
+    results = store.search("compartment", "beta", top_k=3, ef_search=16)
+    assert {r["text"] for r in results} == {"alpha", "gamma"}
+    store.close()
+
+def test_vector_store_scores_are_calibrated_cosine(temp_data_dir):
+    """Test that scores are cosine similarities and min_score cuts results off."""
+    store = VectorStore(str(temp_data_dir), dimension=64)
+    store.add("compartment", ["the cat sat on the mat", "quantum physics lecture notes"])
+
+    results = store.search("compartment", "the cat sat on the mat", top_k=2)
+    assert results[0]["score"] == pytest.approx(1.0, abs=1e-5)
+    assert results[0]["distance"] == pytest.approx(0.0, abs=1e-5)
+    assert 0.0 <= results[1]["score"] < 0.5
+
+    results = store.search("compartment", "the cat sat on the mat", top_k=2, min_score=0.9)
+    assert [r["text"] for r in results] == ["the cat sat on the mat"]
+    store.close()
+
+def test_relevance_agrees_across_metrics():
+    """Test that every backend unit converts to the same relevance."""
+    from engram.core.scoring import (METRIC_COSINE, METRIC_INNER_PRODUCT, METRIC_L2,
+                                     relevance)
+
+    a, b = np.random.default_rng(0).normal(size=(2, 16))
+    a, b = a / np.linalg.norm(a), b / np.linalg.norm(b)
+    cosine = float(a @ b)
+    assert relevance(cosine, METRIC_INNER_PRODUCT) == pytest.approx(max(0.0, cosine))
+    assert relevance(1 - cosine, METRIC_COSINE) == pytest.approx(max(0.0, cosine))
+    assert relevance(float(((a - b) ** 2).sum()), METRIC_L2) == pytest.approx(max(0.0, cosine))
+    assert relevance(4.0, METRIC_L2) == 0.0
+
+def test_vector_store_compacts_tombstones(temp_data_dir):
+    """Test that HNSW tombstones are filtered out and compacted away."""
+    store = VectorStore(str(temp_data_dir), dimension=32, index_factory="HNSW16",
+                        compaction_ratio=0.5)
+    texts = [f"note number {i}" for i in range(10)]
+    ids = store.add("compartment", texts)
+
+    # Below the ratio the removed vectors stay in the index, filtered out
+    assert store.remove("compartment", ids[:3]) == 3
+    assert store.indices["compartment"].ntotal == 10
+    results = store.search("compartment", "note number 1", top_k=7)
+    assert {r["text"] for r in results} == set(texts[3:])
+
+    assert store.remove("compartment", ids[3:5]) == 2
+    store.wait()
+    assert store.indices["compartment"].ntotal == 5
+    assert store.tombstones["compartment"] == set()
+    store.close()
+
+    reloaded = VectorStore(str(temp_data_dir), dimension=32, index_factory="HNSW16")
+    assert reloaded.ensure_compartment("compartment") is True
+    assert reloaded.tombstones["compartment"] == set()
+    assert {r["text"] for r in reloaded.search("compartment", "note", top_k=10)} == set(texts[5:])
+    reloaded.close()
+
+def test_vector_store_replays_metadata_updates(temp_data_dir):
+    """Test that updates and caller-supplied IDs in metadata survive a reload."""
+    store = VectorStore(str(temp_data_dir), dimension=32)
+    vector_id = store.add("compartment", ["alpha"], [{"id": "conversations-alpha"}])[0]
+    assert store.update_metadata("compartment", vector_id, {"expiration": "2030-01-01"}) is True
+    assert store.update_metadata("compartment", vector_id + 1, {"expiration": "2030-01-01"}) is False
+    store.close()
+
+    reloaded = VectorStore(str(temp_data_dir), dimension=32)
+    assert reloaded.ensure_compartment("compartment") is True
+    entry = reloaded.metadata["compartment"][vector_id]
+    assert entry["id"] == "conversations-alpha" and entry["expiration"] == "2030-01-01"
+    reloaded.close()
+
+def test_vector_store_loads_lazily_and_unloads_idle(temp_data_dir):
+    """Test that compartments load on first use and idle ones unload over the memory limit."""
+    store = VectorStore(str(temp_data_dir), dimension=32)
+    for name in ("one", "two", "three"):
+        store.add(name, [f"{name} note {i}" for i in range(100)])
+    store.close()
+
+    # Each compartment holds about 13 KB of vectors; the limit fits one
+    lazy = VectorStore(str(temp_data_dir), dimension=32, memory_limit_mb=0.02, mmap=True)
+    assert lazy.indices == {}
+    assert sorted(lazy.get_compartments()) == ["one", "three", "two"]
+
+    assert lazy.search("one", "one note 5", top_k=1)[0]["text"] == "one note 5"
+    assert lazy.search("two", "two note 7", top_k=1)[0]["text"] == "two note 7"
+    assert list(lazy.indices) == ["two"]
+
+    # Unloaded compartments come back on use, and mapped indexes take changes
+    lazy.add("one", ["one more note"])
+    assert "one" in lazy.indices
+    assert lazy.search("one", "one more note", top_k=1)[0]["text"] == "one more note"
+    lazy.close()
+
+    reloaded = VectorStore(str(temp_data_dir), dimension=32)
+    assert len(reloaded.get_metadata("one")) == 101
+    assert reloaded.get_metadata("missing") == {}
+    reloaded.close()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark the per-message cost of auto-categorization.
+
+Builds synthetic assistant messages of several lengths that mix ordinary
+words with rule keywords, then times the compiled categorizer on each.
+Every message is categorized with a single scan, so cost should grow with
+message length and not with the number of rules.
+
+Usage:
+    python utils/benchmark_categorization.py [--lengths 20 100 500 2000] [--messages 2000]
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add the project root to the path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from engram.core.structured.categorization.rules import DEFAULT_RULES, load_rules
+
+FILLER = ("the a of and to we it is was this that on for with as be by at from "
+          "then so now here there about after before when which while").split()
+
+
+def rule_keywords(rules: dict) -> list:
+    """Collect every keyword in a rule set."""
+    keywords = []
+
+    def walk(node):
+        if isinstance(node, dict):
+            keywords.extend(node.get("keywords", []))
+            for key, value in node.items():
+                if key != "keywords":
+                    walk(value)
+        elif isinstance(node, list):
+            for item in node:
+                walk(item)
+
+    walk(rules)
+    return keywords
+
+
+def make_messages(count: int, words: int, seed: int = 42) -> list:
+    """Build messages of `words` words, about one in fifty a rule keyword."""
+    rng = random.Random(seed)
+    keywords = rule_keywords(DEFAULT_RULES)
+    return [
+        " ".join(rng.choice(keywords) if rng.random() < 0.02 else rng.choice(FILLER)
+                 for _ in range(words)).capitalize() + "."
+        for _ in range(count)
+    ]
+
+
+def benchmark(words: int, count: int) -> dict:
+    """Time categorizing `count` messages of `words` words each."""
+    rules = load_rules()
+    messages = make_messages(count, words)
+
+    latencies = []
+    for message in messages:
+        start = time.perf_counter()
+        rules.categorize(message)
+        latencies.append(time.perf_counter() - start)
+
+    latencies.sort()
+    return {
+        "words": words,
+        "median_us": statistics.median(latencies) * 1e6,
+        "p99_us": latencies[int(len(latencies) * 0.99) - 1] * 1e6,
+        "mean_us": statistics.mean(latencies) * 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark auto-categorization cost")
+    parser.add_argument("--lengths", type=int, nargs="+", default=[20, 100, 500, 2000],
+                        help="Message lengths in words")
+    parser.add_argument("--messages", type=int, default=2000,
+                        help="Number of messages to time at each length")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    load_rules()
+    print(f"Rule compilation: {(time.perf_counter() - start) * 1e3:.1f} ms")
+
+    print(f"{'words':>8} {'median (us)':>12} {'p99 (us)':>10} {'mean (us)':>10}")
+    for words in args.lengths:
+        result = benchmark(words, args.messages)
+        print(f"{result['words']:>8} {result['median_us']:>12.1f} "
+              f"{result['p99_us']:>10.1f} {result['mean_us']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
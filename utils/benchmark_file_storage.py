@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark FileStorage write latency as the number of stored memories grows.
+
+Pre-populates a snapshot with N memories for each size, then times a run of
+individual adds against it. With the append-only log, per-add latency should
+stay flat from 1k to 1M memories.
+
+Usage:
+    python utils/benchmark_file_storage.py [--sizes 1000 10000 100000 1000000] [--writes 1000]
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add the project root to the path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from engram.core.memory.storage.file_storage import FileStorage
+
+
+def populate_snapshot(data_dir: Path, client_id: str, size: int) -> None:
+    """Write a snapshot containing `size` memories directly to disk."""
+    memories = {"conversations": [
+        {
+            "id": f"conversations-{i}",
+            "content": f"Benchmark memory number {i} about topic {i % 97}",
+            "metadata": {"timestamp": f"2025-01-01T00:00:{i % 60:02d}", "client_id": client_id}
+        }
+        for i in range(size)
+    ]}
+    with open(data_dir / f"{client_id}-memories.json", "w") as f:
+        json.dump(memories, f)
+
+
+def benchmark(size: int, writes: int) -> dict:
+    """Time `writes` adds against a store pre-populated with `size` memories."""
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = Path(tmp)
+        populate_snapshot(data_dir, "bench", size)
+
+        start = time.perf_counter()
+        storage = FileStorage("bench", data_dir)
+        load_time = time.perf_counter() - start
+
+        latencies = []
+        for i in range(writes):
+            start = time.perf_counter()
+            storage.add(f"New benchmark memory {i}", namespace="conversations")
+            latencies.append(time.perf_counter() - start)
+        storage.close()
+
+        latencies.sort()
+        return {
+            "size": size,
+            "load_s": load_time,
+            "median_us": statistics.median(latencies) * 1e6,
+            "p99_us": latencies[int(len(latencies) * 0.99) - 1] * 1e6,
+            "mean_us": statistics.mean(latencies) * 1e6,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark FileStorage write latency")
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        default=[1000, 10000, 100000, 1000000],
+                        help="Number of pre-existing memories to test against")
+    parser.add_argument("--writes", type=int, default=1000,
+                        help="Number of adds to time at each size")
+    args = parser.parse_args()
+
+    print(f"{'memories':>10} {'load (s)':>10} {'median (us)':>12} {'p99 (us)':>10} {'mean (us)':>10}")
+    for size in args.sizes:
+        result = benchmark(size, args.writes)
+        print(f"{result['size']:>10} {result['load_s']:>10.2f} {result['median_us']:>12.1f} "
+              f"{result['p99_us']:>10.1f} {result['mean_us']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -178,14 +178,22 @@ class LanceDBAdapter:
     def semantic_search(self, 
                         query: str, 
                         compartment_id: str, 
-                        limit: int = 5) -> List[Dict[str, Any]]:
+                        limit: int = 5,
+                        nprobes: Optional[int] = None,
+                        refine_factor: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         Search for memories by semantic similarity.
         
+        Large compartments are searched through an ANN index; nprobes and
+        refine_factor trade latency for recall on those.
+        
         Args:
             query: The text to search for
             compartment_id: The compartment to search in
             limit: Maximum number of results to return
+            nprobes: Number of IVF partitions to probe (default: 20)
+            refine_factor: Re-rank refine_factor * limit candidates by exact
+                distance (default: 10)
             
         Returns:
             List of matching memories with similarity scores
@@ -201,7 +209,9 @@ class LanceDBAdapter:
         results = self.vector_store.vector_search(
             query=query,
             compartment=compartment_id,
-            top_k=limit
+            top_k=limit,
+            nprobes=nprobes,
+            refine_factor=refine_factor
         )
         
         logger.info(f"Semantic search for '{query}' in compartment '{compartment_id}', found {len(results)} results")
@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+"""
+Benchmark recall and latency of LanceDB ANN search against flat search.
+
+Builds a table of clustered random vectors, computes exact neighbours with
+numpy, then times top-k queries with brute-force search and with an ANN
+index at several nprobes/refine_factor settings.
+
+Usage:
+    python vector/lancedb/benchmark_ann.py [--rows 100000] [--dimension 128] [--queries 200]
+        [--index-type IVF_PQ] [--nprobes 10 20 50] [--refine 1 5 10]
+"""
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import lancedb
+
+# Add Engram to path
+ENGRAM_DIR = str(Path(__file__).parent.parent.parent)
+if ENGRAM_DIR not in sys.path:
+    sys.path.insert(0, ENGRAM_DIR)
+
+from vector.lancedb.vector_store.operations.index import create_index, INDEX_TYPES
+
+
+def make_vectors(rows: int, dimension: int, seed: int = 0) -> np.ndarray:
+    """Generate unit vectors drawn around random cluster centres."""
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(max(1, rows // 1000), dimension))
+    vectors = centres[rng.integers(len(centres), size=rows)] + 0.3 * rng.normal(size=(rows, dimension))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors.astype(np.float32)
+
+
+def exact_neighbours(vectors: np.ndarray, queries: np.ndarray, k: int) -> list:
+    """Compute the true top-k neighbour IDs of each query."""
+    neighbours = []
+    for query in queries:
+        distances = ((vectors - query) ** 2).sum(axis=1)
+        top = np.argpartition(distances, k)[:k]
+        neighbours.append(set(top[np.argsort(distances[top])].tolist()))
+    return neighbours
+
+
+def run_queries(db_table, queries: np.ndarray, truth: list, k: int,
+                nprobes: int = None, refine_factor: int = None, flat: bool = False) -> dict:
+    """Time queries and measure recall against the exact neighbours."""
+    latencies = []
+    hits = 0
+    for query, expected in zip(queries, truth):
+        search = db_table.search(query).select(["id"]).limit(k)
+        if flat:
+            search = search.bypass_vector_index()
+        if nprobes is not None:
+            search = search.nprobes(nprobes)
+        if refine_factor is not None:
+            search = search.refine_factor(refine_factor)
+
+        start = time.perf_counter()
+        rows = search.to_arrow().column("id").to_pylist()
+        latencies.append(time.perf_counter() - start)
+        hits += len(expected.intersection(rows))
+
+    latencies.sort()
+    return {
+        "recall": hits / (k * len(queries)),
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark LanceDB ANN search")
+    parser.add_argument("--rows", type=int, default=100000, help="Rows in the table")
+    parser.add_argument("--dimension", type=int, default=128, help="Vector dimension")
+    parser.add_argument("--queries", type=int, default=200, help="Number of queries")
+    parser.add_argument("--k", type=int, default=10, help="Neighbours per query")
+    parser.add_argument("--index-type", default="IVF_PQ", choices=INDEX_TYPES, help="ANN index type")
+    parser.add_argument("--nprobes", type=int, nargs="+", default=[10, 20, 50], help="nprobes settings")
+    parser.add_argument("--refine", type=int, nargs="+", default=[1, 5, 10], help="refine_factor settings")
+    args = parser.parse_args()
+
+    vectors = make_vectors(args.rows, args.dimension)
+    queries = make_vectors(args.queries, args.dimension, seed=1)
+    truth = exact_neighbours(vectors, queries, args.k)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = lancedb.connect(tmp)
+        db_table = db.create_table("bench", pa.table({
+            "id": pa.array(np.arange(args.rows), pa.int64()),
+            "vector": pa.FixedSizeListArray.from_arrays(pa.array(vectors.ravel()), args.dimension),
+        }))
+
+        print(f"{args.rows} rows, dimension {args.dimension}, top-{args.k}, {args.queries} queries\n")
+        print(f"{'search':<28}{'recall':>8}{'p50 ms':>10}{'p95 ms':>10}")
+
+        result = run_queries(db_table, queries, truth, args.k, flat=True)
+        print(f"{'flat':<28}{result['recall']:>8.3f}{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}")
+
+        start = time.perf_counter()
+        if not create_index(db_table, args.dimension, args.rows, args.index_type):
+            sys.exit(1)
+        print(f"\n{args.index_type} build: {time.perf_counter() - start:.1f}s\n")
+
+        for nprobes in args.nprobes:
+            for refine in args.refine:
+                result = run_queries(db_table, queries, truth, args.k, nprobes=nprobes, refine_factor=refine)
+                label = f"nprobes={nprobes} refine={refine}"
+                print(f"{label:<28}{result['recall']:>8.3f}{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
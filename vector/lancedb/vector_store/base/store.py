@@ -12,10 +12,12 @@ from typing import Dict, List, Any, Optional, Union
 from ..utils.logging import get_logger, log_versions, configure_path
 from ..utils.metadata import MetadataCache
 from ..embedding.simple import SimpleEmbedding
+from engram.core.embedding_cache import cached_encoder
 from ..operations.crud import (
     create_compartment, add_to_compartment, 
-    save_compartment, delete_compartment
+    save_compartment, delete_compartment, drop_placeholder
 )
+from ..operations.index import IndexManager, INDEX_MIN_ROWS
 from ..search.text import text_search
 from ..search.vector import vector_search, get_by_id
 
@@ -35,7 +37,9 @@ class VectorStore:
     def __init__(self, 
                 data_path: str = "vector_data", 
                 dimension: int = 128,
-                use_gpu: bool = False) -> None:
+                use_gpu: bool = False,
+                index_type: str = "IVF_PQ",
+                index_threshold: int = INDEX_MIN_ROWS) -> None:
         """
         Initialize the vector store
         
@@ -43,13 +47,22 @@ class VectorStore:
             data_path: Directory to store vector database
             dimension: Dimension of the vectors to store
             use_gpu: Whether to use GPU acceleration if available
+            index_type: ANN index to build on large compartments ("IVF_PQ" or "IVF_HNSW_SQ")
+            index_threshold: Row count at which a compartment gets an ANN index
         """
         self.data_path = data_path
         self.dimension = dimension
         self.use_gpu = use_gpu
-        self.embedding = SimpleEmbedding(vector_size=dimension)
+        self.embedding = cached_encoder(SimpleEmbedding(vector_size=dimension))
         self.db = None
         
+        # Open table handles and their row counts, by compartment
+        self.tables: Dict[str, Any] = {}
+        self.row_counts: Dict[str, int] = {}
+        
+        # Builds and refreshes ANN indexes in the background
+        self.index_manager = IndexManager(dimension, index_type=index_type, min_rows=index_threshold)
+        
         # Create data directory if it doesn't exist
         os.makedirs(data_path, exist_ok=True)
         
@@ -105,6 +118,46 @@ class VectorStore:
             logger.warning("PyTorch not available, using CPU mode")
             self.use_gpu = False
     
+    def _open_table(self, compartment: str):
+        """
+        Get the open table of a compartment, opening it on first use.
+        
+        Placeholder rows left by older versions are removed the first time
+        a table is opened.
+        
+        Args:
+            compartment: Name of the compartment
+            
+        Returns:
+            LanceDB table, or None if the compartment doesn't exist
+        """
+        db_table = self.tables.get(compartment)
+        if db_table is None:
+            try:
+                db_table = self.db.open_table(compartment)
+            except Exception:
+                return None
+            drop_placeholder(db_table, self.metadata_cache, compartment)
+            self.tables[compartment] = db_table
+        return db_table
+    
+    def _row_count(self, compartment: str, db_table) -> int:
+        """
+        Get the number of rows in a compartment, counting only after changes.
+        
+        Args:
+            compartment: Name of the compartment
+            db_table: LanceDB table of the compartment
+            
+        Returns:
+            Number of rows in the table
+        """
+        count = self.row_counts.get(compartment)
+        if count is None:
+            count = db_table.count_rows()
+            self.row_counts[compartment] = count
+        return count
+    
     def create_compartment(self, compartment: str) -> bool:
         """
         Create a new compartment (table in LanceDB)
@@ -115,7 +168,7 @@ class VectorStore:
         Returns:
             True if successful, False otherwise
         """
-        if not self.db:
+        if self.db is None:
             logger.error("Database not initialized")
             return False
             
@@ -128,7 +181,7 @@ class VectorStore:
         Returns:
             List of compartment names
         """
-        if not self.db:
+        if self.db is None:
             logger.error("Database not initialized")
             return []
             
@@ -151,12 +204,12 @@ class VectorStore:
         Returns:
             List of IDs assigned to the added texts
         """
-        if not self.db:
+        if self.db is None:
             logger.error("Database not initialized")
             # Try to reinitialize the database
             try:
                 self._initialize_db()
-                if not self.db:
+                if self.db is None:
                     return []
             except Exception:
                 return []
@@ -167,10 +220,33 @@ class VectorStore:
         # Convert texts to embeddings
         embeddings = self.embedding.encode(texts).tolist()
         
-        # Add to compartment
-        return add_to_compartment(
-            self.db, self.metadata_cache, compartment, texts, embeddings, metadatas
+        # Add to compartment; the row count is recounted on the next search
+        ids = add_to_compartment(
+            self.db, self.metadata_cache, compartment, texts, embeddings, metadatas,
+            db_table=self._open_table(compartment)
         )
+        self.row_counts.pop(compartment, None)
+        
+        # Build or refresh the ANN index once enough rows have accumulated
+        db_table = self._open_table(compartment)
+        if db_table is not None:
+            try:
+                self.index_manager.maybe_update(
+                    compartment, db_table, self._row_count(compartment, db_table)
+                )
+            except Exception as e:
+                logger.error(f"Failed to schedule index update for '{compartment}': {e}")
+        return ids
+    
+    def wait_for_index(self, compartment: Optional[str] = None, timeout: Optional[float] = None) -> None:
+        """
+        Wait for background index builds to finish
+        
+        Args:
+            compartment: Compartment to wait for, or None for all
+            timeout: Maximum seconds to wait per build
+        """
+        self.index_manager.wait(compartment, timeout)
     
     def save(self, compartment: str) -> bool:
         """
@@ -182,7 +258,7 @@ class VectorStore:
         Returns:
             True if successful, False otherwise
         """
-        if not self.db:
+        if self.db is None:
             logger.error("Database not initialized")
             return False
             
@@ -209,7 +285,7 @@ class VectorStore:
         Returns:
             List of matching documents with metadata and scores
         """
-        if not self.db:
+        if self.db is None:
             logger.error("Database not initialized")
             return []
             
@@ -228,7 +304,10 @@ class VectorStore:
             logger.error(f"Failed to search in compartment '{compartment}': {e}")
             return []
     
-    def vector_search(self, query: str, compartment: str, top_k: int = 5) -> List[Dict[str, Any]]:
+    def vector_search(self, query: str, compartment: str, top_k: int = 5,
+                     nprobes: Optional[int] = None,
+                     refine_factor: Optional[int] = None,
+                     min_score: float = 0.0) -> List[Dict[str, Any]]:
         """
         Search for similar texts using vector similarity
         
@@ -236,30 +315,40 @@ class VectorStore:
             query: The search query
             compartment: The compartment to search in
             top_k: Number of results to return
+            nprobes: Number of IVF partitions to probe on indexed compartments
+                (default: DEFAULT_NPROBES)
+            refine_factor: Re-rank refine_factor * top_k index candidates by exact
+                distance (default: DEFAULT_REFINE_FACTOR)
+            min_score: Minimum relevance score; fewer than top_k results may be returned
             
         Returns:
             List of matching documents with metadata and scores
         """
-        if not self.db:
+        if self.db is None:
             logger.error("Database not initialized")
             return []
             
         try:
-            if compartment not in self.get_compartments():
+            db_table = self._open_table(compartment)
+            if db_table is None:
                 logger.warning(f"Compartment '{compartment}' doesn't exist")
                 return []
                 
+            # Nothing to search in an empty table
+            row_count = self._row_count(compartment, db_table)
+            if row_count == 0:
+                return []
+                
             # Create query embedding
             query_embedding = self.embedding.encode(query)[0].tolist()
             
             # Load metadata cache
             cache = self.metadata_cache.load(compartment)
             
-            # Open LanceDB table
-            db_table = self.db.open_table(compartment)
-            
             # Perform vector search
-            return vector_search(db_table, query_embedding, cache, top_k)
+            return vector_search(db_table, query_embedding, cache, top_k, row_count,
+                                 nprobes=nprobes, refine_factor=refine_factor,
+                                 min_score=min_score)
                 
         except Exception as e:
             logger.error(f"Failed to perform vector search in compartment '{compartment}': {e}")
@@ -276,21 +365,19 @@ class VectorStore:
         Returns:
             The memory if found, None otherwise
         """
-        if not self.db:
+        if self.db is None:
             logger.error("Database not initialized")
             return None
             
         try:
-            if compartment not in self.get_compartments():
+            db_table = self._open_table(compartment)
+            if db_table is None:
                 logger.warning(f"Compartment '{compartment}' doesn't exist")
                 return None
                 
             # Load metadata cache
             cache = self.metadata_cache.load(compartment)
             
-            # Open LanceDB table
-            db_table = self.db.open_table(compartment)
-            
             # Get memory by ID
             return get_by_id(db_table, memory_id, cache)
                 
@@ -308,7 +395,7 @@ class VectorStore:
         Returns:
             True if successful, False otherwise
         """
-        if not self.db:
+        if self.db is None:
             logger.error("Database not initialized")
             return False
             
@@ -317,6 +404,9 @@ class VectorStore:
                 logger.warning(f"Compartment '{compartment}' doesn't exist")
                 return False
                 
+            self.index_manager.forget(compartment)
+            self.tables.pop(compartment, None)
+            self.row_counts.pop(compartment, None)
             return delete_compartment(self.db, self.metadata_cache, compartment)
                 
         except Exception as e:
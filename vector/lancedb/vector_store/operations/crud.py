@@ -5,6 +5,7 @@ This module provides create, read, update, and delete operations for vector stor
 """
 
 import os
+import json
 import time
 import logging
 import pyarrow as pa
@@ -14,6 +15,51 @@ from typing import Dict, List, Any, Optional, Tuple
 logger = logging.getLogger("lancedb_vector_store.operations")
 
 
+# Columns every compartment table has; metadata is stored as a JSON string
+BASE_COLUMNS = ("id", "text", "vector", "timestamp")
+
+
+def compartment_schema(dimension: int) -> pa.Schema:
+    """
+    Get the Arrow schema for a compartment table.
+    
+    Args:
+        dimension: Dimension of the vectors to store
+        
+    Returns:
+        Arrow schema with a fixed-size vector column
+    """
+    return pa.schema([
+        pa.field("id", pa.int64()),
+        pa.field("text", pa.string()),
+        pa.field("vector", pa.list_(pa.float32(), dimension)),
+        pa.field("timestamp", pa.float64()),
+        pa.field("metadata", pa.string()),
+    ])
+
+
+def drop_placeholder(db_table, metadata_cache, compartment: str) -> None:
+    """
+    Remove the id=0 placeholder row that older versions created in every table.
+    
+    Args:
+        db_table: LanceDB table of the compartment
+        metadata_cache: Metadata cache manager
+        compartment: Name of the compartment
+    """
+    try:
+        if db_table.count_rows("id = 0") > 0:
+            db_table.delete("id = 0")
+            logger.info(f"Removed placeholder row from '{compartment}'")
+    except Exception as e:
+        logger.warning(f"Failed to remove placeholder row from '{compartment}': {e}")
+    
+    cache = metadata_cache.load(compartment)
+    if any(entry.get("placeholder", False) for entry in cache):
+        cache[:] = [entry for entry in cache if not entry.get("placeholder", False)]
+        metadata_cache.save(compartment)
+
+
 def create_compartment(db, metadata_cache, compartment: str, dimension: int) -> bool:
     """
     Create a new compartment (table in LanceDB).
@@ -33,53 +79,25 @@ def create_compartment(db, metadata_cache, compartment: str, dimension: int) ->
             table_names = db.table_names()
             if compartment in table_names:
                 logger.info(f"Compartment '{compartment}' already exists")
-                # Load metadata cache if not already loaded
-                metadata_cache.load(compartment)
+                drop_placeholder(db.open_table(compartment), metadata_cache, compartment)
                 return True
         except Exception as e:
             logger.warning(f"Error checking existing tables: {e}")
             # Proceed with creation attempt
             
-        # Create a minimal table with required fields
-        empty_table = pa.Table.from_pydict(
-            {
-                "id": [0],
-                "text": ["initialization placeholder"],
-                "vector": [[0.0] * dimension],
-                "timestamp": [time.time()]
-            }
-        )
-        
-        # First try to open the table to see if it exists
+        # Create an empty table with an explicit schema
         try:
-            db.open_table(compartment)
-            logger.info(f"Table '{compartment}' exists but wasn't listed")
-            exists = True
-        except:
-            exists = False
-            
-        if not exists:
-            # Create the table
-            try:
-                db.create_table(compartment, empty_table)
-                logger.info(f"Created new compartment '{compartment}'")
-            except Exception as create_err:
-                logger.error(f"Error creating table: {create_err}")
-                # If table creation failed due to existing table, we can still proceed
-                if "already exists" not in str(create_err):
-                    raise
+            db.create_table(compartment, schema=compartment_schema(dimension))
+            logger.info(f"Created new compartment '{compartment}'")
+        except Exception as create_err:
+            logger.error(f"Error creating table: {create_err}")
+            # If table creation failed due to existing table, we can still proceed
+            if "already exists" not in str(create_err):
+                raise
         
-        # Initialize metadata cache with the placeholder
-        cache = metadata_cache.load(compartment)
-        if not cache:  # If cache is empty
-            cache_entry = {
-                "id": 0,
-                "text": "initialization placeholder",
-                "timestamp": time.time(),
-                "placeholder": True
-            }
-            metadata_cache.cache[compartment] = [cache_entry]
-            metadata_cache.save(compartment)
+        # Initialize an empty metadata cache
+        metadata_cache.load(compartment)
+        metadata_cache.save(compartment)
         
         return True
     except Exception as e:
@@ -87,9 +105,45 @@ def create_compartment(db, metadata_cache, compartment: str, dimension: int) ->
         return False
 
 
+def build_rows(schema: pa.Schema, ids: List[int], texts: List[str],
+               embeddings: List[List[float]], timestamp: float,
+               metadatas: List[Dict[str, Any]]) -> pa.Table:
+    """
+    Build an Arrow table of new rows conforming to a compartment's schema.
+    
+    Tables created before the explicit schema stored each metadata key as
+    its own column; those columns are filled from the metadata when present.
+    
+    Args:
+        schema: Schema of the target table
+        ids: IDs of the new rows
+        texts: Texts of the new rows
+        embeddings: Embedding vectors of the new rows
+        timestamp: Timestamp for the new rows
+        metadatas: Metadata dicts of the new rows
+        
+    Returns:
+        Arrow table ready to append
+    """
+    data = {
+        "id": ids,
+        "text": texts,
+        "vector": embeddings,
+        "timestamp": [timestamp] * len(texts),
+    }
+    for name in schema.names:
+        if name == "metadata":
+            data[name] = [json.dumps(meta, default=str) for meta in metadatas]
+        elif name not in data:
+            data[name] = [meta.get(name) for meta in metadatas]
+    
+    return pa.Table.from_pydict({name: data[name] for name in schema.names}, schema=schema)
+
+
 def add_to_compartment(db, metadata_cache, compartment: str, 
                       texts: List[str], embeddings: List[List[float]],
-                      metadatas: Optional[List[Dict[str, Any]]] = None) -> List[int]:
+                      metadatas: Optional[List[Dict[str, Any]]] = None,
+                      db_table=None) -> List[int]:
     """
     Add texts and their embeddings to a compartment.
     
@@ -100,6 +154,7 @@ def add_to_compartment(db, metadata_cache, compartment: str,
         texts: List of texts to add
         embeddings: List of embedding vectors for the texts
         metadatas: Optional list of metadata dicts for the texts
+        db_table: Already open table of the compartment, if any
         
     Returns:
         List of IDs assigned to the added texts
@@ -116,7 +171,7 @@ def add_to_compartment(db, metadata_cache, compartment: str,
     try:
         # Ensure compartment exists
         try:
-            if compartment not in db.table_names():
+            if db_table is None and compartment not in db.table_names():
                 create_compartment(db, metadata_cache, compartment, len(embeddings[0]))
         except Exception as e:
             logger.warning(f"Error checking compartments: {e}")
@@ -126,8 +181,8 @@ def add_to_compartment(db, metadata_cache, compartment: str,
         # Load metadata cache
         cache = metadata_cache.load(compartment)
         
-        # Current count in the index
-        start_id = 1  # Start from 1 since 0 is the placeholder
+        # Next ID (0 was the placeholder in older tables and stays unused)
+        start_id = 1
         if cache:
             start_id = max(item.get("id", 0) for item in cache) + 1
             
@@ -136,43 +191,17 @@ def add_to_compartment(db, metadata_cache, compartment: str,
         
         # Prepare data for LanceDB
         timestamp = time.time()
-        data = {
-            "id": ids,
-            "text": texts,
-            "vector": embeddings,
-            "timestamp": [timestamp] * len(texts)
-        }
-        
-        # Add metadata fields - create empty fields for all possible metadata keys
-        all_keys = set()
-        for meta in metadatas:
-            all_keys.update(meta.keys())
-            
-        # Add each metadata field with appropriate values for each record
-        for key in all_keys:
-            data[key] = [meta.get(key, None) for meta in metadatas]
-            
-        # Create Arrow table
-        table = pa.Table.from_pydict(data)
         
         # Add to LanceDB
         try:
-            db_table = db.open_table(compartment)
-            db_table.add(table)
+            if db_table is None:
+                db_table = db.open_table(compartment)
+            db_table.add(build_rows(db_table.schema, ids, texts, embeddings, timestamp, metadatas))
             logger.info(f"Added {len(texts)} texts to table '{compartment}'")
         except Exception as table_err:
-            logger.error(f"Failed to add to table: {table_err}")
-            # Try to create the table first if it doesn't exist or has schema issues
-            if "Table does not exist" in str(table_err) or "schema mismatch" in str(table_err).lower():
-                logger.info(f"Creating table '{compartment}' with new schema")
-                try:
-                    db.create_table(compartment, table)
-                    logger.info(f"Created table '{compartment}' with data")
-                except Exception as create_err:
-                    logger.error(f"Failed to create table: {create_err}")
-                    # Still keep track in metadata cache even if DB operation failed
-            else:
-                raise
+            # Nothing was stored, so don't hand out IDs for it
+            logger.error(f"Failed to add to table '{compartment}': {table_err}")
+            return []
         
         # Add to metadata cache
         metadata_cache.add_entries(compartment, texts, ids, timestamp, metadatas)
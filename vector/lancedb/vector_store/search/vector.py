@@ -4,66 +4,99 @@ Vector-based search functionality for the LanceDB vector store.
 This module provides vector-based search functionality for the vector store.
 """
 
+import json
 import logging
-import lancedb
-import pandas as pd
 from typing import Dict, List, Any, Optional, Union
 
+from engram.core.scoring import METRIC_L2, relevance
+from ..operations.crud import BASE_COLUMNS
+from ..operations.index import DEFAULT_NPROBES, DEFAULT_REFINE_FACTOR
+
 # Get logger
 logger = logging.getLogger("lancedb_vector_store.search.vector")
 
 
+def row_metadata(row: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Extract the metadata of a table row.
+    
+    Metadata is stored as a JSON string column; tables created by older
+    versions store each metadata key in its own column instead.
+    
+    Args:
+        row: Row as returned by Arrow's to_pylist()
+        
+    Returns:
+        Metadata dictionary
+    """
+    metadata = {k: v for k, v in row.items()
+               if k not in BASE_COLUMNS and k not in ("metadata", "_distance")}
+    if row.get("metadata"):
+        try:
+            metadata.update(json.loads(row["metadata"]))
+        except (TypeError, ValueError):
+            metadata["metadata"] = row["metadata"]
+    return metadata
+
+
 def vector_search(db_table, query_embedding: List[float], metadata_cache: List[Dict[str, Any]], 
-                 top_k: int = 5) -> List[Dict[str, Any]]:
+                 top_k: int = 5, row_count: Optional[int] = None,
+                 nprobes: Optional[int] = None,
+                 refine_factor: Optional[int] = None,
+                 min_score: float = 0.0) -> List[Dict[str, Any]]:
     """
     Search for similar texts using vector similarity.
     
+    Scores are the shared relevance of engram.core.scoring (cosine
+    similarity of the unit-length embeddings, clipped to [0, 1]).
+    
     Args:
         db_table: LanceDB table to search in
         query_embedding: The query embedding vector
         metadata_cache: Fallback metadata cache to use if DB search fails
         top_k: Number of results to return
+        row_count: Known number of rows in the table, if cached by the caller
+        nprobes: Number of IVF partitions to probe when the table has an ANN index
+            (default: DEFAULT_NPROBES)
+        refine_factor: Re-rank refine_factor * top_k index candidates by exact
+            distance (default: DEFAULT_REFINE_FACTOR)
+        min_score: Stop at the first result whose score is below this
         
     Returns:
         List of matching documents with metadata and scores
     """
     try:
-        # Skip the placeholder record (id=0) in search
-        search_query = db_table.search(query_embedding)
-        
-        # Check if the table is empty (except for placeholder)
-        table_empty = len(db_table.to_pandas()) <= 1
-        if table_empty:
-            logger.warning(f"Table is empty (has only placeholder)")
+        # count_rows() reads fragment metadata; it never scans the table
+        if row_count is None:
+            row_count = db_table.count_rows()
+        if row_count == 0:
+            logger.debug("Table is empty")
             return []
             
-        # Get search results and then filter out placeholder with pandas
-        search_results = search_query.limit(top_k + 1).to_pandas()
-        search_results = search_results[search_results["id"] != 0].head(top_k)
+        # Fetch only the top-k rows, without their vectors, as plain dicts
+        columns = [name for name in db_table.schema.names if name != "vector"]
+        search_query = db_table.search(query_embedding).select(columns + ["_distance"]).limit(top_k)
         
-        # If no results (could happen if only placeholder exists)
-        if search_results.empty:
-            return []
+        # Trade recall for latency on indexed tables; ignored by flat search
+        search_query = search_query.nprobes(nprobes or DEFAULT_NPROBES)
+        search_query = search_query.refine_factor(refine_factor or DEFAULT_REFINE_FACTOR)
+            
+        search_results = search_query.to_arrow().to_pylist()
         
         # Format results
         results = []
-        for _, row in search_results.iterrows():
-            # Get metadata
-            metadata = {k: v for k, v in row.items() 
-                       if k not in ["id", "text", "vector", "timestamp", "_distance"]}
-            
-            # Calculate score (convert distance to similarity score)
-            # LanceDB returns L2 distance, so we convert to a similarity score
-            # where 1.0 is most similar and 0.0 is least similar
-            max_distance = 10.0  # Arbitrary max distance to normalize
-            score = max(0.0, 1.0 - (row["_distance"] / max_distance))
+        for row in search_results:
+            # LanceDB returns squared L2 distances, closest first
+            score = relevance(row["_distance"], METRIC_L2)
+            if score < min_score:
+                break
             
             # Add to results
             results.append({
                 "id": int(row["id"]),
                 "text": row["text"],
                 "score": score,
-                "metadata": metadata
+                "metadata": row_metadata(row)
             })
             
         return results
@@ -108,15 +141,22 @@ def get_by_id(db_table, memory_id: int, metadata_cache: List[Dict[str, Any]]) ->
     
     # Not found in cache, query the database
     try:
-        result = db_table.to_pandas(filter=f"id = {memory_id}")
+        columns = [name for name in db_table.schema.names if name != "vector"]
+        rows = (
+            db_table.search()
+            .where(f"id = {int(memory_id)}")
+            .select(columns)
+            .limit(1)
+            .to_arrow()
+            .to_pylist()
+        )
         
-        if len(result) > 0:
-            row = result.iloc[0]
+        if rows:
+            row = rows[0]
             return {
                 "id": int(row["id"]),
                 "text": row["text"],
-                "metadata": {k: v for k, v in row.items() 
-                           if k not in ["id", "text", "vector", "timestamp"]}
+                "metadata": row_metadata(row)
             }
         else:
             return None